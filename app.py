@@ -1,20 +1,387 @@
+"""
+The SystemNode HTTP API. create_app() configures it from the environment; nothing connects to
+the database or starts a thread at import, and the DAO modules are imported only for the
+backend that is configured. Serve it with gunicorn (see gunicorn.conf.py) or, for local
+development, `python app.py`.
+"""
+
+import atexit
+import logging
+import math
 import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Optional
 
-from flask import Flask, request, jsonify
-from src.dao.system_node_dao import SystemNodeDAO
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from src.dao.system_node import SystemNode
+from src.admission import admission_from_env
+from src.compression import PREFERENCE, compression_from_env, iter_json_array
+from src.config import db_config_from_env, replica_configs_from_env, env_flag
+from src.metrics import metrics
+from src.tracing import tracer, tracer_from_env, InMemoryExporter
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
+# Set by create_app()
+response_compression = None
+admission = None
+db_config = None
+dao = None
+mysql_dao = None  # the SystemNodeDAO underneath any wrappers, for MySQL-only features
+maintenance_dao = None
+subtree_stats = None
+change_log = None
+node_cache = None
+node_versions = None
+subtree_hashes = None
+access_tracker = None
+cache_prewarmer = None
+_set_session = None  # SystemNodeDAO.set_session for the MySQL backends
+
+_configured = False
+_started_pid = None
+_startup_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def _configure() -> None:
+    global response_compression, admission, db_config, dao, mysql_dao, maintenance_dao
+    global subtree_stats, change_log, node_versions, subtree_hashes, _set_session
+
+    # TRACE_SAMPLE_RATE=0.01 traces 1% of requests (spans in memory for GET /traces, or TRACE_FILE)
+    tracer_from_env()
+
+    # Responses over HTTP_COMPRESSION_MIN_BYTES are compressed (zstd/br/gzip, per Accept-Encoding);
+    # HTTP_COMPRESSION=false turns that off
+    response_compression = compression_from_env()
+
+    # ADMISSION_CONTROL=true bounds concurrent requests per route class and sheds the excess with 503 (ADMISSION_LIMITS)
+    admission = admission_from_env()
+
+    # Load DB configuration from environment variables or defaults
+    db_config = db_config_from_env()
+
+    # DB_BACKEND selects the storage backend: "mysql" (default) or "sqlite" (embedded, see SQLITE_PATH)
+    db_backend = os.getenv("DB_BACKEND", "mysql").lower()
+    if db_backend == "sqlite":
+        from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO
+
+        dao = SQLiteSystemNodeDAO(os.getenv("SQLITE_PATH", "system.db"))
+    elif db_backend == "mysql" and os.getenv("DB_SHARDS"):
+        from src.dao.sharding import sharded_dao_from_env
+        from src.dao.system_node_dao import SystemNodeDAO
+
+        # DB_SHARDS="s0=db_a,s1=host2:3307/db_b" spreads top-level subtrees over several databases, with the
+        # ShardDirectory in DB_NAME (`manage.py init-shards`). MySQL-only features work per database and are off.
+        dao = sharded_dao_from_env(pool_size=int(os.getenv("DB_POOL_SIZE", "0")),
+                                   prepared_statements=env_flag("DB_PREPARED_STATEMENTS"))
+        atexit.register(dao.close)
+        _set_session = SystemNodeDAO.set_session
+    elif db_backend == "mysql":
+        from src.dao.system_node_dao import SystemNodeDAO
+
+        # DB_REPLICA_HOSTS="host1,host2:3307" routes reads to replicas with the same credentials
+        # DB_POOL_SIZE=<n> reuses connections; DB_PREPARED_STATEMENTS=true then prepares the hot reads once
+        # per connection
+        dao = SystemNodeDAO(
+            db_config,
+            replica_configs=replica_configs_from_env(db_config),
+            read_your_writes_seconds=float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "0")),
+            pool_size=int(os.getenv("DB_POOL_SIZE", "0")),
+            prepared_statements=env_flag("DB_PREPARED_STATEMENTS")
+        )
+        mysql_dao = dao
+        _set_session = SystemNodeDAO.set_session
+        # DB_SUBTREE_STATS=true keeps per-node descendant counts by Status (GET /nodes/<id>/stats)
+        if env_flag("DB_SUBTREE_STATS"):
+            from src.dao.subtree_stats import SubtreeStats
+
+            subtree_stats = SubtreeStats(dao)
+        # DB_CHANGE_LOG=true records a versioned SystemNodeChange row per changed node (snapshot catch-up)
+        if env_flag("DB_CHANGE_LOG"):
+            from src.dao.change_log import ChangeLog
+
+            change_log = ChangeLog(dao)
+        # DB_GROUP_COMMIT=true commits concurrent creates / updates arriving within DB_GROUP_COMMIT_WINDOW_MS
+        # (default 2) together, up to DB_GROUP_COMMIT_MAX_BATCH (default 32) per transaction
+        if env_flag("DB_GROUP_COMMIT"):
+            from src.dao.group_commit import GroupCommitSystemNodeDAO
+
+            dao = GroupCommitSystemNodeDAO(dao,
+                                           window_seconds=float(os.getenv("DB_GROUP_COMMIT_WINDOW_MS", "2")) / 1000,
+                                           max_batch=int(os.getenv("DB_GROUP_COMMIT_MAX_BATCH", "32")))
+    else:
+        raise ValueError(f"Unknown DB_BACKEND '{db_backend}' (expected 'mysql' or 'sqlite')")
+
+    # DB_ENGINE=memory serves every read from an in-memory copy of the tree and persists writes behind
+    # (the tree is loaded by start_worker)
+    if os.getenv("DB_ENGINE", "").lower() == "memory":
+        from src.dao.in_memory_dao import InMemorySystemNodeDAO
+
+        dao = InMemorySystemNodeDAO(dao, durable_writes=env_flag("DB_DURABLE_WRITES"))
+    # The cache, coalescing and access-stats wrappers are added by start_worker, after the fork
+
+    # SortOrder compaction and archiving write straight to MySQL, so they are unavailable when the memory engine
+    # owns writes
+    maintenance_dao = None if os.getenv("DB_ENGINE", "").lower() == "memory" else mysql_dao
+
+    # HTTP_ETAGS=true versions each node, child list and the whole tree (SystemNodeVersion, `manage.py migrate`)
+    # so GETs carry ETags and If-None-Match gets a 304 without the listing query. Not with DB_ENGINE=memory,
+    # whose write-behind batches skip write hooks.
+    if maintenance_dao is not None and env_flag("HTTP_ETAGS"):
+        from src.dao.node_versions import NodeVersions
+
+        node_versions = NodeVersions(maintenance_dao,
+                                     settle_seconds=float(os.getenv("HTTP_ETAG_SETTLE_SECONDS", "5")))
+    # DB_SUBTREE_HASHES=true keeps a Merkle hash per subtree (SystemNodeHash, `manage.py migrate`) for
+    # GET /nodes/<id>/hash, so an offline client can resync by comparing hashes top-down
+    if maintenance_dao is not None and env_flag("DB_SUBTREE_HASHES"):
+        from src.dao.subtree_hashes import SubtreeHashes
+
+        subtree_hashes = SubtreeHashes(maintenance_dao)
+
+
+def _wrap_reads() -> None:
+    """
+    Wrap dao in the per-process read layers: the cache (its store connection and invalidation
+    subscription thread would not survive a fork), read coalescing and access stats.
+    """
+    global dao, node_cache, access_tracker
+
+    if os.getenv("DB_ENGINE", "").lower() != "memory":
+        # CACHE_URL=local (per worker) or redis://host:6379/0 (shared by every worker) caches nodes and child lists
+        if os.getenv("CACHE_URL"):
+            from src.dao.cache import CachedSystemNodeDAO, kv_store_from_url
+
+            dao = node_cache = CachedSystemNodeDAO(
+                dao,
+                kv_store_from_url(os.getenv("CACHE_URL")),
+                ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "300")),
+                near_cache_size=int(os.getenv("CACHE_NEAR_SIZE", "0")),
+                near_ttl_seconds=float(os.getenv("CACHE_NEAR_TTL_SECONDS", "5"))
+            )
+        if env_flag("DB_COALESCE_READS", default=True):
+            from src.dao.coalescing_dao import CoalescingSystemNodeDAO
+
+            # Identical concurrent reads (e.g. many tabs reconnecting) share one query
+            dao = CoalescingSystemNodeDAO(dao)
+
+    # ACCESS_STATS=true samples reads into decaying hot-node / hot-parent counts (GET /debug/hot)
+    from src.dao.access_stats import access_tracking_from_env
+
+    access_tracker = access_tracking_from_env(dao)
+    if access_tracker is not None:
+        dao = access_tracker
+
+
+def start_worker() -> None:
+    """
+    Start what must not be shared across a fork: the read caches (see _wrap_reads), the
+    in-memory engine's load and write-behind thread, replica health checks, background
+    compaction, cache prewarming, and (APP_WARMUP=true) the warm-up. Runs once per process;
+    GET /readyz answers 200 once it has finished.
+    """
+    global _started_pid, cache_prewarmer
+    with _startup_lock:
+        if _started_pid == os.getpid():
+            return
+        _started_pid = os.getpid()
+
+    _wrap_reads()
+    if os.getenv("DB_ENGINE", "").lower() == "memory":
+        # SNAPSHOT_PATH (see `manage.py snapshot`) skips the full read_all() query on cold start
+        snapshot_path = os.getenv("SNAPSHOT_PATH")
+        if snapshot_path and os.path.exists(snapshot_path):
+            dao.load_from_snapshot(snapshot_path, change_log)
+        else:
+            dao.load()
+        dao.start()
+        atexit.register(dao.close)
+    if mysql_dao is not None:
+        mysql_dao.replicas.start_health_checks()
+    # DB_SORT_COMPACTION_INTERVAL=600 renumbers drifted sibling lists in the background every 10 minutes
+    if maintenance_dao is not None and float(os.getenv("DB_SORT_COMPACTION_INTERVAL", "0")) > 0:
+        from src.dao.sort_compaction import start_background_compaction
+
+        start_background_compaction(maintenance_dao, float(os.getenv("DB_SORT_COMPACTION_INTERVAL")))
+    # CACHE_PREWARM_INTERVAL=30 keeps the CACHE_PREWARM_TOP (default 100) hottest nodes and child lists
+    # (ACCESS_STATS) cached, CACHE_PREWARM_DEPTH levels of child lists down, reloading what restarts
+    # and invalidations dropped
+    if access_tracker is not None and node_cache is not None and float(os.getenv("CACHE_PREWARM_INTERVAL", "0")) > 0:
+        from src.dao.access_stats import CachePrewarmer
+
+        cache_prewarmer = CachePrewarmer(access_tracker, node_cache, top_n=int(os.getenv("CACHE_PREWARM_TOP", "100")),
+                                         depth=int(os.getenv("CACHE_PREWARM_DEPTH", "1")))
+    if env_flag("APP_WARMUP"):
+        try:
+            warm_up()
+        except Exception:
+            logger.exception("Warm-up failed; serving without it")
+    if cache_prewarmer is not None:
+        cache_prewarmer.start(float(os.getenv("CACHE_PREWARM_INTERVAL")))
+    _ready.set()
+
+
+def warm_up() -> dict:
+    """
+    Do the first request's work before the instance takes traffic: open APP_WARMUP_CONNECTIONS
+    pooled MySQL connections (default DB_POOL_SIZE) and read the top-level list through the whole
+    DAO stack, which fills the caches and prepares the hot statements on one connection. With a
+    cache prewarmer, the saved hot nodes and child lists are cached too.
+    Observation: app.warm_up_ms.
+    """
+    start = time.perf_counter()
+    result = {"connections": 0}
+    if mysql_dao is not None:
+        connections = int(os.getenv("APP_WARMUP_CONNECTIONS", os.getenv("DB_POOL_SIZE", "0")))
+        result["connections"] = mysql_dao.warm_up(connections)
+    result["top_level_nodes"] = len(dao.read_by_parent(None))
+    if cache_prewarmer is not None:
+        cache_prewarmer.load_saved()
+        result["prewarmed"] = cache_prewarmer.run_once()
+    metrics.observe("app.warm_up_ms", (time.perf_counter() - start) * 1000)
+    return result
+
+
+def create_app(start: bool = True) -> Flask:
+    """
+    The application factory: configures the app from the environment on the first call and
+    returns it. start=False leaves start_worker() to the caller, which is how gunicorn's
+    preload uses it (configure once in the master, start in each forked worker).
+    Observation: app.create_app_ms.
+    """
+    global _configured
+    with _startup_lock:
+        if not _configured:
+            began = time.perf_counter()
+            _configure()
+            _configured = True
+            metrics.observe("app.create_app_ms", (time.perf_counter() - began) * 1000)
+    if start:
+        start_worker()
+    return app
+
+
+# Read-your-writes across worker processes and instances: a write's time goes back to the client in this
+# header (and cookie) and comes back with its next requests
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+
+
+@app.before_request
+def bind_session():
+    # Clients that echo X-Last-Write (or keep the cookie) read their own writes from the primary for
+    # DB_READ_YOUR_WRITES_SECONDS; X-Session-ID alone only pins within the process that served the write
+    if _set_session is not None:
+        last_write = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+        try:
+            last_write_at = float(last_write) if last_write else None
+        except ValueError:
+            last_write_at = None
+        _set_session(request.headers.get("X-Session-ID"), last_write_at)
+
+
+@app.before_request
+def start_trace():
+    # X-Trace-Id continues a caller's trace ID; X-Trace-Sample: 1 records this request regardless of sampling
+    g.trace_id = request.headers.get("X-Trace-Id") or tracer.new_trace_id()
+    g.trace_scope = tracer.start_trace(
+        f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+        trace_id=g.trace_id,
+        force=request.headers.get("X-Trace-Sample") == "1",
+        path=request.path
+    )
+    g.trace_span = g.trace_scope.__enter__()
+
+
+# Endpoints that never touch the database are not admission-controlled
+_UNMETERED_ENDPOINTS = {"home", "get_metrics", "get_traces", "get_hot_nodes", "healthz", "readyz", "static"}
+# (a subtree hash read may have to hash a whole subtree that was never read before)
+_HEAVY_ENDPOINTS = {"export_nodes", "archive_nodes", "compact_children", "get_subtree_hash"}
+# POSTs that only read
+_READ_ENDPOINTS = {"resolve_node_paths", "batch_get_nodes"}
 
-# Load DB configuration from environment variables or defaults
-db_config = {
-    "host": os.getenv("DB_HOST", "127.0.0.1"),
-    "user": os.getenv("DB_USER", "root"),
-    "password": os.getenv("DB_PASSWORD", ""),
-    "database": os.getenv("DB_NAME", "jbone-system-db")
-}
 
-dao = SystemNodeDAO(db_config)
+def _route_class() -> Optional[str]:
+    if request.endpoint is None or request.endpoint in _UNMETERED_ENDPOINTS:
+        return None
+    if request.endpoint in _HEAVY_ENDPOINTS or (request.endpoint == "get_nodes" and "parent" not in request.args):
+        return "heavy"
+    return "read" if request.method in ("GET", "HEAD") or request.endpoint in _READ_ENDPOINTS else "write"
+
+
+@app.before_request
+def admit_request():
+    # Refuse quickly while the database is slow rather than tying up another worker and connection
+    route_class = _route_class() if admission is not None else None
+    if route_class is None:
+        return None
+    g.bulkhead = admission.acquire(route_class)
+    if g.bulkhead is None:
+        response = jsonify({"error": f"Server busy ({route_class} requests), retry shortly"})
+        response.headers["Retry-After"] = str(admission.retry_after_seconds)
+        return response, 503
+    return None
+
+
+@app.teardown_request
+def release_admission(exc):
+    bulkhead = g.pop("bulkhead", None)
+    if bulkhead is not None:
+        bulkhead.release()
+
+
+@app.after_request
+def hand_back_last_write(response):
+    if _set_session is None:
+        return response
+    from src.dao.system_node_dao import SystemNodeDAO
+
+    last_write_at = SystemNodeDAO.last_write_time()
+    if last_write_at is not None:
+        response.headers[LAST_WRITE_HEADER] = f"{last_write_at:.6f}"
+        window = mysql_dao.read_your_writes_seconds if mysql_dao is not None else 0
+        response.set_cookie(LAST_WRITE_COOKIE, f"{last_write_at:.6f}", max_age=max(int(math.ceil(window)), 1),
+                            httponly=True, samesite="Lax")
+    return response
+
+
+@app.after_request
+def add_trace_header(response):
+    if "trace_id" in g:
+        response.headers["X-Trace-Id"] = g.trace_id
+        g.trace_span.set(status=response.status_code)
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    # Streamed bodies (GET /nodes) are compressed as they are produced, see _json_stream
+    if (response_compression is None or response.is_streamed or response.direct_passthrough
+            or response.status_code != 200 or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding, chunks = response_compression.encode(
+        [response.get_data()], request.headers.get("Accept-Encoding"), request.endpoint
+    )
+    body = b"".join(chunks)
+    if encoding is not None:
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+
+@app.teardown_request
+def end_trace(exc):
+    scope = g.pop("trace_scope", None)
+    if scope is not None:
+        scope.__exit__(type(exc) if exc else None, exc, None)
 
 
 @app.route("/")
@@ -22,6 +389,57 @@ def home():
     return "Welcome to the SystemNode Flask API!"
 
 
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Process-wide counters, e.g. dao.coalesce.saved = reads answered by another request's query.
+    """
+    return jsonify(metrics.snapshot()), 200
+
+
+@app.route("/traces", methods=["GET"])
+def get_traces():
+    """
+    Recently sampled request traces, newest last; ?trace_id=<X-Trace-Id> picks one.
+    Each trace is a list of spans (request, dao.*, db.connect, db.execute with SQL shape and rows, db.commit).
+    """
+    if not isinstance(tracer.exporter, InMemoryExporter):
+        return jsonify({"error": "Traces are written to TRACE_FILE, not kept in memory"}), 501
+    return jsonify(tracer.exporter.traces(request.args.get("trace_id"))), 200
+
+
+@app.route("/debug/hot", methods=["GET"])
+def get_hot_nodes():
+    """
+    The most read nodes and child lists (ACCESS_STATS=true), hottest first, with decayed read
+    counts per ACCESS_STATS_HALF_LIFE_SECONDS. ?limit=N (default 50).
+    """
+    if access_tracker is None:
+        return jsonify({"error": "Access statistics are not enabled (ACCESS_STATS=true)"}), 501
+    report = access_tracker.hot(int(request.args.get("limit", "50")))
+    report.update(sample_rate=access_tracker.sample_rate, half_life_seconds=access_tracker.nodes.half_life_seconds)
+    return jsonify(report), 200
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """
+    Liveness: the process is serving requests.
+    """
+    return jsonify({"status": "ok"}), 200
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """
+    Readiness: 503 until this worker has started (and warmed up, with APP_WARMUP=true).
+    Point the platform's startup probe here so no request waits on a cold worker.
+    """
+    if not _ready.is_set():
+        return jsonify({"status": "starting"}), 503
+    return jsonify({"status": "ready"}), 200
+
+
 # -----------------------------------------------------------
 # 1) CREATE - POST /nodes
 # -----------------------------------------------------------
@@ -67,18 +485,104 @@ def create_node():
 # -----------------------------------------------------------
 # 2) READ - GET /nodes/<id> or GET /nodes?parent=<pid>
 # -----------------------------------------------------------
+def _include_archived() -> bool:
+    # Archived subtrees live in MySQL's SystemNodeArchive; other backends never archive
+    return mysql_dao is not None and request.args.get("include_archived", "false").lower() == "true"
+
+
+def _check_etag(kind: str, key: Optional[int] = None) -> tuple:
+    """
+    Returns (304 response or None, ETag for a full response or None) for a node ("node", key = its
+    ID), a child list ("parent", key = the parent ID or None) or the whole tree ("all"). The version
+    is read before the body, and only a settled version (see NodeVersions) is handed out as a tag.
+    """
+    if node_versions is None or _include_archived():
+        return None, None
+    from src.dao.node_versions import ALL_SCOPE, node_scope, parent_scope
+
+    scope = node_scope(key) if kind == "node" else parent_scope(key) if kind == "parent" else ALL_SCOPE
+    tag, settled = node_versions.etag(scope)
+    # A compressed representation carries the tag with the content coding appended
+    for candidate in [tag] + [f"{tag}-{encoding}" for encoding in PREFERENCE]:
+        if request.if_none_match.contains_weak(candidate):
+            metrics.incr("http.not_modified")
+            response = Response(status=304)
+            response.set_etag(candidate)
+            response.vary.add("Accept-Encoding")
+            return response, None
+    return None, tag if settled else None
+
+
+def _with_etag(response: Response, tag) -> Response:
+    if tag is not None:
+        response.set_etag(tag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _json_stream(items, tag) -> Response:
+    """
+    A JSON array response encoded (and compressed) chunk by chunk as the client reads it,
+    instead of one jsonify() string holding the whole listing. Its admission slot and trace
+    span last until the body has been sent (see _hold_until_sent).
+    """
+    chunks = iter_json_array(items, app.json.dumps)
+    encoding = None
+    if response_compression is not None:
+        encoding, chunks = response_compression.encode(
+            chunks, request.headers.get("Accept-Encoding"), request.endpoint
+        )
+    response = Response(stream_with_context(chunks), mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+        tag = tag and f"{tag}-{encoding}"
+    return _with_etag(_hold_until_sent(response), tag)
+
+
+def _hold_until_sent(response: Response) -> Response:
+    """
+    Hand the request's admission slot and trace span over to a streamed response, which
+    releases them once the server closes it (sent, or the client went away). teardown_request
+    runs when the view returns, before a streamed body has been produced.
+    """
+    bulkhead = g.pop("bulkhead", None)
+    scope = g.pop("trace_scope", None)
+
+    def finish():
+        if bulkhead is not None:
+            bulkhead.release()
+        if scope is not None:
+            scope.__exit__(None, None, None)
+
+    response.call_on_close(finish)
+    return response
+
+
 @app.route("/nodes/<int:node_id>", methods=["GET"])
 def get_node(node_id):
     """
     Fetch a single node by ID.
     GET /nodes/123
+    ?include_archived=true also finds archived nodes (returned with "Archived": true).
+    With HTTP_ETAGS=true, If-None-Match with the last ETag returns 304 while the node is unchanged.
     """
     try:
+        not_modified, tag = _check_etag("node", node_id)
+        if not_modified is not None:
+            return not_modified
+
         node = dao.read(node_id)
+        if node is None and _include_archived():
+            from src.dao.archive import read_archived
+
+            archived = read_archived(mysql_dao, node_id)
+            if archived is not None:
+                return jsonify({**asdict(archived), "Archived": True}), 200
         if node is None:
             return jsonify({"error": "Node not found"}), 404
 
-        return jsonify({
+        return _with_etag(jsonify({
             "ID": node.ID,
             "ParentID": node.ParentID,
             "Name": node.Name,
@@ -89,7 +593,7 @@ def get_node(node_id):
             "Status": node.Status,
             "Importance": node.Importance,
             "SortOrder": node.SortOrder
-        }), 200
+        }), tag), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -99,7 +603,9 @@ def get_node(node_id):
 def get_nodes():
     """
     If query param ?parent=VALUE is present, return only children of that parent (VALUE can be 'null').
-    Otherwise return all nodes in the system.
+    Otherwise return all nodes in the system (archived nodes are never included).
+    With ?parent and ?include_archived=true, archived children follow the live ones, marked "Archived": true.
+    With HTTP_ETAGS=true, If-None-Match with the last ETag returns 304 while the list is unchanged.
     """
     try:
         parent_str = request.args.get("parent", None)
@@ -110,25 +616,127 @@ def get_nodes():
             else:
                 parent_id = int(parent_str)
 
+            not_modified, tag = _check_etag("parent", parent_id)
+            if not_modified is not None:
+                return not_modified
             nodes = dao.read_by_parent(parent_id)
+            archived_nodes = []
+            if _include_archived():
+                from src.dao.archive import read_archived_children
+
+                archived_nodes = read_archived_children(mysql_dao, parent_id)
         else:
+            not_modified, tag = _check_etag("all")
+            if not_modified is not None:
+                return not_modified
             nodes = dao.read_all()
+            archived_nodes = []
 
-        result = []
-        for node in nodes:
-            result.append({
-                "ID": node.ID,
-                "ParentID": node.ParentID,
-                "Name": node.Name,
-                "Description": node.Description,
-                "Notes": node.Notes,
-                "Tags": node.Tags,
-                "Metadata": node.Metadata,
-                "Status": node.Status,
-                "Importance": node.Importance,
-                "SortOrder": node.SortOrder
-            })
-        return jsonify(result), 200
+        def result():
+            for node in nodes:
+                yield {
+                    "ID": node.ID,
+                    "ParentID": node.ParentID,
+                    "Name": node.Name,
+                    "Description": node.Description,
+                    "Notes": node.Notes,
+                    "Tags": node.Tags,
+                    "Metadata": node.Metadata,
+                    "Status": node.Status,
+                    "Importance": node.Importance,
+                    "SortOrder": node.SortOrder
+                }
+            for node in archived_nodes:
+                yield {**asdict(node), "Archived": True}
+
+        return _json_stream(result(), tag), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/by-path/<path:node_path>", methods=["GET"])
+def get_node_by_path(node_path):
+    """
+    Fetch a node by its path of Names from the top level, in one query.
+    GET /nodes/by-path/Work/Projects/Q4/Launch
+    Where siblings share a Name, the first by SortOrder is followed.
+    """
+    try:
+        try:
+            node = dao.resolve_path(node_path)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if node is None:
+            return jsonify({"error": "Node not found"}), 404
+        return jsonify(asdict(node)), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/by-path", methods=["POST"])
+def resolve_node_paths():
+    """
+    Resolve many paths at once.
+    JSON body: { "paths": ["/Work/Projects", "/Work/Projects/Q4/Launch"] }
+    Returns { "nodes": [ {...} or null, ... ] } in the same order.
+    """
+    try:
+        body = request.json
+        if not body or not isinstance(body.get("paths"), list):
+            return jsonify({"error": "Must provide a 'paths' list"}), 400
+        try:
+            nodes = dao.resolve_paths(body["paths"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"nodes": [asdict(node) if node else None for node in nodes]}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/<int:node_id>/stats", methods=["GET"])
+def get_node_stats(node_id):
+    """
+    Descendant counts for a node, overall and per Status ('' = no Status):
+    { "ID": 123, "DescendantCount": 12, "StatusCounts": { "Done": 5, "Active": 7 } }
+    """
+    try:
+        if subtree_stats is None:
+            return jsonify({"error": "Subtree stats are not enabled (DB_SUBTREE_STATS=true)"}), 501
+
+        stats = subtree_stats.read(node_id)
+        if stats is None:
+            return jsonify({"error": "Node not found"}), 404
+        return jsonify(stats), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/hash", methods=["GET"], defaults={"node_id": None})
+@app.route("/nodes/<int:node_id>/hash", methods=["GET"])
+def get_subtree_hash(node_id):
+    """
+    Merkle hashes for resync: the node's subtree hash and ?depth=N (default 1) levels of its
+    children's, each level in (SortOrder, ID) order; GET /nodes/hash starts above the top-level nodes.
+    { "ID": 123, "Hash": "9f2c...", "Children": [ { "ID": 124, "Hash": "07ab..." }, ... ] }
+    Equal hashes mean equal subtrees, so a client only descends where its own hash differs.
+    """
+    try:
+        if subtree_hashes is None:
+            return jsonify({"error": "Subtree hashes are not enabled (DB_SUBTREE_HASHES=true)"}), 501
+        from src.dao.subtree_hashes import MAX_HASH_DEPTH
+
+        try:
+            depth = int(request.args.get("depth", "1"))
+            tree = subtree_hashes.tree(node_id, depth)
+        except ValueError:
+            return jsonify({"error": f"depth must be an integer between 0 and {MAX_HASH_DEPTH}"}), 400
+        if tree is None:
+            return jsonify({"error": "Node not found"}), 404
+        return jsonify(tree), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -277,10 +885,191 @@ def move_node_endpoint(node_id):
         return jsonify({"error": str(e)}), 500
 
 
+# -----------------------------------------------------------
+# 5b) BATCHES - POST /nodes/batch/get, /nodes/batch/create, /nodes/batch/move
+# -----------------------------------------------------------
+def _batch_items(key: str) -> tuple:
+    """
+    Returns (items, None) for a JSON body {key: [...]}, or (None, error response). At most
+    BATCH_MAX_ITEMS (default 1000) items per request.
+    """
+    body = request.json
+    if not body or not isinstance(body.get(key), list):
+        return None, (jsonify({"error": f"Must provide a '{key}' list"}), 400)
+    limit = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    if len(body[key]) > limit:
+        return None, (jsonify({"error": f"At most {limit} {key} per batch"}), 400)
+    return body[key], None
+
+
+@app.route("/nodes/batch/get", methods=["POST"])
+def batch_get_nodes():
+    """
+    Fetch many nodes in one request.
+    JSON body: { "ids": [1, 2, 3] }
+    Returns { "nodes": [ {...} or null, ... ] } in the same order.
+    """
+    try:
+        ids, error = _batch_items("ids")
+        if error is not None:
+            return error
+        nodes = [dao.read(int(node_id)) for node_id in ids]
+        return jsonify({"nodes": [asdict(node) if node else None for node in nodes]}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/batch/create", methods=["POST"])
+def batch_create_nodes():
+    """
+    Create many nodes in one request, in order (a node may name an earlier one's parent only
+    by an ID it already knows). Each is appended to its siblings as POST /nodes would.
+    JSON body: { "nodes": [ { "Name": "A", "ParentID": 1, ... }, ... ] }
+    Returns 201 { "IDs": [...] }. Not atomic: a failure part-way returns 500 with the IDs
+    created so far.
+    """
+    created = []
+    try:
+        items, error = _batch_items("nodes")
+        if error is not None:
+            return error
+        if not all(isinstance(data, dict) and "Name" in data for data in items):
+            return jsonify({"error": "Every node needs a 'Name'"}), 400
+
+        for data in items:
+            created.append(dao.create(SystemNode(
+                ParentID=data.get("ParentID"),
+                Name=data["Name"],
+                Description=data.get("Description"),
+                Notes=data.get("Notes"),
+                Tags=data.get("Tags", {}),
+                Metadata=data.get("Metadata", {}),
+                Status=data.get("Status"),
+                Importance=data.get("Importance", 0)
+            )))
+        return jsonify({"message": f"{len(created)} nodes created", "IDs": created}), 201
+
+    except Exception as e:
+        return jsonify({"error": str(e), "IDs": created}), 500
+
+
+@app.route("/nodes/batch/move", methods=["POST"])
+def batch_move_nodes():
+    """
+    Apply many moves in one request, in order; reordering a parent's children is a run of
+    moves to target indexes 1..n under that same parent.
+    JSON body: { "moves": [ { "ID": 5, "new_parent_id": 1, "target_index": 1 }, ... ] }
+    Returns { "moved": [true / false (node not found), ...] } in the same order.
+    """
+    try:
+        moves, error = _batch_items("moves")
+        if error is not None:
+            return error
+        if not all(isinstance(move, dict) and "ID" in move for move in moves):
+            return jsonify({"error": "Every move needs an 'ID'"}), 400
+
+        moved = [dao.move_node(move["ID"], move.get("new_parent_id"), move.get("target_index")) for move in moves]
+        return jsonify({"moved": moved}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/compact", methods=["POST"], defaults={"node_id": None})
+@app.route("/nodes/<int:node_id>/compact", methods=["POST"])
+def compact_children(node_id):
+    """
+    Renumber the SortOrders of a node's children (or of the root nodes, POST /nodes/compact)
+    to 1..n, closing gaps and resolving duplicates. ?dry_run=true only reports the plan.
+    """
+    try:
+        if maintenance_dao is None:
+            return jsonify({"error": "SortOrder compaction needs the MySQL backend without DB_ENGINE=memory"}), 501
+        from src.dao.sort_compaction import compact_parent
+
+        dry_run = request.args.get("dry_run", "false").lower() == "true"
+        result = compact_parent(maintenance_dao, node_id, dry_run=dry_run)
+        if node_cache is not None and result["renumbered"] and not dry_run:
+            node_cache.invalidate([change["ID"] for change in result["changes"]], [node_id])
+        return jsonify(result), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/archive", methods=["POST"])
+def archive_nodes():
+    """
+    Move subtrees that are entirely Done and unchanged for ?older_than_days (default 90) to
+    SystemNodeArchive, up to ?max_subtrees (default 100). ?dry_run=true only lists them.
+    """
+    try:
+        if maintenance_dao is None:
+            return jsonify({"error": "Archiving needs the MySQL backend without DB_ENGINE=memory"}), 501
+        from src.dao.archive import archive_all
+
+        report = archive_all(
+            maintenance_dao,
+            older_than_days=int(request.args.get("older_than_days", "90")),
+            max_subtrees=int(request.args.get("max_subtrees", "100")),
+            dry_run=request.args.get("dry_run", "false").lower() == "true",
+            on_archived=(lambda r: node_cache.invalidate(r["ids"] + r["renumbered"], [r["ParentID"]]))
+            if node_cache else None
+        )
+        return jsonify(report), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes/<int:node_id>/unarchive", methods=["POST"])
+def unarchive_node(node_id):
+    """
+    Bring an archived subtree back, appended after its parent's children. 409 if the node
+    is not archived or its parent is archived too (unarchive that first).
+    """
+    try:
+        if maintenance_dao is None:
+            return jsonify({"error": "Archiving needs the MySQL backend without DB_ENGINE=memory"}), 501
+        from src.dao.archive import unarchive_subtree
+
+        try:
+            result = unarchive_subtree(maintenance_dao, node_id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 409
+        if node_cache is not None:
+            node_cache.invalidate(result["ids"], [result["ParentID"]])
+        return jsonify(result), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# -----------------------------------------------------------
+# 6) EXPORT - GET /export
+# -----------------------------------------------------------
+@app.route("/export", methods=["GET"])
+def export_nodes():
+    """
+    Stream the whole tree as gzip-compressed NDJSON (one node per line), in constant memory.
+    Load it elsewhere with: python manage.py import systemnodes.ndjson.gz
+    """
+    if mysql_dao is None:
+        return jsonify({"error": "Export requires the MySQL backend"}), 501
+    from src.dao.bulk_io import iter_export_rows, iter_ndjson_gzip
+
+    return _hold_until_sent(Response(
+        stream_with_context(iter_ndjson_gzip(iter_export_rows(mysql_dao))),
+        mimetype="application/gzip",
+        headers={"Content-Disposition": "attachment; filename=systemnodes.ndjson.gz"}
+    ))
+
+
 # -----------------------------------------------------------
 # RUN LOCALLY
 # -----------------------------------------------------------
 if __name__ == "__main__":
-    # For local dev: app.run(debug=True, host="0.0.0.0", port=8080)
-    # For production (e.g. Cloud Run), use gunicorn or similar WSGI server.
-    app.run(debug=True, host="0.0.0.0", port=8080)
+    # Development server only; production runs `gunicorn -c gunicorn.conf.py` (see the Dockerfile).
+    # FLASK_DEBUG=true turns on the debugger and reloader.
+    create_app().run(debug=env_flag("FLASK_DEBUG"), host="0.0.0.0", port=int(os.getenv("PORT", "8080")))
@@ -0,0 +1,183 @@
+"""
+ASGI variant of app.py on Quart and AsyncSystemNodeDAO (MySQL only). Same routes and
+JSON shapes as the Flask app, plus GET /nodes?parents=1,2,null (children of several
+parents, fetched concurrently). A waiting request holds a pooled connection, not a thread,
+so one process serves many more concurrent clients. Run with an ASGI server:
+
+hypercorn asgi_app:app --bind 0.0.0.0:8080
+
+DB_POOL_SIZE (default 20) caps the MySQL connections per process.
+"""
+
+import os
+from dataclasses import asdict
+
+from quart import Quart, request, jsonify
+from src.dao.async_system_node_dao import AsyncSystemNodeDAO
+from src.dao.system_node import SystemNode
+from src.config import db_config_from_env
+from src.metrics import metrics
+
+app = Quart(__name__)
+dao = AsyncSystemNodeDAO(db_config_from_env(), max_connections=int(os.getenv("DB_POOL_SIZE", "20")))
+
+
+@app.before_serving
+async def open_pool():
+    await dao.open()
+
+
+@app.after_serving
+async def close_pool():
+    await dao.close()
+
+
+def _node_from_json(data: dict, node_id=None) -> SystemNode:
+    return SystemNode(
+        ID=node_id if node_id is not None else data.get("ID"),
+        ParentID=data.get("ParentID"),
+        Name=data.get("Name", ""),
+        Description=data.get("Description"),
+        Notes=data.get("Notes"),
+        Tags=data.get("Tags", {}),
+        Metadata=data.get("Metadata", {}),
+        Status=data.get("Status"),
+        Importance=data.get("Importance", 0),
+        SortOrder=data.get("SortOrder", 0)
+    )
+
+
+def _parse_parent(value: str):
+    return None if value.lower() == "null" else int(value)
+
+
+@app.route("/")
+async def home():
+    return "Welcome to the SystemNode ASGI API!"
+
+
+@app.route("/metrics", methods=["GET"])
+async def get_metrics():
+    return jsonify(metrics.snapshot()), 200
+
+
+# -----------------------------------------------------------
+# 1) CREATE - POST /nodes
+# -----------------------------------------------------------
+@app.route("/nodes", methods=["POST"])
+async def create_node():
+    try:
+        data = await request.get_json()
+        if not data or "Name" not in data:
+            return jsonify({"error": "Missing 'Name' in JSON body"}), 400
+
+        new_id = await dao.create(_node_from_json(data))
+        return jsonify({"message": "Node created", "ID": new_id}), 201
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# -----------------------------------------------------------
+# 2) READ - GET /nodes/<id>, GET /nodes?parent=<pid>, GET /nodes?parents=<pid>,<pid>
+# -----------------------------------------------------------
+@app.route("/nodes/<int:node_id>", methods=["GET"])
+async def get_node(node_id):
+    try:
+        node = await dao.read(node_id)
+        if node is None:
+            return jsonify({"error": "Node not found"}), 404
+        return jsonify(asdict(node)), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/nodes", methods=["GET"])
+async def get_nodes():
+    """
+    ?parent=VALUE -> children of that parent ('null' = roots); ?parents=1,2,null -> one
+    object keyed by parent ID ('null' for roots); otherwise every node.
+    """
+    try:
+        parents_str = request.args.get("parents")
+        if parents_str is not None:
+            parent_ids = [_parse_parent(p.strip()) for p in parents_str.split(",") if p.strip()]
+            children = await dao.read_by_parents(parent_ids)
+            return jsonify({
+                "null" if parent_id is None else str(parent_id): [asdict(node) for node in nodes]
+                for parent_id, nodes in children.items()
+            }), 200
+
+        parent_str = request.args.get("parent")
+        if parent_str is not None:
+            nodes = await dao.read_by_parent(_parse_parent(parent_str))
+        else:
+            nodes = await dao.read_all()
+        return jsonify([asdict(node) for node in nodes]), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# -----------------------------------------------------------
+# 3) UPDATE - PATCH /nodes/<id>
+# -----------------------------------------------------------
+@app.route("/nodes/<int:node_id>", methods=["PATCH"])
+async def update_node(node_id):
+    try:
+        body = await request.get_json()
+        if not body or "old" not in body or "new" not in body:
+            return jsonify({"error": "Must provide 'old' and 'new' objects"}), 400
+        if body["old"].get("ID") != node_id or body["new"].get("ID") != node_id:
+            return jsonify({"error": "Mismatched node_id in URL vs. JSON"}), 400
+
+        if await dao.update(_node_from_json(body["old"]), _node_from_json(body["new"])):
+            return jsonify({"message": "Node updated"}), 200
+        return jsonify({"error": "Update failed (concurrency mismatch or node not found)"}), 409
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# -----------------------------------------------------------
+# 4) DELETE - DELETE /nodes/<id>
+# -----------------------------------------------------------
+@app.route("/nodes/<int:node_id>", methods=["DELETE"])
+async def delete_node(node_id):
+    try:
+        body = await request.get_json()
+        if not body or "old" not in body:
+            return jsonify({"error": "Must provide 'old' object"}), 400
+        if body["old"].get("ID") != node_id:
+            return jsonify({"error": "Mismatched node_id in URL vs. JSON"}), 400
+
+        if await dao.delete(_node_from_json(body["old"])):
+            return jsonify({"message": f"Node {node_id} deleted"}), 200
+        return jsonify({"error": "Delete failed (concurrency mismatch or node not found)"}), 409
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# -----------------------------------------------------------
+# 5) MOVE - POST /nodes/<id>/move
+# -----------------------------------------------------------
+@app.route("/nodes/<int:node_id>/move", methods=["POST"])
+async def move_node_endpoint(node_id):
+    try:
+        body = await request.get_json()
+        if not body:
+            return jsonify({"error": "No JSON provided"}), 400
+
+        new_parent_id = body.get("new_parent_id", None)
+        target_index = body.get("target_index", None)
+        if await dao.move_node(node_id, new_parent_id, target_index):
+            msg = f"Node {node_id} moved to parent {new_parent_id}"
+            if target_index is not None:
+                msg += f" at index {target_index}"
+            return jsonify({"message": msg}), 200
+        return jsonify({"error": "Move failed (node not found?)"}), 404
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Generates a synthetic export file and times a bulk import into MySQL.
+
+Requires MYSQL_TEST_DATABASE (plus DB_HOST / DB_USER / DB_PASSWORD); rows are imported
+with --remap-ids semantics so existing data is left alone. Use a disposable database.
+
+python benchmarks/bench_bulk_import.py --nodes 1000000 --workers 8 --chunk-size 5000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dao.bulk_io import import_ndjson  # noqa: E402
+from src.dao.system_node_dao import SystemNodeDAO  # noqa: E402
+
+
+def write_synthetic_export(path, node_count, fanout=20):
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=1) as f:
+        for i in range(1, node_count + 1):
+            parent_id = (i - 1) // fanout if i > fanout else None
+            f.write(json.dumps({
+                "ID": i, "ParentID": parent_id, "Name": f"node-{i}", "Description": None, "Notes": None,
+                "Tags": {}, "Metadata": {}, "Status": "Active", "Importance": 0, "SortOrder": (i - 1) % fanout + 1
+            }, separators=(",", ":")) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if not os.getenv("MYSQL_TEST_DATABASE"):
+        print("Set MYSQL_TEST_DATABASE to run this benchmark.")
+        sys.exit(1)
+
+    dao = SystemNodeDAO({
+        "host": os.getenv("DB_HOST", "127.0.0.1"),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("MYSQL_TEST_DATABASE"),
+    })
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "bench.ndjson.gz")
+        start = time.perf_counter()
+        write_synthetic_export(path, args.nodes)
+        print(f"generated {args.nodes} rows in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) / 1e6:.1f} MB)")
+
+        result = import_ndjson(dao, path, remap_ids=True, chunk_size=args.chunk_size, workers=args.workers)
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
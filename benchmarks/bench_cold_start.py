@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+Cold-start time of the HTTP API: start a fresh server process and poll GET /nodes?parent=null
+until it answers 200. Per mode it reports, over --runs starts:
+
+  ready ms   process start to the first 200 (interpreter, imports, create_app, first query)
+  first ms   how long that first successful request itself took (what a user waits once
+             the port is open: handshakes and cold caches show up here)
+
+Modes:
+  dev           python app.py (Flask's development server)
+  gunicorn      gunicorn -c gunicorn.conf.py (preloaded workers)
+  gunicorn+wu   the same with APP_WARMUP=true (each worker warms its pool and caches first)
+
+The gunicorn modes are skipped when gunicorn is not installed. Uses a throwaway SQLite file
+unless --mysql is given, which uses MYSQL_TEST_DATABASE (DB_HOST / DB_USER / DB_PASSWORD as
+for app.py) with DB_POOL_SIZE=--pool-size.
+
+python benchmarks/bench_cold_start.py --runs 10 --nodes 200 [--mysql]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_once(command, env, timeout: float = 30.0):
+    """
+    Returns (ms from spawn to the first 200, ms the first successful request took).
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/nodes?parent=null"
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env={**env, "PORT": str(port)},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            sent = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        response.read()
+                        done = time.perf_counter()
+                        return (done - start) * 1000, (done - sent) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError(f"{' '.join(command)} did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--nodes", type=int, default=200, help="Nodes to seed before timing")
+    parser.add_argument("--mysql", action="store_true", help="Use MYSQL_TEST_DATABASE instead of SQLite")
+    parser.add_argument("--pool-size", type=int, default=4, help="DB_POOL_SIZE for --mysql")
+    parser.add_argument("--workers", type=int, default=1, help="WEB_CONCURRENCY for the gunicorn modes")
+    args = parser.parse_args()
+
+    env = {**os.environ, "DB_COALESCE_READS": "true", "WEB_CONCURRENCY": str(args.workers)}
+    tmpdir = tempfile.TemporaryDirectory()
+    if args.mysql:
+        if not os.getenv("MYSQL_TEST_DATABASE"):
+            sys.exit("Set MYSQL_TEST_DATABASE to a disposable MySQL database")
+        env.update(DB_BACKEND="mysql", DB_NAME=os.getenv("MYSQL_TEST_DATABASE"), DB_POOL_SIZE=str(args.pool_size))
+        from src.config import db_config_from_env  # noqa: E402
+        from src.dao.system_node_dao import SystemNodeDAO  # noqa: E402
+
+        dao = SystemNodeDAO({**db_config_from_env(), "database": env["DB_NAME"]})
+    else:
+        env.update(DB_BACKEND="sqlite", SQLITE_PATH=os.path.join(tmpdir.name, "cold.db"))
+        from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO  # noqa: E402
+
+        dao = SQLiteSystemNodeDAO(env["SQLITE_PATH"])
+    from benchmarks.bench_read_latency import seed  # noqa: E402
+
+    seed(dao, args.nodes)
+
+    modes = [("dev", [sys.executable, "app.py"], {})]
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("gunicorn not installed: skipping the gunicorn modes")
+    else:
+        gunicorn_command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+        modes += [("gunicorn", gunicorn_command, {}), ("gunicorn+wu", gunicorn_command, {"APP_WARMUP": "true"})]
+
+    print(f"{'mode':<13}{'ready p50':>11}{'ready max':>11}{'first p50':>11}{'first max':>11}")
+    for label, command, extra_env in modes:
+        results = [start_once(command, {**env, **extra_env}) for _ in range(args.runs)]
+        ready = [r[0] for r in results]
+        first = [r[1] for r in results]
+        print(f"{label:<13}{statistics.median(ready):>11.1f}{max(ready):>11.1f}"
+              f"{statistics.median(first):>11.1f}{max(first):>11.1f}")
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
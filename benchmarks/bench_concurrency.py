@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""
+Load-tests running API servers at increasing numbers of concurrent clients and reports
+throughput, latency and errors for each, to compare the Flask app with the ASGI app.
+
+Start both against the same MySQL database (one process each), for example:
+
+gunicorn -w 1 --threads 16 -b 127.0.0.1:8080 app:app
+hypercorn -w 1 -b 127.0.0.1:8081 asgi_app:app
+
+python benchmarks/bench_concurrency.py --url flask=http://127.0.0.1:8080 --url asgi=http://127.0.0.1:8081 \\
+    --concurrency 10,100,500,1000 --seconds 10
+
+Each client keeps one HTTP/1.1 keep-alive connection (when the server allows it) and loops
+GET <path> (default /nodes?parent=null), reconnecting after errors. A request slower than
+--timeout counts as an error; the highest concurrency with < 1% errors is the process's
+practical capacity.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def _request(reader, writer, host, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    version, status = status_line.split()[:2]
+    keep_alive = version == b"HTTP/1.1"
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "connection":
+            keep_alive = value.strip().lower() == "keep-alive"
+    await reader.readexactly(length)
+    return int(status), keep_alive
+
+
+async def _client(url, path, deadline, timeout, latencies, errors):
+    parts = urlsplit(url)
+    reader = writer = None
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(parts.hostname, parts.port or 80), timeout)
+            status, keep_alive = await asyncio.wait_for(_request(reader, writer, parts.netloc, path), timeout)
+            if status >= 500:
+                errors.append(status)
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+            if not keep_alive:  # e.g. the Flask dev server answers HTTP/1.0
+                writer.close()
+                reader = writer = None
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors.append("connection")
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_level(url, path, concurrency, seconds, timeout):
+    latencies, errors = [], []
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(_client(url, path, deadline, timeout, latencies, errors) for _ in range(concurrency)))
+    total = len(latencies) + len(errors)
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "rps": round(len(latencies) / seconds),
+        "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 1) if latencies else None,
+        "error_pct": round(100.0 * len(errors) / total, 2) if total else 100.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", required=True, help="name=http://host:port (repeatable)")
+    parser.add_argument("--path", default="/nodes?parent=null")
+    parser.add_argument("--concurrency", default="10,50,200,1000")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    print(f"{'server':<10}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors %':>10}")
+    for named_url in args.url:
+        name, _, url = named_url.partition("=")
+        for concurrency in levels:
+            r = await run_level(url, args.path, concurrency, args.seconds, args.timeout)
+            print(f"{name:<10}{r['concurrency']:>8}{r['rps']:>10}{str(r['p50_ms']):>10}"
+                  f"{str(r['p99_ms']):>10}{r['error_pct']:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Polling workload against the Flask app with HTTP_ETAGS=true: clients re-fetch child lists
+(GET /nodes?parent=X) and nodes (GET /nodes/<id>) over and over while a writer adds a node
+under a random parent every --write-every polls. Run twice, the same request sequence:
+
+  plain        no If-None-Match: every poll runs the query and sends the full body
+  conditional  each client sends back the last ETag it got for the URL
+
+and reports response bytes, how many polls were 304s, and app-process CPU per poll
+(MySQL's own CPU is not included; the saved listing queries show up as fewer rows read).
+
+Needs MYSQL_TEST_DATABASE (DB_HOST / DB_USER / DB_PASSWORD as for app.py) with the schema
+migrated (`python manage.py migrate`); the database is seeded with extra nodes, so point it
+at a disposable one.
+
+python benchmarks/bench_etags.py --nodes 2000 --clients 50 --polls 20000 --write-every 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(client, dao, urls, polls, write_every, parent_ids, conditional, seed_value):
+    """
+    Returns (bytes, not_modified, cpu_seconds, wall_seconds) for `polls` requests.
+    """
+    from src.dao.system_node import SystemNode
+
+    rng = random.Random(seed_value)
+    etags = {}  # (client, url) -> last ETag
+    total_bytes = not_modified = 0
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for i in range(polls):
+        if write_every and i % write_every == write_every - 1:
+            dao.create(SystemNode(ParentID=rng.choice(parent_ids), Name=f"poll-write-{i}", Status="Active"))
+        key = rng.choice(urls)
+        headers = {"If-None-Match": etags[key]} if conditional and key in etags else {}
+        response = client.get(key[1], headers=headers)
+        total_bytes += len(response.get_data())
+        if response.status_code == 304:
+            not_modified += 1
+        elif response.headers.get("ETag"):
+            etags[key] = response.headers["ETag"]
+    return total_bytes, not_modified, time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--urls-per-client", type=int, default=5)
+    parser.add_argument("--polls", type=int, default=20000)
+    parser.add_argument("--write-every", type=int, default=200, help="One write per this many polls (0 = none)")
+    parser.add_argument("--settle-seconds", type=float, default=1.0, help="HTTP_ETAG_SETTLE_SECONDS for the run")
+    args = parser.parse_args()
+
+    if not os.getenv("MYSQL_TEST_DATABASE"):
+        sys.exit("Set MYSQL_TEST_DATABASE to a disposable MySQL database")
+    os.environ.update({
+        "DB_BACKEND": "mysql",
+        "DB_NAME": os.getenv("MYSQL_TEST_DATABASE"),
+        "HTTP_ETAGS": "true",
+        "HTTP_ETAG_SETTLE_SECONDS": str(args.settle_seconds),
+        "DB_COALESCE_READS": "false",
+    })
+    import app as app_module  # noqa: E402 (configured from the environment above)
+    app_module.create_app()
+    from benchmarks.bench_read_latency import seed  # noqa: E402
+
+    node_ids, parent_ids = seed(app_module.dao, args.nodes)
+    time.sleep(args.settle_seconds)  # let the seeded versions settle so the first polls get ETags
+
+    rng = random.Random(0)
+    urls = []
+    for client_id in range(args.clients):
+        for _ in range(args.urls_per_client):
+            if rng.random() < 0.5:
+                parent_id = rng.choice(parent_ids)
+                urls.append((client_id, f"/nodes?parent={'null' if parent_id is None else parent_id}"))
+            else:
+                urls.append((client_id, f"/nodes/{rng.choice(node_ids)}"))
+
+    client = app_module.app.test_client()
+    print(f"{'mode':<13}{'polls':>8}{'304s':>8}{'MB sent':>10}{'CPU us/poll':>13}{'wall s':>9}")
+    for label, conditional in [("plain", False), ("conditional", True)]:
+        sent, not_modified, cpu, wall = run(client, app_module.dao, urls, args.polls, args.write_every,
+                                            parent_ids, conditional, seed_value=1)
+        print(f"{label:<13}{args.polls:>8}{not_modified:>8}{sent / 1e6:>10.2f}"
+              f"{cpu / args.polls * 1e6:>13.1f}{wall:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Write throughput on MySQL with and without group commit: --threads writers each loop
+create() (and, with --updates, an update() of the node just created) for --seconds, the way a
+burst of quick-capture POST /nodes and PATCH calls reaches the DAO. For each mode it reports:
+
+  writes/s    completed create / update calls per second
+  commits/s   transactions committed per second (one log flush each)
+  p50 / p99   per-call latency (ms); group commit adds up to the window to each write
+
+Modes: "single" (SystemNodeDAO, one transaction per write) and "group W ms" for each
+--windows value (GroupCommitSystemNodeDAO with max_batch=--max-batch).
+
+Needs MYSQL_TEST_DATABASE (DB_HOST / DB_USER / DB_PASSWORD as for app.py); nodes are added
+under a fresh parent per mode, so point it at a disposable database.
+
+python benchmarks/bench_group_commit.py --threads 32 --seconds 10 --windows 1,2,5 [--updates]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dao.group_commit import GroupCommitSystemNodeDAO  # noqa: E402
+from src.dao.system_node import SystemNode  # noqa: E402
+from src.dao.system_node_dao import SystemNodeDAO  # noqa: E402
+from src.metrics import metrics  # noqa: E402
+
+
+def run(dao, parent_id, threads, seconds, updates):
+    """
+    Returns (writes per second, sorted latencies in ms).
+    """
+    deadline = time.monotonic() + seconds
+    per_thread = [[] for _ in range(threads)]
+
+    def worker(samples, index):
+        n = 0
+        while time.monotonic() < deadline:
+            n += 1
+            node = SystemNode(ParentID=parent_id, Name=f"w{index}-{n}")
+            start = time.perf_counter()
+            node.ID = dao.create(node)
+            samples.append((time.perf_counter() - start) * 1000)
+            if updates:
+                start = time.perf_counter()
+                dao.update(node, SystemNode(ID=node.ID, ParentID=parent_id, Name=node.Name, Status="Captured"))
+                samples.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=worker, args=(per_thread[i], i)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    samples = sorted(s for thread_samples in per_thread for s in thread_samples)
+    return len(samples) / seconds, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--windows", default="1,2,5", help="Group commit windows to try, in ms")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--updates", action="store_true", help="Follow each create with an update")
+    args = parser.parse_args()
+
+    if not os.getenv("MYSQL_TEST_DATABASE"):
+        sys.exit("Set MYSQL_TEST_DATABASE to a disposable MySQL database")
+    db_config = {
+        "host": os.getenv("DB_HOST", "127.0.0.1"),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("MYSQL_TEST_DATABASE"),
+    }
+    base = SystemNodeDAO(db_config, pool_size=args.threads)
+
+    modes = [("single", base)] + [
+        (f"group {window} ms", GroupCommitSystemNodeDAO(base, window_seconds=float(window) / 1000,
+                                                        max_batch=args.max_batch))
+        for window in args.windows.split(",")
+    ]
+    print(f"{'mode':<14}{'writes/s':>10}{'commits/s':>11}{'p50 ms':>9}{'p99 ms':>9}")
+    for label, dao in modes:
+        parent_id = base.create(SystemNode(Name=f"bench_group_commit {label}"))
+        metrics.reset()
+        rate, samples = run(dao, parent_id, args.threads, args.seconds, args.updates)
+        commits = metrics.counter("dao.group_commit.commits") if dao is not base else len(samples)
+        p50 = samples[len(samples) // 2] if samples else 0.0
+        p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0.0
+        print(f"{label:<14}{rate:>10.0f}{commits / args.seconds:>11.0f}{p50:>9.2f}{p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
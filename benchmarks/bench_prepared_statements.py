@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Compares SystemNodeDAO.read and read_by_parent throughput on MySQL across three
+connection paths, with several threads calling as fast as they can:
+
+  connect    a new connection per call (pool_size=0, the default)
+  pooled     pooled connections, SQL text sent and parsed on every call
+  prepared   pooled connections plus server-side prepared statements
+
+Needs MYSQL_TEST_DATABASE (DB_HOST / DB_USER / DB_PASSWORD as for app.py); the database
+is seeded with extra nodes, so point it at a disposable one.
+
+python benchmarks/bench_prepared_statements.py --nodes 2000 --threads 16 --seconds 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dao.system_node_dao import SystemNodeDAO  # noqa: E402
+from benchmarks.bench_read_latency import seed  # noqa: E402
+
+
+def run(fn, args_list, threads, seconds):
+    """
+    Calls fn with random args from `threads` threads for `seconds`; returns (qps, p50_us, p99_us).
+    """
+    deadline = time.monotonic() + seconds
+    per_thread = [[] for _ in range(threads)]
+
+    def worker(samples, seed_value):
+        rng = random.Random(seed_value)
+        while time.monotonic() < deadline:
+            args = rng.choice(args_list)
+            start = time.perf_counter_ns()
+            fn(*args)
+            samples.append((time.perf_counter_ns() - start) / 1000.0)
+
+    workers = [threading.Thread(target=worker, args=(per_thread[i], i)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    samples = sorted(s for thread_samples in per_thread for s in thread_samples)
+    if not samples:
+        return 0, 0.0, 0.0
+    return round(len(samples) / seconds), samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if not os.getenv("MYSQL_TEST_DATABASE"):
+        sys.exit("Set MYSQL_TEST_DATABASE to a disposable MySQL database")
+    db_config = {
+        "host": os.getenv("DB_HOST", "127.0.0.1"),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("MYSQL_TEST_DATABASE"),
+    }
+
+    node_ids, parent_ids = seed(SystemNodeDAO(db_config), args.nodes)
+    read_args = [(node_id,) for node_id in node_ids]
+    parent_args = [(parent_id,) for parent_id in parent_ids]
+
+    paths = [
+        ("connect", SystemNodeDAO(db_config)),
+        ("pooled", SystemNodeDAO(db_config, pool_size=args.threads)),
+        ("prepared", SystemNodeDAO(db_config, pool_size=args.threads, prepared_statements=True)),
+    ]
+    print(f"{'path':<10}{'method':<16}{'qps':>10}{'p50 us':>10}{'p99 us':>10}")
+    for label, dao in paths:
+        for name, fn, args_list in [("read", dao.read, read_args),
+                                    ("read_by_parent", dao.read_by_parent, parent_args)]:
+            fn(*args_list[0])  # warm the pool (and prepare) outside the timed run
+            qps, p50, p99 = run(fn, args_list, args.threads, args.seconds)
+            print(f"{label:<10}{name:<16}{qps:>10}{p50:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
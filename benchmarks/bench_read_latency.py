@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Measures DAO read latency in microseconds for each storage backend.
+
+SQLite always runs (against a temp file). MySQL runs when MYSQL_TEST_DATABASE is set,
+using DB_HOST / DB_USER / DB_PASSWORD like app.py. The MySQL database is seeded with
+extra nodes, so point it at a disposable database.
+
+python benchmarks/bench_read_latency.py --nodes 2000 --iterations 5000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO  # noqa: E402
+from src.dao.system_node import SystemNode  # noqa: E402
+from src.dao.system_node_dao import SystemNodeDAO  # noqa: E402
+
+
+def seed(dao, node_count, fanout=20):
+    """
+    Creates node_count nodes as a tree with roughly `fanout` children per parent.
+    Returns (node_ids, parent_ids).
+    """
+    node_ids = []
+    parent_ids = [None]
+    for i in range(node_count):
+        parent_id = node_ids[i // fanout - 1] if i >= fanout else None
+        node_ids.append(dao.create(SystemNode(ParentID=parent_id, Name=f"bench-{i}", Status="Active")))
+        if parent_id is not None and parent_id not in parent_ids:
+            parent_ids.append(parent_id)
+    return node_ids, parent_ids
+
+
+def measure_us(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter_ns()
+        fn(*args)
+        samples.append((time.perf_counter_ns() - start) / 1000.0)
+    samples.sort()
+    return {
+        "p50": samples[len(samples) // 2],
+        "p99": samples[int(len(samples) * 0.99) - 1],
+        "mean": statistics.fmean(samples),
+    }
+
+
+def report(label, dao, node_count, iterations):
+    node_ids, parent_ids = seed(dao, node_count)
+    rng = random.Random(42)
+    read_args = [(rng.choice(node_ids),) for _ in range(iterations)]
+    parent_args = [(rng.choice(parent_ids),) for _ in range(iterations)]
+
+    for name, fn, args in [("read", dao.read, read_args), ("read_by_parent", dao.read_by_parent, parent_args)]:
+        stats = measure_us(fn, args)
+        print(f"{label:8s} {name:15s} p50={stats['p50']:9.1f}us  p99={stats['p99']:9.1f}us  "
+              f"mean={stats['mean']:9.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sqlite_dao = SQLiteSystemNodeDAO(os.path.join(tmpdir, "bench.db"))
+        report("sqlite", sqlite_dao, args.nodes, args.iterations)
+        sqlite_dao.close()
+
+    if os.getenv("MYSQL_TEST_DATABASE"):
+        mysql_dao = SystemNodeDAO({
+            "host": os.getenv("DB_HOST", "127.0.0.1"),
+            "user": os.getenv("DB_USER", "root"),
+            "password": os.getenv("DB_PASSWORD", ""),
+            "database": os.getenv("MYSQL_TEST_DATABASE"),
+        })
+        report("mysql", mysql_dao, args.nodes, args.iterations)
+    else:
+        print("mysql    skipped (set MYSQL_TEST_DATABASE to include it)")
+
+
+if __name__ == "__main__":
+    main()
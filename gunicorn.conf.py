@@ -0,0 +1,38 @@
+"""
+Production serving settings (the Dockerfile runs `gunicorn -c gunicorn.conf.py`).
+
+The app is configured once in the master (preload_app: imports and DAO setup happen before the
+fork, so workers share them and start in milliseconds). Each worker then runs start_worker() in
+post_fork, which opens nothing until then and, with APP_WARMUP=true, warms its pool and caches
+before serving. WEB_CONCURRENCY workers x GUNICORN_THREADS threads; PORT as set by Cloud Run.
+DB_ENGINE=memory must be the only writer, so it always runs one worker (scale it with threads).
+"""
+
+import os
+
+wsgi_app = "app:create_app(start=False)"
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+# Each worker would load its own copy of the tree and hand out its own IDs
+single_writer = os.getenv("DB_ENGINE", "").lower() == "memory"
+workers = 1 if single_writer else int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+# Seconds an idle keep-alive connection stays open, so pooled clients (src.client) reuse it
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Cloud Run enforces the request timeout itself
+timeout = 0
+accesslog = "-" if os.getenv("GUNICORN_ACCESS_LOG", "false").lower() == "true" else None
+
+
+def post_fork(server, worker):
+    import app
+
+    # workers = 1 can still be overridden (-w, TTIN); a second memory-engine worker must not boot
+    if single_writer and server.num_workers > 1:
+        raise RuntimeError("DB_ENGINE=memory must be the only writer: run gunicorn with one worker")
+    if os.getenv("CACHE_URL") == "local" and server.num_workers > 1:
+        server.log.warning("CACHE_URL=local is per worker: other workers see a write when entries expire")
+
+    # Configures the app too when preload_app is off
+    app.create_app()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+"""
+Maintenance commands for the SystemNode database (MySQL, configured like app.py via
+DB_HOST / DB_USER / DB_PASSWORD / DB_NAME).
+
+python manage.py migrate [--target 3]
+python manage.py check-indexes
+python manage.py repair-stats
+python manage.py compact-sort-order [--dry-run] [--parent ID | --root] [--max-parents 1000]
+python manage.py export backup.ndjson.gz
+python manage.py import backup.ndjson.gz [--remap-ids] [--workers 8] [--chunk-size 5000]
+python manage.py snapshot tree.snap
+python manage.py archive [--older-than-days 90] [--dry-run] [--max-subtrees 100]
+python manage.py unarchive ID
+python manage.py init-shards
+python manage.py recover-shards
+python manage.py move-root ID SHARD
+"""
+
+import argparse
+import json
+
+from src.config import db_config_from_env, env_flag
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+def migrate_schema(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.schema import migrate
+
+    return migrate(dao, args.target)
+
+
+def advise_indexes(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.schema import check_indexes
+
+    return check_indexes(dao)
+
+
+def repair_stats(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.subtree_stats import SubtreeStats
+
+    stats = SubtreeStats(dao)
+    stats.ensure_table()
+    return stats.recompute()
+
+
+def compact_sort_order(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.sort_compaction import compact_all, compact_parent
+
+    _attach_hooks_from_env(dao)
+    if args.parent is not None or args.root:
+        return compact_parent(dao, args.parent, dry_run=args.dry_run)
+    return compact_all(dao, dry_run=args.dry_run, max_parents=args.max_parents, pause_seconds=args.pause)
+
+
+def export_tree(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.bulk_io import export_to_file
+
+    return {"exported": export_to_file(dao, args.path, args.level), "path": args.path}
+
+
+def import_tree(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.bulk_io import import_ndjson
+    from src.dao.node_versions import NodeVersions
+    from src.dao.subtree_hashes import SubtreeHashes
+
+    result = import_ndjson(dao, args.path, remap_ids=args.remap_ids, chunk_size=args.chunk_size,
+                           workers=args.workers)
+    # The import skips write hooks, so no per-node version moved: retire every ETag instead
+    if env_flag("HTTP_ETAGS"):
+        NodeVersions(dao).bump_epoch()
+    if env_flag("DB_SUBTREE_HASHES"):
+        SubtreeHashes(dao).reset()
+    return result
+
+
+def snapshot_tree(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.change_log import ChangeLog
+    from src.dao.snapshot import create_snapshot
+
+    change_log = ChangeLog(dao)
+    change_log.ensure_table()
+    return create_snapshot(dao, change_log, args.path)
+
+
+def _attach_hooks_from_env(dao: SystemNodeDAO) -> None:
+    # The same derived tables app.py maintains (DB_SUBTREE_STATS / DB_CHANGE_LOG / HTTP_ETAGS /
+    # DB_SUBTREE_HASHES) must follow archive moves and SortOrder compaction
+    from src.dao.change_log import ChangeLog
+    from src.dao.node_versions import NodeVersions
+    from src.dao.subtree_hashes import SubtreeHashes
+    from src.dao.subtree_stats import SubtreeStats
+
+    if env_flag("DB_SUBTREE_STATS"):
+        SubtreeStats(dao)
+    if env_flag("DB_CHANGE_LOG"):
+        ChangeLog(dao)
+    if env_flag("HTTP_ETAGS"):
+        NodeVersions(dao)
+    if env_flag("DB_SUBTREE_HASHES"):
+        SubtreeHashes(dao)
+
+
+def archive_subtrees(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.archive import archive_all
+
+    _attach_hooks_from_env(dao)
+    return archive_all(dao, older_than_days=args.older_than_days, max_subtrees=args.max_subtrees,
+                       max_rows=args.max_rows, pause_seconds=args.pause, dry_run=args.dry_run)
+
+
+def unarchive(dao: SystemNodeDAO, args) -> dict:
+    from src.dao.archive import unarchive_subtree
+
+    _attach_hooks_from_env(dao)
+    return unarchive_subtree(dao, args.id)
+
+
+def _sharded_dao():
+    from src.dao.sharding import sharded_dao_from_env
+
+    sharded = sharded_dao_from_env()
+    if sharded is None:
+        raise SystemExit("Set DB_SHARDS (the directory lives in DB_NAME)")
+    return sharded
+
+
+def init_shards(dao: SystemNodeDAO, args) -> dict:
+    return _sharded_dao().init_shards()
+
+
+def recover_shards(dao: SystemNodeDAO, args) -> dict:
+    return _sharded_dao().recover()
+
+
+def move_root(dao: SystemNodeDAO, args) -> dict:
+    return {"ID": args.id, "shard": args.shard, "moved": _sharded_dao().move_root(args.id, args.shard)}
+
+
+def _migrate_args(parser):
+    parser.add_argument("--target", type=int, default=None, help="Stop at this schema version (default: latest)")
+
+
+def _compact_args(parser):
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--parent", type=int, default=None, help="Only compact this node's children")
+    parser.add_argument("--root", action="store_true", help="Only compact the root nodes")
+    parser.add_argument("--max-parents", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between parents")
+
+
+def _export_args(parser):
+    parser.add_argument("path", help="Output file (.ndjson.gz)")
+    parser.add_argument("--level", type=int, default=6, help="gzip level (1 = fastest, 9 = smallest)")
+
+
+def _import_args(parser):
+    parser.add_argument("path", help="Export file (gzip or plain NDJSON)")
+    parser.add_argument("--remap-ids", action="store_true", help="Shift IDs past the current MAX(ID)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+
+
+def _snapshot_args(parser):
+    parser.add_argument("path", help="Output snapshot file (replaced atomically)")
+
+
+def _archive_args(parser):
+    parser.add_argument("--older-than-days", type=int, default=90, help="Only subtrees untouched this long")
+    parser.add_argument("--dry-run", action="store_true", help="List eligible subtrees without moving them")
+    parser.add_argument("--max-subtrees", type=int, default=100)
+    parser.add_argument("--max-rows", type=int, default=5000, help="Leave bigger subtrees in place")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between subtrees")
+
+
+def _unarchive_args(parser):
+    parser.add_argument("id", type=int, help="Root of the archived subtree")
+
+
+def _move_root_args(parser):
+    parser.add_argument("id", type=int, help="Top-level node to move with its subtree")
+    parser.add_argument("shard", help="Destination shard name (from DB_SHARDS)")
+
+
+COMMANDS = {
+    "migrate": (migrate_schema, "Create or upgrade the MySQL schema (tables, indexes, foreign keys)", _migrate_args),
+    "check-indexes": (advise_indexes, "Report missing/redundant/unused indexes with EXPLAIN for the DAO's queries",
+                      None),
+    "repair-stats": (repair_stats, "Recompute subtree descendant/status rollups from scratch", None),
+    "compact-sort-order": (compact_sort_order, "Renumber sibling SortOrders that have gaps or duplicates",
+                           _compact_args),
+    "export": (export_tree, "Stream the whole tree to compressed NDJSON", _export_args),
+    "import": (import_tree, "Bulk-load an NDJSON export in parallel chunks", _import_args),
+    "snapshot": (snapshot_tree, "Write a memory-mappable binary snapshot stamped with the change version",
+                 _snapshot_args),
+    "archive": (archive_subtrees, "Move old, fully Done subtrees to SystemNodeArchive in batches", _archive_args),
+    "unarchive": (unarchive, "Move an archived subtree back into SystemNode", _unarchive_args),
+    "init-shards": (init_shards, "Create the shard directory, migrate each shard and give it its own ID range",
+                    None),
+    "recover-shards": (recover_shards, "Commit or roll back cross-shard moves left prepared", None),
+    "move-root": (move_root, "Move a top-level subtree to another shard", _move_root_args),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text, add_arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if add_arguments:
+            add_arguments(subparser)
+    args = parser.parse_args(argv)
+
+    dao = SystemNodeDAO(db_config_from_env())
+    handler, _, _ = COMMANDS[args.command]
+    print(json.dumps(handler(dao, args), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from typing import Optional, Dict
+from src.config import env_flag
+from src.metrics import metrics
+
+# class -> (concurrent requests, queued requests, max queue wait in seconds)
+DEFAULT_LIMITS = {
+    "read": (32, 32, 0.5),
+    "write": (8, 16, 1.0),
+    "heavy": (2, 2, 0.1),
+}
+
+
+class Bulkhead:
+    def __init__(self, name: str, limit: int, queue_size: int, wait_seconds: float):
+        """
+        Admits at most `limit` requests at once. Up to `queue_size` more wait, each for at
+        most wait_seconds; anything beyond that is refused straight away, so a slow database
+        shows up as fast rejections instead of piled-up workers and connections.
+
+        Counters: http.admission.<name>.admitted / .shed_queue_full / .shed_timeout.
+        Observation: http.admission.<name>.wait_ms (admitted after queueing).
+        """
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.wait_seconds = wait_seconds
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> bool:
+        with self._cond:
+            if self.active < self.limit and self.waiting == 0:
+                self.active += 1
+                metrics.incr(f"http.admission.{self.name}.admitted")
+                return True
+            if self.waiting >= self.queue_size:
+                metrics.incr(f"http.admission.{self.name}.shed_queue_full")
+                return False
+
+            self.waiting += 1
+            start = time.monotonic()
+            deadline = start + self.wait_seconds
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        metrics.incr(f"http.admission.{self.name}.shed_timeout")
+                        return False
+                    self._cond.wait(remaining)
+                self.active += 1
+            finally:
+                self.waiting -= 1
+            metrics.incr(f"http.admission.{self.name}.admitted")
+            metrics.observe(f"http.admission.{self.name}.wait_ms", (time.monotonic() - start) * 1000)
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+
+class AdmissionController:
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None, retry_after_seconds: int = 1):
+        """
+        One Bulkhead per route class (limits: class -> (limit, queue_size, wait_seconds)), so
+        heavy listings being shed never take slots from cheap reads. Refused requests should be
+        answered with 503 and Retry-After: retry_after_seconds.
+        """
+        self.bulkheads = {name: Bulkhead(name, *limit) for name, limit in (limits or DEFAULT_LIMITS).items()}
+        self.retry_after_seconds = retry_after_seconds
+
+    def acquire(self, route_class: str) -> Optional[Bulkhead]:
+        """
+        The bulkhead to release() when the request ends, or None if it was refused.
+        """
+        bulkhead = self.bulkheads[route_class]
+        return bulkhead if bulkhead.acquire() else None
+
+
+def admission_from_env() -> Optional[AdmissionController]:
+    """
+    ADMISSION_CONTROL=true turns admission control on. ADMISSION_LIMITS="heavy=1:0:0,read=64:64:0.25"
+    overrides classes as limit:queue:wait_seconds; ADMISSION_RETRY_AFTER (default 1) is the
+    Retry-After sent with each 503.
+    """
+    if not env_flag("ADMISSION_CONTROL"):
+        return None
+    limits = dict(DEFAULT_LIMITS)
+    for pair in filter(None, os.getenv("ADMISSION_LIMITS", "").split(",")):
+        name, _, spec = pair.partition("=")
+        limit, queue_size, wait_seconds = spec.split(":")
+        limits[name.strip()] = (int(limit), int(queue_size), float(wait_seconds))
+    return AdmissionController(limits, int(os.getenv("ADMISSION_RETRY_AFTER", "1")))
@@ -0,0 +1,18 @@
+"""
+Python client for the SystemNode HTTP API:
+
+    from src.client import SystemNodeClient
+    from src.dao.system_node import SystemNode
+
+    with SystemNodeClient("http://127.0.0.1:8080", cache_size=1000) as client:
+        ids = client.create_many([SystemNode(Name="A"), SystemNode(Name="B")])
+        nodes = client.get_many(ids)
+"""
+
+from src.client.client import (
+    Batch, ClientError, HTTPConnectionPool, Pending, SystemNodeClient, local_hashes, node_from_json
+)
+from src.client.async_client import AsyncSystemNodeClient
+
+__all__ = ["AsyncSystemNodeClient", "Batch", "ClientError", "HTTPConnectionPool", "Pending", "SystemNodeClient",
+           "local_hashes", "node_from_json"]
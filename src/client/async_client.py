@@ -0,0 +1,88 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple
+from src.client.client import SystemNodeClient
+from src.dao.system_node import SystemNode
+
+
+class AsyncSystemNodeClient:
+    def __init__(self, base_url: str = "http://127.0.0.1:8080", pool_size: int = 10, **client_kwargs):
+        """
+        The SystemNodeClient API as coroutines, for fanning out many requests from asyncio code:
+
+            parents, children = await asyncio.gather(client.get_many(ids), client.children(root))
+
+        Each call runs the pooled SystemNodeClient (same batching, cache and retries; keyword
+        arguments are passed to it) on a pool of pool_size threads, one per keep-alive
+        connection, so up to pool_size requests are in flight at once and the rest wait their
+        turn without blocking the event loop. Call `await close()` when done.
+        """
+        self.client = SystemNodeClient(base_url, pool_size=pool_size, **client_kwargs)
+        self._executor = ThreadPoolExecutor(pool_size, thread_name_prefix="systemnode-client")
+
+    async def __aenter__(self) -> "AsyncSystemNodeClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+    async def get(self, node_id: int) -> Optional[SystemNode]:
+        return await self._run(self.client.get, node_id)
+
+    async def get_many(self, node_ids: List[int]) -> List[Optional[SystemNode]]:
+        return await self._run(self.client.get_many, node_ids)
+
+    async def children(self, parent_id: Optional[int] = None) -> List[SystemNode]:
+        return await self._run(self.client.children, parent_id)
+
+    async def children_of_many(self, parent_ids: List[Optional[int]]) -> List[List[SystemNode]]:
+        """
+        The children of each parent, fetched concurrently.
+        """
+        return list(await asyncio.gather(*(self.children(parent_id) for parent_id in parent_ids)))
+
+    async def all_nodes(self) -> List[SystemNode]:
+        return await self._run(self.client.all_nodes)
+
+    async def by_path(self, path: str) -> Optional[SystemNode]:
+        return await self._run(self.client.by_path, path)
+
+    async def by_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        return await self._run(self.client.by_paths, paths)
+
+    async def subtree_hashes(self, node_id: Optional[int] = None, depth: int = 1) -> Optional[dict]:
+        return await self._run(self.client.subtree_hashes, node_id, depth)
+
+    async def diverged(self, local: Dict[Optional[int], str], node_id: Optional[int] = None,
+                       depth: int = 2) -> List[dict]:
+        return await self._run(self.client.diverged, local, node_id, depth)
+
+    async def create(self, node: SystemNode) -> int:
+        return await self._run(self.client.create, node)
+
+    async def create_many(self, nodes: List[SystemNode]) -> List[int]:
+        return await self._run(self.client.create_many, nodes)
+
+    async def update(self, old: SystemNode, new: SystemNode) -> bool:
+        return await self._run(self.client.update, old, new)
+
+    async def delete(self, old: SystemNode) -> bool:
+        return await self._run(self.client.delete, old)
+
+    async def move(self, node_id: int, new_parent_id: Optional[int] = None,
+                   target_index: Optional[int] = None) -> bool:
+        return await self._run(self.client.move, node_id, new_parent_id, target_index)
+
+    async def move_many(self, moves: List[Tuple[int, Optional[int], Optional[int]]]) -> List[bool]:
+        return await self._run(self.client.move_many, moves)
+
+    async def reorder(self, parent_id: Optional[int], ordered_ids: List[int]) -> List[bool]:
+        return await self._run(self.client.reorder, parent_id, ordered_ids)
@@ -0,0 +1,513 @@
+import http.client
+import json
+import queue
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, fields
+from typing import Optional, List, Dict, Tuple, Callable, Any
+from urllib.parse import urlsplit, quote
+from src.dao.system_node import SystemNode, merkle_hash
+
+_NODE_FIELDS = [f.name for f in fields(SystemNode)]
+
+# Errors that mean a kept-alive connection was closed by the server while idle
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                            ConnectionResetError, BrokenPipeError)
+
+# Batch endpoints (see app.py); servers without them answer 404 / 405 and get one call per item
+BATCH_GET_PATH = "/nodes/batch/get"
+BATCH_CREATE_PATH = "/nodes/batch/create"
+BATCH_MOVE_PATH = "/nodes/batch/move"
+
+
+class ClientError(Exception):
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        """
+        A response the client cannot turn into a result (a 5xx, a 400, a 503 after the retries).
+        """
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+def node_from_json(data: dict) -> SystemNode:
+    node = SystemNode(**{name: data[name] for name in _NODE_FIELDS if name in data})
+    node.Tags = node.Tags or {}
+    node.Metadata = node.Metadata or {}
+    return node
+
+
+def local_hashes(nodes: List[SystemNode]) -> Dict[Optional[int], str]:
+    """
+    {ID: hex subtree hash} over a local copy of the tree (None: the whole copy), computed the
+    way the server's GET /nodes/<id>/hash does, for SystemNodeClient.diverged().
+    """
+    children: Dict[Optional[int], List[SystemNode]] = {}
+    for node in nodes:
+        children.setdefault(node.ParentID, []).append(node)
+    for siblings in children.values():
+        siblings.sort(key=lambda n: (n.SortOrder, n.ID))
+    hashes: Dict[Optional[int], bytes] = {}
+    # Post-order without recursion, so deep trees are fine
+    stack: List[Tuple[Optional[SystemNode], bool]] = [(None, False)]
+    while stack:
+        node, expanded = stack.pop()
+        node_id = None if node is None else node.ID
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children.get(node_id, []))
+            continue
+        hashes[node_id] = merkle_hash(node, [hashes[child.ID] for child in children.get(node_id, [])])
+    return {node_id: digest.hex() for node_id, digest in hashes.items()}
+
+
+# -----------------------------------------------------------
+# CONNECTIONS
+# -----------------------------------------------------------
+class HTTPConnectionPool:
+    def __init__(self, base_url: str, size: int = 10, timeout: float = 30.0):
+        """
+        At most `size` keep-alive connections to one server, opened on demand and reused (LIFO,
+        so the most recently used connection, the one least likely to have been closed, goes
+        first). A request on a reused connection the server has since closed is resent once on
+        a fresh one. request() waits for a free connection when all are busy.
+        """
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    @staticmethod
+    def _send(conn: http.client.HTTPConnection, method: str, path: str, body: Optional[bytes],
+              headers: dict) -> http.client.HTTPResponse:
+        conn.request(method, path, body=body, headers=headers)
+        return conn.getresponse()
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[dict] = None) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Returns (status, response headers, raw body).
+        """
+        headers = headers or {}
+        path = self.prefix + path
+        self._slots.acquire()
+        try:
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+            try:
+                try:
+                    response = self._send(conn, method, path, body, headers)
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    conn.close()
+                    conn = self._connect()
+                    response = self._send(conn, method, path, body, headers)
+                data = response.read()
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._idle.put(conn)
+            return response.status, response.headers, data
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": self._idle.qsize(), "opened": self.opened}
+
+
+# -----------------------------------------------------------
+# CLIENT
+# -----------------------------------------------------------
+class SystemNodeClient:
+    def __init__(self, base_url: str = "http://127.0.0.1:8080", pool_size: int = 10, timeout: float = 30.0,
+                 cache_size: int = 0, batch_size: int = 500, retries: int = 2, session_id: Optional[str] = None):
+        """
+        The SystemNode HTTP API as typed calls, over a pool of keep-alive connections (safe to
+        share between threads, up to pool_size requests at once).
+
+        - get_many / create_many / move_many / reorder send batch_size items per request to the
+          batch endpoints, falling back to one request per item on servers without them;
+          batch() groups individual calls the same way.
+        - cache_size > 0 keeps that many GET responses (nodes, child lists) with their ETags and
+          revalidates them with If-None-Match, so an unchanged node costs a 304 with no body.
+          Needs a server with HTTP_ETAGS=true; without ETags nothing is cached.
+        - A 503 (admission control shedding load) is retried `retries` times after Retry-After.
+        - The X-Last-Write time of this client's latest write is sent back with every request, so
+          it reads its own writes under replica routing (DB_READ_YOUR_WRITES_SECONDS) whichever
+          server process answers; session_id is also sent as X-Session-ID.
+        Responses are requested gzip-compressed.
+        """
+        self.pool = HTTPConnectionPool(base_url, pool_size, timeout)
+        self.batch_size = batch_size
+        self.retries = retries
+        self.session_id = session_id
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._unsupported = set()
+        # Guards _last_write and _counts, which every thread sharing the client updates
+        self._state_lock = threading.Lock()
+        self._last_write: Optional[str] = None
+        self._counts = {"requests": 0, "not_modified": 0, "batches": 0, "retries": 0}
+
+    def __enter__(self) -> "SystemNodeClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def stats(self) -> dict:
+        with self._state_lock:
+            counts = dict(self._counts)
+        return {**counts, "cached": len(self._cache), "pool": self.pool.stats()}
+
+    def _count(self, name: str) -> None:
+        with self._state_lock:
+            self._counts[name] += 1
+
+    # ---- HTTP ----
+    def _call(self, method: str, path: str, payload: Any = None, headers: Optional[dict] = None) -> tuple:
+        """
+        Returns (status, response headers, parsed JSON body or None).
+        """
+        headers = {"Accept-Encoding": "gzip", **(headers or {})}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        if self.session_id:
+            headers["X-Session-ID"] = self.session_id
+        with self._state_lock:
+            if self._last_write:
+                headers["X-Last-Write"] = self._last_write
+        for attempt in range(self.retries + 1):
+            self._count("requests")
+            status, response_headers, data = self.pool.request(method, path, body, headers)
+            if status != 503 or attempt == self.retries:
+                break
+            self._count("retries")
+            time.sleep(float(response_headers.get("Retry-After") or 1))
+        last_write = response_headers.get("X-Last-Write")
+        if last_write:
+            # Keep the latest: concurrent writes may answer out of order
+            with self._state_lock:
+                if self._last_write is None or float(last_write) > float(self._last_write):
+                    self._last_write = last_write
+        if response_headers.get("Content-Encoding") == "gzip":
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+        parsed = None
+        if data and (response_headers.get("Content-Type") or "").startswith("application/json"):
+            parsed = json.loads(data)
+        return status, response_headers, parsed
+
+    @staticmethod
+    def _error(status: int, parsed: Any, headers: Optional[http.client.HTTPMessage] = None) -> ClientError:
+        message = parsed.get("error", str(parsed)) if isinstance(parsed, dict) else str(parsed)
+        retry_after = headers.get("Retry-After") if headers is not None else None
+        return ClientError(status, message, float(retry_after) if retry_after else None)
+
+    def _get(self, path: str) -> Tuple[int, Any]:
+        cached = None
+        if self.cache_size > 0:
+            with self._cache_lock:
+                cached = self._cache.get(path)
+        status, headers, parsed = self._call("GET", path, headers={"If-None-Match": cached[0]} if cached else None)
+        if status == 304 and cached is not None:
+            self._count("not_modified")
+            with self._cache_lock:
+                if path in self._cache:
+                    self._cache.move_to_end(path)
+            return 200, cached[1]
+        if status >= 500:
+            raise self._error(status, parsed, headers)
+        if self.cache_size > 0:
+            with self._cache_lock:
+                if status == 200 and headers.get("ETag"):
+                    self._cache[path] = (headers["ETag"], parsed)
+                    self._cache.move_to_end(path)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                else:
+                    self._cache.pop(path, None)
+        return status, parsed
+
+    def _batched(self, path: str, key: str, items: list, result_key: str, one: Callable[[Any], Any]) -> list:
+        """
+        POSTs items batch_size at a time as {key: [...]} and concatenates response[result_key];
+        if the server has no such endpoint, calls one(item) per item instead.
+        """
+        results = []
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start:start + self.batch_size]
+            if path not in self._unsupported:
+                status, headers, parsed = self._call("POST", path, {key: chunk})
+                if status in (200, 201):
+                    self._count("batches")
+                    results.extend(parsed[result_key])
+                    continue
+                if status not in (404, 405):
+                    raise self._error(status, parsed, headers)
+                self._unsupported.add(path)
+            results.extend(one(item) for item in chunk)
+        return results
+
+    # ---- reads ----
+    def get(self, node_id: int) -> Optional[SystemNode]:
+        status, parsed = self._get(f"/nodes/{int(node_id)}")
+        if status == 404:
+            return None
+        if status != 200:
+            raise self._error(status, parsed)
+        return node_from_json(parsed)
+
+    def get_many(self, node_ids: List[int]) -> List[Optional[SystemNode]]:
+        """
+        Nodes by ID, None where missing, in the given order.
+        """
+        found = self._batched(BATCH_GET_PATH, "ids", [int(i) for i in node_ids], "nodes",
+                              lambda node_id: self.get(node_id))
+        return [node if node is None or isinstance(node, SystemNode) else node_from_json(node) for node in found]
+
+    def children(self, parent_id: Optional[int] = None) -> List[SystemNode]:
+        """
+        The children of parent_id (None: the top-level nodes), in SortOrder.
+        """
+        status, parsed = self._get(f"/nodes?parent={'null' if parent_id is None else int(parent_id)}")
+        if status != 200:
+            raise self._error(status, parsed)
+        return [node_from_json(node) for node in parsed]
+
+    def all_nodes(self) -> List[SystemNode]:
+        status, parsed = self._get("/nodes")
+        if status != 200:
+            raise self._error(status, parsed)
+        return [node_from_json(node) for node in parsed]
+
+    def by_path(self, path: str) -> Optional[SystemNode]:
+        status, parsed = self._get("/nodes/by-path/" + quote(path.strip("/")))
+        if status == 404:
+            return None
+        if status != 200:
+            raise self._error(status, parsed)
+        return node_from_json(parsed)
+
+    def by_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        status, headers, parsed = self._call("POST", "/nodes/by-path", {"paths": paths})
+        if status != 200:
+            raise self._error(status, parsed, headers)
+        return [node_from_json(node) if node else None for node in parsed["nodes"]]
+
+    # ---- resync ----
+    def subtree_hashes(self, node_id: Optional[int] = None, depth: int = 1) -> Optional[dict]:
+        """
+        GET /nodes/<id>/hash: {"ID", "Hash", "Children": [...]} down to depth levels (None: from
+        above the top-level nodes), or None if the node does not exist.
+        """
+        path = "/nodes/hash" if node_id is None else f"/nodes/{int(node_id)}/hash"
+        status, headers, parsed = self._call("GET", f"{path}?depth={int(depth)}")
+        if status == 404 and node_id is not None:
+            return None
+        if status != 200:
+            raise self._error(status, parsed, headers)
+        return parsed
+
+    def diverged(self, local: Dict[Optional[int], str], node_id: Optional[int] = None,
+                 depth: int = 2) -> List[dict]:
+        """
+        Compares the server's subtree hashes with local ({ID: hex hash}, see local_hashes) from
+        node_id down, descending only where they differ, depth levels per request. Returns
+        {"ID", "Hash", "Children": [child IDs]} for every node whose subtree differs, parents
+        first: refetch those nodes and take their child lists; children not listed were
+        deleted or moved, listed children not in the result are unchanged.
+        """
+        result = []
+        roots = [node_id]
+        while roots:
+            tree = self.subtree_hashes(roots.pop(0), depth)
+            if tree is None:
+                continue
+            entries = [tree]
+            while entries:
+                entry = entries.pop(0)
+                if local.get(entry["ID"]) == entry["Hash"]:
+                    continue
+                if "Children" not in entry:
+                    # Below this request's depth: ask again from here
+                    roots.append(entry["ID"])
+                    continue
+                result.append({"ID": entry["ID"], "Hash": entry["Hash"],
+                               "Children": [child["ID"] for child in entry["Children"]]})
+                entries.extend(entry["Children"])
+        return result
+
+    # ---- writes ----
+    def create(self, node: SystemNode) -> int:
+        """
+        Creates node (appended to its siblings) and returns its ID.
+        """
+        status, headers, parsed = self._call("POST", "/nodes", asdict(node))
+        if status != 201:
+            raise self._error(status, parsed, headers)
+        return parsed["ID"]
+
+    def create_many(self, nodes: List[SystemNode]) -> List[int]:
+        """
+        Creates nodes in order and returns their IDs. Not atomic: a ClientError part-way leaves
+        the earlier ones created.
+        """
+        return self._batched(BATCH_CREATE_PATH, "nodes", [asdict(node) for node in nodes], "IDs",
+                             lambda data: self.create(node_from_json(data)))
+
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        """
+        False if the node changed since `old` was read (or is gone).
+        """
+        status, headers, parsed = self._call("PATCH", f"/nodes/{old.ID}", {"old": asdict(old), "new": asdict(new)})
+        if status == 409:
+            return False
+        if status != 200:
+            raise self._error(status, parsed, headers)
+        return True
+
+    def delete(self, old: SystemNode) -> bool:
+        """
+        False if the node changed since `old` was read, is gone, or still has children.
+        """
+        status, headers, parsed = self._call("DELETE", f"/nodes/{old.ID}", {"old": asdict(old)})
+        if status == 409:
+            return False
+        if status != 200:
+            raise self._error(status, parsed, headers)
+        return True
+
+    def move(self, node_id: int, new_parent_id: Optional[int] = None, target_index: Optional[int] = None) -> bool:
+        status, headers, parsed = self._call("POST", f"/nodes/{int(node_id)}/move",
+                                             {"new_parent_id": new_parent_id, "target_index": target_index})
+        if status == 404:
+            return False
+        if status != 200:
+            raise self._error(status, parsed, headers)
+        return True
+
+    def move_many(self, moves: List[Tuple[int, Optional[int], Optional[int]]]) -> List[bool]:
+        """
+        Applies (node_id, new_parent_id, target_index) moves in order; False where the node was not found.
+        """
+        payload = [{"ID": node_id, "new_parent_id": parent_id, "target_index": index}
+                   for node_id, parent_id, index in moves]
+        return self._batched(BATCH_MOVE_PATH, "moves", payload, "moved",
+                             lambda move: self.move(move["ID"], move["new_parent_id"], move["target_index"]))
+
+    def reorder(self, parent_id: Optional[int], ordered_ids: List[int]) -> List[bool]:
+        """
+        Puts ordered_ids first among parent_id's children, in that order (moving them under
+        parent_id if they are elsewhere).
+        """
+        return self.move_many([(node_id, parent_id, index) for index, node_id in enumerate(ordered_ids, 1)])
+
+    def batch(self) -> "Batch":
+        return Batch(self)
+
+
+# -----------------------------------------------------------
+# BATCHING
+# -----------------------------------------------------------
+class Pending:
+    """
+    The result of a call queued on a Batch, available as .value once the batch is flushed.
+    """
+
+    _UNSET = object()
+
+    def __init__(self):
+        self._value = Pending._UNSET
+
+    @property
+    def done(self) -> bool:
+        return self._value is not Pending._UNSET
+
+    @property
+    def value(self) -> Any:
+        if not self.done:
+            raise RuntimeError("The batch has not been flushed yet")
+        return self._value
+
+
+class Batch:
+    def __init__(self, client: SystemNodeClient):
+        """
+        Queues get / create / move calls and sends them on flush() (or leaving a `with` block
+        without an exception), each run of consecutive same-kind calls as one batch request, so
+        the calls take effect in the order they were made:
+
+            with client.batch() as batch:
+                ids = [batch.create(SystemNode(Name=name)) for name in names]
+            print([pending.value for pending in ids])
+        """
+        self.client = client
+        self._queued: List[Tuple[str, Any, Pending]] = []
+
+    def __enter__(self) -> "Batch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def _queue(self, kind: str, arg: Any) -> Pending:
+        pending = Pending()
+        self._queued.append((kind, arg, pending))
+        return pending
+
+    def get(self, node_id: int) -> Pending:
+        return self._queue("get", node_id)
+
+    def create(self, node: SystemNode) -> Pending:
+        return self._queue("create", node)
+
+    def move(self, node_id: int, new_parent_id: Optional[int] = None, target_index: Optional[int] = None) -> Pending:
+        return self._queue("move", (node_id, new_parent_id, target_index))
+
+    def flush(self) -> None:
+        send = {"get": self.client.get_many, "create": self.client.create_many, "move": self.client.move_many}
+        queued, self._queued = self._queued, []
+        start = 0
+        while start < len(queued):
+            end = start
+            while end < len(queued) and queued[end][0] == queued[start][0]:
+                end += 1
+            run = queued[start:end]
+            for (_, _, pending), result in zip(run, send[run[0][0]]([arg for _, arg, _ in run])):
+                pending._value = result
+            start = end
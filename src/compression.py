@@ -0,0 +1,221 @@
+import os
+import time
+import zlib
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple, Callable, Any
+from src.config import env_flag
+from src.metrics import metrics
+
+# Server preference when the client accepts several equally. brotli and zstandard are optional
+# packages; an encoding whose package is missing is never offered.
+PREFERENCE = ("zstd", "br", "gzip")
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+LEVEL_RANGES = {"zstd": (1, 22), "br": (0, 11), "gzip": (1, 9)}
+
+
+# -----------------------------------------------------------
+# ENCODERS
+# -----------------------------------------------------------
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        import zstandard
+
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+_ENCODERS: Dict[str, Callable[[int], Any]] = {"gzip": _GzipEncoder, "br": _BrotliEncoder, "zstd": _ZstdEncoder}
+_MODULES = {"gzip": "zlib", "br": "brotli", "zstd": "zstandard"}
+
+
+def installed_encodings() -> List[str]:
+    """
+    The encodings in PREFERENCE order whose compression package can be imported.
+    """
+    found = []
+    for encoding in PREFERENCE:
+        try:
+            __import__(_MODULES[encoding])
+        except ImportError:
+            continue
+        found.append(encoding)
+    return found
+
+
+def negotiate(accept_encoding: Optional[str], encodings: List[str]) -> Optional[str]:
+    """
+    Pick from encodings (in server preference order) using an Accept-Encoding header:
+    the highest q-value wins, ties go to the earlier encoding. None = send identity.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+# -----------------------------------------------------------
+# STREAMING
+# -----------------------------------------------------------
+def iter_json_array(items: Iterable[Any], dumps: Callable[[Any], str], batch: int = 500) -> Iterator[bytes]:
+    """
+    Encode items as one JSON array (plus a trailing newline, like jsonify), yielding a chunk per
+    `batch` items so the whole document never sits in memory at once.
+    """
+    yield b"["
+    buffer: List[str] = []
+    first = True
+    for item in items:
+        buffer.append(dumps(item))
+        if len(buffer) >= batch:
+            yield (("" if first else ",") + ",".join(buffer)).encode("utf-8")
+            buffer.clear()
+            first = False
+    if buffer:
+        yield (("" if first else ",") + ",".join(buffer)).encode("utf-8")
+    yield b"]\n"
+
+
+class ResponseCompression:
+    def __init__(self, encodings: Optional[List[str]] = None, min_bytes: int = 1024,
+                 route_levels: Optional[Dict[str, int]] = None):
+        """
+        Negotiated response compression. Bodies smaller than min_bytes go out as they are
+        (compressing them costs more CPU than the bytes are worth). route_levels maps a Flask
+        endpoint name to a compression level, clamped to each encoding's range; other routes
+        use DEFAULT_LEVELS.
+
+        Counters: http.compression.<encoding>.responses / .bytes_in / .bytes_out,
+        http.compression.skipped, http.bytes_on_wire.<route>. Observation:
+        http.compression.<encoding>.cpu_ms (per response, thread CPU time spent compressing).
+        """
+        self.encodings = installed_encodings() if encodings is None else encodings
+        self.min_bytes = min_bytes
+        self.route_levels = route_levels or {}
+
+    def level(self, encoding: str, route: Optional[str]) -> int:
+        low, high = LEVEL_RANGES[encoding]
+        return min(max(self.route_levels.get(route, DEFAULT_LEVELS[encoding]), low), high)
+
+    def encode(self, chunks: Iterable[bytes], accept_encoding: Optional[str],
+               route: Optional[str]) -> Tuple[Optional[str], Iterator[bytes]]:
+        """
+        Returns (content coding or None, body chunks). Reads ahead until min_bytes are buffered
+        to decide; the rest is compressed as the chunks arrive.
+        """
+        chunks = iter(chunks)
+        encoding = negotiate(accept_encoding, self.encodings)
+        head: List[bytes] = []
+        size = 0
+        if encoding is not None:
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+                if size >= self.min_bytes:
+                    break
+            else:
+                encoding = None
+        if encoding is None:
+            metrics.incr("http.compression.skipped")
+            return None, self._count(head, chunks, route)
+        return encoding, self._compress(head, chunks, encoding, route)
+
+    @staticmethod
+    def _count(head: List[bytes], chunks: Iterator[bytes], route: Optional[str]) -> Iterator[bytes]:
+        sent = 0
+        try:
+            for chunk in head:
+                sent += len(chunk)
+                yield chunk
+            for chunk in chunks:
+                sent += len(chunk)
+                yield chunk
+        finally:
+            metrics.incr(f"http.bytes_on_wire.{route}", sent)
+
+    def _compress(self, head: List[bytes], chunks: Iterator[bytes], encoding: str,
+                  route: Optional[str]) -> Iterator[bytes]:
+        encoder = _ENCODERS[encoding](self.level(encoding, route))
+        bytes_in = bytes_out = cpu_ns = 0
+        try:
+            for source in (head, chunks):
+                for chunk in source:
+                    start = time.thread_time_ns()
+                    out = encoder.compress(chunk)
+                    cpu_ns += time.thread_time_ns() - start
+                    bytes_in += len(chunk)
+                    if out:
+                        bytes_out += len(out)
+                        yield out
+            start = time.thread_time_ns()
+            out = encoder.finish()
+            cpu_ns += time.thread_time_ns() - start
+            bytes_out += len(out)
+            yield out
+        finally:
+            metrics.incr(f"http.compression.{encoding}.responses")
+            metrics.incr(f"http.compression.{encoding}.bytes_in", bytes_in)
+            metrics.incr(f"http.compression.{encoding}.bytes_out", bytes_out)
+            metrics.incr(f"http.bytes_on_wire.{route}", bytes_out)
+            metrics.observe(f"http.compression.{encoding}.cpu_ms", cpu_ns / 1e6)
+
+
+def compression_from_env() -> Optional[ResponseCompression]:
+    """
+    HTTP_COMPRESSION=false turns compression off. HTTP_COMPRESSION_ENCODINGS="br,gzip" restricts
+    (and orders) the encodings offered, HTTP_COMPRESSION_MIN_BYTES (default 1024) is the size
+    threshold and HTTP_COMPRESSION_LEVELS="get_nodes=4,get_node=1" sets levels per endpoint.
+    """
+    if not env_flag("HTTP_COMPRESSION", default=True):
+        return None
+    encodings = installed_encodings()
+    if os.getenv("HTTP_COMPRESSION_ENCODINGS"):
+        wanted = [e.strip() for e in os.getenv("HTTP_COMPRESSION_ENCODINGS").split(",")]
+        encodings = [e for e in wanted if e in encodings]
+    route_levels = {}
+    for pair in filter(None, os.getenv("HTTP_COMPRESSION_LEVELS", "").split(",")):
+        route, _, level = pair.partition("=")
+        route_levels[route.strip()] = int(level)
+    return ResponseCompression(encodings, int(os.getenv("HTTP_COMPRESSION_MIN_BYTES", "1024")), route_levels)
@@ -0,0 +1,45 @@
+import os
+
+
+def db_config_from_env() -> dict:
+    """
+    MySQL connection settings from DB_HOST / DB_USER / DB_PASSWORD / DB_NAME.
+    """
+    return {
+        "host": os.getenv("DB_HOST", "127.0.0.1"),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("DB_NAME", "jbone-system-db")
+    }
+
+
+def replica_configs_from_env(db_config: dict) -> list:
+    """
+    DB_REPLICA_HOSTS="host1,host2:3307" -> one config per replica, sharing db_config's credentials.
+    """
+    replica_configs = []
+    for replica in filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")):
+        host, _, port = replica.strip().partition(":")
+        replica_configs.append({**db_config, "host": host, "port": int(port or 3306)})
+    return replica_configs
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    return os.getenv(name, "true" if default else "false").lower() == "true"
+
+
+def shard_configs_from_env(db_config: dict) -> dict:
+    """
+    DB_SHARDS="s0=db_a,s1=host2:3307/db_b" -> {"s0": config, "s1": config}, in the listed order.
+    Each shard is a database (optionally on another host) sharing db_config's credentials.
+    """
+    shard_configs = {}
+    for shard in filter(None, os.getenv("DB_SHARDS", "").split(",")):
+        name, _, location = shard.strip().partition("=")
+        server, _, database = location.rpartition("/")
+        config = {**db_config, "database": database}
+        if server:
+            host, _, port = server.partition(":")
+            config.update(host=host, port=int(port or 3306))
+        shard_configs[name.strip()] = config
+    return shard_configs
@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional, List, Dict, Hashable, Callable, Tuple
+from src.config import env_flag
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Counters are stored pre-multiplied by 2^(age / half-life) so old hits never need touching;
+# once the multiplier reaches this, everything is divided down and the clock restarts.
+_RESCALE_AT = 2.0 ** 32
+
+# The KVStore key prewarmers save the hot lists under, so the next process starts from them
+HOT_KEY = "systemnode:hot"
+
+
+# -----------------------------------------------------------
+# SKETCH
+# -----------------------------------------------------------
+class DecayingTopK:
+    def __init__(self, capacity: int = 500, width: int = 2048, depth: int = 4, half_life_seconds: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Approximate access counts that halve every half_life_seconds, in bounded memory: a
+        count-min sketch of depth x width counters (conservative update, so estimates only
+        over-count on collisions) plus the `capacity` keys with the highest estimates.
+        """
+        self.capacity = capacity
+        self.width = width
+        self.depth = depth
+        self.half_life_seconds = half_life_seconds
+        self._clock = clock
+        self._epoch = clock()
+        self._rows = [[0.0] * width for _ in range(depth)]
+        self._top: Dict[Hashable, float] = {}
+        self._floor = 0.0
+        self._lock = threading.Lock()
+
+    def _weight(self, now: float) -> float:
+        return 2.0 ** ((now - self._epoch) / self.half_life_seconds)
+
+    def _rescale(self, weight: float, now: float) -> None:
+        for row in self._rows:
+            for i, value in enumerate(row):
+                if value:
+                    row[i] = value / weight
+        self._top = {key: value / weight for key, value in self._top.items()}
+        self._floor /= weight
+        self._epoch = now
+
+    def _prune(self) -> None:
+        kept = sorted(self._top.items(), key=lambda item: item[1], reverse=True)[:self.capacity]
+        self._top = dict(kept)
+        self._floor = kept[-1][1] if kept else 0.0
+
+    def add(self, key: Hashable, count: float = 1.0) -> None:
+        now = self._clock()
+        hashed = hash(key)
+        slots = [hash((row, hashed)) % self.width for row in range(self.depth)]
+        with self._lock:
+            weight = self._weight(now)
+            if weight > _RESCALE_AT:
+                self._rescale(weight, now)
+                weight = 1.0
+            rows = self._rows
+            estimate = min(rows[row][slot] for row, slot in enumerate(slots)) + count * weight
+            for row, slot in enumerate(slots):
+                if rows[row][slot] < estimate:
+                    rows[row][slot] = estimate
+            if key in self._top or len(self._top) < self.capacity or estimate > self._floor:
+                self._top[key] = estimate
+                if len(self._top) > 2 * self.capacity:
+                    self._prune()
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """
+        [(key, decayed count)], hottest first.
+        """
+        with self._lock:
+            weight = self._weight(self._clock())
+            items = sorted(self._top.items(), key=lambda item: item[1], reverse=True)[:limit or self.capacity]
+        return [(key, value / weight) for key, value in items]
+
+
+# -----------------------------------------------------------
+# TRACKING DAO
+# -----------------------------------------------------------
+class AccessTrackingSystemNodeDAO(SystemNodeBackend):
+    def __init__(self, dao: SystemNodeBackend, sample_rate: float = 0.1, capacity: int = 500,
+                 half_life_seconds: float = 600.0):
+        """
+        Wraps a backend and samples read (by node ID) and read_by_parent (by parent ID) into two
+        DecayingTopK sketches, so the hottest nodes and child lists are known without a counter
+        per node. A sampled call counts 1 / sample_rate. Everything passes straight through.
+        Counter: dao.access.sampled.
+        """
+        self.dao = dao
+        self.sample_rate = sample_rate
+        self.nodes = DecayingTopK(capacity, half_life_seconds=half_life_seconds)
+        self.parents = DecayingTopK(capacity, half_life_seconds=half_life_seconds)
+
+    def __getattr__(self, name: str):
+        return getattr(self.dao, name)
+
+    def _sample(self, sketch: DecayingTopK, key: Hashable) -> None:
+        if random.random() < self.sample_rate:
+            sketch.add(key, 1.0 / self.sample_rate)
+            metrics.incr("dao.access.sampled")
+
+    def hot(self, limit: Optional[int] = None) -> dict:
+        """
+        {"nodes": [{"ID", "count"}], "parents": [{"ParentID", "count"}]}, hottest first; counts are
+        estimated reads per half-life.
+        """
+        return {
+            "nodes": [{"ID": key, "count": round(count, 2)} for key, count in self.nodes.top(limit)],
+            "parents": [{"ParentID": key, "count": round(count, 2)} for key, count in self.parents.top(limit)],
+        }
+
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        self._sample(self.nodes, node_id)
+        return self.dao.read(node_id)
+
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        self._sample(self.parents, parent_id)
+        return self.dao.read_by_parent(parent_id)
+
+    def read_all(self) -> List[SystemNode]:
+        return self.dao.read_all()
+
+    def resolve_path(self, path: str) -> Optional[SystemNode]:
+        return self.dao.resolve_path(path)
+
+    def resolve_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        return self.dao.resolve_paths(paths)
+
+    def create(self, node: SystemNode) -> int:
+        return self.dao.create(node)
+
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        return self.dao.update(old, new)
+
+    def delete(self, old: SystemNode) -> bool:
+        return self.dao.delete(old)
+
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        return self.dao.move_node(node_id, new_parent_id, target_index)
+
+    def apply_batch(self, upserts: List[SystemNode], deleted_ids: List[int]) -> None:
+        return self.dao.apply_batch(upserts, deleted_ids)
+
+
+# -----------------------------------------------------------
+# PREWARMING
+# -----------------------------------------------------------
+class CachePrewarmer:
+    def __init__(self, tracker: AccessTrackingSystemNodeDAO, cache, top_n: int = 100, depth: int = 1,
+                 saved_ttl_seconds: float = 7 * 86400):
+        """
+        Keeps the top_n hottest nodes and child lists in `cache` (a CachedSystemNodeDAO, read
+        directly so prefetches are not counted as accesses): present entries cost a cache hit,
+        missing ones (cold start, invalidated, expired) are loaded. depth > 1 also loads the
+        child lists of the children of hot parents, that many levels down.
+
+        Each run saves the hot lists in the cache's store under HOT_KEY; load_saved() seeds a
+        fresh tracker from them, so a restarted worker prewarms before its own counts build up.
+        Counters: cache.prewarm.runs, cache.prewarm.keys.
+        """
+        self.tracker = tracker
+        self.cache = cache
+        self.top_n = top_n
+        self.depth = depth
+        self.saved_ttl_seconds = saved_ttl_seconds
+        self._loaded = False
+
+    def load_saved(self) -> int:
+        """
+        Seed the tracker from the saved hot lists (once; later calls return 0).
+        """
+        if self._loaded:
+            return 0
+        self._loaded = True
+        (raw,) = self.cache.store.get_many([HOT_KEY])
+        if raw is None:
+            return 0
+        saved = json.loads(raw)
+        for item in saved.get("nodes", []):
+            self.tracker.nodes.add(item["ID"], item["count"])
+        for item in saved.get("parents", []):
+            self.tracker.parents.add(item["ParentID"], item["count"])
+        return len(saved.get("nodes", [])) + len(saved.get("parents", []))
+
+    def run_once(self) -> dict:
+        hot = self.tracker.hot(self.top_n)
+        keys = 0
+        for item in hot["nodes"]:
+            self.cache.read(item["ID"])
+            keys += 1
+        level = [item["ParentID"] for item in hot["parents"]]
+        for _ in range(self.depth):
+            next_level = []
+            for parent_id in level:
+                next_level.extend(child.ID for child in self.cache.read_by_parent(parent_id))
+                keys += 1
+            level = next_level
+        if hot["nodes"] or hot["parents"]:
+            self.cache.store.set_many({HOT_KEY: json.dumps(hot).encode()}, self.saved_ttl_seconds)
+        metrics.incr("cache.prewarm.runs")
+        metrics.incr("cache.prewarm.keys", keys)
+        return {"nodes": len(hot["nodes"]), "parents": len(hot["parents"]), "keys": keys}
+
+    def start(self, interval: float) -> threading.Thread:
+        """
+        load_saved() and a first run straight away, then a run every `interval` seconds, on a daemon thread.
+        """
+        def loop():
+            try:
+                self.load_saved()
+            except Exception:
+                logger.exception("Could not load the saved hot lists")
+            while True:
+                try:
+                    self.run_once()
+                except Exception:
+                    logger.exception("Cache prewarm failed")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=loop, name="cache-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+
+def access_tracking_from_env(dao: SystemNodeBackend) -> Optional[AccessTrackingSystemNodeDAO]:
+    """
+    ACCESS_STATS=true wraps dao in an AccessTrackingSystemNodeDAO: ACCESS_STATS_SAMPLE_RATE (default
+    0.1), ACCESS_STATS_CAPACITY (hot keys kept per sketch, default 500) and
+    ACCESS_STATS_HALF_LIFE_SECONDS (default 600).
+    """
+    if not env_flag("ACCESS_STATS"):
+        return None
+    return AccessTrackingSystemNodeDAO(
+        dao,
+        sample_rate=float(os.getenv("ACCESS_STATS_SAMPLE_RATE", "0.1")),
+        capacity=int(os.getenv("ACCESS_STATS_CAPACITY", "500")),
+        half_life_seconds=float(os.getenv("ACCESS_STATS_HALF_LIFE_SECONDS", "600"))
+    )
@@ -0,0 +1,271 @@
+import time
+from typing import Optional, List, Callable
+from src.dao.subtree_sql import NODE_COLUMNS, SubtreeSkipped, chunks, collect_subtree, in_list
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+from src.metrics import metrics
+
+ARCHIVE_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS SystemNodeArchive (
+        ID BIGINT NOT NULL PRIMARY KEY,
+        ParentID BIGINT NULL,
+        Name VARCHAR(255) NOT NULL,
+        Description TEXT NULL,
+        Notes TEXT NULL,
+        Tags JSON NULL,
+        Metadata JSON NULL,
+        Status VARCHAR(255) NULL,
+        Importance INT NOT NULL DEFAULT 0,
+        SortOrder INT NOT NULL DEFAULT 0,
+        UpdatedAt TIMESTAMP NULL,
+        ArchivedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        KEY idx_archive_parent_sort (ParentID, SortOrder)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+ARCHIVE_STATUS = "Done"
+
+# Roots of the largest subtrees that are entirely Done and untouched for %s days. A node is
+# "blocked" if it is not eligible itself or any descendant is; walking up from the (few)
+# ineligible nodes finds them all. A root is eligible and unblocked, under a blocked parent
+# (or none).
+ARCHIVABLE_ROOTS_SQL = f"""
+    WITH RECURSIVE blocked (ID) AS (
+        SELECT ID FROM SystemNode
+        WHERE NOT (Status <=> '{ARCHIVE_STATUS}' AND UpdatedAt < NOW() - INTERVAL %s DAY)
+        UNION
+        SELECT n.ParentID FROM SystemNode n JOIN blocked b ON n.ID = b.ID
+        WHERE n.ParentID IS NOT NULL
+    )
+    SELECT n.ID
+    FROM SystemNode n
+    WHERE n.Status = '{ARCHIVE_STATUS}'
+      AND n.UpdatedAt < NOW() - INTERVAL %s DAY
+      AND n.ID NOT IN (SELECT ID FROM blocked)
+      AND (n.ParentID IS NULL OR n.ParentID IN (SELECT ID FROM blocked))
+    ORDER BY n.ID
+    LIMIT %s
+"""
+
+# Constants, so with prepared statements each pooled connection prepares them once
+SELECT_ARCHIVED_SQL = f"SELECT {NODE_COLUMNS} FROM SystemNodeArchive WHERE ID = %s"
+SELECT_ARCHIVED_CHILDREN_SQL = f"SELECT {NODE_COLUMNS} FROM SystemNodeArchive WHERE ParentID <=> %s ORDER BY SortOrder"
+
+
+def _archivable(older_than_days: int) -> tuple:
+    # collect_subtree's eligible condition: the same test as ARCHIVABLE_ROOTS_SQL, per node
+    return f"Status <=> '{ARCHIVE_STATUS}' AND UpdatedAt < NOW() - INTERVAL %s DAY", (older_than_days,)
+
+
+# -----------------------------------------------------------
+# ARCHIVE
+# -----------------------------------------------------------
+def find_archivable_roots(dao: SystemNodeDAO, older_than_days: int, limit: int = 100) -> List[int]:
+    conn = dao._get_read_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(ARCHIVABLE_ROOTS_SQL, (older_than_days, older_than_days, limit))
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return ids
+    finally:
+        conn.close()
+
+
+def archive_subtree(dao: SystemNodeDAO, root_id: int, older_than_days: int, max_rows: int = 5000,
+                    dry_run: bool = False) -> dict:
+    """
+    Move the subtree under root_id from SystemNode to SystemNodeArchive in one transaction,
+    if every node in it is Done and unchanged for older_than_days. Its former siblings close
+    the gap. Locks the parent's child list and then the subtree, in the same order as
+    move_node. Write hooks see one on_delete per node (deepest first) and an on_reorder.
+
+    Returns {"ID", "ParentID", "rows", "archived", "ids", "renumbered"} ("renumbered": the later
+    siblings whose SortOrder went down by one), plus "skipped" ("not_found", "not_eligible",
+    "too_large") when nothing was moved. dry_run checks without locking or writing.
+    """
+    result = {"ID": root_id, "rows": 0, "archived": 0, "ids": [], "renumbered": []}
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT ParentID FROM SystemNode WHERE ID = %s", (root_id,))
+        row = cursor.fetchone()
+        if not row:
+            return {**result, "skipped": "not_found"}
+        parent_id = result["ParentID"] = row["ParentID"]
+
+        if not dry_run:
+            cursor.execute("""
+                SELECT ID, SortOrder
+                FROM SystemNode
+                WHERE ParentID <=> %s
+                ORDER BY SortOrder
+                FOR UPDATE
+            """, (parent_id,))
+            siblings = {r["ID"]: r["SortOrder"] for r in cursor.fetchall()}
+            if root_id not in siblings:
+                conn.rollback()
+                return {**result, "skipped": "not_found"}
+
+        try:
+            levels = collect_subtree(cursor, "SystemNode", root_id, max_rows, lock=not dry_run,
+                                     eligible=_archivable(older_than_days))
+        except SubtreeSkipped as skip:
+            conn.rollback()
+            return {**result, "skipped": str(skip)}
+        ids = [r["ID"] for level in levels for r in level]
+        result.update(rows=len(ids), ids=ids)
+        if dry_run:
+            return result
+
+        for chunk in chunks(ids):
+            cursor.execute(f"""
+                INSERT INTO SystemNodeArchive ({NODE_COLUMNS}, UpdatedAt)
+                SELECT {NODE_COLUMNS}, UpdatedAt FROM SystemNode WHERE ID IN ({in_list(chunk)})
+            """, tuple(chunk))
+        # Deepest level first (the parent foreign key); each level's hooks still see its ancestors.
+        for level in reversed(levels):
+            for chunk in chunks([r["ID"] for r in level]):
+                cursor.execute(f"DELETE FROM SystemNode WHERE ID IN ({in_list(chunk)})", tuple(chunk))
+            for r in level:
+                for hook in dao.write_hooks:
+                    hook.on_delete(conn, dao._row_to_node(r))
+        cursor.execute("""
+            UPDATE SystemNode
+            SET SortOrder = SortOrder - 1
+            WHERE ParentID <=> %s
+              AND SortOrder > %s
+        """, (parent_id, siblings[root_id]))
+        for hook in dao.write_hooks:
+            hook.on_reorder(conn, parent_id)
+        conn.commit()
+        dao._note_write()
+        cursor.close()
+        result["archived"] = len(ids)
+        result["renumbered"] = [sibling_id for sibling_id, sort_order in siblings.items()
+                                if sort_order > siblings[root_id]]
+        return result
+    except:  # noqa
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def archive_all(dao: SystemNodeDAO, older_than_days: int = 90, max_subtrees: int = 100, max_rows: int = 5000,
+                pause_seconds: float = 0.05, dry_run: bool = False,
+                on_archived: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Archive up to max_subtrees eligible subtrees, one transaction each, sleeping pause_seconds
+    between them. Subtrees over max_rows nodes are left in place and listed under "too_large".
+    on_archived(result) is called with archive_subtree's result for each subtree moved
+    (e.g. to invalidate caches).
+    """
+    report = {"dry_run": dry_run, "older_than_days": older_than_days, "subtrees": 0, "rows": 0,
+              "too_large": [], "skipped": 0, "roots": []}
+    for root_id in find_archivable_roots(dao, older_than_days, max_subtrees):
+        result = archive_subtree(dao, root_id, older_than_days, max_rows=max_rows, dry_run=dry_run)
+        if result.get("skipped") == "too_large":
+            report["too_large"].append(root_id)
+        elif result.get("skipped"):
+            report["skipped"] += 1
+        else:
+            report["subtrees"] += 1
+            report["rows"] += result["rows"]
+            report["roots"].append(root_id)
+            if on_archived is not None and not dry_run:
+                on_archived(result)
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    if not dry_run:
+        metrics.incr("maintenance.archive.subtrees", report["subtrees"])
+        metrics.incr("maintenance.archive.rows", report["rows"])
+    return report
+
+
+# -----------------------------------------------------------
+# UNARCHIVE
+# -----------------------------------------------------------
+def unarchive_subtree(dao: SystemNodeDAO, root_id: int, max_rows: int = 100000) -> dict:
+    """
+    Move an archived subtree back into SystemNode, appended after its parent's live children.
+    Restored rows count as touched now (UpdatedAt), so the next archive run leaves them alone.
+    Raises ValueError if root_id is not an archived subtree root whose parent is live.
+    """
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT ParentID FROM SystemNodeArchive WHERE ID = %s FOR UPDATE", (root_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise ValueError(f"Node {root_id} is not archived")
+        parent_id = row["ParentID"]
+        if parent_id is not None:
+            cursor.execute("SELECT ID FROM SystemNode WHERE ID = %s FOR UPDATE", (parent_id,))
+            if not cursor.fetchone():
+                raise ValueError(f"Parent {parent_id} of node {root_id} is not live; unarchive it first")
+
+        cursor.execute("""
+            SELECT ID, SortOrder
+            FROM SystemNode
+            WHERE ParentID <=> %s
+            ORDER BY SortOrder
+            FOR UPDATE
+        """, (parent_id,))
+        next_pos = max((r["SortOrder"] for r in cursor.fetchall()), default=0) + 1
+
+        try:
+            levels = collect_subtree(cursor, "SystemNodeArchive", root_id, max_rows, lock=True)
+        except SubtreeSkipped:
+            raise ValueError(f"Archived subtree under {root_id} has more than {max_rows} nodes")
+
+        ids = []
+        for level in levels:
+            level_ids = [r["ID"] for r in level]
+            ids.extend(level_ids)
+            for chunk in chunks(level_ids):
+                cursor.execute(f"""
+                    INSERT INTO SystemNode ({NODE_COLUMNS}, UpdatedAt)
+                    SELECT ID, ParentID, Name, Description, Notes, Tags, Metadata, Status, Importance,
+                           IF(ID = %s, %s, SortOrder), CURRENT_TIMESTAMP
+                    FROM SystemNodeArchive WHERE ID IN ({in_list(chunk)})
+                """, (root_id, next_pos) + tuple(chunk))
+            for r in level:
+                node = dao._row_to_node(r)
+                if node.ID == root_id:
+                    node.SortOrder = next_pos
+                for hook in dao.write_hooks:
+                    hook.on_create(conn, node)
+        for chunk in chunks(ids):
+            cursor.execute(f"DELETE FROM SystemNodeArchive WHERE ID IN ({in_list(chunk)})", tuple(chunk))
+        conn.commit()
+        dao._note_write()
+        cursor.close()
+        return {"ID": root_id, "ParentID": parent_id, "SortOrder": next_pos, "restored": len(ids), "ids": ids}
+    except:  # noqa
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------------
+# READS (?include_archived=true)
+# -----------------------------------------------------------
+def read_archived(dao: SystemNodeDAO, node_id: int) -> Optional[SystemNode]:
+    conn = dao._get_read_connection()
+    try:
+        row = dao._fetch(conn, SELECT_ARCHIVED_SQL, (node_id,), one=True)
+        return dao._row_to_node(row) if row else None
+    finally:
+        conn.close()
+
+
+def read_archived_children(dao: SystemNodeDAO, parent_id: Optional[int]) -> List[SystemNode]:
+    conn = dao._get_read_connection()
+    try:
+        rows = dao._fetch(conn, SELECT_ARCHIVED_CHILDREN_SQL, (parent_id,))
+        return [dao._row_to_node(row) for row in rows]
+    finally:
+        conn.close()
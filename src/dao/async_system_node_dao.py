@@ -0,0 +1,280 @@
+import asyncio
+import json
+import random
+from typing import Optional, List, Dict, Iterable
+import aiomysql
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO, RETRYABLE_ERRNOS, ER_LOCK_DEADLOCK
+from src.metrics import metrics
+
+_SELECT_NODES = """
+    SELECT
+        ID, ParentID, Name, Description, Notes,
+        Tags, Metadata, Status, Importance, SortOrder
+    FROM SystemNode
+"""
+
+
+class AsyncSystemNodeDAO:
+    def __init__(self, db_config: dict, min_connections: int = 1, max_connections: int = 20,
+                 move_retries: int = 5, move_backoff_seconds: float = 0.01):
+        """
+        The SystemNodeDAO API as coroutines, on an aiomysql connection pool.
+        db_config has the same shape as SystemNodeDAO's. Call `await open()` before use
+        and `await close()` at shutdown.
+
+        Each call borrows one pooled connection, so up to max_connections queries run at
+        once and a waiting call costs no thread. Reads run in autocommit mode (every query
+        sees the latest commit); writes and moves use explicit transactions with the same
+        SQL and rules as SystemNodeDAO. Replica routing and write hooks are sync-only.
+        """
+        self.db_config = db_config
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.move_retries = move_retries
+        self.move_backoff_seconds = move_backoff_seconds
+        self._pool: Optional[aiomysql.Pool] = None
+
+    async def open(self) -> None:
+        if self._pool is None:
+            self._pool = await aiomysql.create_pool(
+                host=self.db_config.get("host", "127.0.0.1"),
+                port=self.db_config.get("port", 3306),
+                user=self.db_config.get("user"),
+                password=self.db_config.get("password", ""),
+                db=self.db_config.get("database"),
+                minsize=self.min_connections,
+                maxsize=self.max_connections,
+                autocommit=True,
+            )
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    # -----------------------------------------------------------
+    # 1) CREATE
+    # -----------------------------------------------------------
+    async def create(self, node: SystemNode) -> int:
+        async with self._pool.acquire() as conn:
+            await conn.begin()
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("""
+                        SELECT COALESCE(MAX(SortOrder), 0) + 1
+                        FROM SystemNode
+                        WHERE ParentID <=> %s
+                    """, (node.ParentID,))
+                    (new_sort_order,) = await cursor.fetchone() or (1,)
+                    await cursor.execute("""
+                        INSERT INTO SystemNode (
+                            ParentID, Name, Description, Notes,
+                            Tags, Metadata, Status, Importance, SortOrder
+                        )
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """, (
+                        node.ParentID,
+                        node.Name,
+                        node.Description,
+                        node.Notes,
+                        json.dumps(node.Tags) if node.Tags else None,
+                        json.dumps(node.Metadata) if node.Metadata else None,
+                        node.Status,
+                        node.Importance,
+                        new_sort_order
+                    ))
+                    new_id = cursor.lastrowid
+                await conn.commit()
+                return new_id
+            except:  # noqa
+                await conn.rollback()
+                raise
+
+    # -----------------------------------------------------------
+    # 2) READ (Single / All / Many parents)
+    # -----------------------------------------------------------
+    async def _fetch_nodes(self, sql: str, params: tuple = ()) -> List[SystemNode]:
+        async with self._pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+        return [SystemNodeDAO._row_to_node(row) for row in rows]
+
+    async def read(self, node_id: int) -> Optional[SystemNode]:
+        nodes = await self._fetch_nodes(_SELECT_NODES + " WHERE ID = %s", (node_id,))
+        return nodes[0] if nodes else None
+
+    async def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        return await self._fetch_nodes(_SELECT_NODES + " WHERE ParentID <=> %s ORDER BY SortOrder", (parent_id,))
+
+    async def read_by_parents(self, parent_ids: Iterable[Optional[int]]) -> Dict[Optional[int], List[SystemNode]]:
+        """
+        Children of several parents at once. Each parent is its own indexed query on its own
+        pooled connection, and they all run concurrently: the total wait is about the slowest
+        single query rather than the sum.
+        """
+        parent_ids = list(dict.fromkeys(parent_ids))
+        results = await asyncio.gather(*(self.read_by_parent(parent_id) for parent_id in parent_ids))
+        return dict(zip(parent_ids, results))
+
+    async def read_all(self) -> List[SystemNode]:
+        return await self._fetch_nodes(_SELECT_NODES + " ORDER BY ParentID, SortOrder")
+
+    # -----------------------------------------------------------
+    # 3) UPDATE / 4) DELETE (Looser Concurrency)
+    # -----------------------------------------------------------
+    async def _write(self, sql: str, params: tuple) -> int:
+        async with self._pool.acquire() as conn:
+            await conn.begin()
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(sql, params)
+                    affected = cursor.rowcount
+                await conn.commit()
+                return affected
+            except:  # noqa
+                await conn.rollback()
+                raise
+
+    async def update(self, old: SystemNode, new: SystemNode) -> bool:
+        """
+        Same concurrency check as SystemNodeDAO.update: old's ID, ParentID, Status, Importance.
+        """
+        updated_count = await self._write("""
+            UPDATE SystemNode
+            SET
+                ParentID = %s,
+                Name = %s,
+                Description = %s,
+                Notes = %s,
+                Tags = %s,
+                Metadata = %s,
+                Status = %s,
+                Importance = %s,
+                SortOrder = %s
+            WHERE
+                ID = %s
+                AND ParentID <=> %s
+                AND Status <=> %s
+                AND Importance = %s
+        """, (
+            new.ParentID,
+            new.Name,
+            new.Description,
+            new.Notes,
+            json.dumps(new.Tags) if new.Tags else None,
+            json.dumps(new.Metadata) if new.Metadata else None,
+            new.Status,
+            new.Importance,
+            new.SortOrder,
+            old.ID,
+            old.ParentID,
+            old.Status,
+            old.Importance
+        ))
+        return updated_count == 1
+
+    async def delete(self, old: SystemNode) -> bool:
+        deleted_count = await self._write("""
+            DELETE FROM SystemNode
+            WHERE
+                ID = %s
+                AND ParentID <=> %s
+                AND Status <=> %s
+                AND Importance = %s
+        """, (old.ID, old.ParentID, old.Status, old.Importance))
+        return deleted_count == 1
+
+    # -----------------------------------------------------------
+    # 5) MOVE & REORDER
+    # -----------------------------------------------------------
+    async def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        """
+        Same SortOrder rules, lock order and deadlock retries as SystemNodeDAO.move_node.
+        """
+        for attempt in range(self.move_retries + 1):
+            try:
+                moved = await self._move_node_once(node_id, new_parent_id, target_index)
+                if moved is not None:
+                    return moved
+                reason = "parent_changed"
+            except aiomysql.MySQLError as e:
+                errno = e.args[0] if e.args else None
+                if errno not in RETRYABLE_ERRNOS:
+                    raise
+                if attempt == self.move_retries:
+                    metrics.incr("dao.move.gave_up")
+                    raise
+                reason = "deadlock" if errno == ER_LOCK_DEADLOCK else "lock_wait_timeout"
+            metrics.incr("dao.move.retries")
+            metrics.incr(f"dao.move.retries.{reason}")
+            await asyncio.sleep(self.move_backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5))
+        raise RuntimeError(f"Node {node_id} kept changing parent during the move ({self.move_retries} retries)")
+
+    async def _move_node_once(self, node_id: int, new_parent_id: Optional[int],
+                              target_index: Optional[int]) -> Optional[bool]:
+        async with self._pool.acquire() as conn:
+            await conn.begin()
+            try:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute("SELECT ParentID, SortOrder FROM SystemNode WHERE ID = %s", (node_id,))
+                    old_row = await cursor.fetchone()
+                    if not old_row:
+                        await conn.rollback()
+                        return False
+                    old_parent = old_row["ParentID"]
+
+                    siblings = {}
+                    for parent_id in sorted({old_parent, new_parent_id}, key=lambda p: (p is not None, p or 0)):
+                        await cursor.execute("""
+                            SELECT ID, SortOrder
+                            FROM SystemNode
+                            WHERE ParentID <=> %s
+                            ORDER BY SortOrder
+                            FOR UPDATE
+                        """, (parent_id,))
+                        siblings[parent_id] = {row["ID"]: row["SortOrder"] for row in await cursor.fetchall()}
+
+                    if node_id not in siblings[old_parent]:
+                        await conn.rollback()
+                        return None
+                    old_sort_order = siblings[old_parent][node_id]
+
+                    await cursor.execute("""
+                        UPDATE SystemNode
+                        SET SortOrder = SortOrder - 1
+                        WHERE ParentID <=> %s
+                          AND SortOrder > %s
+                    """, (old_parent, old_sort_order))
+
+                    new_siblings = [
+                        sort_order - 1 if old_parent == new_parent_id and sort_order > old_sort_order else sort_order
+                        for sibling_id, sort_order in siblings[new_parent_id].items()
+                        if sibling_id != node_id
+                    ]
+                    next_pos = max(new_siblings, default=0) + 1
+                    if target_index is not None and target_index < next_pos:
+                        new_sort_order = max(target_index, 1)
+                        await cursor.execute("""
+                            UPDATE SystemNode
+                            SET SortOrder = SortOrder + 1
+                            WHERE ParentID <=> %s
+                              AND SortOrder >= %s
+                              AND ID <> %s
+                        """, (new_parent_id, new_sort_order, node_id))
+                    else:
+                        new_sort_order = next_pos
+
+                    await cursor.execute("""
+                        UPDATE SystemNode
+                        SET ParentID = %s, SortOrder = %s
+                        WHERE ID = %s
+                    """, (new_parent_id, new_sort_order, node_id))
+                    updated_count = cursor.rowcount
+                await conn.commit()
+                return updated_count == 1
+            except:  # noqa
+                await conn.rollback()
+                raise
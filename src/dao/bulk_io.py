@@ -0,0 +1,242 @@
+import gzip
+import json
+import logging
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterator, Iterable, IO, List, Optional
+import mysql.connector
+from src.dao.connection_pool import PooledConnection
+from src.dao.system_node_dao import SystemNodeDAO
+from src.tracing import unwrap_connection
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("ID", "ParentID", "Name", "Description", "Notes", "Tags", "Metadata", "Status", "Importance", "SortOrder")
+
+
+def _discard(conn) -> None:
+    """
+    Close conn for good: a pooled connection is not handed back to the pool.
+    """
+    if isinstance(unwrap_connection(conn), PooledConnection):
+        conn.discard()
+        return
+    try:
+        conn.close()
+    except mysql.connector.Error:
+        pass
+
+
+# -----------------------------------------------------------
+# EXPORT
+# -----------------------------------------------------------
+def iter_export_rows(dao: SystemNodeDAO, fetch_size: int = 1000) -> Iterator[dict]:
+    """
+    Stream every SystemNode row (Tags/Metadata decoded, like the API returns them) in ID order.
+    Uses an unbuffered cursor, so memory stays constant however large the table is. If the
+    caller stops early (a client that disconnects mid-export), the connection still holds the
+    rest of the result, so it is closed rather than reused.
+    """
+    conn = dao._get_read_connection()
+    finished = False
+    try:
+        cursor = conn.cursor(dictionary=True, buffered=False)
+        cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM SystemNode ORDER BY ID")
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                row["Tags"] = json.loads(row["Tags"]) if row["Tags"] else {}
+                row["Metadata"] = json.loads(row["Metadata"]) if row["Metadata"] else {}
+                yield row
+        cursor.close()
+        finished = True
+    finally:
+        if finished:
+            conn.close()
+        else:
+            _discard(conn)
+
+
+def iter_ndjson_gzip(rows: Iterable[dict], level: int = 6, flush_rows: int = 1000) -> Iterator[bytes]:
+    """
+    Encode rows as gzip-compressed NDJSON, yielding compressed chunks as they fill up.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    buffer: List[str] = []
+    for row in rows:
+        buffer.append(json.dumps(row, separators=(",", ":")))
+        if len(buffer) >= flush_rows:
+            chunk = compressor.compress(("\n".join(buffer) + "\n").encode("utf-8"))
+            buffer.clear()
+            if chunk:
+                yield chunk
+    if buffer:
+        yield compressor.compress(("\n".join(buffer) + "\n").encode("utf-8"))
+    yield compressor.flush()
+
+
+def export_to_file(dao: SystemNodeDAO, path: str, level: int = 6) -> int:
+    """
+    Write the whole tree to a .ndjson.gz file. Returns the number of rows written.
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in iter_export_rows(dao):
+            count += 1
+            yield row
+
+    with open(path, "wb") as f:
+        for chunk in iter_ndjson_gzip(counted(), level):
+            f.write(chunk)
+    return count
+
+
+# -----------------------------------------------------------
+# IMPORT
+# -----------------------------------------------------------
+def _open_ndjson(path: str) -> IO[str]:
+    with open(path, "rb") as f:
+        is_gzip = f.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rt", encoding="utf-8") if is_gzip else open(path, "r", encoding="utf-8")
+
+
+def _insert_chunk(dao: SystemNodeDAO, rows: List[tuple]) -> int:
+    """
+    One chunk = one connection and one transaction. Foreign-key checks are off for the
+    session because chunks load in parallel and a child may arrive before its parent; they
+    are turned back on before the connection is returned (or it is closed), so the next
+    borrower of a pooled connection writes with them.
+    """
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        conn.start_transaction()
+        # executemany() sends a single multi-row INSERT for the whole chunk.
+        cursor.executemany(f"""
+            INSERT INTO SystemNode ({', '.join(COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(COLUMNS))})
+        """, rows)
+        conn.commit()
+        cursor.close()
+        return len(rows)
+    except:  # noqa
+        conn.rollback()
+        raise
+    finally:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+            cursor.close()
+        except mysql.connector.Error:
+            _discard(conn)
+        else:
+            conn.close()
+
+
+def _count_orphans(dao: SystemNodeDAO) -> int:
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM SystemNode c
+            LEFT JOIN SystemNode p ON p.ID = c.ParentID
+            WHERE c.ParentID IS NOT NULL AND p.ID IS NULL
+        """)
+        (orphans,) = cursor.fetchone()
+        cursor.close()
+        return orphans
+    finally:
+        conn.close()
+
+
+def _id_offset(dao: SystemNodeDAO) -> int:
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(ID), 0) FROM SystemNode")
+        (offset,) = cursor.fetchone()
+        cursor.close()
+        return offset
+    finally:
+        conn.close()
+
+
+def import_ndjson(dao: SystemNodeDAO, path: str, remap_ids: bool = False, chunk_size: int = 5000,
+                  workers: int = 4) -> dict:
+    """
+    Bulk-load an export file (gzip or plain NDJSON) into SystemNode.
+
+    IDs are kept as-is by default (duplicates fail their chunk). With remap_ids=True every ID
+    and ParentID is shifted past the current MAX(ID), which keeps the file's tree intact
+    next to existing data without holding an old->new ID map in memory.
+
+    Chunks of chunk_size rows are inserted by `workers` threads, each chunk in its own
+    transaction; at most 2 * workers chunks are in memory at once. A chunk that fails is
+    reported (first/last line) and the rest continue, so a failed range can be re-imported.
+    Write hooks do not run: run repair-stats afterwards if subtree stats are enabled.
+    """
+    offset = _id_offset(dao) if remap_ids else 0
+    start = time.perf_counter()
+    imported = 0
+    failed: List[dict] = []
+
+    def to_params(row: dict) -> tuple:
+        parent_id: Optional[int] = row.get("ParentID")
+        return (
+            row["ID"] + offset,
+            parent_id + offset if parent_id is not None else None,
+            row["Name"],
+            row.get("Description"),
+            row.get("Notes"),
+            json.dumps(row["Tags"]) if row.get("Tags") else None,
+            json.dumps(row["Metadata"]) if row.get("Metadata") else None,
+            row.get("Status"),
+            row.get("Importance", 0),
+            row.get("SortOrder", 0),
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, _open_ndjson(path) as f:
+        in_flight = {}
+
+        def collect(done):
+            nonlocal imported
+            for future in done:
+                first_line, last_line = in_flight.pop(future)
+                try:
+                    imported += future.result()
+                except Exception as e:
+                    logger.error("Import chunk lines %d-%d failed: %s", first_line, last_line, e)
+                    failed.append({"first_line": first_line, "last_line": last_line, "error": str(e)})
+
+        chunk: List[tuple] = []
+        first_line = line_no = 1
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            chunk.append(to_params(json.loads(line)))
+            if len(chunk) >= chunk_size:
+                in_flight[pool.submit(_insert_chunk, dao, chunk)] = (first_line, line_no)
+                chunk, first_line = [], line_no + 1
+                if len(in_flight) >= 2 * workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+        if chunk:
+            in_flight[pool.submit(_insert_chunk, dao, chunk)] = (first_line, line_no)
+        collect(wait(in_flight).done)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "imported": imported,
+        "failed_chunks": failed,
+        "id_offset": offset,
+        "orphans": _count_orphans(dao),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(imported / elapsed) if elapsed else imported,
+    }
@@ -0,0 +1,348 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Optional, List, Dict, Callable, Any, Iterable
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend
+from src.dao.system_node_dao import primary_reads
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "systemnode:invalidate"
+
+
+# -----------------------------------------------------------
+# KEY-VALUE STORES
+# -----------------------------------------------------------
+class KVStore(ABC):
+    """
+    The small slice of a key-value store the cache needs. Values are bytes.
+    """
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        ...
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, bytes], ttl_seconds: float) -> None:
+        ...
+
+    @abstractmethod
+    def incr_many(self, keys: List[str], ttl_seconds: float) -> None:
+        """
+        Increment integer counters (missing = 0), refreshing their expiry.
+        """
+
+    @abstractmethod
+    def publish(self, channel: str, message: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        """
+        Call callback(message) for every message published to channel from now on.
+        """
+
+
+class LocalKVStore(KVStore):
+    def __init__(self):
+        """
+        In-process store with the same semantics as RedisKVStore: a single worker's cache,
+        or a stand-in for Redis in tests (share one instance between several caches to
+        simulate several workers). Messages are delivered synchronously.
+        """
+        self._lock = threading.Lock()
+        self._data: Dict[str, tuple] = {}  # key -> (value, expires_at)
+        self._subscribers: Dict[str, List[Callable[[bytes], None]]] = {}
+
+    def _get(self, key: str, now: float) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._get(key, now) for key in keys]
+
+    def set_many(self, items: Dict[str, bytes], ttl_seconds: float) -> None:
+        expires_at = time.monotonic() + ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = (value, expires_at)
+
+    def incr_many(self, keys: List[str], ttl_seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                value = int(self._get(key, now) or 0) + 1
+                self._data[key] = (str(value).encode(), now + ttl_seconds)
+
+    def publish(self, channel: str, message: bytes) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+
+class RedisKVStore(KVStore):
+    def __init__(self, url: str):
+        """
+        A Redis (or Memorystore) store shared by every worker and instance, e.g.
+        "redis://10.0.0.3:6379/0". Needs the redis package.
+        """
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self._pubsub = None
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def set_many(self, items: Dict[str, bytes], ttl_seconds: float) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(key, value, px=int(ttl_seconds * 1000))
+        pipe.execute()
+
+    def incr_many(self, keys: List[str], ttl_seconds: float) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(key)
+            pipe.pexpire(key, int(ttl_seconds * 1000))
+        pipe.execute()
+
+    def publish(self, channel: str, message: bytes) -> None:
+        self.client.publish(channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        if self._pubsub is None:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: lambda message: callback(message["data"])})
+        self._pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+
+def kv_store_from_url(url: str) -> KVStore:
+    """
+    "local" -> LocalKVStore, "redis://..." / "rediss://..." -> RedisKVStore.
+    """
+    if url == "local":
+        return LocalKVStore()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisKVStore(url)
+    raise ValueError(f"Unknown cache store '{url}' (expected 'local' or a redis:// URL)")
+
+
+# -----------------------------------------------------------
+# CACHED DAO
+# -----------------------------------------------------------
+def _node_key(node_id: int) -> str:
+    return f"systemnode:node:{node_id}"
+
+
+def _children_key(parent_id: Optional[int]) -> str:
+    return f"systemnode:children:{'null' if parent_id is None else parent_id}"
+
+
+def _version_key(key: str) -> str:
+    return f"{key}:v"
+
+
+class CachedSystemNodeDAO(SystemNodeBackend):
+    def __init__(self, dao: SystemNodeBackend, store: KVStore, ttl_seconds: float = 300.0,
+                 near_cache_size: int = 0, near_ttl_seconds: float = 5.0):
+        """
+        Caches read (per node) and read_by_parent (per child list) in a KVStore shared by
+        every worker. read_all is not cached.
+
+        Entries are version-stamped: each key has a counter that every write touching it bumps.
+        A read notes the counter before querying and stores the result with that stamp; an entry
+        whose stamp no longer matches is a miss. So a slow read that raced a write cannot leave a
+        stale entry behind. That only holds if the query sees every write committed before the
+        bump, so misses are loaded from the primary (primary_reads), never from a replica that
+        may still be behind.
+
+        After each write the affected keys are invalidated and announced on INVALIDATION_CHANNEL.
+        With near_cache_size > 0 each worker also keeps that many decoded entries in process;
+        the announcements evict them in every worker, so they lag a write by the pub/sub delay.
+        A near entry is also dropped after near_ttl_seconds, which bounds that lag when an
+        announcement is lost (a dropped Redis connection, a worker that missed the subscription).
+
+        Build it in the process that serves (after a fork): the subscription runs on a thread.
+
+        Writes that bypass this wrapper (bulk import, background SortOrder compaction) are only
+        picked up when their entries expire after ttl_seconds.
+        Counters: cache.hit, cache.miss, cache.stale, cache.invalidated_keys.
+        """
+        self.dao = dao
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.near_cache_size = near_cache_size
+        self.near_ttl_seconds = near_ttl_seconds
+        self._near: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at)
+        self._near_lock = threading.Lock()
+        self._instance_id = uuid.uuid4().hex
+        store.subscribe(INVALIDATION_CHANNEL, self._on_invalidation)
+
+    def __getattr__(self, name: str):
+        return getattr(self.dao, name)
+
+    # -----------------------------------------------------------
+    # NEAR CACHE (per process)
+    # -----------------------------------------------------------
+    def _near_get(self, key: str) -> tuple:
+        with self._near_lock:
+            entry = self._near.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.monotonic():
+                del self._near[key]
+                return False, None
+            self._near.move_to_end(key)
+            return True, entry[0]
+
+    def _near_put(self, key: str, value: Any) -> None:
+        if self.near_cache_size <= 0:
+            return
+        with self._near_lock:
+            self._near[key] = (value, time.monotonic() + self.near_ttl_seconds)
+            self._near.move_to_end(key)
+            while len(self._near) > self.near_cache_size:
+                self._near.popitem(last=False)
+
+    def _near_evict(self, keys: Iterable[str]) -> None:
+        with self._near_lock:
+            for key in keys:
+                self._near.pop(key, None)
+
+    def _on_invalidation(self, message: bytes) -> None:
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation message")
+            return
+        if payload.get("origin") != self._instance_id:
+            self._near_evict(payload.get("keys", []))
+
+    # -----------------------------------------------------------
+    # LOOKUP
+    # -----------------------------------------------------------
+    def _cached(self, key: str, load: Callable[[], Any], encode: Callable[[Any], Any],
+                decode: Callable[[Any], Any]) -> Any:
+        found, value = self._near_get(key)
+        if found:
+            metrics.incr("cache.hit")
+            return decode(value)
+
+        raw_entry, raw_version = self.store.get_many([key, _version_key(key)])
+        version = int(raw_version or 0)
+        if raw_entry is not None:
+            entry = json.loads(raw_entry)
+            if entry["v"] == version:
+                metrics.incr("cache.hit")
+                self._near_put(key, entry["data"])
+                return decode(entry["data"])
+            metrics.incr("cache.stale")
+        metrics.incr("cache.miss")
+
+        with primary_reads():
+            result = load()
+        data = encode(result)
+        self.store.set_many({key: json.dumps({"v": version, "data": data}).encode()}, self.ttl_seconds)
+        self._near_put(key, data)
+        return result
+
+    def invalidate(self, node_ids: Iterable[int] = (), parent_ids: Iterable[Optional[int]] = ()) -> None:
+        """
+        Drop the cached entries for these nodes and child lists in every worker.
+        """
+        keys = list(dict.fromkeys([_node_key(i) for i in node_ids] + [_children_key(p) for p in parent_ids]))
+        if not keys:
+            return
+        # Bump versions first: from here on no reader can store an entry that looks current.
+        self.store.incr_many([_version_key(key) for key in keys], self.ttl_seconds * 2)
+        self._near_evict(keys)
+        self.store.publish(INVALIDATION_CHANNEL, json.dumps({"origin": self._instance_id, "keys": keys}).encode())
+        metrics.incr("cache.invalidated_keys", len(keys))
+
+    # -----------------------------------------------------------
+    # READS (cached)
+    # -----------------------------------------------------------
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        return self._cached(
+            _node_key(node_id), lambda: self.dao.read(node_id),
+            lambda node: asdict(node) if node else None,
+            lambda data: SystemNode(**data) if data else None
+        )
+
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        return self._cached(
+            _children_key(parent_id), lambda: self.dao.read_by_parent(parent_id),
+            lambda nodes: [asdict(node) for node in nodes],
+            lambda data: [SystemNode(**item) for item in data]
+        )
+
+    def read_all(self) -> List[SystemNode]:
+        return self.dao.read_all()
+
+    # Path lookups are not cached (a rename anywhere up the path would have to invalidate them)
+    def resolve_path(self, path: str) -> Optional[SystemNode]:
+        return self.dao.resolve_path(path)
+
+    def resolve_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        return self.dao.resolve_paths(paths)
+
+    # -----------------------------------------------------------
+    # WRITES (pass-through, then invalidate)
+    # -----------------------------------------------------------
+    def create(self, node: SystemNode) -> int:
+        new_id = self.dao.create(node)
+        self.invalidate([new_id], [node.ParentID])
+        return new_id
+
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        updated = self.dao.update(old, new)
+        if updated:
+            self.invalidate([old.ID], [old.ParentID, new.ParentID])
+        return updated
+
+    def delete(self, old: SystemNode) -> bool:
+        deleted = self.dao.delete(old)
+        if deleted:
+            self.invalidate([old.ID], [old.ParentID])
+        return deleted
+
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        """
+        A move renumbers the siblings in both lists, so every child of the old and new
+        parent is invalidated (two extra child-list queries, uncached). Those reads go to the
+        primary: a lagging replica could name the wrong old parent or siblings.
+        """
+        with primary_reads():
+            current = self.dao.read(node_id)
+        moved = self.dao.move_node(node_id, new_parent_id, target_index)
+        if moved:
+            parent_ids = [new_parent_id] if current is None else [current.ParentID, new_parent_id]
+            with primary_reads():
+                sibling_ids = [n.ID for parent_id in parent_ids for n in self.dao.read_by_parent(parent_id)]
+            self.invalidate([node_id] + sibling_ids, parent_ids)
+        return moved
+
+    def apply_batch(self, upserts: List[SystemNode], deleted_ids: List[int]) -> None:
+        self.dao.apply_batch(upserts, deleted_ids)
+        # Previous parents are unknown here; their lists expire with the TTL.
+        self.invalidate([n.ID for n in upserts] + list(deleted_ids), [n.ParentID for n in upserts])
@@ -0,0 +1,172 @@
+from typing import Optional, List, Tuple
+from mysql.connector import MySQLConnection
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+from src.dao.write_hooks import WriteHook
+
+CHANGE_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS SystemNodeChange (
+        Version BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        NodeID BIGINT NOT NULL,
+        ParentID BIGINT NULL,
+        ChangedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        KEY idx_change_node (NodeID, Version),
+        KEY idx_change_parent (ParentID, Version)
+    )
+"""
+
+# Versions come from AUTO_INCREMENT, so they can commit out of order. A reader treats the
+# first missing version within this window as possibly still in flight.
+IN_FLIGHT_WINDOW = 1000
+
+_SELECT_NODES = """
+    SELECT
+        ID, ParentID, Name, Description, Notes,
+        Tags, Metadata, Status, Importance, SortOrder
+    FROM SystemNode
+"""
+
+
+class ChangeLog(WriteHook):
+    def __init__(self, dao: SystemNodeDAO):
+        """
+        Records one SystemNodeChange row per node whose API-visible row changed, tagged with
+        the parent listing it affects, inside the write's own transaction. The Version column
+        is a change version: caches stamped with one can catch up with changes_since().
+
+        Registers itself as a write hook on dao.
+        """
+        self.dao = dao
+        dao.add_write_hook(self)
+
+    def ensure_table(self) -> None:
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(CHANGE_TABLE_DDL)
+            cursor.close()
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------
+    # RECORDING (runs inside the DAO's transaction)
+    # -----------------------------------------------------------
+    @staticmethod
+    def _record(conn: MySQLConnection, rows: List[Tuple[int, Optional[int]]]) -> None:
+        cursor = conn.cursor()
+        cursor.executemany("INSERT INTO SystemNodeChange (NodeID, ParentID) VALUES (%s, %s)", rows)
+        cursor.close()
+
+    def on_create(self, conn: MySQLConnection, node: SystemNode) -> None:
+        self._record(conn, [(node.ID, node.ParentID)])
+
+    def on_update(self, conn: MySQLConnection, old: SystemNode, new: SystemNode) -> None:
+        rows = [(old.ID, old.ParentID)]
+        if new.ParentID != old.ParentID:
+            rows.append((old.ID, new.ParentID))
+        self._record(conn, rows)
+
+    def on_delete(self, conn: MySQLConnection, old: SystemNode) -> None:
+        self._record(conn, [(old.ID, old.ParentID)])
+
+    def on_move(self, conn: MySQLConnection, node_id: int, old_parent_id: Optional[int],
+                new_parent_id: Optional[int]) -> None:
+        # A move renumbers siblings, so every child of both parents counts as changed.
+        cursor = conn.cursor()
+        parent_ids = [old_parent_id] if old_parent_id == new_parent_id else [old_parent_id, new_parent_id]
+        for parent_id in parent_ids:
+            cursor.execute("""
+                INSERT INTO SystemNodeChange (NodeID, ParentID)
+                SELECT ID, ParentID FROM SystemNode WHERE ParentID <=> %s
+            """, (parent_id,))
+        if old_parent_id != new_parent_id:
+            cursor.execute("INSERT INTO SystemNodeChange (NodeID, ParentID) VALUES (%s, %s)",
+                           (node_id, old_parent_id))
+        cursor.close()
+
+    def on_reorder(self, conn: MySQLConnection, parent_id: Optional[int]) -> None:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO SystemNodeChange (NodeID, ParentID)
+            SELECT ID, ParentID FROM SystemNode WHERE ParentID <=> %s
+        """, (parent_id,))
+        cursor.close()
+
+    # -----------------------------------------------------------
+    # VERSIONS & CATCH-UP
+    # -----------------------------------------------------------
+    @staticmethod
+    def safe_version(cursor) -> int:
+        """
+        The highest version V such that every change <= V is visible to this cursor's
+        transaction (the first gap within IN_FLIGHT_WINDOW of the newest change ends it).
+        """
+        cursor.execute("SELECT COALESCE(MAX(Version), 0) FROM SystemNodeChange")
+        (latest,) = cursor.fetchone()
+        cursor.execute("SELECT Version FROM SystemNodeChange WHERE Version > %s ORDER BY Version",
+                       (max(latest - IN_FLIGHT_WINDOW, 0),))
+        expected = max(latest - IN_FLIGHT_WINDOW, 0) + 1
+        for (version,) in cursor.fetchall():
+            if version != expected:
+                return expected - 1
+            expected += 1
+        return latest
+
+    def current_version(self) -> int:
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            version = self.safe_version(cursor)
+            cursor.close()
+            return version
+        finally:
+            conn.close()
+
+    def changes_since(self, version: int) -> Tuple[int, List[SystemNode], List[int]]:
+        """
+        Everything that changed after `version`: returns (new_version, current rows of the
+        changed nodes, IDs of changed nodes that no longer exist). Applying the result to a
+        copy taken at `version` brings it up to new_version; re-applying is harmless.
+        """
+        conn = self.dao._get_connection()
+        try:
+            conn.start_transaction(consistent_snapshot=True)
+            version_cursor = conn.cursor()
+            new_version = self.safe_version(version_cursor)
+            version_cursor.close()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                "SELECT DISTINCT NodeID FROM SystemNodeChange WHERE Version > %s AND Version <= %s",
+                (version, new_version)
+            )
+            changed_ids = [row["NodeID"] for row in cursor.fetchall()]
+
+            nodes: List[SystemNode] = []
+            for i in range(0, len(changed_ids), 1000):
+                batch = changed_ids[i:i + 1000]
+                cursor.execute(_SELECT_NODES + f" WHERE ID IN ({', '.join(['%s'] * len(batch))})", tuple(batch))
+                nodes.extend(SystemNodeDAO._row_to_node(row) for row in cursor.fetchall())
+            conn.commit()
+            cursor.close()
+
+            found = {node.ID for node in nodes}
+            return new_version, nodes, [node_id for node_id in changed_ids if node_id not in found]
+        finally:
+            conn.close()
+
+    def prune(self, keep_versions: int = 1_000_000) -> int:
+        """
+        Delete all but the newest keep_versions changes. Returns the number of rows removed.
+        """
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(Version), 0) FROM SystemNodeChange")
+            (latest,) = cursor.fetchone()
+            cursor.execute("DELETE FROM SystemNodeChange WHERE Version <= %s", (latest - keep_versions,))
+            removed = cursor.rowcount
+            conn.commit()
+            cursor.close()
+            return removed
+        finally:
+            conn.close()
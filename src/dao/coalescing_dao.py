@@ -0,0 +1,123 @@
+import threading
+from typing import Optional, List, Callable, Any, Hashable
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend
+from src.metrics import metrics
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the same key
+    wait for that call and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple:
+        """
+        Returns (result, shared) where shared is True if another caller ran the query.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class CoalescingSystemNodeDAO(SystemNodeBackend):
+    def __init__(self, dao: SystemNodeBackend):
+        """
+        Wraps a backend so identical concurrent reads (read, read_by_parent, read_all)
+        share one in-flight query. Writes pass straight through.
+
+        Every write bumps a generation number that is part of the coalescing key, so a
+        read that starts after a write never joins a query that started before it. Whether the
+        caller is pinned to the primary (read-your-writes, primary_reads) is part of the key too:
+        a pinned caller never shares an unpinned caller's replica read, even when its pin comes
+        from a write in another process, which never bumped this wrapper's generation.
+
+        Callers that share a query get the same SystemNode objects; treat them as read-only.
+        Counters: dao.coalesce.executed (queries run) and dao.coalesce.saved (queries avoided).
+        """
+        self.dao = dao
+        self._flight = SingleFlight()
+        self._generation = 0
+        self._pinned = getattr(dao, "_pinned_to_primary", None)  # only MySQL backends route reads
+
+    def __getattr__(self, name: str):
+        # Anything outside the backend contract (check_replicas, stats, ...) goes to the wrapped DAO.
+        return getattr(self.dao, name)
+
+    def _coalesce(self, key: tuple, fn: Callable[[], Any]) -> Any:
+        pinned = self._pinned is not None and bool(self._pinned())
+        result, shared = self._flight.do((self._generation, pinned) + key, fn)
+        metrics.incr("dao.coalesce.saved" if shared else "dao.coalesce.executed")
+        return result
+
+    def _written(self, result: Any) -> Any:
+        self._generation += 1
+        return result
+
+    # -----------------------------------------------------------
+    # READS (coalesced)
+    # -----------------------------------------------------------
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        return self._coalesce(("read", node_id), lambda: self.dao.read(node_id))
+
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        return self._coalesce(("read_by_parent", parent_id), lambda: self.dao.read_by_parent(parent_id))
+
+    def read_all(self) -> List[SystemNode]:
+        return self._coalesce(("read_all",), self.dao.read_all)
+
+    def resolve_path(self, path: str) -> Optional[SystemNode]:
+        return self._coalesce(("resolve_path", path), lambda: self.dao.resolve_path(path))
+
+    def resolve_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        return self.dao.resolve_paths(paths)
+
+    # -----------------------------------------------------------
+    # WRITES (pass-through)
+    # -----------------------------------------------------------
+    def create(self, node: SystemNode) -> int:
+        return self._written(self.dao.create(node))
+
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        return self._written(self.dao.update(old, new))
+
+    def delete(self, old: SystemNode) -> bool:
+        return self._written(self.dao.delete(old))
+
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        return self._written(self.dao.move_node(node_id, new_parent_id, target_index))
+
+    def apply_batch(self, upserts: List[SystemNode], deleted_ids: List[int]) -> None:
+        return self._written(self.dao.apply_batch(upserts, deleted_ids))
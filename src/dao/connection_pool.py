@@ -0,0 +1,163 @@
+import queue
+import threading
+import time
+from typing import Optional, Dict
+import mysql.connector
+from mysql.connector import MySQLConnection
+from mysql.connector.errors import PoolError
+from src.metrics import metrics
+
+
+class _Entry:
+    def __init__(self, conn: MySQLConnection):
+        self.conn = conn
+        self.statements: Dict[tuple, object] = {}  # (sql, dictionary) -> prepared cursor
+        self.returned_at = time.monotonic()
+
+
+class PooledConnection:
+    def __init__(self, pool: "ConnectionPool", entry: _Entry):
+        """
+        A borrowed connection. Behaves like the MySQLConnection it wraps, except that
+        close() hands it back to the pool.
+        """
+        self._pool = pool
+        self._entry: Optional[_Entry] = entry
+
+    def __getattr__(self, name: str):
+        return getattr(self._entry.conn, name)
+
+    def prepared_cursor(self, sql: str, dictionary: bool = False):
+        """
+        The cursor holding sql as a server-side prepared statement on this connection,
+        prepared on first use and reused by every later borrower. Pass the same str object
+        each time (a module constant): the connector re-prepares when the text object differs.
+        Do not close it; fetch all rows before the next execute.
+        """
+        key = (sql, dictionary)
+        cursor = self._entry.statements.get(key)
+        if cursor is None:
+            cursor = self._entry.statements[key] = self._entry.conn.cursor(prepared=True, dictionary=dictionary)
+            metrics.incr("dao.pool.statements_prepared")
+        return cursor
+
+    def close(self) -> None:
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool._release(entry)
+
+    def discard(self) -> None:
+        """
+        Close the connection instead of handing it back, for a borrower that leaves it unfit
+        for reuse (an unread streamed result, a session it could not restore).
+        """
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool._discard(entry)
+            self._pool._slots.release()
+
+
+class ConnectionPool:
+    def __init__(self, db_config: dict, size: int, autocommit: bool = False, wait_seconds: float = 10.0,
+                 ping_after_idle_seconds: float = 30.0):
+        """
+        At most `size` open connections to one server, opened on demand and reused.
+
+        Unlike mysql.connector.pooling, a returned connection keeps its session: prepared
+        statements survive (COM_RESET_CONNECTION would free them). Only an unfinished
+        transaction is rolled back on return, so the next borrower never inherits an open
+        snapshot or half a write. Session variables set by a borrower must be restored by it.
+
+        get() waits up to wait_seconds for a free connection, then raises PoolError.
+        A connection idle longer than ping_after_idle_seconds is pinged (and reopened if
+        the server dropped it) before it is handed out. Counter: dao.pool.statements_prepared.
+        """
+        self.db_config = {**db_config, "autocommit": autocommit}
+        self.size = size
+        self.wait_seconds = wait_seconds
+        self.ping_after_idle_seconds = ping_after_idle_seconds
+        self._closed = False
+        self._idle: "queue.LifoQueue[_Entry]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def get(self) -> PooledConnection:
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise PoolError(f"No free connection to {self.db_config.get('host')} after {self.wait_seconds}s")
+        try:
+            entry = self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+        return PooledConnection(self, entry)
+
+    def _checkout(self) -> _Entry:
+        # LIFO: the most recently used connection is the one least likely to have timed out.
+        try:
+            entry = self._idle.get_nowait()
+        except queue.Empty:
+            return _Entry(mysql.connector.connect(**self.db_config))
+        if time.monotonic() - entry.returned_at > self.ping_after_idle_seconds and not entry.conn.is_connected():
+            self._discard(entry)
+            return _Entry(mysql.connector.connect(**self.db_config))
+        return entry
+
+    def _release(self, entry: _Entry) -> None:
+        try:
+            if entry.conn.in_transaction:
+                entry.conn.rollback()
+        except mysql.connector.Error:
+            self._discard(entry)
+        else:
+            if self._closed:
+                self._discard(entry)
+                return
+            entry.returned_at = time.monotonic()
+            self._idle.put(entry)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _discard(entry: _Entry) -> None:
+        try:
+            entry.conn.close()
+        except mysql.connector.Error:
+            pass
+
+    def close(self) -> None:
+        """
+        Close the idle connections (borrowed ones are closed when returned after this).
+        """
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def warm(self, count: int) -> int:
+        """
+        Open connections in parallel until `count` (at most size) are idle, so the first requests
+        skip the TCP/TLS handshake and authentication. Returns how many are idle afterwards.
+        """
+        missing = min(count, self.size) - self._idle.qsize()
+        if missing <= 0:
+            return self._idle.qsize()
+        borrowed = []
+        lock = threading.Lock()
+
+        def borrow():
+            conn = self.get()
+            with lock:
+                borrowed.append(conn)
+
+        threads = [threading.Thread(target=borrow, name="pool-warm", daemon=True) for _ in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for conn in borrowed:
+            conn.close()
+        return self._idle.qsize()
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": self._idle.qsize()}
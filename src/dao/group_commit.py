@@ -0,0 +1,175 @@
+import threading
+import time
+from typing import Optional, List, Callable, Any
+import mysql.connector
+from mysql.connector import MySQLConnection
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend
+from src.dao.system_node_dao import SystemNodeDAO, RETRYABLE_ERRNOS
+from src.metrics import metrics
+
+
+class _Write:
+    def __init__(self, run: Callable[[MySQLConnection], Any]):
+        self.run = run
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def outcome(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class GroupCommitSystemNodeDAO(SystemNodeBackend):
+    def __init__(self, dao: SystemNodeDAO, window_seconds: float = 0.002, max_batch: int = 32):
+        """
+        Wraps a SystemNodeDAO so concurrent create() and update() calls share transactions: the
+        first write of a group waits up to window_seconds (or until max_batch writes have joined),
+        then runs the whole group on one connection with one COMMIT, so a burst of small writes
+        costs one log flush instead of one each.
+
+        Every caller still gets its own result: its ID, its update's True / False (the same
+        ParentID / Status / Importance check, seeing earlier writes of the group as if they
+        had run one after another), or its own exception. A failing write is undone back to a
+        SAVEPOINT taken before it and the rest of the group commits. If the transaction hits a
+        deadlock or lock wait timeout (which can undo all of it) the group is rerun one write per
+        transaction. A lone write pays the window in latency; other calls pass straight through.
+
+        Counters: dao.group_commit.commits, dao.group_commit.writes, dao.group_commit.fallbacks.
+        Observation: dao.group_commit.batch_size.
+        """
+        self.dao = dao
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._open: Optional[List[_Write]] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.dao, name)
+
+    # -----------------------------------------------------------
+    # GROUPING
+    # -----------------------------------------------------------
+    def _submit(self, run: Callable[[MySQLConnection], Any]) -> Any:
+        write = _Write(run)
+        with self._cond:
+            group = self._open
+            leader = group is None or len(group) >= self.max_batch
+            if leader:
+                group = self._open = [write]
+            else:
+                group.append(write)
+                if len(group) >= self.max_batch:
+                    self._cond.notify_all()
+        if leader:
+            with self._cond:
+                deadline = time.monotonic() + self.window_seconds
+                while len(group) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._open is group:
+                    self._open = None
+            self._commit(group)
+        result = write.outcome()
+        # Each caller records its own write, so read-your-writes pins the right session
+        self.dao._note_write()
+        return result
+
+    def _commit(self, group: List[_Write]) -> None:
+        try:
+            if not self._run_in_one_transaction(group) and len(group) > 1:
+                metrics.incr("dao.group_commit.fallbacks")
+                for write in group:
+                    write.error = None
+                    self._run_in_one_transaction([write])
+                    write.done.set()
+        except BaseException as e:
+            for write in group:
+                if not write.done.is_set():
+                    write.result, write.error = None, e
+            raise
+        finally:
+            for write in group:
+                write.done.set()
+
+    def _run_in_one_transaction(self, writes: List[_Write]) -> bool:
+        """
+        Runs writes in one transaction and commits. Returns False, with nothing committed, if it
+        hit a deadlock or lock wait timeout (recorded as each write's error).
+        """
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                for i, write in enumerate(writes):
+                    if len(writes) > 1:
+                        cursor.execute(f"SAVEPOINT w{i}")
+                    try:
+                        write.result = write.run(conn)
+                    except mysql.connector.Error as e:
+                        if e.errno in RETRYABLE_ERRNOS:
+                            raise
+                        if len(writes) > 1:
+                            cursor.execute(f"ROLLBACK TO SAVEPOINT w{i}")
+                        write.error = e
+                    except Exception as e:
+                        if len(writes) > 1:
+                            cursor.execute(f"ROLLBACK TO SAVEPOINT w{i}")
+                        write.error = e
+                conn.commit()
+            except mysql.connector.Error as e:
+                conn.rollback()
+                if e.errno not in RETRYABLE_ERRNOS:
+                    raise
+                for write in writes:
+                    write.result, write.error = None, e
+                return False
+            finally:
+                cursor.close()
+            metrics.incr("dao.group_commit.commits")
+            metrics.incr("dao.group_commit.writes", len(writes))
+            metrics.observe("dao.group_commit.batch_size", len(writes))
+            return True
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------
+    # WRITES (grouped)
+    # -----------------------------------------------------------
+    def create(self, node: SystemNode) -> int:
+        return self._submit(lambda conn: self.dao.create_in(conn, node))
+
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        return self._submit(lambda conn: self.dao.update_in(conn, old, new))
+
+    # -----------------------------------------------------------
+    # EVERYTHING ELSE (pass-through)
+    # -----------------------------------------------------------
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        return self.dao.read(node_id)
+
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        return self.dao.read_by_parent(parent_id)
+
+    def read_all(self) -> List[SystemNode]:
+        return self.dao.read_all()
+
+    def resolve_path(self, path: str) -> Optional[SystemNode]:
+        return self.dao.resolve_path(path)
+
+    def resolve_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        return self.dao.resolve_paths(paths)
+
+    def delete(self, old: SystemNode) -> bool:
+        return self.dao.delete(old)
+
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        return self.dao.move_node(node_id, new_parent_id, target_index)
+
+    def apply_batch(self, upserts: List[SystemNode], deleted_ids: List[int]) -> None:
+        return self.dao.apply_batch(upserts, deleted_ids)
@@ -0,0 +1,448 @@
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import replace
+from itertools import islice
+from typing import Optional, List, Dict
+import mysql.connector
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend
+
+logger = logging.getLogger(__name__)
+
+# Batch failures that retrying cannot fix: the rows themselves break a constraint
+_PERMANENT_ERRORS = (sqlite3.IntegrityError, mysql.connector.IntegrityError)
+
+
+def _copy_node(node: SystemNode) -> SystemNode:
+    """
+    Callers get their own copy, so mutating a returned node never corrupts the in-memory tree.
+    """
+    return replace(node, Tags=dict(node.Tags or {}), Metadata=dict(node.Metadata or {}))
+
+
+def _estimate_node_bytes(node: SystemNode) -> int:
+    """
+    Rough resident size of one node: the object, its field values, and its index entries.
+    """
+    size = sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+    for value in node.__dict__.values():
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    # One slot in the by-ID dict plus one slot in a children list.
+    return size + 112 + 8
+
+
+class InMemorySystemNodeDAO(SystemNodeBackend):
+    def __init__(self, store: SystemNodeBackend, batch_size: int = 500, flush_interval: float = 0.05,
+                 durable_writes: bool = False, max_batch_attempts: int = 3):
+        """
+        An authoritative in-memory copy of the whole tree in front of a persistent store.
+
+        store is the backend that holds the data on disk (SystemNodeDAO or SQLiteSystemNodeDAO);
+        it must implement read_all() and apply_batch(). Call load() once, then start().
+
+        Reads are answered from memory. Mutations are applied in memory first and queued;
+        a background thread persists them in order, in batches of up to batch_size rows,
+        every flush_interval seconds. With durable_writes=True each mutation waits for its
+        batch to commit before returning, otherwise use wait_durable() to get the acknowledgement.
+
+        A failing batch is retried with backoff. If it fails max_batch_attempts times in a row
+        with a constraint error, its rows are written one at a time and the ones that still fail
+        are set aside in dead_letters (logged, counted in stats(); wait_durable() returns False
+        for them and durable writes raise), so one bad row cannot hold up every later write.
+
+        This engine must be the only writer to the store: it allocates IDs itself.
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durable_writes = durable_writes
+
+        self._lock = threading.RLock()
+        self._nodes: Dict[int, SystemNode] = {}
+        self._children: Dict[Optional[int], List[int]] = {}
+        self._next_id = 1
+
+        # Write-behind queue: node ID -> (sequence of its latest change, node or None for delete).
+        # Insertion order is the order of first change, which keeps parents ahead of their children;
+        # a delete moves its entry to the end, so children are deleted before their parents.
+        self._pending: Dict[int, tuple] = {}
+        self._pending_cond = threading.Condition(self._lock)
+        self._sequence = 0
+        self._durable_sequence = 0
+        self._thread_local = threading.local()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
+        self.max_batch_attempts = max_batch_attempts
+        self._dropped_sequences = set()
+        self.dead_letters: List[dict] = []
+
+        self.cold_load_seconds = 0.0
+        self.change_version: Optional[int] = None
+        self.bytes_per_node = 0
+        self.batches_written = 0
+        self.rows_written = 0
+        self.last_error: Optional[str] = None
+
+    # -----------------------------------------------------------
+    # LIFECYCLE
+    # -----------------------------------------------------------
+    def load(self) -> None:
+        """
+        Load the whole tree from the store and build the indexes. Reports load time and memory per node.
+        """
+        start = time.perf_counter()
+        self._build_indexes(self.store.read_all())
+        self._report_load(start)
+
+    def load_from_snapshot(self, path: str, change_log=None) -> None:
+        """
+        Load the tree from a snapshot file (see src/dao/snapshot.py) instead of querying the store.
+        With a ChangeLog, nodes changed since the snapshot's change version are then re-read from
+        the database, so the result is as fresh as load() while only fetching the recent changes.
+        """
+        from src.dao.snapshot import Snapshot
+
+        start = time.perf_counter()
+        with Snapshot(path) as snapshot:
+            nodes = {node.ID: node for node in snapshot.iter_nodes()}
+            change_version = snapshot.change_version
+        if change_log is not None:
+            change_version, changed, deleted_ids = change_log.changes_since(change_version)
+            nodes.update((node.ID, node) for node in changed)
+            for node_id in deleted_ids:
+                nodes.pop(node_id, None)
+            logger.info("Caught up %d changed and %d deleted nodes from the change log",
+                        len(changed), len(deleted_ids))
+        self._build_indexes(list(nodes.values()))
+        self.change_version = change_version
+        self._report_load(start)
+
+    def _build_indexes(self, nodes: List[SystemNode]) -> None:
+        with self._lock:
+            self._nodes = {node.ID: node for node in nodes}
+            self._children = {}
+            for node in nodes:
+                self._children.setdefault(node.ParentID, []).append(node.ID)
+            for parent_id in self._children:
+                self._sort_children(parent_id)
+            self._next_id = max(self._nodes, default=0) + 1
+
+    def _report_load(self, start: float) -> None:
+        self.cold_load_seconds = time.perf_counter() - start
+        sample = list(islice(self._nodes.values(), 1000))
+        self.bytes_per_node = sum(_estimate_node_bytes(n) for n in sample) // len(sample) if sample else 0
+        logger.info("Loaded %d nodes in %.1f ms (~%d bytes per node)",
+                    len(self._nodes), self.cold_load_seconds * 1000, self.bytes_per_node)
+
+    def start(self) -> None:
+        """
+        Start the background write-behind thread.
+        """
+        if self._worker is None:
+            self._stopping = False
+            self._worker = threading.Thread(target=self._write_behind_loop, name="write-behind", daemon=True)
+            self._worker.start()
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Flush pending writes and stop the background thread.
+        """
+        if self._worker is not None:
+            self.wait_durable(self._sequence, timeout)
+        with self._pending_cond:
+            self._stopping = True
+            self._pending_cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "nodes": len(self._nodes),
+                "cold_load_ms": round(self.cold_load_seconds * 1000, 3),
+                "snapshot_change_version": self.change_version,
+                "bytes_per_node": self.bytes_per_node,
+                "pending_writes": len(self._pending),
+                "last_sequence": self._sequence,
+                "durable_sequence": self._durable_sequence,
+                "batches_written": self.batches_written,
+                "rows_written": self.rows_written,
+                "last_error": self.last_error,
+                "dead_letters": len(self.dead_letters),
+            }
+
+    # -----------------------------------------------------------
+    # DURABILITY
+    # -----------------------------------------------------------
+    def wait_durable(self, sequence: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every mutation up to `sequence` is committed to the store.
+        Defaults to the calling thread's last mutation. Returns False on timeout, or if
+        that mutation could not be persisted (see dead_letters).
+        """
+        if sequence is None:
+            sequence = getattr(self._thread_local, "last_sequence", 0)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._pending_cond:
+            while self._durable_sequence < sequence:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._pending_cond.wait(remaining)
+            return sequence not in self._dropped_sequences
+
+    def _enqueue(self, node_ids) -> None:
+        """
+        Queue the current state of node_ids (deleted if no longer present). Caller holds the lock.
+        """
+        self._sequence += 1
+        for node_id in node_ids:
+            node = self._nodes.get(node_id)
+            if node is None:
+                self._pending.pop(node_id, None)
+            self._pending[node_id] = (self._sequence, _copy_node(node) if node else None)
+        self._thread_local.last_sequence = self._sequence
+        self._pending_cond.notify_all()
+
+    def _after_write(self) -> None:
+        if self.durable_writes and not self.wait_durable():
+            raise RuntimeError(f"Write could not be persisted: {self.last_error}")
+
+    def _write_behind_loop(self) -> None:
+        attempts = 0
+        while True:
+            with self._pending_cond:
+                while not self._pending and not self._stopping:
+                    self._pending_cond.wait()
+                if self._stopping and not self._pending:
+                    return
+                batch = self._take_batch()
+
+            upserts = [node for _, (_, node) in batch if node is not None]
+            deleted_ids = [node_id for node_id, (_, node) in batch if node is None]
+            dropped = []
+            try:
+                if attempts >= self.max_batch_attempts:
+                    dropped = self._apply_one_by_one(batch)
+                else:
+                    self.store.apply_batch(upserts, deleted_ids)
+            except Exception as e:  # keep the batch queued and retry
+                attempts = attempts + 1 if isinstance(e, _PERMANENT_ERRORS) else 0
+                logger.exception("Write-behind batch failed; will retry")
+                with self._lock:
+                    self.last_error = str(e)
+                time.sleep(min(max(self.flush_interval, 0.5) * 2 ** min(attempts, 6), 30.0))
+                continue
+            attempts = 0
+
+            with self._pending_cond:
+                for node_id, entry, error in dropped:
+                    logger.error("Dropping write-behind row %s after repeated failures: %s", node_id, error)
+                    self.dead_letters.append({"ID": node_id, "Node": entry[1], "Error": str(error)})
+                    self._dropped_sequences.add(entry[0])
+                for node_id, (sequence, _) in batch:
+                    # Only drop the entry if it was not changed again while the batch was in flight.
+                    if self._pending.get(node_id, (None,))[0] == sequence:
+                        del self._pending[node_id]
+                self._durable_sequence = (min(seq for seq, _ in self._pending.values()) - 1
+                                          if self._pending else self._sequence)
+                self.batches_written += 1
+                self.rows_written += len(batch) - len(dropped)
+                self.last_error = str(dropped[-1][2]) if dropped else None
+                self._pending_cond.notify_all()
+
+            if self.flush_interval:
+                time.sleep(self.flush_interval)
+
+    def _apply_one_by_one(self, batch: list) -> list:
+        """
+        Persist a batch that keeps failing one row per apply_batch call, upserts (parents first)
+        before deletes. Returns (node ID, entry, error) for the rows rejected by a constraint;
+        any other error propagates and the whole batch is retried.
+        """
+        dropped = []
+        for node_id, entry in sorted(batch, key=lambda item: item[1][1] is None):
+            try:
+                if entry[1] is not None:
+                    self.store.apply_batch([entry[1]], [])
+                else:
+                    self.store.apply_batch([], [node_id])
+            except _PERMANENT_ERRORS as e:
+                dropped.append((node_id, entry, e))
+        return dropped
+
+    def _take_batch(self) -> list:
+        """
+        The oldest batch_size pending entries, plus any pending parents they reference,
+        with upserts ordered parents-first so foreign keys hold row by row. Caller holds the lock.
+        """
+        batch = dict(list(self._pending.items())[:self.batch_size])
+        queue = [entry[1] for entry in batch.values() if entry[1] is not None]
+        while queue:
+            parent_id = queue.pop().ParentID
+            if parent_id in self._pending and parent_id not in batch and self._pending[parent_id][1]:
+                batch[parent_id] = self._pending[parent_id]
+                queue.append(self._pending[parent_id][1])
+
+        def depth(node_id: int) -> int:
+            levels = 0
+            node = batch[node_id][1]
+            while node is not None and node.ParentID in batch and levels <= len(batch):
+                levels += 1
+                node = batch[node.ParentID][1]
+            return levels
+
+        # Deletes keep queue order (the order they happened), so children go before their parents.
+        return sorted(batch.items(), key=lambda item: depth(item[0]) if item[1][1] is not None else 0)
+
+    # -----------------------------------------------------------
+    # INDEX HELPERS
+    # -----------------------------------------------------------
+    def _sort_children(self, parent_id: Optional[int]) -> None:
+        self._children[parent_id].sort(key=lambda i: (self._nodes[i].SortOrder, i))
+
+    def _detach(self, node_id: int, parent_id: Optional[int]) -> None:
+        siblings = self._children.get(parent_id, [])
+        siblings.remove(node_id)
+        if not siblings:
+            self._children.pop(parent_id, None)
+
+    def _attach(self, node_id: int, parent_id: Optional[int]) -> None:
+        self._children.setdefault(parent_id, []).append(node_id)
+        self._sort_children(parent_id)
+
+    def _check_parent(self, parent_id: Optional[int]) -> None:
+        if parent_id is not None and parent_id not in self._nodes:
+            raise ValueError(f"Parent node {parent_id} does not exist")
+
+    @staticmethod
+    def _matches(current: SystemNode, old: SystemNode) -> bool:
+        return (current.ParentID == old.ParentID and current.Status == old.Status
+                and current.Importance == old.Importance)
+
+    # -----------------------------------------------------------
+    # 1) CREATE
+    # -----------------------------------------------------------
+    def create(self, node: SystemNode) -> int:
+        with self._lock:
+            self._check_parent(node.ParentID)
+            siblings = self._children.get(node.ParentID, [])
+            sort_order = self._nodes[siblings[-1]].SortOrder + 1 if siblings else 1
+
+            new_id = self._next_id
+            self._next_id += 1
+            self._nodes[new_id] = replace(_copy_node(node), ID=new_id, SortOrder=sort_order)
+            self._attach(new_id, node.ParentID)
+            self._enqueue([new_id])
+        self._after_write()
+        return new_id
+
+    # -----------------------------------------------------------
+    # 2) READ (Single / All)
+    # -----------------------------------------------------------
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        with self._lock:
+            node = self._nodes.get(node_id)
+            return _copy_node(node) if node else None
+
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        with self._lock:
+            return [_copy_node(self._nodes[i]) for i in self._children.get(parent_id, [])]
+
+    def read_all(self) -> List[SystemNode]:
+        with self._lock:
+            # Same order as the SQL backends: NULL parent first, then by ParentID, then SortOrder.
+            parent_ids = sorted(self._children, key=lambda p: (p is not None, p or 0))
+            return [_copy_node(self._nodes[i]) for p in parent_ids for i in self._children[p]]
+
+    # -----------------------------------------------------------
+    # 3) UPDATE (Looser Concurrency)
+    # -----------------------------------------------------------
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        with self._lock:
+            current = self._nodes.get(old.ID)
+            if current is None or not self._matches(current, old):
+                return False
+            self._check_parent(new.ParentID)
+
+            self._nodes[old.ID] = replace(_copy_node(new), ID=old.ID)
+            if current.ParentID != new.ParentID:
+                self._detach(old.ID, current.ParentID)
+                self._attach(old.ID, new.ParentID)
+            elif current.SortOrder != new.SortOrder:
+                self._sort_children(new.ParentID)
+            self._enqueue([old.ID])
+        self._after_write()
+        return True
+
+    # -----------------------------------------------------------
+    # 4) DELETE (Looser Concurrency)
+    # -----------------------------------------------------------
+    def delete(self, old: SystemNode) -> bool:
+        with self._lock:
+            current = self._nodes.get(old.ID)
+            if current is None or not self._matches(current, old):
+                return False
+            if self._children.get(old.ID):
+                # Same outcome as the ParentID foreign key in the SQL backends.
+                raise ValueError(f"Cannot delete node {old.ID}: it still has children")
+
+            del self._nodes[old.ID]
+            self._detach(old.ID, current.ParentID)
+            self._enqueue([old.ID])
+        self._after_write()
+        return True
+
+    # -----------------------------------------------------------
+    # 5) MOVE & REORDER
+    # -----------------------------------------------------------
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        """
+        Same SortOrder rules as SystemNodeDAO.move_node; every sibling whose SortOrder
+        shifts is queued for persistence along with the moved node.
+        """
+        with self._lock:
+            node = self._nodes.get(node_id)
+            if node is None:
+                return False
+            self._check_parent(new_parent_id)
+            ancestor_id = new_parent_id
+            while ancestor_id is not None:
+                if ancestor_id == node_id:
+                    raise ValueError(f"Cannot move node {node_id} under itself or its descendant")
+                ancestor_id = self._nodes[ancestor_id].ParentID
+            old_parent = node.ParentID
+            changed = [node_id]
+
+            for sibling_id in self._children.get(old_parent, []):
+                sibling = self._nodes[sibling_id]
+                if sibling_id != node_id and sibling.SortOrder > node.SortOrder:
+                    sibling.SortOrder -= 1
+                    changed.append(sibling_id)
+            if old_parent != new_parent_id:
+                self._detach(node_id, old_parent)
+                self._attach(node_id, new_parent_id)
+
+            next_pos = max((self._nodes[i].SortOrder for i in self._children[new_parent_id]
+                            if i != node_id), default=0) + 1
+            if target_index is not None and target_index < next_pos:
+                node.SortOrder = max(target_index, 1)
+                for sibling_id in self._children[new_parent_id]:
+                    sibling = self._nodes[sibling_id]
+                    if sibling_id != node_id and sibling.SortOrder >= node.SortOrder:
+                        sibling.SortOrder += 1
+                        changed.append(sibling_id)
+            else:
+                node.SortOrder = next_pos
+
+            node.ParentID = new_parent_id
+            self._sort_children(new_parent_id)
+            self._enqueue(dict.fromkeys(changed))
+        self._after_write()
+        return True
@@ -0,0 +1,154 @@
+import random
+from typing import Optional, List, Tuple
+from mysql.connector import MySQLConnection
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+from src.dao.write_hooks import WriteHook
+
+VERSION_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS SystemNodeVersion (
+        Scope VARCHAR(40) NOT NULL PRIMARY KEY,
+        Version BIGINT NOT NULL,
+        ChangedAt TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3)
+    )
+"""
+
+EPOCH_SCOPE = "epoch"
+# The whole-tree version is spread over this many rows so writes do not all queue on one row lock
+ALL_SHARDS = 16
+
+_BUMP_SUFFIX = " ON DUPLICATE KEY UPDATE Version = Version + 1, ChangedAt = CURRENT_TIMESTAMP(3)"
+
+_BUMP_CHILDREN_SQL = """
+    INSERT INTO SystemNodeVersion (Scope, Version)
+    SELECT CONCAT('node:', ID), 1 FROM SystemNode WHERE ParentID <=> %s
+""" + _BUMP_SUFFIX
+
+
+def node_scope(node_id: int) -> str:
+    return f"node:{node_id}"
+
+
+def parent_scope(parent_id: Optional[int]) -> str:
+    return f"parent:{'null' if parent_id is None else parent_id}"
+
+
+ALL_SCOPE = "all"
+_ALL_SHARD_SCOPES = [f"all:{i}" for i in range(ALL_SHARDS)]
+
+# etag() runs on every conditional GET: one constant per scope shape, so with prepared statements each
+# pooled connection prepares it once (the connector re-prepares whenever the str object differs)
+_ETAG_SQL = """
+    SELECT Scope, Version, ChangedAt > NOW(3) - INTERVAL %s MICROSECOND AS Recent
+    FROM SystemNodeVersion
+    WHERE Scope IN ({scopes})
+"""
+_SCOPE_ETAG_SQL = _ETAG_SQL.format(scopes="%s, %s")
+_ALL_ETAG_SQL = _ETAG_SQL.format(scopes=", ".join(["%s"] * (ALL_SHARDS + 1)))
+
+
+class NodeVersions(WriteHook):
+    def __init__(self, dao: SystemNodeDAO, settle_seconds: float = 5.0):
+        """
+        Keeps a version counter per node (its row as GET /nodes/<id> returns it), per child
+        list (GET /nodes?parent=X) and for the whole tree (GET /nodes), in SystemNodeVersion,
+        bumped inside each write's transaction. They make cheap ETags: checking one is a
+        primary-key read instead of the listing query.
+
+        etag() also reports whether the scope changed within settle_seconds. A body read right
+        after a change may come from something that has not caught up yet (a replica, the
+        shared cache, a coalesced query that started earlier), so callers should only tag a
+        body with a settled version; a tag can then never be newer than its body.
+
+        Writes that skip the hooks (bulk import, apply_batch) must call bump_epoch(), which
+        changes every ETag at once.
+
+        Registers itself as a write hook on dao.
+        """
+        self.dao = dao
+        self.settle_seconds = settle_seconds
+        dao.add_write_hook(self)
+
+    def ensure_table(self) -> None:
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(VERSION_TABLE_DDL)
+            cursor.close()
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------
+    # BUMPING (runs inside the DAO's transaction)
+    # -----------------------------------------------------------
+    @staticmethod
+    def _bump(conn: MySQLConnection, scopes: List[str]) -> None:
+        # One row per scope, locked in a fixed order so concurrent writers cannot deadlock on them
+        scopes = sorted(set(scopes) | {random.choice(_ALL_SHARD_SCOPES)})
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO SystemNodeVersion (Scope, Version) VALUES "
+            + ", ".join(["(%s, 1)"] * len(scopes)) + _BUMP_SUFFIX,
+            tuple(scopes)
+        )
+        cursor.close()
+
+    @classmethod
+    def _bump_children(cls, conn: MySQLConnection, parent_ids: List[Optional[int]]) -> None:
+        # Renumbering changes every sibling's SortOrder, so each sibling's own version moves too
+        cursor = conn.cursor()
+        for parent_id in parent_ids:
+            cursor.execute(_BUMP_CHILDREN_SQL, (parent_id,))
+        cursor.close()
+
+    def on_create(self, conn: MySQLConnection, node: SystemNode) -> None:
+        self._bump(conn, [node_scope(node.ID), parent_scope(node.ParentID)])
+
+    def on_update(self, conn: MySQLConnection, old: SystemNode, new: SystemNode) -> None:
+        self._bump(conn, [node_scope(old.ID), parent_scope(old.ParentID), parent_scope(new.ParentID)])
+
+    def on_delete(self, conn: MySQLConnection, old: SystemNode) -> None:
+        self._bump(conn, [node_scope(old.ID), parent_scope(old.ParentID)])
+
+    def on_move(self, conn: MySQLConnection, node_id: int, old_parent_id: Optional[int],
+                new_parent_id: Optional[int]) -> None:
+        parent_ids = list(dict.fromkeys([old_parent_id, new_parent_id]))
+        self._bump_children(conn, parent_ids)
+        self._bump(conn, [node_scope(node_id)] + [parent_scope(p) for p in parent_ids])
+
+    def on_reorder(self, conn: MySQLConnection, parent_id: Optional[int]) -> None:
+        self._bump_children(conn, [parent_id])
+        self._bump(conn, [parent_scope(parent_id)])
+
+    def bump_epoch(self) -> None:
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO SystemNodeVersion (Scope, Version) VALUES (%s, 1)" + _BUMP_SUFFIX,
+                           (EPOCH_SCOPE,))
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------
+    # READ
+    # -----------------------------------------------------------
+    def etag(self, scope: str) -> Tuple[str, bool]:
+        """
+        (entity tag, settled) for node_scope(id), parent_scope(id) or ALL_SCOPE. Read from the
+        primary: a replica that lags could otherwise answer 304 for a tag it has not reached.
+        Scopes never written yet count as version 0.
+        """
+        if scope == ALL_SCOPE:
+            sql, scopes = _ALL_ETAG_SQL, _ALL_SHARD_SCOPES + [EPOCH_SCOPE]
+        else:
+            sql, scopes = _SCOPE_ETAG_SQL, [scope, EPOCH_SCOPE]
+        conn = self.dao._get_connection()
+        try:
+            rows = self.dao._fetch(conn, sql, (int(self.settle_seconds * 1_000_000), *scopes))
+        finally:
+            conn.close()
+        epoch = sum(row["Version"] for row in rows if row["Scope"] == EPOCH_SCOPE)
+        version = sum(row["Version"] for row in rows if row["Scope"] != EPOCH_SCOPE)
+        return f"{epoch}.{version}", not any(row["Recent"] for row in rows)
@@ -0,0 +1,131 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Optional, List
+import mysql.connector
+from mysql.connector import MySQLConnection
+from mysql.connector.errors import PoolError
+from src.dao.connection_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class _Replica:
+    def __init__(self, db_config: dict, pool_size: int = 0):
+        self.db_config = db_config
+        self.pool = ConnectionPool(db_config, pool_size, autocommit=True) if pool_size > 0 else None
+        self.healthy = True
+        self.retry_at = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.db_config.get('host')}:{self.db_config.get('port', 3306)}"
+
+
+class ReplicaRouter:
+    def __init__(self, replica_configs: List[dict], retry_seconds: float = 30.0,
+                 max_lag_seconds: Optional[float] = None, pool_size: int = 0):
+        """
+        Spreads read connections across replicas round-robin.
+
+        A replica that fails to connect (or, in check(), lags more than max_lag_seconds)
+        is taken out of rotation for retry_seconds. connect() returns None when no replica
+        is usable, so the caller can fall back to the primary.
+
+        With pool_size > 0 each replica keeps a ConnectionPool (autocommit) of that size.
+        """
+        self.replicas = [_Replica(config, pool_size) for config in replica_configs]
+        self.retry_seconds = retry_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._checker: Optional[threading.Thread] = None
+
+    def _mark_down(self, replica: _Replica, error: str) -> None:
+        with self._lock:
+            if replica.healthy:
+                logger.warning("Replica %s taken out of rotation: %s", replica.name, error)
+            replica.healthy = False
+            replica.retry_at = time.monotonic() + self.retry_seconds
+            replica.last_error = error
+
+    def _mark_up(self, replica: _Replica) -> None:
+        with self._lock:
+            replica.healthy = True
+            replica.last_error = None
+
+    def connect(self) -> Optional[MySQLConnection]:
+        """
+        Connect to the next usable replica, or return None if none can be reached.
+        """
+        if not self.replicas:
+            return None
+
+        start = next(self._counter)
+        now = time.monotonic()
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if not replica.healthy and now < replica.retry_at:
+                continue
+            try:
+                conn = replica.pool.get() if replica.pool else mysql.connector.connect(**replica.db_config)
+            except PoolError:
+                continue  # busy, not down
+            except mysql.connector.Error as e:
+                self._mark_down(replica, str(e))
+                continue
+            if not replica.healthy:
+                self._mark_up(replica)
+            return conn
+        return None
+
+    # -----------------------------------------------------------
+    # HEALTH CHECKS
+    # -----------------------------------------------------------
+    def check(self) -> List[dict]:
+        """
+        Actively probe every replica (connectivity and, if configured, replication lag)
+        and update its rotation status. Returns one status dict per replica.
+        """
+        for replica in self.replicas:
+            try:
+                conn = mysql.connector.connect(**replica.db_config)
+                try:
+                    cursor = conn.cursor(dictionary=True)
+                    if self.max_lag_seconds is not None:
+                        cursor.execute("SHOW REPLICA STATUS")
+                        status = cursor.fetchone() or {}
+                        lag = status.get("Seconds_Behind_Source")
+                        if lag is None or lag > self.max_lag_seconds:
+                            raise RuntimeError(f"replication lag {lag} exceeds {self.max_lag_seconds}s")
+                    else:
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                    cursor.close()
+                finally:
+                    conn.close()
+                self._mark_up(replica)
+            except (mysql.connector.Error, RuntimeError) as e:
+                self._mark_down(replica, str(e))
+
+        return [
+            {"replica": r.name, "healthy": r.healthy, "last_error": r.last_error}
+            for r in self.replicas
+        ]
+
+    def start_health_checks(self, interval: float = 10.0) -> None:
+        """
+        Run check() every `interval` seconds on a daemon thread.
+        """
+        if self._checker is not None or not self.replicas:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.check()
+
+        self._checker = threading.Thread(target=loop, name="replica-health", daemon=True)
+        self._checker.start()
@@ -0,0 +1,324 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from src.dao.archive import ARCHIVE_TABLE_DDL
+from src.dao.change_log import CHANGE_TABLE_DDL
+from src.dao.node_versions import VERSION_TABLE_DDL
+from src.dao.subtree_hashes import HASH_TABLE_DDL
+from src.dao.subtree_stats import STATS_TABLE_DDL
+from src.dao.system_node_dao import SystemNodeDAO
+
+# The MySQL schema, as an ordered list of migrations. Applied versions are recorded in
+# SchemaVersion; `python manage.py migrate` runs whatever is missing. Never edit a released
+# migration: append a new one. (SQLiteSystemNodeDAO creates its own schema.)
+
+SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS SchemaVersion (
+        Version INT NOT NULL PRIMARY KEY,
+        Description VARCHAR(255) NOT NULL,
+        AppliedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# (ParentID, SortOrder) serves every hot predicate in SystemNodeDAO: read_by_parent's
+# "ParentID <=> %s ORDER BY SortOrder" (no filesort), create's "MAX(SortOrder) WHERE ParentID"
+# (one index dive), move_node's sibling shifts, and the ParentID foreign key itself.
+SYSTEM_NODE_DDL = """
+    CREATE TABLE IF NOT EXISTS SystemNode (
+        ID BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        ParentID BIGINT NULL,
+        Name VARCHAR(255) NOT NULL,
+        Description TEXT NULL,
+        Notes TEXT NULL,
+        Tags JSON NULL,
+        Metadata JSON NULL,
+        Status VARCHAR(255) NULL,
+        Importance INT NOT NULL DEFAULT 0,
+        SortOrder INT NOT NULL DEFAULT 0,
+        KEY idx_systemnode_parent_sort (ParentID, SortOrder),
+        CONSTRAINT fk_systemnode_parent FOREIGN KEY (ParentID) REFERENCES SystemNode (ID) ON DELETE RESTRICT
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# Indexes the DAO's queries rely on: table -> [(index name, columns)]. Any existing index
+# that starts with the same columns satisfies a requirement.
+REQUIRED_INDEXES: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {
+    "SystemNode": [("idx_systemnode_parent_sort", ("ParentID", "SortOrder")),
+                   ("idx_systemnode_parent_name", ("ParentID", "Name"))],
+    "SystemNodeArchive": [("idx_archive_parent_sort", ("ParentID", "SortOrder"))],
+    "SystemNodeStatusRollup": [("PRIMARY", ("NodeID", "Status"))],
+    "SystemNodeChange": [("idx_change_node", ("NodeID", "Version")), ("idx_change_parent", ("ParentID", "Version"))],
+}
+
+
+def _ensure_index(table: str, name: str, columns: Tuple[str, ...]) -> Callable:
+    """
+    A migration step that adds an index unless one with the same leading columns exists
+    (tables created before the schema was managed may lack it; MySQL has no CREATE INDEX IF NOT EXISTS).
+    """
+    def step(cursor) -> None:
+        existing = _existing_indexes(cursor, table)
+        if not any(cols[:len(columns)] == columns for cols in existing.values()):
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+    return step
+
+
+def _ensure_column(table: str, column: str, definition: str) -> Callable:
+    """
+    A migration step that adds a column unless it exists (MySQL has no ADD COLUMN IF NOT EXISTS).
+    """
+    def step(cursor) -> None:
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        (exists,) = cursor.fetchone()
+        if not exists:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return step
+
+
+Step = Union[str, Callable]
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "SystemNode table with (ParentID, SortOrder) index and parent foreign key", [
+        SYSTEM_NODE_DDL,
+        _ensure_index("SystemNode", "idx_systemnode_parent_sort", ("ParentID", "SortOrder")),
+    ]),
+    (2, "SystemNodeStatusRollup table for subtree stats", [STATS_TABLE_DDL]),
+    (3, "SystemNodeChange table for the change log", [CHANGE_TABLE_DDL]),
+    # Existing rows get the migration time as UpdatedAt, so nothing is archivable until the threshold passes.
+    (4, "SystemNode.UpdatedAt and the SystemNodeArchive table for archived subtrees", [
+        _ensure_column("SystemNode", "UpdatedAt",
+                       "TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        _ensure_index("SystemNode", "idx_systemnode_status_updated", ("Status", "UpdatedAt")),
+        ARCHIVE_TABLE_DDL,
+    ]),
+    (5, "SystemNodeVersion table for HTTP ETags", [VERSION_TABLE_DDL]),
+    (6, "(ParentID, Name) index for path lookups", [
+        _ensure_index("SystemNode", "idx_systemnode_parent_name", ("ParentID", "Name")),
+    ]),
+    (7, "SystemNodeHash table for subtree hashes", [HASH_TABLE_DDL]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# -----------------------------------------------------------
+# MIGRATE
+# -----------------------------------------------------------
+def current_version(dao: SystemNodeDAO) -> int:
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(SCHEMA_VERSION_DDL)
+        cursor.execute("SELECT COALESCE(MAX(Version), 0) FROM SchemaVersion")
+        (version,) = cursor.fetchone()
+        cursor.close()
+        return version
+    finally:
+        conn.close()
+
+
+def migrate(dao: SystemNodeDAO, target: Optional[int] = None) -> dict:
+    """
+    Apply every migration above the recorded version, up to `target` (default: all).
+    DDL commits implicitly in MySQL, so each migration is recorded right after its steps run;
+    a failed migration stops the run and is retried from its first step next time
+    (steps are written to be re-runnable).
+    """
+    start_version = current_version(dao)
+    target = LATEST_VERSION if target is None else target
+    applied = []
+
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor()
+        for version, description, steps in MIGRATIONS:
+            if version <= start_version or version > target:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute("INSERT INTO SchemaVersion (Version, Description) VALUES (%s, %s)",
+                           (version, description))
+            conn.commit()
+            applied.append({"version": version, "description": description})
+        cursor.close()
+    finally:
+        conn.close()
+
+    return {"from_version": start_version, "to_version": applied[-1]["version"] if applied else start_version,
+            "applied": applied}
+
+
+# -----------------------------------------------------------
+# INDEX ADVISOR
+# -----------------------------------------------------------
+# The DAO's hot queries: (name, table, SQL, parameters, index it should use). Parameters are
+# filled with a real ParentID / ID from the database so EXPLAIN sees representative values.
+QUERY_PATTERNS = [
+    ("read", "SystemNode", "SELECT * FROM SystemNode WHERE ID = %s", ("id",), "PRIMARY"),
+    ("read_by_parent", "SystemNode", "SELECT * FROM SystemNode WHERE ParentID <=> %s ORDER BY SortOrder",
+     ("parent",), "idx_systemnode_parent_sort"),
+    ("create.next_sort_order", "SystemNode",
+     "SELECT COALESCE(MAX(SortOrder), 0) + 1 FROM SystemNode WHERE ParentID <=> %s",
+     ("parent",), "idx_systemnode_parent_sort"),
+    ("move_node.close_gap", "SystemNode",
+     "UPDATE SystemNode SET SortOrder = SortOrder - 1 WHERE ParentID <=> %s AND SortOrder > %s",
+     ("parent", "sort"), "idx_systemnode_parent_sort"),
+    ("resolve_path.step", "SystemNode",
+     "SELECT ID FROM SystemNode WHERE ParentID = %s AND Name = %s ORDER BY SortOrder, ID LIMIT 1",
+     ("parent", "name"), "idx_systemnode_parent_name"),
+    ("subtree_stats.read", "SystemNodeStatusRollup",
+     "SELECT Status, Descendants FROM SystemNodeStatusRollup WHERE NodeID = %s", ("id",), "PRIMARY"),
+    ("change_log.changes_since", "SystemNodeChange",
+     "SELECT DISTINCT NodeID FROM SystemNodeChange WHERE Version > %s", ("version",), "PRIMARY"),
+]
+
+# EXPLAIN notes meaning the optimizer needed no index at all (e.g. MAX() read from the index
+# end, or a constant lookup that matched nothing).
+_NO_ACCESS_NEEDED = ("Select tables optimized away", "no matching row in const table", "Impossible WHERE")
+
+
+def _existing_indexes(cursor, table: str) -> Dict[str, Tuple[str, ...]]:
+    cursor.execute("""
+        SELECT INDEX_NAME, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+    indexes: Dict[str, Tuple[str, ...]] = {}
+    for index_name, column_name in cursor.fetchall():
+        indexes[index_name] = indexes.get(index_name, ()) + (column_name,)
+    return indexes
+
+
+def missing_indexes(existing: Dict[str, Dict[str, Tuple[str, ...]]]) -> List[dict]:
+    """
+    Required indexes with no existing index starting with the same columns.
+    existing: table -> {index name: columns}; tables that do not exist are skipped.
+    """
+    missing = []
+    for table, required in REQUIRED_INDEXES.items():
+        if table not in existing:
+            continue
+        for name, columns in required:
+            if not any(cols[:len(columns)] == columns for cols in existing[table].values()):
+                missing.append({"table": table, "index": name, "columns": list(columns),
+                                "fix": f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"})
+    return missing
+
+
+def redundant_indexes(existing: Dict[str, Dict[str, Tuple[str, ...]]]) -> List[dict]:
+    """
+    Secondary indexes whose columns are a leading prefix of another index on the same table
+    (e.g. a bare ParentID index next to (ParentID, SortOrder)); they cost writes and serve nothing extra.
+    """
+    redundant = []
+    for table, indexes in existing.items():
+        for name, columns in indexes.items():
+            if name == "PRIMARY":
+                continue
+            for other_name, other_columns in indexes.items():
+                longer = len(other_columns) > len(columns) or (other_columns == columns and other_name < name)
+                if other_name != name and longer and other_columns[:len(columns)] == columns:
+                    redundant.append({"table": table, "index": name, "columns": list(columns),
+                                      "covered_by": other_name})
+                    break
+    return redundant
+
+
+def explain_problems(rows: List[dict], expected_index: str) -> List[str]:
+    """
+    What is wrong with one query's EXPLAIN rows (traditional format), if anything.
+    """
+    problems = []
+    for row in rows:
+        extra = row.get("Extra") or ""
+        if any(note in extra for note in _NO_ACCESS_NEEDED):
+            continue
+        if row.get("type") == "ALL":
+            problems.append(f"full table scan of {row.get('table')} (expected {expected_index})")
+        elif not row.get("key"):
+            problems.append(f"no index used on {row.get('table')} (expected {expected_index})")
+        if "filesort" in extra:
+            problems.append("sorts with filesort")
+    return problems
+
+
+def _unused_indexes(cursor) -> Optional[List[dict]]:
+    """
+    Secondary indexes with no reads since the server started (performance_schema), or None
+    when performance_schema is unavailable.
+    """
+    try:
+        cursor.execute("""
+            SELECT OBJECT_NAME, INDEX_NAME
+            FROM performance_schema.table_io_waits_summary_by_index_usage
+            WHERE OBJECT_SCHEMA = DATABASE() AND INDEX_NAME IS NOT NULL AND INDEX_NAME <> 'PRIMARY'
+              AND COUNT_READ = 0
+            ORDER BY OBJECT_NAME, INDEX_NAME
+        """)
+    except Exception:
+        return None
+    return [{"table": table, "index": index} for table, index in cursor.fetchall() if table in REQUIRED_INDEXES]
+
+
+def _has_parent_foreign_key(cursor) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'SystemNode'
+          AND COLUMN_NAME = 'ParentID' AND REFERENCED_TABLE_NAME = 'SystemNode'
+    """)
+    (count,) = cursor.fetchone()
+    return count > 0
+
+
+def check_indexes(dao: SystemNodeDAO) -> dict:
+    """
+    Compare a live database with the DAO's query patterns: missing and redundant indexes,
+    indexes unused since server start, and EXPLAIN output for every hot query.
+    "ok" is False if anything needs attention.
+    """
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor()
+        existing = {}
+        for table in REQUIRED_INDEXES:
+            indexes = _existing_indexes(cursor, table)
+            if indexes:
+                existing[table] = indexes
+
+        cursor.execute("SELECT ParentID, ID, SortOrder, Name FROM SystemNode WHERE ParentID IS NOT NULL LIMIT 1")
+        sample = cursor.fetchone() or (1, 1, 0, "")
+        values = {"parent": sample[0], "id": sample[1], "sort": sample[2], "name": sample[3], "version": 0}
+
+        explain_cursor = conn.cursor(dictionary=True)
+        queries = []
+        for name, table, sql, params, expected_index in QUERY_PATTERNS:
+            if table not in existing:
+                continue
+            explain_cursor.execute("EXPLAIN " + sql, tuple(values[p] for p in params))
+            rows = explain_cursor.fetchall()
+            queries.append({"name": name, "sql": sql, "expected_index": expected_index, "explain": rows,
+                            "problems": explain_problems(rows, expected_index)})
+        explain_cursor.close()
+
+        report = {
+            "schema_version": None,
+            "missing": missing_indexes(existing),
+            "redundant": redundant_indexes(existing),
+            "unused": _unused_indexes(cursor),
+            "parent_foreign_key": _has_parent_foreign_key(cursor) if "SystemNode" in existing else None,
+            "queries": queries,
+        }
+        cursor.close()
+    finally:
+        conn.close()
+
+    report["schema_version"] = current_version(dao)
+    report["ok"] = (not report["missing"] and not report["redundant"] and report["parent_foreign_key"] is not False
+                    and not any(q["problems"] for q in queries))
+    return report
@@ -0,0 +1,689 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Optional, List, Dict, Tuple, Callable, Any
+import mysql.connector
+from src.config import db_config_from_env, shard_configs_from_env
+from src.dao.subtree_sql import SubtreeSkipped, chunks, collect_subtree, in_list
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend, split_path
+from src.dao.system_node_dao import SystemNodeDAO, RETRYABLE_ERRNOS
+from src.metrics import metrics
+
+SHARD_DIRECTORY_DDL = """
+    CREATE TABLE IF NOT EXISTS ShardDirectory (
+        RootID BIGINT NOT NULL PRIMARY KEY,
+        Shard VARCHAR(64) NOT NULL,
+        AssignedAt TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+        KEY idx_sharddirectory_shard (Shard)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# The decision log of cross-shard moves: a move is committed exactly when its 'commit' row exists.
+SHARD_MOVE_DDL = """
+    CREATE TABLE IF NOT EXISTS ShardMove (
+        Xid VARCHAR(64) NOT NULL PRIMARY KEY,
+        NodeID BIGINT NULL,
+        FromShard VARCHAR(64) NULL,
+        ToShard VARCHAR(64) NULL,
+        Outcome VARCHAR(8) NOT NULL,
+        DecidedAt TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# Shard i hands out IDs from i << ID_SHARD_BITS (see init_shards), so an ID names the shard it was
+# created on. That is only a hint: cross-shard moves keep IDs, and lookups fall back to every shard.
+# A shard never holds IDs above its own range: InnoDB would raise its AUTO_INCREMENT past them, into
+# the next shard's range, and both would hand out the same IDs.
+ID_SHARD_BITS = 40
+XID_PREFIX = "shardmove-"
+
+LOCK_CHILDREN_SQL = """
+    SELECT ID, SortOrder
+    FROM SystemNode
+    WHERE ParentID <=> %s
+    ORDER BY SortOrder
+    FOR UPDATE
+"""
+
+INSERT_NODE_WITH_ID_SQL = """
+    INSERT INTO SystemNode (
+        ID, ParentID, Name, Description, Notes,
+        Tags, Metadata, Status, Importance, SortOrder
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _insert_params(node: SystemNode) -> tuple:
+    return (node.ID, node.ParentID, node.Name, node.Description, node.Notes,
+            json.dumps(node.Tags) if node.Tags else None,
+            json.dumps(node.Metadata) if node.Metadata else None,
+            node.Status, node.Importance, node.SortOrder)
+
+
+# -----------------------------------------------------------
+# DIRECTORY
+# -----------------------------------------------------------
+class ShardDirectory:
+    def __init__(self, db_config: dict):
+        """
+        Which shard holds each top-level node (and so its whole subtree), in the ShardDirectory
+        table of the db_config database. The table is small (one row per root), so it is read once
+        and kept in memory; assign/remove keep the copy current. Another process's changes show
+        up after refresh(); until then the sharded DAO's fallback lookups cover them.
+        """
+        self.db_config = db_config
+        self._roots: Optional[Dict[int, str]] = None
+        self._lock = threading.Lock()
+
+    def _get_connection(self):
+        return mysql.connector.connect(**self.db_config)
+
+    def ensure_tables(self) -> None:
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(SHARD_DIRECTORY_DDL)
+            cursor.execute(SHARD_MOVE_DDL)
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    def refresh(self) -> Dict[int, str]:
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT RootID, Shard FROM ShardDirectory")
+            roots = {root_id: shard for root_id, shard in cursor.fetchall()}
+            cursor.close()
+        finally:
+            conn.close()
+        with self._lock:
+            self._roots = roots
+        return roots
+
+    def roots(self) -> Dict[int, str]:
+        return dict(self._roots if self._roots is not None else self.refresh())
+
+    def shard_of_root(self, root_id: int) -> Optional[str]:
+        if self._roots is None:
+            self.refresh()
+        return self._roots.get(root_id)
+
+    def place(self, shards: List[str]) -> str:
+        """
+        The shard for a new top-level node: the one holding the fewest roots.
+        """
+        counts = {shard: 0 for shard in shards}
+        for shard in self.roots().values():
+            if shard in counts:
+                counts[shard] += 1
+        return min(shards, key=lambda shard: counts[shard])
+
+    def assign(self, root_id: int, shard: str) -> None:
+        self._write("""
+            INSERT INTO ShardDirectory (RootID, Shard) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE Shard = VALUES(Shard)
+        """, (root_id, shard))
+        self._remember(root_id, shard)
+
+    def remove(self, root_id: int) -> None:
+        self._write("DELETE FROM ShardDirectory WHERE RootID = %s", (root_id,))
+        self._remember(root_id, None)
+
+    def _write(self, sql: str, params: tuple) -> None:
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    def _remember(self, root_id: int, shard: Optional[str]) -> None:
+        with self._lock:
+            if self._roots is None:
+                return
+            if shard is None:
+                self._roots.pop(root_id, None)
+            else:
+                self._roots[root_id] = shard
+
+    def decide(self, xid: str, node_id: int, from_shard: str, to_shard: str, was_root: bool,
+               root_shard: Optional[str]) -> bool:
+        """
+        The commit point of a cross-shard move: record the 'commit' decision and the moved node's
+        new directory entry (root_shard, or none if it is no longer top-level) in one transaction.
+        Returns False if recover() already decided 'abort' for xid.
+        """
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    INSERT INTO ShardMove (Xid, NodeID, FromShard, ToShard, Outcome)
+                    VALUES (%s, %s, %s, %s, 'commit')
+                """, (xid, node_id, from_shard, to_shard))
+            except mysql.connector.IntegrityError:
+                conn.rollback()
+                return False
+            if root_shard is not None:
+                cursor.execute("""
+                    INSERT INTO ShardDirectory (RootID, Shard) VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE Shard = VALUES(Shard)
+                """, (node_id, root_shard))
+            elif was_root:
+                cursor.execute("DELETE FROM ShardDirectory WHERE RootID = %s", (node_id,))
+            conn.commit()
+            cursor.close()
+        except:  # noqa
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        if root_shard is not None or was_root:
+            self._remember(node_id, root_shard)
+        return True
+
+    def resolve(self, xid: str) -> str:
+        """
+        The outcome of a prepared move, 'commit' or 'abort'; an undecided move is decided 'abort'.
+        """
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("INSERT IGNORE INTO ShardMove (Xid, Outcome) VALUES (%s, 'abort')", (xid,))
+            conn.commit()
+            cursor.execute("SELECT Outcome FROM ShardMove WHERE Xid = %s", (xid,))
+            (outcome,) = cursor.fetchone()
+            cursor.close()
+            return outcome
+        finally:
+            conn.close()
+
+
+# -----------------------------------------------------------
+# SHARDED BACKEND
+# -----------------------------------------------------------
+class ShardedSystemNodeDAO(SystemNodeBackend):
+    def __init__(self, shards: Dict[str, SystemNodeBackend], directory: ShardDirectory,
+                 max_move_rows: int = 10000, locator_size: int = 100000, move_retries: int = 5,
+                 move_backoff_seconds: float = 0.01):
+        """
+        Spreads the tree over several databases by top-level node: each root and its whole
+        subtree live on one shard (shards: name -> backend, in ID-range order), recorded in the
+        directory. Reads inside a subtree and every write go to that one shard; the top-level
+        list, read_all and path lookups query all shards in parallel and merge.
+
+        SortOrder of top-level nodes is per shard: the merged top-level list is ordered by
+        (SortOrder, ID), and moving a root to the top level keeps it on its shard.
+
+        update cannot reparent across shards (ValueError); move_node can. A cross-shard move
+        copies the subtree (same IDs) to the new parent's shard and deletes it from the old one
+        under XA two-phase commit on both MySQL shards, with the decision recorded in the
+        directory's ShardMove table; recover() finishes moves interrupted after PREPARE.
+        Subtrees larger than max_move_rows are refused (ValueError), and so are subtrees with IDs
+        above the target shard's range (created on a later shard), which it cannot hold.
+
+        The shard of a node is found from, in order: a per-process LRU of locator_size IDs, the
+        directory (roots), the ID range it was created in, then all shards in parallel.
+
+        Counters: dao.shard.fan_out, dao.shard.locate_fallback, dao.shard.cross_moves,
+        dao.shard.move_retries, dao.shard.commit_deferred.
+        """
+        self.shards = dict(shards)
+        self.directory = directory
+        self.max_move_rows = max_move_rows
+        self.locator_size = locator_size
+        self.move_retries = move_retries
+        self.move_backoff_seconds = move_backoff_seconds
+        self._names = list(self.shards)
+        self._locator: "OrderedDict[int, str]" = OrderedDict()
+        self._locator_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="shard-fan-out")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # -----------------------------------------------------------
+    # ROUTING
+    # -----------------------------------------------------------
+    def _fan_out(self, fn: Callable[[str], Any], names: Optional[List[str]] = None) -> List[Any]:
+        """
+        fn(shard name) for every shard (or those named) in parallel; results in the same order.
+        """
+        metrics.incr("dao.shard.fan_out")
+        return list(self._executor.map(fn, names or self._names))
+
+    def _remember(self, node_ids: List[int], shard: Optional[str]) -> None:
+        with self._locator_lock:
+            for node_id in node_ids:
+                if shard is None:
+                    self._locator.pop(node_id, None)
+                    continue
+                self._locator[node_id] = shard
+                self._locator.move_to_end(node_id)
+            while len(self._locator) > self.locator_size:
+                self._locator.popitem(last=False)
+
+    def _candidates(self, node_id: int) -> List[str]:
+        """
+        Likely shards for node_id, best guess first (each still has to be checked).
+        """
+        with self._locator_lock:
+            cached = self._locator.get(node_id)
+        index = node_id >> ID_SHARD_BITS
+        born = self._names[index] if 0 <= index < len(self._names) else None
+        candidates = [cached, self.directory.shard_of_root(node_id), born]
+        return list(dict.fromkeys(name for name in candidates if name is not None))
+
+    def _locate(self, node_id: int) -> Tuple[Optional[str], Optional[SystemNode]]:
+        """
+        (shard, node) for node_id, or (None, None) if no shard has it.
+        """
+        tried = self._candidates(node_id)
+        for name in tried:
+            node = self.shards[name].read(node_id)
+            if node is not None:
+                self._remember([node_id], name)
+                return name, node
+        others = [name for name in self._names if name not in tried]
+        if others:
+            metrics.incr("dao.shard.locate_fallback")
+            for name, node in zip(others, self._fan_out(lambda name: self.shards[name].read(node_id), others)):
+                if node is not None:
+                    self._remember([node_id], name)
+                    return name, node
+        return None, None
+
+    def _shard_for_write(self, parent_id: int) -> str:
+        # A missing parent is left to the shard it would be on, which rejects it as unsharded MySQL does
+        name, _ = self._locate(parent_id)
+        return name or (self._candidates(parent_id) or self._names)[0]
+
+    # -----------------------------------------------------------
+    # READS
+    # -----------------------------------------------------------
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        return self._locate(node_id)[1]
+
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        if parent_id is None:
+            lists = self._fan_out(lambda name: self.shards[name].read_by_parent(None))
+            nodes = [node for children in lists for node in children]
+            return sorted(nodes, key=lambda node: (node.SortOrder, node.ID))
+        # Children live with their parent: a non-empty list from the likeliest shard is the answer
+        candidates = self._candidates(parent_id)
+        if candidates:
+            children = self.shards[candidates[0]].read_by_parent(parent_id)
+            if children:
+                return children
+        name, _ = self._locate(parent_id)
+        if name is None or (candidates and name == candidates[0]):
+            return []
+        return self.shards[name].read_by_parent(parent_id)
+
+    def read_all(self) -> List[SystemNode]:
+        nodes = [node for nodes in self._fan_out(lambda name: self.shards[name].read_all()) for node in nodes]
+        return sorted(nodes, key=lambda node: (node.ParentID is not None, node.ParentID or 0, node.SortOrder, node.ID))
+
+    def resolve_path(self, path: str) -> Optional[SystemNode]:
+        return self.resolve_paths([path])[0]
+
+    def resolve_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        """
+        Finds each distinct first segment on every shard in parallel, keeps the first root by
+        (SortOrder, ID), then resolves the paths in one batch per shard that owns a root.
+        """
+        firsts = [split_path(path)[0] for path in paths]
+        names = list(dict.fromkeys(firsts))
+        found = self._fan_out(lambda shard: self.shards[shard].resolve_paths([f"/{name}" for name in names]))
+        owner = {}
+        for i, name in enumerate(names):
+            roots = [(nodes[i].SortOrder, nodes[i].ID, shard) for shard, nodes in zip(self._names, found) if nodes[i]]
+            if roots:
+                owner[name] = min(roots)[2]
+
+        by_shard: Dict[str, List[int]] = {}
+        for i, first in enumerate(firsts):
+            if first in owner:
+                by_shard.setdefault(owner[first], []).append(i)
+        results: List[Optional[SystemNode]] = [None] * len(paths)
+        shard_names = list(by_shard)
+        batches = self._fan_out(lambda name: self.shards[name].resolve_paths([paths[i] for i in by_shard[name]]),
+                                shard_names) if shard_names else []
+        for name, nodes in zip(shard_names, batches):
+            for i, node in zip(by_shard[name], nodes):
+                results[i] = node
+        return results
+
+    # -----------------------------------------------------------
+    # WRITES
+    # -----------------------------------------------------------
+    def create(self, node: SystemNode) -> int:
+        """
+        A top-level node goes to the shard with the fewest roots and is entered in the
+        directory (the row is deleted again if that fails); any other node joins its parent.
+        """
+        if node.ParentID is not None:
+            name = self._shard_for_write(node.ParentID)
+            new_id = self.shards[name].create(node)
+            self._remember([new_id], name)
+            return new_id
+
+        name = self.directory.place(self._names)
+        shard = self.shards[name]
+        new_id = shard.create(node)
+        try:
+            self.directory.assign(new_id, name)
+        except:  # noqa
+            created = shard.read(new_id)
+            if created is not None:
+                shard.delete(created)
+            raise
+        self._remember([new_id], name)
+        return new_id
+
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        name, _ = self._locate(old.ID)
+        if name is None:
+            return False
+        if new.ParentID is not None and new.ParentID != old.ParentID:
+            parent_shard, _ = self._locate(new.ParentID)
+            if parent_shard is not None and parent_shard != name:
+                raise ValueError(f"Node {new.ParentID} is on another shard; use move_node to reparent across shards")
+        updated = self.shards[name].update(old, new)
+        if updated and (old.ParentID is None) != (new.ParentID is None):
+            if new.ParentID is None:
+                self.directory.assign(old.ID, name)
+            else:
+                self.directory.remove(old.ID)
+        return updated
+
+    def delete(self, old: SystemNode) -> bool:
+        name, _ = self._locate(old.ID)
+        if name is None:
+            return False
+        deleted = self.shards[name].delete(old)
+        if deleted:
+            self._remember([old.ID], None)
+            if old.ParentID is None:
+                self.directory.remove(old.ID)
+        return deleted
+
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        """
+        Within a shard this is the shard's own move_node; to a parent on another shard the whole
+        subtree moves (see move_across). A root moved to the top level stays on its shard.
+        """
+        name, node = self._locate(node_id)
+        if name is None:
+            return False
+        target = name if new_parent_id is None else self._shard_for_write(new_parent_id)
+        if target != name:
+            return self.move_across(node_id, name, target, new_parent_id, target_index)
+
+        moved = self.shards[name].move_node(node_id, new_parent_id, target_index)
+        if moved and (node.ParentID is None) != (new_parent_id is None):
+            if new_parent_id is None:
+                self.directory.assign(node_id, name)
+            else:
+                self.directory.remove(node_id)
+        return moved
+
+    def move_root(self, root_id: int, shard: str) -> bool:
+        """
+        Rebalance: move a top-level node and its subtree to another shard, at the end of that
+        shard's top-level list. Returns False if the node does not exist.
+        """
+        if shard not in self.shards:
+            raise ValueError(f"Unknown shard '{shard}'")
+        name, node = self._locate(root_id)
+        if name is None:
+            return False
+        if node.ParentID is not None:
+            raise ValueError(f"Node {root_id} is not a top-level node")
+        if name == shard:
+            return True
+        return self.move_across(root_id, name, shard, None, None)
+
+    # -----------------------------------------------------------
+    # CROSS-SHARD MOVES (XA two-phase commit)
+    # -----------------------------------------------------------
+    def move_across(self, node_id: int, source: str, target: str, new_parent_id: Optional[int],
+                    target_index: Optional[int]) -> bool:
+        """
+        Move node_id's subtree from the source shard to new_parent_id on the target shard,
+        retrying (like move_node) on deadlocks, lock-wait timeouts and concurrent changes.
+        """
+        metrics.incr("dao.shard.cross_moves")
+        for attempt in range(self.move_retries + 1):
+            try:
+                moved = self._move_across_once(node_id, source, target, new_parent_id, target_index)
+                if moved is not None:
+                    return moved
+            except mysql.connector.Error as e:
+                if e.errno not in RETRYABLE_ERRNOS or attempt == self.move_retries:
+                    raise
+            metrics.incr("dao.shard.move_retries")
+            time.sleep(self.move_backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5))
+        raise RuntimeError(f"Node {node_id} kept changing during the cross-shard move ({self.move_retries} retries)")
+
+    def _move_across_once(self, node_id: int, source: str, target: str, new_parent_id: Optional[int],
+                          target_index: Optional[int]) -> Optional[bool]:
+        """
+        One attempt. Both shards run an XA branch with the same xid: the source locks the old
+        sibling list and the subtree (move_node's and archiving's lock order), the target locks
+        the new parent's child list; the rows are inserted top-down on the target and deleted
+        bottom-up on the source, and both branches are prepared before the directory records
+        the decision. Returns None when the node or the new parent changed under us.
+        """
+        src_dao, dst_dao = self.shards[source], self.shards[target]
+        xid = f"{XID_PREFIX}{uuid.uuid4().hex}"
+        src_conn, dst_conn = src_dao._get_connection(), dst_dao._get_connection()
+        decided = False
+        cursors = ()
+        try:
+            src, dst = cursors = src_conn.cursor(dictionary=True), dst_conn.cursor(dictionary=True)
+            for cursor in (src, dst):
+                cursor.execute(f"XA START '{xid}'")
+
+            # 1) Source: the old sibling list, then the subtree
+            src.execute("SELECT ParentID FROM SystemNode WHERE ID = %s", (node_id,))
+            row = src.fetchone()
+            if not row:
+                self._xa_rollback(cursors, xid)
+                return False
+            old_parent = row["ParentID"]
+            src.execute(LOCK_CHILDREN_SQL, (old_parent,))
+            old_siblings = {r["ID"]: r["SortOrder"] for r in src.fetchall()}
+            if node_id not in old_siblings:
+                self._xa_rollback(cursors, xid)
+                return None
+            try:
+                levels = collect_subtree(src, "SystemNode", node_id, self.max_move_rows, lock=True)
+            except SubtreeSkipped:
+                raise ValueError(f"Subtree under {node_id} has more than {self.max_move_rows} nodes to move")
+            limit = self._id_limit(target)
+            if limit is not None and max(r["ID"] for level in levels for r in level) >= limit:
+                raise ValueError(f"Subtree under {node_id} has IDs above shard '{target}''s range "
+                                 "(created on a later shard), so it cannot move there")
+
+            # 2) Target: the new parent and its child list
+            if new_parent_id is not None:
+                dst.execute("SELECT ID FROM SystemNode WHERE ID = %s FOR UPDATE", (new_parent_id,))
+                if not dst.fetchall():
+                    self._xa_rollback(cursors, xid)
+                    return None
+            dst.execute(LOCK_CHILDREN_SQL, (new_parent_id,))
+            next_pos = max((r["SortOrder"] for r in dst.fetchall()), default=0) + 1
+            if target_index is not None and target_index < next_pos:
+                new_sort_order = max(target_index, 1)
+                dst.execute("""
+                    UPDATE SystemNode
+                    SET SortOrder = SortOrder + 1
+                    WHERE ParentID <=> %s
+                      AND SortOrder >= %s
+                """, (new_parent_id, new_sort_order))
+            else:
+                new_sort_order = next_pos
+
+            # 3) Copy top-down (parents before children, for the foreign key), keeping the IDs
+            moved_ids = []
+            for depth, level in enumerate(levels):
+                nodes = [src_dao._row_to_node(r) for r in level]
+                if depth == 0:
+                    nodes = [replace(nodes[0], ParentID=new_parent_id, SortOrder=new_sort_order)]
+                dst.executemany(INSERT_NODE_WITH_ID_SQL, [_insert_params(n) for n in nodes])
+                for n in nodes:
+                    for hook in dst_dao.write_hooks:
+                        hook.on_create(dst_conn, n)
+                moved_ids.extend(n.ID for n in nodes)
+            for hook in dst_dao.write_hooks:
+                hook.on_reorder(dst_conn, new_parent_id)
+
+            # 4) Delete bottom-up on the source and close the gap
+            for level in reversed(levels):
+                for chunk in chunks([r["ID"] for r in level]):
+                    src.execute(f"DELETE FROM SystemNode WHERE ID IN ({in_list(chunk)})", tuple(chunk))
+                for r in level:
+                    for hook in src_dao.write_hooks:
+                        hook.on_delete(src_conn, src_dao._row_to_node(r))
+            src.execute("""
+                UPDATE SystemNode
+                SET SortOrder = SortOrder - 1
+                WHERE ParentID <=> %s
+                  AND SortOrder > %s
+            """, (old_parent, old_siblings[node_id]))
+            for hook in src_dao.write_hooks:
+                hook.on_reorder(src_conn, old_parent)
+
+            # 5) Prepare both branches, then 6) the decision row is the commit point
+            for cursor in (src, dst):
+                cursor.execute(f"XA END '{xid}'")
+                cursor.execute(f"XA PREPARE '{xid}'")
+            root_shard = target if new_parent_id is None else None
+            if not self.directory.decide(xid, node_id, source, target, old_parent is None, root_shard):
+                self._xa_rollback(cursors, xid)  # recover() aborted it between PREPARE and the decision
+                return None
+            decided = True
+
+            # 7) Phase two; a branch that fails here stays prepared until recover() commits it
+            for cursor in (src, dst):
+                try:
+                    cursor.execute(f"XA COMMIT '{xid}'")
+                except mysql.connector.Error:
+                    metrics.incr("dao.shard.commit_deferred")
+            self._remember(moved_ids, target)
+            for shard_dao in (src_dao, dst_dao):
+                shard_dao._note_write()
+            return True
+        except:  # noqa
+            if not decided:
+                self._xa_rollback(cursors, xid)
+            raise
+        finally:
+            src_conn.close()
+            dst_conn.close()
+
+    def _id_limit(self, shard: str) -> Optional[int]:
+        """
+        The first ID past shard's range, or None for the last shard.
+        """
+        index = self._names.index(shard)
+        return (index + 1) << ID_SHARD_BITS if index + 1 < len(self._names) else None
+
+    @staticmethod
+    def _xa_rollback(cursors, xid: str) -> None:
+        # Each branch may be active, idle or prepared (or already rolled back by recover())
+        for cursor in cursors:
+            for statement in ("XA END", "XA ROLLBACK"):
+                try:
+                    cursor.execute(f"{statement} '{xid}'")
+                except mysql.connector.Error:
+                    pass
+
+    def recover(self) -> dict:
+        """
+        Finish cross-shard moves left prepared by a crash or a failed phase two: commit the
+        branches of moves with a 'commit' decision, roll back the rest (deciding 'abort' first,
+        so a mover that has not reached its decision yet backs out too). Safe to run at any time.
+        """
+        result = {"committed": [], "rolled_back": []}
+        for name, shard in self.shards.items():
+            conn = shard._get_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("XA RECOVER")
+                xids = [row[3].decode() if isinstance(row[3], (bytes, bytearray)) else row[3]
+                        for row in cursor.fetchall()]
+                for xid in xids:
+                    if not xid.startswith(XID_PREFIX):
+                        continue
+                    if self.directory.resolve(xid) == "commit":
+                        cursor.execute(f"XA COMMIT '{xid}'")
+                        result["committed"].append(f"{name}:{xid}")
+                    else:
+                        cursor.execute(f"XA ROLLBACK '{xid}'")
+                        result["rolled_back"].append(f"{name}:{xid}")
+                cursor.close()
+            finally:
+                conn.close()
+        with self._locator_lock:
+            self._locator.clear()
+        return result
+
+    # -----------------------------------------------------------
+    # SETUP
+    # -----------------------------------------------------------
+    def init_shards(self) -> dict:
+        """
+        Create the directory tables, migrate every shard, start shard i's IDs at
+        i << ID_SHARD_BITS and enter the roots already on each shard in the directory.
+        Idempotent, so it also registers a pre-existing unsharded database as the first shard.
+        """
+        from src.dao.schema import migrate
+
+        self.directory.ensure_tables()
+        result = {}
+        for index, (name, shard) in enumerate(self.shards.items()):
+            migrate(shard)
+            base = index << ID_SHARD_BITS
+            if index:
+                # MySQL ignores an AUTO_INCREMENT at or below the IDs in use
+                conn = shard._get_connection()
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(f"ALTER TABLE SystemNode AUTO_INCREMENT = {base}")
+                    cursor.close()
+                finally:
+                    conn.close()
+            roots = shard.read_by_parent(None)
+            for root in roots:
+                self.directory.assign(root.ID, name)
+            result[name] = {"id_base": base, "roots": len(roots)}
+        return result
+
+
+def sharded_dao_from_env(**dao_kwargs) -> Optional[ShardedSystemNodeDAO]:
+    """
+    DB_SHARDS="s0=db_a,s1=host2:3307/db_b" (see shard_configs_from_env) shards the tree over those
+    databases, with the directory in the DB_NAME database. dao_kwargs go to each shard's
+    SystemNodeDAO. DB_SHARD_MAX_MOVE_ROWS (default 10000) caps cross-shard moves. None without DB_SHARDS.
+    """
+    db_config = db_config_from_env()
+    shard_configs = shard_configs_from_env(db_config)
+    if not shard_configs:
+        return None
+    shards = {name: SystemNodeDAO(config, **dao_kwargs) for name, config in shard_configs.items()}
+    return ShardedSystemNodeDAO(shards, ShardDirectory(db_config),
+                                max_move_rows=int(os.getenv("DB_SHARD_MAX_MOVE_ROWS", "10000")))
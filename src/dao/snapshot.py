@@ -0,0 +1,226 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+
+# File layout (all little-endian, every section 8-byte aligned):
+#   header      magic, format version, flags, change version, node count, string count, blob bytes
+#   int64[n]    ID (ascending), ParentID (0 = NULL), SortOrder, Importance
+#   int64[s+1]  string offsets into the blob
+#   int32[n]    string refs (-1 = NULL) for Name, Description, Notes, Tags, Metadata, Status
+#   bytes       UTF-8 string blob (each distinct string stored once)
+MAGIC = b"SNSNAP01"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIqQQQ")
+INT_COLUMNS = ("ID", "ParentID", "SortOrder", "Importance")
+STRING_COLUMNS = ("Name", "Description", "Notes", "Tags", "Metadata", "Status")
+_JSON_COLUMNS = ("Tags", "Metadata")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _pad(length: int) -> int:
+    return -length % 8
+
+
+def _to_le_bytes(values: array) -> bytes:
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+# -----------------------------------------------------------
+# WRITE
+# -----------------------------------------------------------
+def write_snapshot(nodes: Iterable[SystemNode], path: str, change_version: int = 0) -> int:
+    """
+    Write nodes to a snapshot file stamped with change_version. The file is written next to
+    `path` and renamed into place, so readers never see a partial snapshot. Returns the node count.
+    """
+    nodes = sorted(nodes, key=lambda n: n.ID)
+    ints = {column: array("q") for column in INT_COLUMNS}
+    refs = {column: array("i") for column in STRING_COLUMNS}
+    string_ids: dict = {}
+    offsets = array("q", [0])
+    blob = bytearray()
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        ref = string_ids.get(value)
+        if ref is None:
+            ref = string_ids[value] = len(string_ids)
+            blob.extend(value.encode("utf-8"))
+            offsets.append(len(blob))
+        return ref
+
+    for node in nodes:
+        ints["ID"].append(node.ID)
+        ints["ParentID"].append(node.ParentID or 0)
+        ints["SortOrder"].append(node.SortOrder or 0)
+        ints["Importance"].append(node.Importance or 0)
+        for column in STRING_COLUMNS:
+            value = getattr(node, column)
+            if column in _JSON_COLUMNS:
+                value = json.dumps(value, separators=(",", ":")) if value else None
+            refs[column].append(intern(value))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, change_version, len(nodes), len(string_ids), len(blob)))
+            for column in INT_COLUMNS:
+                f.write(_to_le_bytes(ints[column]))
+            f.write(_to_le_bytes(offsets))
+            for column in STRING_COLUMNS:
+                f.write(_to_le_bytes(refs[column]))
+            f.write(b"\0" * _pad(4 * len(nodes) * len(STRING_COLUMNS)))
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except:  # noqa
+        os.unlink(tmp_path)
+        raise
+    return len(nodes)
+
+
+def create_snapshot(dao: SystemNodeDAO, change_log, path: str) -> dict:
+    """
+    Snapshot a MySQL tree. The rows and the change version are read in one consistent-snapshot
+    transaction, so changes_since(change_version) covers exactly what the file is missing.
+    """
+    conn = dao._get_connection()
+    try:
+        conn.start_transaction(consistent_snapshot=True, readonly=True)
+        version_cursor = conn.cursor()
+        change_version = change_log.safe_version(version_cursor)
+        version_cursor.close()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT
+                ID, ParentID, Name, Description, Notes,
+                Tags, Metadata, Status, Importance, SortOrder
+            FROM SystemNode
+            ORDER BY ID
+        """)
+        nodes = [SystemNodeDAO._row_to_node(row) for row in cursor.fetchall()]
+        cursor.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+    count = write_snapshot(nodes, path, change_version)
+    return {"nodes": count, "change_version": change_version, "bytes": os.path.getsize(path), "path": path}
+
+
+# -----------------------------------------------------------
+# READ
+# -----------------------------------------------------------
+class Snapshot:
+    def __init__(self, path: str):
+        """
+        A memory-mapped snapshot file. Opening it only reads the header: columns are views
+        into the mapping, and nodes are decoded one at a time by index() / find() / iter_nodes().
+        Call close() (or use it as a context manager) when done.
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, self.change_version, count, string_count, blob_bytes = \
+                _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} SystemNode snapshot")
+            expected = (_HEADER.size + 8 * count * len(INT_COLUMNS) + 8 * (string_count + 1)
+                        + 4 * count * len(STRING_COLUMNS) + _pad(4 * count * len(STRING_COLUMNS)) + blob_bytes)
+            if len(self._mmap) != expected:
+                raise ValueError(f"{path} is truncated or corrupt ({len(self._mmap)} bytes, expected {expected})")
+
+            self._view = memoryview(self._mmap)
+            self._views: List[memoryview] = []
+            position = _HEADER.size
+            self.count = count
+            self.columns = {}
+            for column in INT_COLUMNS:
+                self.columns[column] = self._column(position, count, "q")
+                position += 8 * count
+            self._offsets = self._column(position, string_count + 1, "q")
+            position += 8 * (string_count + 1)
+            for column in STRING_COLUMNS:
+                self.columns[column] = self._column(position, count, "i")
+                position += 4 * count
+            position += _pad(4 * count * len(STRING_COLUMNS))
+            self._blob = self._slice(position, position + blob_bytes)
+        except:  # noqa
+            self.close()
+            raise
+
+    def _slice(self, start: int, end: int) -> memoryview:
+        view = self._view[start:end]
+        self._views.append(view)
+        return view
+
+    def _column(self, position: int, length: int, typecode: str):
+        view = self._slice(position, position + length * array(typecode).itemsize)
+        if _LITTLE_ENDIAN:
+            column = view.cast(typecode)
+            self._views.append(column)
+            return column
+        column = array(typecode, view.tobytes())
+        column.byteswap()
+        return column
+
+    def close(self) -> None:
+        for view in reversed(getattr(self, "_views", [])):
+            view.release()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _string(self, ref: int) -> Optional[str]:
+        if ref < 0:
+            return None
+        return str(self._blob[self._offsets[ref]:self._offsets[ref + 1]], "utf-8")
+
+    def index(self, i: int) -> SystemNode:
+        """
+        The i-th node in ID order.
+        """
+        strings = {column: self._string(self.columns[column][i]) for column in STRING_COLUMNS}
+        for column in _JSON_COLUMNS:
+            strings[column] = json.loads(strings[column]) if strings[column] else {}
+        return SystemNode(
+            ID=self.columns["ID"][i],
+            ParentID=self.columns["ParentID"][i] or None,
+            SortOrder=self.columns["SortOrder"][i],
+            Importance=self.columns["Importance"][i],
+            **strings
+        )
+
+    def find(self, node_id: int) -> Optional[SystemNode]:
+        """
+        Look one node up by ID (binary search over the ID column).
+        """
+        i = bisect_left(self.columns["ID"], node_id)
+        if i < self.count and self.columns["ID"][i] == node_id:
+            return self.index(i)
+        return None
+
+    def iter_nodes(self) -> Iterator[SystemNode]:
+        for i in range(self.count):
+            yield self.index(i)
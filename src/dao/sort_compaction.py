@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from typing import Optional, List
+import mysql.connector
+from src.dao.system_node_dao import SystemNodeDAO, RETRYABLE_ERRNOS
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# A parent's children are healthy when their SortOrders are exactly 1..n.
+DRIFT_SQL = """
+    SELECT ParentID, COUNT(*) AS Children, MIN(SortOrder) AS MinSort, MAX(SortOrder) AS MaxSort,
+           COUNT(DISTINCT SortOrder) AS DistinctSort
+    FROM SystemNode
+    GROUP BY ParentID
+    HAVING MinSort <> 1 OR MaxSort <> Children OR DistinctSort <> Children
+    ORDER BY ParentID
+    LIMIT %s
+"""
+
+
+def find_drifted_parents(dao: SystemNodeDAO, limit: int = 1000) -> List[dict]:
+    """
+    Parents whose children's SortOrders have gaps, duplicates, or do not start at 1
+    (ParentID None = the root level). Runs on a replica when one is configured; the
+    repair re-checks each parent on the primary, so a lagging answer is harmless.
+    """
+    conn = dao._get_read_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(DRIFT_SQL, (limit,))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+
+def compact_parent(dao: SystemNodeDAO, parent_id: Optional[int], dry_run: bool = False,
+                   lock_wait_seconds: int = 2) -> dict:
+    """
+    Renumber one parent's children to 1..n, keeping their order (ties broken by ID),
+    in a single short transaction that row-locks only those children. A live write
+    holding them makes this wait at most lock_wait_seconds before giving up (raises).
+
+    dry_run reads without locking and reports the plan without changing anything.
+    Returns {"ParentID", "children", "renumbered", "changes": [{"ID", "from", "to"}]}.
+    """
+    conn = dao._get_connection()
+    try:
+        cursor = conn.cursor()
+        if not dry_run:
+            cursor.execute("SET SESSION innodb_lock_wait_timeout = %s", (lock_wait_seconds,))
+            conn.start_transaction()
+        cursor.execute(f"""
+            SELECT ID, SortOrder
+            FROM SystemNode
+            WHERE ParentID <=> %s
+            ORDER BY SortOrder, ID
+            {"" if dry_run else "FOR UPDATE"}
+        """, (parent_id,))
+        rows = cursor.fetchall()
+        changes = [
+            {"ID": node_id, "from": sort_order, "to": position}
+            for position, (node_id, sort_order) in enumerate(rows, start=1)
+            if sort_order != position
+        ]
+
+        if not dry_run:
+            if changes:
+                cursor.executemany("UPDATE SystemNode SET SortOrder = %s WHERE ID = %s",
+                                   [(change["to"], change["ID"]) for change in changes])
+                for hook in dao.write_hooks:
+                    hook.on_reorder(conn, parent_id)
+            conn.commit()
+            if changes:
+                dao._note_write()
+        cursor.close()
+        return {"ParentID": parent_id, "children": len(rows), "renumbered": len(changes), "changes": changes}
+    except:  # noqa
+        if not dry_run:
+            conn.rollback()
+        raise
+    finally:
+        if not dry_run:
+            # Pooled connections keep their session; hand this one back with the server default.
+            try:
+                restore = conn.cursor()
+                restore.execute("SET SESSION innodb_lock_wait_timeout = DEFAULT")
+                restore.close()
+            except mysql.connector.Error:
+                pass
+        conn.close()
+
+
+def compact_all(dao: SystemNodeDAO, dry_run: bool = False, max_parents: int = 1000,
+                pause_seconds: float = 0.05) -> dict:
+    """
+    Find drifted parents and compact them one transaction at a time, sleeping pause_seconds
+    between parents so live traffic keeps most of the database. Parents locked by live
+    writes are skipped (listed under "busy") and picked up by the next run.
+    """
+    report = {"dry_run": dry_run, "parents_checked": 0, "parents_fixed": 0, "rows_renumbered": 0,
+              "busy": [], "parents": []}
+    for drifted in find_drifted_parents(dao, max_parents):
+        parent_id = drifted["ParentID"]
+        report["parents_checked"] += 1
+        try:
+            result = compact_parent(dao, parent_id, dry_run=dry_run)
+        except mysql.connector.Error as e:
+            # A live write holds these rows: skip the parent and retry on the next run.
+            if e.errno not in RETRYABLE_ERRNOS:
+                raise
+            report["busy"].append(parent_id)
+            continue
+        if result["renumbered"]:
+            report["parents_fixed"] += 1
+            report["rows_renumbered"] += result["renumbered"]
+            report["parents"].append(result)
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    if not dry_run:
+        metrics.incr("maintenance.sort_compaction.parents_fixed", report["parents_fixed"])
+        metrics.incr("maintenance.sort_compaction.rows_renumbered", report["rows_renumbered"])
+        metrics.incr("maintenance.sort_compaction.busy", len(report["busy"]))
+    return report
+
+
+def start_background_compaction(dao: SystemNodeDAO, interval: float = 600.0, **kwargs) -> threading.Thread:
+    """
+    Run compact_all(dao, **kwargs) every `interval` seconds on a daemon thread.
+    """
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                report = compact_all(dao, **kwargs)
+                if report["parents_fixed"] or report["busy"]:
+                    logger.info("SortOrder compaction: fixed %d parents (%d rows), %d busy",
+                                report["parents_fixed"], report["rows_renumbered"], len(report["busy"]))
+            except Exception:
+                logger.exception("SortOrder compaction failed")
+
+    thread = threading.Thread(target=loop, name="sort-compaction", daemon=True)
+    thread.start()
+    return thread
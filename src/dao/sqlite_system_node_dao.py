@@ -0,0 +1,357 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Optional, List
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend
+from src.tracing import traced
+
+# MySQL's NULL-safe "<=>" becomes SQLite's "IS", which can also use the (ParentID, SortOrder) index.
+SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS SystemNode (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ParentID INTEGER NULL REFERENCES SystemNode(ID) ON DELETE RESTRICT,
+        Name TEXT NOT NULL,
+        Description TEXT,
+        Notes TEXT,
+        Tags TEXT,
+        Metadata TEXT,
+        Status TEXT,
+        Importance INTEGER NOT NULL DEFAULT 0,
+        SortOrder INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_systemnode_parent_sort ON SystemNode (ParentID, SortOrder)",
+)
+
+
+def _row_to_node(row: sqlite3.Row) -> SystemNode:
+    return SystemNode(
+        ID=row["ID"],
+        ParentID=row["ParentID"],
+        Name=row["Name"],
+        Description=row["Description"],
+        Notes=row["Notes"],
+        Tags=json.loads(row["Tags"]) if row["Tags"] else {},
+        Metadata=json.loads(row["Metadata"]) if row["Metadata"] else {},
+        Status=row["Status"],
+        Importance=row["Importance"],
+        SortOrder=row["SortOrder"]
+    )
+
+
+class SQLiteSystemNodeDAO(SystemNodeBackend):
+    def __init__(self, db_path: str):
+        """
+        db_path is a file path like '/var/lib/system/system.db', or ':memory:' for a
+        private in-memory database shared by every thread using this DAO.
+
+        Each thread keeps one open connection, so a read is a single in-process query
+        with no network hop and no connect/handshake cost.
+        """
+        if db_path == ":memory:":
+            # A named shared-cache database, so each thread's connection sees the same data.
+            self._uri = f"file:systemnode-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self._uri = None
+        self.db_path = db_path
+        self._local = threading.local()
+        # Keeps a shared-cache in-memory database alive while the DAO exists.
+        self._keepalive = self._get_connection()
+        for statement in SCHEMA_STATEMENTS:
+            self._keepalive.execute(statement)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # A connection must not be used across a fork (gunicorn's preload): the child opens its own
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        if self._uri:
+            conn = sqlite3.connect(self._uri, uri=True, isolation_level=None, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.row_factory = sqlite3.Row
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """
+        Close this thread's connection (other threads close theirs when they exit).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -----------------------------------------------------------
+    # 1) CREATE
+    # -----------------------------------------------------------
+    @traced("dao.create")
+    def create(self, node: SystemNode) -> int:
+        """
+        Inserts a new row into SystemNode at the end of its siblings.
+        Returns the newly generated ID.
+        """
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (new_sort_order,) = conn.execute(
+                "SELECT COALESCE(MAX(SortOrder), 0) + 1 FROM SystemNode WHERE ParentID IS ?",
+                (node.ParentID,)
+            ).fetchone()
+
+            cursor = conn.execute(
+                """
+                INSERT INTO SystemNode (
+                    ParentID, Name, Description, Notes,
+                    Tags, Metadata, Status, Importance, SortOrder
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    node.ParentID,
+                    node.Name,
+                    node.Description,
+                    node.Notes,
+                    json.dumps(node.Tags) if node.Tags else None,
+                    json.dumps(node.Metadata) if node.Metadata else None,
+                    node.Status,
+                    node.Importance,
+                    new_sort_order
+                )
+            )
+            conn.execute("COMMIT")
+            return cursor.lastrowid
+        except:  # noqa
+            conn.execute("ROLLBACK")
+            raise
+
+    # -----------------------------------------------------------
+    # 2) READ (Single / All)
+    # -----------------------------------------------------------
+    @traced("dao.read")
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        """
+        Fetch a single row by ID. Returns a SystemNode or None if not found.
+        """
+        row = self._get_connection().execute(
+            """
+            SELECT
+                ID, ParentID, Name, Description, Notes,
+                Tags, Metadata, Status, Importance, SortOrder
+            FROM SystemNode
+            WHERE ID = ?
+            """,
+            (node_id,)
+        ).fetchone()
+        return _row_to_node(row) if row else None
+
+    @traced("dao.read_by_parent")
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        """
+        Return all nodes whose ParentID == parent_id (null or not), ordered by SortOrder.
+        """
+        rows = self._get_connection().execute(
+            """
+            SELECT
+                ID, ParentID, Name, Description, Notes,
+                Tags, Metadata, Status, Importance, SortOrder
+            FROM SystemNode
+            WHERE ParentID IS ?
+            ORDER BY SortOrder
+            """,
+            (parent_id,)
+        ).fetchall()
+        return [_row_to_node(row) for row in rows]
+
+    @traced("dao.read_all")
+    def read_all(self) -> List[SystemNode]:
+        """
+        Fetch all rows from SystemNode. Returns a list of SystemNode objects.
+        """
+        rows = self._get_connection().execute(
+            """
+            SELECT
+                ID, ParentID, Name, Description, Notes,
+                Tags, Metadata, Status, Importance, SortOrder
+            FROM SystemNode
+            ORDER BY ParentID, SortOrder
+            """
+        ).fetchall()
+        return [_row_to_node(row) for row in rows]
+
+    # -----------------------------------------------------------
+    # 3) UPDATE (Looser Concurrency)
+    # -----------------------------------------------------------
+    @traced("dao.update")
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        """
+        Update a row only if it still matches old.ID, old.ParentID, old.Status and old.Importance.
+        Returns True if exactly one row was updated, False otherwise.
+        """
+        cursor = self._get_connection().execute(
+            """
+            UPDATE SystemNode
+            SET
+                ParentID = ?,
+                Name = ?,
+                Description = ?,
+                Notes = ?,
+                Tags = ?,
+                Metadata = ?,
+                Status = ?,
+                Importance = ?,
+                SortOrder = ?
+            WHERE
+                ID = ?
+                AND ParentID IS ?
+                AND Status IS ?
+                AND Importance = ?
+            """,
+            (
+                new.ParentID,
+                new.Name,
+                new.Description,
+                new.Notes,
+                json.dumps(new.Tags) if new.Tags else None,
+                json.dumps(new.Metadata) if new.Metadata else None,
+                new.Status,
+                new.Importance,
+                new.SortOrder,
+                old.ID,
+                old.ParentID,
+                old.Status,
+                old.Importance
+            )
+        )
+        return cursor.rowcount == 1
+
+    # -----------------------------------------------------------
+    # 4) DELETE (Looser Concurrency)
+    # -----------------------------------------------------------
+    @traced("dao.delete")
+    def delete(self, old: SystemNode) -> bool:
+        """
+        Delete a row only if it still matches old.ID, old.ParentID, old.Status and old.Importance.
+        Returns True if exactly one row was deleted, False otherwise.
+        """
+        cursor = self._get_connection().execute(
+            """
+            DELETE FROM SystemNode
+            WHERE
+                ID = ?
+                AND ParentID IS ?
+                AND Status IS ?
+                AND Importance = ?
+            """,
+            (old.ID, old.ParentID, old.Status, old.Importance)
+        )
+        return cursor.rowcount == 1
+
+    # -----------------------------------------------------------
+    # 5) MOVE & REORDER
+    # -----------------------------------------------------------
+    @traced("dao.move_node")
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        """
+        Move or reorder a node with the same SortOrder rules as SystemNodeDAO.move_node.
+        Returns True if exactly one row was updated, False otherwise.
+        """
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            old_row = conn.execute("SELECT ParentID, SortOrder FROM SystemNode WHERE ID = ?", (node_id,)).fetchone()
+            if not old_row:
+                conn.execute("ROLLBACK")
+                return False
+
+            old_parent = old_row["ParentID"]
+            old_sort_order = old_row["SortOrder"]
+
+            # BEGIN IMMEDIATE already serializes writers, so no row locking is needed here.
+            conn.execute(
+                "UPDATE SystemNode SET SortOrder = SortOrder - 1 WHERE ParentID IS ? AND SortOrder > ?",
+                (old_parent, old_sort_order)
+            )
+
+            (next_pos,) = conn.execute(
+                "SELECT COALESCE(MAX(SortOrder), 0) + 1 FROM SystemNode WHERE ParentID IS ? AND ID <> ?",
+                (new_parent_id, node_id)
+            ).fetchone()
+            if target_index is not None and target_index < next_pos:
+                new_sort_order = max(target_index, 1)
+                conn.execute(
+                    "UPDATE SystemNode SET SortOrder = SortOrder + 1"
+                    " WHERE ParentID IS ? AND SortOrder >= ? AND ID <> ?",
+                    (new_parent_id, new_sort_order, node_id)
+                )
+            else:
+                new_sort_order = next_pos
+
+            cursor = conn.execute(
+                "UPDATE SystemNode SET ParentID = ?, SortOrder = ? WHERE ID = ?",
+                (new_parent_id, new_sort_order, node_id)
+            )
+            updated_count = cursor.rowcount
+            conn.execute("COMMIT")
+            return updated_count == 1
+        except:  # noqa
+            conn.execute("ROLLBACK")
+            raise
+
+    # -----------------------------------------------------------
+    # 6) BATCH WRITE (write-behind persistence)
+    # -----------------------------------------------------------
+    @traced("dao.apply_batch")
+    def apply_batch(self, upserts: List[SystemNode], deleted_ids: List[int]) -> None:
+        """
+        Persist final row states in a single transaction, keeping the caller's IDs and SortOrders.
+        """
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO SystemNode (
+                    ID, ParentID, Name, Description, Notes,
+                    Tags, Metadata, Status, Importance, SortOrder
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (ID) DO UPDATE SET
+                    ParentID = excluded.ParentID,
+                    Name = excluded.Name,
+                    Description = excluded.Description,
+                    Notes = excluded.Notes,
+                    Tags = excluded.Tags,
+                    Metadata = excluded.Metadata,
+                    Status = excluded.Status,
+                    Importance = excluded.Importance,
+                    SortOrder = excluded.SortOrder
+                """,
+                [(
+                    node.ID,
+                    node.ParentID,
+                    node.Name,
+                    node.Description,
+                    node.Notes,
+                    json.dumps(node.Tags) if node.Tags else None,
+                    json.dumps(node.Metadata) if node.Metadata else None,
+                    node.Status,
+                    node.Importance,
+                    node.SortOrder
+                ) for node in upserts]
+            )
+            conn.executemany("DELETE FROM SystemNode WHERE ID = ?", [(node_id,) for node_id in deleted_ids])
+            conn.execute("COMMIT")
+        except:  # noqa
+            conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,252 @@
+from typing import Optional, List, Dict, Tuple
+from mysql.connector import MySQLConnection
+from src.dao.subtree_sql import chunks, in_list
+from src.dao.subtree_stats import SubtreeStats
+from src.dao.system_node import SystemNode, merkle_hash
+from src.dao.system_node_dao import SystemNodeDAO, SELECT_NODES_BY_IDS_SQL
+from src.dao.write_hooks import WriteHook
+
+HASH_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS SystemNodeHash (
+        NodeID BIGINT NOT NULL PRIMARY KEY,
+        Version BIGINT NOT NULL DEFAULT 0,
+        Hash BINARY(32) NULL
+    )
+"""
+
+# Deepest hash tree one request may ask for
+MAX_HASH_DEPTH = 8
+
+_INVALIDATE_SUFFIX = " ON DUPLICATE KEY UPDATE Version = Version + 1, Hash = NULL"
+
+
+class SubtreeHashes(WriteHook):
+    def __init__(self, dao: SystemNodeDAO):
+        """
+        Merkle hashes of every subtree (see merkle_hash), in table SystemNodeHash, so a client
+        that was offline can compare its copy top-down and descend only where hashes differ.
+
+        Registers itself as a write hook on dao: create, update, delete, move_node and
+        maintenance clear the stored hash of the changed node and of each of its ancestors
+        (in ID order) inside the write's transaction. tree() recomputes cleared hashes on
+        demand, from the children's hashes down to the first stored ones, so a write costs one
+        statement and a read only recomputes what changed since the last read.
+
+        A computed hash is only stored if no write cleared that row again meanwhile (Version
+        check). Writes that skip the hooks (bulk import, apply_batch) must call reset().
+        """
+        self.dao = dao
+        dao.add_write_hook(self)
+
+    def ensure_table(self) -> None:
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(HASH_TABLE_DDL)
+            cursor.close()
+        finally:
+            conn.close()
+
+    def reset(self) -> None:
+        """
+        Clear every stored hash; each is recomputed on its next read.
+        """
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM SystemNodeHash")
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------
+    # INVALIDATION (runs inside the DAO's transaction)
+    # -----------------------------------------------------------
+    @staticmethod
+    def _invalidate(conn: MySQLConnection, node_ids: List[int], parent_ids: List[Optional[int]],
+                    deleted_id: Optional[int] = None) -> None:
+        cursor = conn.cursor()
+        ids = set(node_ids)
+        for parent_id in dict.fromkeys(parent_ids):
+            ids.update(SubtreeStats._ancestors(cursor, parent_id))
+        if deleted_id is not None:
+            cursor.execute("DELETE FROM SystemNodeHash WHERE NodeID = %s", (deleted_id,))
+            ids.discard(deleted_id)
+        if ids:
+            # Locked in ID order so concurrent writers under a common ancestor cannot deadlock on these rows
+            ordered = sorted(ids)
+            cursor.execute(
+                "INSERT INTO SystemNodeHash (NodeID, Version) VALUES "
+                + ", ".join(["(%s, 1)"] * len(ordered)) + _INVALIDATE_SUFFIX,
+                tuple(ordered)
+            )
+        cursor.close()
+
+    def on_create(self, conn: MySQLConnection, node: SystemNode) -> None:
+        self._invalidate(conn, [node.ID], [node.ParentID])
+
+    def on_update(self, conn: MySQLConnection, old: SystemNode, new: SystemNode) -> None:
+        self._invalidate(conn, [old.ID], [old.ParentID, new.ParentID])
+
+    def on_delete(self, conn: MySQLConnection, old: SystemNode) -> None:
+        self._invalidate(conn, [], [old.ParentID], deleted_id=old.ID)
+
+    def on_move(self, conn: MySQLConnection, node_id: int, old_parent_id: Optional[int],
+                new_parent_id: Optional[int]) -> None:
+        # The node's own hash does not cover its position; both parents' child orders changed
+        self._invalidate(conn, [], [old_parent_id, new_parent_id])
+
+    def on_reorder(self, conn: MySQLConnection, parent_id: Optional[int]) -> None:
+        self._invalidate(conn, [], [parent_id])
+
+    # -----------------------------------------------------------
+    # READ
+    # -----------------------------------------------------------
+    def tree(self, node_id: Optional[int], depth: int = 1) -> Optional[dict]:
+        """
+        {"ID", "Hash" (hex), "Children": [...]} for node_id (None: the virtual root above the
+        top-level nodes, merkle_hash(None, ...)), with `depth` levels of children, each with its
+        ID and Hash and, above the last level, its own "Children" in (SortOrder, ID) order.
+        Returns None if node_id does not exist. Runs on the primary (it stores what it computes).
+        """
+        if not 0 <= depth <= MAX_HASH_DEPTH:
+            raise ValueError(f"depth must be between 0 and {MAX_HASH_DEPTH}")
+        conn = self.dao._get_connection()
+        try:
+            children: Dict[Optional[int], List[int]] = {}
+            level = [node_id]
+            # The virtual root's hash needs the top-level list even at depth 0
+            for _ in range(max(depth, 1 if node_id is None else 0)):
+                children.update(self._fetch_children(conn, level))
+                level = [child for parent in level for child in children[parent]]
+            wanted = [child for ids in children.values() for child in ids]
+            hashes = self._hashes(conn, wanted + ([] if node_id is None else [node_id]))
+            conn.commit()
+        finally:
+            conn.close()
+
+        if node_id is None:
+            root_hash = merkle_hash(None, [hashes[child] for child in children[None] if child in hashes])
+        elif node_id in hashes:
+            root_hash = hashes[node_id]
+        else:
+            return None
+
+        def entry(entry_id: Optional[int], digest: bytes, levels: int) -> dict:
+            result = {"ID": entry_id, "Hash": digest.hex()}
+            if levels > 0:
+                result["Children"] = [entry(child, hashes[child], levels - 1)
+                                      for child in children.get(entry_id, []) if child in hashes]
+            return result
+
+        return entry(node_id, root_hash, depth)
+
+    def _hashes(self, conn: MySQLConnection, node_ids: List[int]) -> Dict[int, bytes]:
+        """
+        The hash of each existing node in node_ids: stored ones as they are, cleared or missing
+        ones computed bottom-up from the first stored hashes below them, each once, and stored.
+        """
+        result: Dict[int, bytes] = {}
+        versions: Dict[int, int] = {}
+        nodes: Dict[int, SystemNode] = {}
+        children: Dict[int, List[int]] = {}
+        # Level by level down to the first stored hashes, one query of each kind per level
+        level = list(dict.fromkeys(node_ids))
+        while level:
+            stored = self._fetch_stored(conn, level)
+            result.update((node_id, digest) for node_id, (_, digest) in stored.items() if digest is not None)
+            versions.update((node_id, version) for node_id, (version, digest) in stored.items() if digest is None)
+            found = self._fetch_nodes(conn, [node_id for node_id in level if node_id not in result])
+            nodes.update(found)
+            children.update(self._fetch_children(conn, list(found)))
+            level = [child for node_id in found for child in children[node_id]
+                     if child not in result and child not in nodes]
+
+        # Children before parents; in memory now, so no recursion limit on deep trees
+        computed: Dict[int, bytes] = {}
+        for root_id in nodes:
+            stack = [(root_id, False)]
+            while stack:
+                node_id, expanded = stack.pop()
+                if node_id in computed or node_id in result:
+                    continue
+                if not expanded:
+                    stack.append((node_id, True))
+                    stack.extend((child, False) for child in children[node_id] if child in nodes)
+                    continue
+                computed[node_id] = merkle_hash(
+                    nodes[node_id],
+                    [computed.get(child, result.get(child)) for child in children[node_id]
+                     if child in computed or child in result]
+                )
+        if computed:
+            self._store(conn, computed, {node_id: versions[node_id] for node_id in computed if node_id in versions})
+        result.update(computed)
+        return result
+
+    def _fetch_children(self, conn: MySQLConnection, parent_ids: List[Optional[int]]) -> Dict[Optional[int], List[int]]:
+        """
+        {parent ID: [child IDs in (SortOrder, ID) order]} with an entry for every parent.
+        """
+        children: Dict[Optional[int], List[int]] = {parent_id: [] for parent_id in parent_ids}
+        cursor = conn.cursor()
+        if None in children:
+            cursor.execute("SELECT ID FROM SystemNode WHERE ParentID IS NULL ORDER BY SortOrder, ID")
+            children[None] = [row[0] for row in cursor.fetchall()]
+        for chunk in chunks([parent_id for parent_id in children if parent_id is not None]):
+            cursor.execute(
+                f"SELECT ID, ParentID FROM SystemNode WHERE ParentID IN ({in_list(chunk)}) "
+                "ORDER BY ParentID, SortOrder, ID",
+                tuple(chunk)
+            )
+            for child_id, parent_id in cursor.fetchall():
+                children[parent_id].append(child_id)
+        cursor.close()
+        return children
+
+    def _fetch_stored(self, conn: MySQLConnection, node_ids: List[int]) -> Dict[int, Tuple[int, Optional[bytes]]]:
+        """
+        {node ID: (Version, Hash or None)} for the nodes that have a SystemNodeHash row.
+        """
+        stored = {}
+        cursor = conn.cursor()
+        for chunk in chunks(list(dict.fromkeys(node_ids))):
+            cursor.execute(f"SELECT NodeID, Version, Hash FROM SystemNodeHash WHERE NodeID IN ({in_list(chunk)})",
+                           tuple(chunk))
+            for node_id, version, digest in cursor.fetchall():
+                stored[node_id] = (version, bytes(digest) if digest is not None else None)
+        cursor.close()
+        return stored
+
+    def _fetch_nodes(self, conn: MySQLConnection, node_ids: List[int]) -> Dict[int, SystemNode]:
+        nodes = {}
+        # A plain cursor: every chunk size is different SQL, not worth a prepared statement
+        cursor = conn.cursor(dictionary=True)
+        for chunk in chunks(node_ids):
+            cursor.execute(SELECT_NODES_BY_IDS_SQL.format(ids=in_list(chunk)), tuple(chunk))
+            nodes.update((row["ID"], self.dao._row_to_node(row)) for row in cursor.fetchall())
+        cursor.close()
+        return nodes
+
+    @staticmethod
+    def _store(conn: MySQLConnection, computed: Dict[int, bytes], versions: Dict[int, int]) -> None:
+        """
+        Store computed hashes unless a write cleared the row after the values they were computed
+        from were read: rows seen cleared keep their hash only at the Version seen, and a row
+        that did not exist is only created for a node that still exists.
+        """
+        cursor = conn.cursor()
+        updates = [(computed[node_id], node_id, versions[node_id]) for node_id in sorted(versions)]
+        inserts = [(computed[node_id], node_id) for node_id in sorted(computed) if node_id not in versions]
+        if updates:
+            cursor.executemany(
+                "UPDATE SystemNodeHash SET Hash = %s WHERE NodeID = %s AND Version = %s AND Hash IS NULL", updates
+            )
+        if inserts:
+            cursor.executemany(
+                "INSERT IGNORE INTO SystemNodeHash (NodeID, Version, Hash) "
+                "SELECT ID, 0, %s FROM SystemNode WHERE ID = %s",
+                inserts
+            )
+        cursor.close()
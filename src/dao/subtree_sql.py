@@ -0,0 +1,62 @@
+from typing import Optional, List, Tuple
+
+# Shared by the modules that copy, move or scan whole subtrees (archive, sharding, subtree hashes)
+
+NODE_COLUMNS = "ID, ParentID, Name, Description, Notes, Tags, Metadata, Status, Importance, SortOrder"
+
+# IDs per IN (...) list
+CHUNK_SIZE = 1000
+
+
+class SubtreeSkipped(Exception):
+    """
+    Raised by collect_subtree; the message is the reason ("too_large" or "not_eligible").
+    """
+
+
+def chunks(ids: List[int], size: int = CHUNK_SIZE) -> List[List[int]]:
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def in_list(ids: List[int]) -> str:
+    """
+    The placeholders for an IN (...) list of len(ids) parameters.
+    """
+    return ", ".join(["%s"] * len(ids))
+
+
+def collect_subtree(cursor, table: str, root_id: int, max_rows: int, lock: bool,
+                    eligible: Optional[Tuple[str, tuple]] = None) -> List[List[dict]]:
+    """
+    The subtree under root_id in table (SystemNode or SystemNodeArchive), level by level (root
+    first), via the (ParentID, SortOrder) index; rows have NODE_COLUMNS, locked FOR UPDATE with
+    lock. Raises SubtreeSkipped("too_large") past max_rows. With eligible = (SQL condition, its
+    parameters), raises SubtreeSkipped("not_eligible") as soon as a node fails the condition.
+    cursor must be a dictionary cursor.
+    """
+    eligible_column = ""
+    params_prefix: tuple = ()
+    if eligible is not None:
+        eligible_column = f", ({eligible[0]}) AS Eligible"
+        params_prefix = eligible[1]
+    lock_clause = " FOR UPDATE" if lock else ""
+
+    cursor.execute(f"SELECT {NODE_COLUMNS}{eligible_column} FROM {table} WHERE ID = %s{lock_clause}",
+                   params_prefix + (root_id,))
+    level = cursor.fetchall()
+    levels, total = [], 0
+    while level:
+        total += len(level)
+        if total > max_rows:
+            raise SubtreeSkipped("too_large")
+        if eligible is not None and not all(row["Eligible"] for row in level):
+            raise SubtreeSkipped("not_eligible")
+        levels.append(level)
+        next_level = []
+        for chunk in chunks([row["ID"] for row in level]):
+            cursor.execute(f"SELECT {NODE_COLUMNS}{eligible_column} FROM {table} "
+                           f"WHERE ParentID IN ({in_list(chunk)}) ORDER BY ParentID, SortOrder{lock_clause}",
+                           params_prefix + tuple(chunk))
+            next_level.extend(cursor.fetchall())
+        level = next_level
+    return levels
@@ -0,0 +1,215 @@
+from typing import Optional, List, Dict
+from mysql.connector import MySQLConnection
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+from src.dao.write_hooks import WriteHook
+
+# Rollup rows use '' for nodes whose Status is NULL (a primary key column cannot be NULL).
+NO_STATUS = ""
+
+STATS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS SystemNodeStatusRollup (
+        NodeID BIGINT NOT NULL,
+        Status VARCHAR(255) NOT NULL,
+        Descendants INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (NodeID, Status)
+    )
+"""
+
+
+def _status_key(status: Optional[str]) -> str:
+    return NO_STATUS if status is None else status
+
+
+class SubtreeStats(WriteHook):
+    def __init__(self, dao: SystemNodeDAO):
+        """
+        Keeps, for every node, how many descendants it has per Status
+        (table SystemNodeStatusRollup), so "X of Y descendants Done" is one indexed read.
+
+        Registers itself as a write hook on dao: create, update (Status or ParentID
+        changes), delete and move_node adjust every ancestor inside the same transaction.
+        recompute() rebuilds the table from scratch.
+        """
+        self.dao = dao
+        dao.add_write_hook(self)
+
+    def ensure_table(self) -> None:
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(STATS_TABLE_DDL)
+            cursor.close()
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------
+    # READ
+    # -----------------------------------------------------------
+    def read(self, node_id: int) -> Optional[dict]:
+        """
+        Returns {"ID", "DescendantCount", "StatusCounts"} or None if the node does not exist.
+        """
+        return self.read_many([node_id]).get(node_id)
+
+    def read_many(self, node_ids: List[int]) -> Dict[int, dict]:
+        if not node_ids:
+            return {}
+        conn = self.dao._get_read_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            placeholders = ", ".join(["%s"] * len(node_ids))
+            cursor.execute(f"""
+                SELECT n.ID, r.Status, r.Descendants
+                FROM SystemNode n
+                LEFT JOIN SystemNodeStatusRollup r
+                    ON r.NodeID = n.ID AND r.Descendants > 0
+                WHERE n.ID IN ({placeholders})
+            """, tuple(node_ids))
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+
+        results: Dict[int, dict] = {}
+        for row in rows:
+            stats = results.setdefault(row["ID"], {"ID": row["ID"], "DescendantCount": 0, "StatusCounts": {}})
+            if row["Status"] is not None:
+                stats["StatusCounts"][row["Status"]] = row["Descendants"]
+                stats["DescendantCount"] += row["Descendants"]
+        return results
+
+    # -----------------------------------------------------------
+    # INCREMENTAL MAINTENANCE (runs inside the DAO's transaction)
+    # -----------------------------------------------------------
+    @staticmethod
+    def _ancestors(cursor, parent_id: Optional[int]) -> List[int]:
+        """
+        parent_id and all of its ancestors, nearest first.
+        """
+        if parent_id is None:
+            return []
+        cursor.execute("""
+            WITH RECURSIVE chain (ID, ParentID, Depth) AS (
+                SELECT ID, ParentID, 0 FROM SystemNode WHERE ID = %s
+                UNION ALL
+                SELECT n.ID, n.ParentID, c.Depth + 1
+                FROM SystemNode n
+                JOIN chain c ON n.ID = c.ParentID
+            )
+            SELECT ID FROM chain ORDER BY Depth
+        """, (parent_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _subtree_counts(cursor, node_id: int, status: Optional[str]) -> Dict[str, int]:
+        """
+        What a node contributes to each ancestor: its own descendants plus itself (with `status`).
+        """
+        cursor.execute(
+            "SELECT Status, Descendants FROM SystemNodeStatusRollup WHERE NodeID = %s AND Descendants <> 0",
+            (node_id,)
+        )
+        counts = dict(cursor.fetchall())
+        counts[_status_key(status)] = counts.get(_status_key(status), 0) + 1
+        return counts
+
+    @staticmethod
+    def _apply(cursor, ancestor_ids: List[int], counts: Dict[str, int], sign: int) -> None:
+        rows = [
+            (ancestor_id, status_key, sign * count)
+            for ancestor_id in ancestor_ids
+            for status_key, count in counts.items()
+            if count
+        ]
+        if not rows:
+            return
+        cursor.executemany("""
+            INSERT INTO SystemNodeStatusRollup (NodeID, Status, Descendants)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE Descendants = Descendants + VALUES(Descendants)
+        """, rows)
+
+    def on_create(self, conn: MySQLConnection, node: SystemNode) -> None:
+        cursor = conn.cursor()
+        self._apply(cursor, self._ancestors(cursor, node.ParentID), {_status_key(node.Status): 1}, +1)
+        cursor.close()
+
+    def on_update(self, conn: MySQLConnection, old: SystemNode, new: SystemNode) -> None:
+        if old.ParentID == new.ParentID and old.Status == new.Status:
+            return
+        cursor = conn.cursor()
+        if old.ParentID == new.ParentID:
+            delta = {_status_key(old.Status): -1}
+            delta[_status_key(new.Status)] = delta.get(_status_key(new.Status), 0) + 1
+            self._apply(cursor, self._ancestors(cursor, new.ParentID), delta, +1)
+        else:
+            before = self._subtree_counts(cursor, old.ID, old.Status)
+            after = self._subtree_counts(cursor, old.ID, new.Status)
+            self._apply(cursor, self._ancestors(cursor, old.ParentID), before, -1)
+            self._apply(cursor, self._ancestors(cursor, new.ParentID), after, +1)
+        cursor.close()
+
+    def on_delete(self, conn: MySQLConnection, old: SystemNode) -> None:
+        cursor = conn.cursor()
+        counts = self._subtree_counts(cursor, old.ID, old.Status)
+        self._apply(cursor, self._ancestors(cursor, old.ParentID), counts, -1)
+        cursor.execute("DELETE FROM SystemNodeStatusRollup WHERE NodeID = %s", (old.ID,))
+        cursor.close()
+
+    def on_move(self, conn: MySQLConnection, node_id: int, old_parent_id: Optional[int],
+                new_parent_id: Optional[int]) -> None:
+        if old_parent_id == new_parent_id:
+            return
+        cursor = conn.cursor()
+        cursor.execute("SELECT Status FROM SystemNode WHERE ID = %s", (node_id,))
+        (status,) = cursor.fetchone()
+        counts = self._subtree_counts(cursor, node_id, status)
+        self._apply(cursor, self._ancestors(cursor, old_parent_id), counts, -1)
+        self._apply(cursor, self._ancestors(cursor, new_parent_id), counts, +1)
+        cursor.close()
+
+    # -----------------------------------------------------------
+    # REPAIR
+    # -----------------------------------------------------------
+    def recompute(self, chunk_size: int = 1000) -> dict:
+        """
+        Rebuild SystemNodeStatusRollup from SystemNode in one transaction.
+        SystemNode rows are share-locked meanwhile, so writes wait until it finishes.
+        """
+        conn = self.dao._get_connection()
+        try:
+            conn.start_transaction()
+            cursor = conn.cursor()
+            cursor.execute("SELECT ID, ParentID, Status FROM SystemNode FOR SHARE")
+            parents: Dict[int, Optional[int]] = {}
+            statuses: Dict[int, str] = {}
+            for node_id, parent_id, status in cursor.fetchall():
+                parents[node_id] = parent_id
+                statuses[node_id] = _status_key(status)
+
+            totals: Dict[tuple, int] = {}
+            for node_id, status_key in statuses.items():
+                ancestor_id = parents[node_id]
+                seen = 0
+                while ancestor_id is not None and ancestor_id in parents and seen <= len(parents):
+                    key = (ancestor_id, status_key)
+                    totals[key] = totals.get(key, 0) + 1
+                    ancestor_id = parents[ancestor_id]
+                    seen += 1
+
+            cursor.execute("DELETE FROM SystemNodeStatusRollup")
+            rows = [(node_id, status_key, count) for (node_id, status_key), count in totals.items()]
+            for i in range(0, len(rows), chunk_size):
+                cursor.executemany(
+                    "INSERT INTO SystemNodeStatusRollup (NodeID, Status, Descendants) VALUES (%s, %s, %s)",
+                    rows[i:i + chunk_size]
+                )
+            conn.commit()
+            cursor.close()
+            return {"nodes": len(parents), "rollup_rows": len(rows)}
+        except:  # noqa
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
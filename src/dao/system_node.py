@@ -1,5 +1,7 @@
+import hashlib
+import json
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 @dataclass
@@ -14,3 +16,24 @@ class SystemNode:
     Status: Optional[str] = None
     Importance: int = 0
     SortOrder: int = 0
+
+
+# What a node's own hash covers; ParentID and SortOrder are covered by where its hash sits in the tree
+HASHED_FIELDS = ("ID", "Name", "Description", "Notes", "Tags", "Metadata", "Status", "Importance")
+
+
+def merkle_hash(node: Optional[SystemNode], child_hashes: List[bytes]) -> bytes:
+    """
+    SHA-256 of a node's content (canonical JSON of HASHED_FIELDS, empty Tags / Metadata as {})
+    followed by its children's hashes in (SortOrder, ID) order. node=None is the virtual root
+    above the top-level nodes. Clients compute the same over their copy to compare subtrees.
+    """
+    digest = hashlib.sha256()
+    if node is not None:
+        content = {name: getattr(node, name) for name in HASHED_FIELDS}
+        content["Tags"] = node.Tags or {}
+        content["Metadata"] = node.Metadata or {}
+        digest.update(json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode())
+    for child_hash in child_hashes:
+        digest.update(child_hash)
+    return digest.digest()
@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List
+from src.dao.system_node import SystemNode
+
+
+# Deeper paths are refused rather than turned into an arbitrarily nested query
+MAX_PATH_DEPTH = 64
+
+
+def split_path(path: str) -> List[str]:
+    """
+    "/Work/Projects/Q4" -> ["Work", "Projects", "Q4"]. Leading and trailing slashes are optional;
+    an empty path or an empty segment ("/Work//Q4") is a ValueError. Names containing "/"
+    cannot be addressed by path.
+    """
+    segments = path.strip("/").split("/")
+    if segments == [""]:
+        raise ValueError("Path must name at least one node")
+    if "" in segments:
+        raise ValueError(f"Empty segment in path '{path}'")
+    if len(segments) > MAX_PATH_DEPTH:
+        raise ValueError(f"Path is deeper than {MAX_PATH_DEPTH} segments")
+    return segments
+
+
+class SystemNodeBackend(ABC):
+    """
+    The storage contract every SystemNode backend implements.
+
+    app.py only talks to this interface, so a backend (MySQL, SQLite, ...) can be
+    swapped without touching the routes. Semantics follow the original MySQL DAO:
+      - SortOrder is 1-based and new nodes are appended after their siblings.
+      - update/delete use looser optimistic concurrency on ID, ParentID, Status, Importance.
+      - ParentID comparisons are NULL-safe (a NULL parent means a top-level node).
+    """
+
+    @abstractmethod
+    def create(self, node: SystemNode) -> int:
+        """
+        Insert a node at the end of its siblings and return the new ID.
+        """
+
+    @abstractmethod
+    def read(self, node_id: int) -> Optional[SystemNode]:
+        """
+        Return the node with this ID, or None if it does not exist.
+        """
+
+    @abstractmethod
+    def read_by_parent(self, parent_id: Optional[int]) -> List[SystemNode]:
+        """
+        Return the children of parent_id (None for top-level nodes), ordered by SortOrder.
+        """
+
+    @abstractmethod
+    def read_all(self) -> List[SystemNode]:
+        """
+        Return every node, ordered by ParentID then SortOrder.
+        """
+
+    @abstractmethod
+    def update(self, old: SystemNode, new: SystemNode) -> bool:
+        """
+        Overwrite the row with new's fields if it still matches old's ID, ParentID, Status
+        and Importance. Returns True if exactly one row was updated.
+        """
+
+    @abstractmethod
+    def delete(self, old: SystemNode) -> bool:
+        """
+        Delete the row if it still matches old's ID, ParentID, Status and Importance.
+        Returns True if exactly one row was deleted.
+        """
+
+    @abstractmethod
+    def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
+        """
+        Move a node under new_parent_id, at target_index or at the end of its new siblings.
+        Returns True if the node was moved, False if it does not exist.
+        """
+
+    def resolve_path(self, path: str) -> Optional[SystemNode]:
+        """
+        The node at a path of Names from the top level ("/Work/Projects/Q4"), or None.
+        Where siblings share a Name, the first by SortOrder is followed. Names compare the way
+        the backend compares them (MySQL: the column's collation).
+
+        This default walks read_by_parent once per segment; backends with a query language
+        override it with a single query.
+        """
+        parent_id = None
+        node = None
+        for name in split_path(path):
+            node = next((child for child in self.read_by_parent(parent_id) if child.Name == name), None)
+            if node is None:
+                return None
+            parent_id = node.ID
+        return node
+
+    def resolve_paths(self, paths: List[str]) -> List[Optional[SystemNode]]:
+        """
+        resolve_path for each path, in the same order.
+        """
+        return [self.resolve_path(path) for path in paths]
+
+    def apply_batch(self, upserts: List[SystemNode], deleted_ids: List[int]) -> None:
+        """
+        Write final row states in one transaction: insert-or-replace every node in upserts
+        (keeping its ID and SortOrder), then delete deleted_ids, both in the given order.
+        Used as the persistence path for write-behind engines; optional for other backends.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batch writes")
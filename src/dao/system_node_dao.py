@@ -1,12 +1,104 @@
+import contextlib
+import contextvars
+import functools
 import json
+import random
+import threading
+import time
+from dataclasses import replace
 import mysql.connector
 from mysql.connector import MySQLConnection
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend, split_path
+from src.dao.replica_router import ReplicaRouter
+from src.dao.connection_pool import ConnectionPool, PooledConnection
+from src.dao.write_hooks import WriteHook
+from src.metrics import metrics
+from src.tracing import tracer, traced, TracedConnection, unwrap_connection
 
+# MySQL errors after which move_node retries its transaction.
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+RETRYABLE_ERRNOS = (ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK)
 
-class SystemNodeDAO:
-    def __init__(self, db_config: dict):
+# Hot statements, run as reusable server-side prepared statements when enabled. Keep them
+# module constants: a prepared cursor only reuses its statement for the identical str object.
+SELECT_NODE_BY_ID_SQL = """
+    SELECT
+        ID, ParentID, Name, Description, Notes,
+        Tags, Metadata, Status, Importance, SortOrder
+    FROM SystemNode
+    WHERE ID = %s
+"""
+SELECT_CHILDREN_SQL = """
+    SELECT
+        ID, ParentID, Name, Description, Notes,
+        Tags, Metadata, Status, Importance, SortOrder
+    FROM SystemNode
+    WHERE ParentID <=> %s
+    ORDER BY SortOrder
+"""
+NEXT_SORT_ORDER_SQL = """
+    SELECT COALESCE(MAX(SortOrder), 0) + 1
+    FROM SystemNode
+    WHERE ParentID <=> %s
+"""
+SELECT_NODES_BY_IDS_SQL = """
+    SELECT
+        ID, ParentID, Name, Description, Notes,
+        Tags, Metadata, Status, Importance, SortOrder
+    FROM SystemNode
+    WHERE ID IN ({ids})
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_path_sql(depth: int) -> str:
+    """
+    One statement resolving a path of `depth` Names (parameters: the Names, top level first).
+    Each level is a scalar subquery on (ParentID, Name) that picks the first match by SortOrder;
+    the SQL is cached per depth so prepared statements can reuse it.
+    """
+    step = "SELECT ID FROM SystemNode WHERE ParentID IS NULL AND Name = %s ORDER BY SortOrder, ID LIMIT 1"
+    for _ in range(depth - 1):
+        step = f"SELECT ID FROM SystemNode WHERE ParentID = ({step}) AND Name = %s ORDER BY SortOrder, ID LIMIT 1"
+    return SELECT_NODE_BY_ID_SQL.replace("WHERE ID = %s", f"WHERE ID = ({step})")
+
+
+# The caller's session (e.g. a client or user ID), used for read-your-writes pinning.
+_current_session: contextvars.ContextVar = contextvars.ContextVar("system_node_session", default=None)
+# When the caller says it last wrote (Unix time, handed back to it by last_write_time()). It travels
+# with the client, so read-your-writes holds in whichever worker process or instance serves the read.
+_client_last_write: contextvars.ContextVar = contextvars.ContextVar("system_node_client_last_write", default=None)
+# How far ahead of this server's clock a client's last write time may be (other servers' clock skew).
+# Later times are ignored, or a client could pin its reads to the primary for good.
+LAST_WRITE_MAX_SKEW_SECONDS = 5.0
+# When the current request last wrote, for the response to hand to the client.
+_written_at: contextvars.ContextVar = contextvars.ContextVar("system_node_written_at", default=None)
+# Set by primary_reads()
+_reads_from_primary: contextvars.ContextVar = contextvars.ContextVar("system_node_reads_from_primary", default=False)
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """
+    Within the block, this thread's / task's SystemNodeDAO reads go to the primary, for callers
+    that must not see replication lag (e.g. filling a cache right after a write invalidated it).
+    """
+    token = _reads_from_primary.set(True)
+    try:
+        yield
+    finally:
+        _reads_from_primary.reset(token)
+
+
+class SystemNodeDAO(SystemNodeBackend):
+    def __init__(self, db_config: dict, replica_configs: Optional[List[dict]] = None,
+                 read_your_writes_seconds: float = 0.0, replica_retry_seconds: float = 30.0,
+                 max_replica_lag_seconds: Optional[float] = None, write_hooks: Optional[List[WriteHook]] = None,
+                 move_retries: int = 5, move_backoff_seconds: float = 0.01, pool_size: int = 0,
+                 prepared_statements: bool = False):
         """
         db_config is a dict like:
         {
@@ -15,15 +107,169 @@ class SystemNodeDAO:
             'password': 'YOUR_DB_PASSWORD',
             'database': 'jbone-system-db'
         }
+
+        db_config is the primary. Optional replica_configs (same shape) serve the read
+        methods, round-robin, falling back to the primary when no replica is healthy.
+        Writes and move_node transactions always use the primary.
+
+        With read_your_writes_seconds > 0, a caller that just wrote reads from the primary for
+        that many seconds, so it never sees replication lag on its own changes. The time of the
+        write goes back to the client (last_write_time) and comes back with its next requests
+        (set_session's last_write_at), which works across processes; a session ID alone is only
+        remembered by the process that served the write.
+
+        write_hooks run inside each write transaction (see WriteHook); they are how derived
+        tables such as subtree stats stay in step with SystemNode.
+
+        move_node retries deadlocked or lock-timed-out transactions up to move_retries times,
+        waiting about move_backoff_seconds * 2^attempt between tries.
+
+        With pool_size > 0, connections are reused from a ConnectionPool of that many per
+        server (primary writes, primary reads and each replica have their own; reads run in
+        autocommit). prepared_statements then runs read, read_by_parent and create's SortOrder
+        probe as server-side prepared statements, prepared once per pooled connection: later
+        calls send only the statement ID and binary parameters, and the server skips parsing.
         """
         self.db_config = db_config
+        self.replicas = ReplicaRouter(replica_configs or [], replica_retry_seconds, max_replica_lag_seconds,
+                                      pool_size=pool_size)
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._last_write_by_session: dict = {}
+        self._session_lock = threading.Lock()
+        self.write_hooks: List[WriteHook] = list(write_hooks or [])
+        self.move_retries = move_retries
+        self.move_backoff_seconds = move_backoff_seconds
+        self.prepared_statements = prepared_statements
+        self._pool = ConnectionPool(db_config, pool_size) if pool_size > 0 else None
+        self._read_pool = ConnectionPool(db_config, pool_size, autocommit=True) if pool_size > 0 else None
 
-    def _get_connection(self) -> MySQLConnection:
+    def _open_connection(self) -> MySQLConnection:
+        if self._pool is not None:
+            return self._pool.get()
         return mysql.connector.connect(**self.db_config)
 
+    @staticmethod
+    def _traced_connection(open_connection, role: str) -> MySQLConnection:
+        # Inside a sampled trace, time the connect/pool wait and trace the connection's statements.
+        if not tracer.active():
+            return open_connection()
+        with tracer.span("db.connect", role=role):
+            return TracedConnection(open_connection())
+
+    def _get_connection(self) -> MySQLConnection:
+        return self._traced_connection(self._open_connection, "primary")
+
+    def _fetch(self, conn: MySQLConnection, sql: str, params: tuple, one: bool = False, dictionary: bool = True):
+        """
+        Run a read statement and return its rows (the first row or None when one=True).
+        On a pooled connection with prepared_statements, sql runs as that connection's
+        prepared statement; the result is always read to the end so the statement can be reused.
+        """
+        if self.prepared_statements and isinstance(unwrap_connection(conn), PooledConnection):
+            cursor = conn.prepared_cursor(sql, dictionary)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            if one:
+                return rows[0] if rows else None
+            return rows
+
+        cursor = conn.cursor(dictionary=dictionary)
+        cursor.execute(sql, params)
+        result = cursor.fetchone() if one else cursor.fetchall()
+        cursor.close()
+        return result
+
+    def add_write_hook(self, hook: WriteHook) -> None:
+        self.write_hooks.append(hook)
+
+    # -----------------------------------------------------------
+    # READ ROUTING (primary / replicas)
+    # -----------------------------------------------------------
+    @staticmethod
+    def set_session(session_id: Optional[str], last_write_at: Optional[float] = None) -> None:
+        """
+        Set the session for the current thread/task (None clears it) and when, per the client,
+        it last wrote (Unix time, see last_write_time). A last_write_at more than
+        LAST_WRITE_MAX_SKEW_SECONDS in the future is ignored.
+        """
+        if last_write_at is not None and not last_write_at <= time.time() + LAST_WRITE_MAX_SKEW_SECONDS:
+            last_write_at = None
+        _current_session.set(session_id)
+        _client_last_write.set(last_write_at)
+        _written_at.set(None)
+
+    @staticmethod
+    def last_write_time() -> Optional[float]:
+        """
+        Unix time of the current thread/task's last write since set_session (None: no write, or
+        read-your-writes is off), for the client to send back as set_session's last_write_at.
+        """
+        return _written_at.get()
+
+    def _note_write(self) -> None:
+        if self.read_your_writes_seconds <= 0:
+            return
+        _written_at.set(time.time())
+        session_id = _current_session.get()
+        if session_id is None:
+            return
+        now = time.monotonic()
+        with self._session_lock:
+            self._last_write_by_session[session_id] = now
+            if len(self._last_write_by_session) > 10000:
+                cutoff = now - self.read_your_writes_seconds
+                self._last_write_by_session = {
+                    k: t for k, t in self._last_write_by_session.items() if t > cutoff
+                }
+
+    def _pinned_to_primary(self) -> bool:
+        if _reads_from_primary.get():
+            return True
+        if self.read_your_writes_seconds <= 0:
+            return False
+        last_write_at = _client_last_write.get()
+        if last_write_at is not None and time.time() - last_write_at < self.read_your_writes_seconds:
+            return True
+        session_id = _current_session.get()
+        if session_id is None:
+            return False
+        with self._session_lock:
+            last_write = self._last_write_by_session.get(session_id)
+        return last_write is not None and time.monotonic() - last_write < self.read_your_writes_seconds
+
+    def _open_read_connection(self) -> MySQLConnection:
+        if not self._pinned_to_primary():
+            conn = self.replicas.connect()
+            if conn is not None:
+                return conn
+        if self._read_pool is not None:
+            return self._read_pool.get()
+        return self._open_connection()
+
+    def _get_read_connection(self) -> MySQLConnection:
+        """
+        Connection for read-only queries: a healthy replica unless the session is pinned
+        to the primary (or there are no usable replicas).
+        """
+        return self._traced_connection(self._open_read_connection, "read")
+
+    def check_replicas(self) -> List[dict]:
+        """
+        Probe every replica now and return their health.
+        """
+        return self.replicas.check()
+
+    def warm_up(self, connections: int) -> int:
+        """
+        Open up to `connections` pooled connections for writes and for reads now (no-op without
+        pool_size); a warm-up before taking traffic. Returns the number of idle connections.
+        """
+        return sum(pool.warm(connections) for pool in (self._pool, self._read_pool) if pool is not None)
+
     # -----------------------------------------------------------
     # 1) CREATE
     # -----------------------------------------------------------
+    @traced("dao.create")
     def create(self, node: SystemNode) -> int:
         """
         Inserts a new row into SystemNode.
@@ -32,126 +278,102 @@ class SystemNodeDAO:
         """
         conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            # 1) Determine next SortOrder for the parent's children
-            sql_max = """
-                SELECT COALESCE(MAX(SortOrder), 0) + 1
-                FROM SystemNode
-                WHERE ParentID <=> %s
-            """
-            cursor.execute(sql_max, (node.ParentID,))
-            (new_sort_order,) = cursor.fetchone() or (1,)
-
-            # 2) Insert the row
-            sql_insert = """
-                INSERT INTO SystemNode (
-                    ParentID, Name, Description, Notes,
-                    Tags, Metadata, Status, Importance, SortOrder
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(sql_insert, (
-                node.ParentID,
-                node.Name,
-                node.Description,
-                node.Notes,
-                json.dumps(node.Tags) if node.Tags else None,
-                json.dumps(node.Metadata) if node.Metadata else None,
-                node.Status,
-                node.Importance,
-                new_sort_order
-            ))
+            new_id = self.create_in(conn, node)
             conn.commit()
-            new_id = cursor.lastrowid
-
-            cursor.close()
+            self._note_write()
             return new_id
         finally:
             conn.close()
 
+    def create_in(self, conn: MySQLConnection, node: SystemNode) -> int:
+        """
+        create()'s statements (and write hooks) on conn, in the caller's transaction; not committed.
+        """
+        # 1) Determine next SortOrder for the parent's children
+        (new_sort_order,) = self._fetch(conn, NEXT_SORT_ORDER_SQL, (node.ParentID,), one=True,
+                                        dictionary=False) or (1,)
+        cursor = conn.cursor()
+
+        # 2) Insert the row
+        sql_insert = """
+            INSERT INTO SystemNode (
+                ParentID, Name, Description, Notes,
+                Tags, Metadata, Status, Importance, SortOrder
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        cursor.execute(sql_insert, (
+            node.ParentID,
+            node.Name,
+            node.Description,
+            node.Notes,
+            json.dumps(node.Tags) if node.Tags else None,
+            json.dumps(node.Metadata) if node.Metadata else None,
+            node.Status,
+            node.Importance,
+            new_sort_order
+        ))
+        new_id = cursor.lastrowid
+        for hook in self.write_hooks:
+            hook.on_create(conn, replace(node, ID=new_id, SortOrder=new_sort_order))
+        cursor.close()
+        return new_id
+
     # -----------------------------------------------------------
     # 2) READ (Single / All)
     # -----------------------------------------------------------
+    @staticmethod
+    def _row_to_node(row: dict) -> SystemNode:
+        """
+        Build a SystemNode from a dictionary-cursor row, decoding the JSON columns.
+        """
+        return SystemNode(
+            ID=row["ID"],
+            ParentID=row["ParentID"],
+            Name=row["Name"],
+            Description=row["Description"],
+            Notes=row["Notes"],
+            Tags=json.loads(row["Tags"]) if row["Tags"] else {},
+            Metadata=json.loads(row["Metadata"]) if row["Metadata"] else {},
+            Status=row["Status"],
+            Importance=row["Importance"],
+            SortOrder=row["SortOrder"]
+        )
+
+    @traced("dao.read")
     def read(self, node_id: int) -> Optional[SystemNode]:
         """
         Fetch a single row by ID. Returns a SystemNode or None if not found.
         """
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
-            cursor = conn.cursor(dictionary=True)
-            sql = """
-                SELECT
-                    ID, ParentID, Name, Description, Notes,
-                    Tags, Metadata, Status, Importance, SortOrder
-                FROM SystemNode
-                WHERE ID = %s
-            """
-            cursor.execute(sql, (node_id,))
-            row = cursor.fetchone()
-            cursor.close()
-
+            row = self._fetch(conn, SELECT_NODE_BY_ID_SQL, (node_id,), one=True)
             if not row:
                 return None
 
-            return SystemNode(
-                ID=row["ID"],
-                ParentID=row["ParentID"],
-                Name=row["Name"],
-                Description=row["Description"],
-                Notes=row["Notes"],
-                Tags=json.loads(row["Tags"]) if row["Tags"] else {},
-                Metadata=json.loads(row["Metadata"]) if row["Metadata"] else {},
-                Status=row["Status"],
-                Importance=row["Importance"],
-                SortOrder=row["SortOrder"]
-            )
+            return self._row_to_node(row)
         finally:
             conn.close()
 
+    @traced("dao.read_by_parent")
     def read_by_parent(self, parent_id: Optional[int]) -> list[SystemNode]:
         """
         Return all nodes whose ParentID == parent_id (null or not),
         ordered by SortOrder.
         """
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
-            cursor = conn.cursor(dictionary=True)
-            sql = """
-                SELECT
-                    ID, ParentID, Name, Description, Notes,
-                    Tags, Metadata, Status, Importance, SortOrder
-                FROM SystemNode
-                WHERE ParentID <=> %s
-                ORDER BY SortOrder
-            """
-            cursor.execute(sql, (parent_id,))
-            rows = cursor.fetchall()
-            cursor.close()
-
-            results = []
-            for row in rows:
-                results.append(SystemNode(
-                    ID=row["ID"],
-                    ParentID=row["ParentID"],
-                    Name=row["Name"],
-                    Description=row["Description"],
-                    Notes=row["Notes"],
-                    Tags=json.loads(row["Tags"]) if row["Tags"] else {},
-                    Metadata=json.loads(row["Metadata"]) if row["Metadata"] else {},
-                    Status=row["Status"],
-                    Importance=row["Importance"],
-                    SortOrder=row["SortOrder"]
-                ))
-            return results
+            rows = self._fetch(conn, SELECT_CHILDREN_SQL, (parent_id,))
+            return [self._row_to_node(row) for row in rows]
         finally:
             conn.close()
 
+    @traced("dao.read_all")
     def read_all(self) -> List[SystemNode]:
         """
         Fetch all rows from SystemNode. Returns a list of SystemNode objects.
         """
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
             cursor = conn.cursor(dictionary=True)
             sql = """
@@ -165,29 +387,74 @@ class SystemNodeDAO:
             rows = cursor.fetchall()
             cursor.close()
 
-            nodes = []
-            for row in rows:
-                node = SystemNode(
-                    ID=row["ID"],
-                    ParentID=row["ParentID"],
-                    Name=row["Name"],
-                    Description=row["Description"],
-                    Notes=row["Notes"],
-                    Tags=json.loads(row["Tags"]) if row["Tags"] else {},
-                    Metadata=json.loads(row["Metadata"]) if row["Metadata"] else {},
-                    Status=row["Status"],
-                    Importance=row["Importance"],
-                    SortOrder=row["SortOrder"]
-                )
-                nodes.append(node)
-
-            return nodes
+            return [self._row_to_node(row) for row in rows]
+        finally:
+            conn.close()
+
+    @traced("dao.resolve_path")
+    def resolve_path(self, path: str) -> Optional[SystemNode]:
+        """
+        The node at a path of Names such as "/Work/Projects/Q4", or None, in one query using
+        the (ParentID, Name) index. Where siblings share a Name, the first by SortOrder is
+        followed. Names compare with the column's collation (case-insensitive by default).
+        """
+        segments = split_path(path)
+        conn = self._get_read_connection()
+        try:
+            row = self._fetch(conn, resolve_path_sql(len(segments)), tuple(segments), one=True)
+            return self._row_to_node(row) if row else None
+        finally:
+            conn.close()
+
+    @traced("dao.resolve_paths")
+    def resolve_paths(self, paths: List[str], chunk_size: int = 500) -> List[Optional[SystemNode]]:
+        """
+        resolve_path for many paths at once: one query per path depth (shared prefixes are
+        looked up once), plus one to load the resolved rows. Results follow the order of paths.
+        """
+        split = [tuple(split_path(path)) for path in paths]
+        resolved: Dict[Tuple[str, ...], int] = {}  # path prefix -> node ID
+        conn = self._get_read_connection()
+        try:
+            cursor = conn.cursor()
+            for depth in range(1, max((len(s) for s in split), default=0) + 1):
+                wanted = list(dict.fromkeys(
+                    s[:depth] for s in split
+                    if len(s) >= depth and (depth == 1 or s[:depth - 1] in resolved)
+                ))
+                for i in range(0, len(wanted), chunk_size):
+                    chunk = wanted[i:i + chunk_size]
+                    params: list = []
+                    for index, prefix in enumerate(chunk):
+                        params += [index, resolved.get(prefix[:-1]), prefix[-1]]
+                    lookups = " UNION ALL ".join(["SELECT %s AS Idx, %s AS ParentID, %s AS Name"] * len(chunk))
+                    cursor.execute(f"""
+                        SELECT r.Idx, n.ID
+                        FROM ({lookups}) r
+                        JOIN SystemNode n ON n.ParentID <=> r.ParentID AND n.Name = r.Name
+                        ORDER BY r.Idx, n.SortOrder, n.ID
+                    """, tuple(params))
+                    for index, node_id in cursor.fetchall():
+                        resolved.setdefault(chunk[index], node_id)
+
+            node_ids = list(dict.fromkeys(resolved[s] for s in split if s in resolved))
+            nodes: Dict[int, SystemNode] = {}
+            row_cursor = conn.cursor(dictionary=True)
+            for i in range(0, len(node_ids), chunk_size):
+                batch = node_ids[i:i + chunk_size]
+                # A plain cursor: every batch size is different SQL, not worth a prepared statement
+                row_cursor.execute(SELECT_NODES_BY_IDS_SQL.format(ids=", ".join(["%s"] * len(batch))), tuple(batch))
+                nodes.update((row["ID"], self._row_to_node(row)) for row in row_cursor.fetchall())
+            cursor.close()
+            row_cursor.close()
+            return [nodes.get(resolved[s]) if s in resolved else None for s in split]
         finally:
             conn.close()
 
     # -----------------------------------------------------------
     # 3) UPDATE (Looser Concurrency)
     # -----------------------------------------------------------
+    @traced("dao.update")
     def update(self, old: SystemNode, new: SystemNode) -> bool:
         """
         Update a row only if the existing DB record still matches old.ID, old.ParentID,
@@ -196,56 +463,68 @@ class SystemNodeDAO:
         """
         conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            sql = """
-            UPDATE SystemNode
-            SET
-                ParentID = %s,
-                Name = %s,
-                Description = %s,
-                Notes = %s,
-                Tags = %s,
-                Metadata = %s,
-                Status = %s,
-                Importance = %s,
-                SortOrder = %s
-            WHERE
-                ID = %s
-                AND ParentID <=> %s
-                AND Status <=> %s
-                AND Importance = %s
-            """
-            # The SET uses the new node's data
-            set_params = (
-                new.ParentID,
-                new.Name,
-                new.Description,
-                new.Notes,
-                json.dumps(new.Tags) if new.Tags else None,
-                json.dumps(new.Metadata) if new.Metadata else None,
-                new.Status,
-                new.Importance,
-                new.SortOrder
-            )
-            # The WHERE uses old node's ID, ParentID, Status, Importance
-            where_params = (
-                old.ID,
-                old.ParentID,
-                old.Status,
-                old.Importance
-            )
-
-            cursor.execute(sql, set_params + where_params)
+            updated = self.update_in(conn, old, new)
             conn.commit()
-            updated_count = cursor.rowcount
-            cursor.close()
-            return updated_count == 1
+            self._note_write()
+            return updated
         finally:
             conn.close()
 
+    def update_in(self, conn: MySQLConnection, old: SystemNode, new: SystemNode) -> bool:
+        """
+        update()'s statements (and write hooks) on conn, in the caller's transaction; not committed.
+        """
+        cursor = conn.cursor()
+        sql = """
+        UPDATE SystemNode
+        SET
+            ParentID = %s,
+            Name = %s,
+            Description = %s,
+            Notes = %s,
+            Tags = %s,
+            Metadata = %s,
+            Status = %s,
+            Importance = %s,
+            SortOrder = %s
+        WHERE
+            ID = %s
+            AND ParentID <=> %s
+            AND Status <=> %s
+            AND Importance = %s
+        """
+        # The SET uses the new node's data
+        set_params = (
+            new.ParentID,
+            new.Name,
+            new.Description,
+            new.Notes,
+            json.dumps(new.Tags) if new.Tags else None,
+            json.dumps(new.Metadata) if new.Metadata else None,
+            new.Status,
+            new.Importance,
+            new.SortOrder
+        )
+        # The WHERE uses old node's ID, ParentID, Status, Importance
+        where_params = (
+            old.ID,
+            old.ParentID,
+            old.Status,
+            old.Importance
+        )
+
+        cursor.execute(sql, set_params + where_params)
+        updated_count = cursor.rowcount
+        if updated_count == 1:
+            for hook in self.write_hooks:
+                hook.on_update(conn, old, new)
+        cursor.close()
+        return updated_count == 1
+
     # -----------------------------------------------------------
     # 4) DELETE (Looser Concurrency)
     # -----------------------------------------------------------
+    @traced("dao.delete")
     def delete(self, old: SystemNode) -> bool:
         """
         Delete a row only if the existing DB record still matches old.ID, old.ParentID,
@@ -270,8 +549,12 @@ class SystemNodeDAO:
                 old.Importance
             )
             cursor.execute(sql, params)
-            conn.commit()
             deleted_count = cursor.rowcount
+            if deleted_count == 1:
+                for hook in self.write_hooks:
+                    hook.on_delete(conn, old)
+            conn.commit()
+            self._note_write()
             cursor.close()
             return deleted_count == 1
         finally:
@@ -280,22 +563,56 @@ class SystemNodeDAO:
     # -----------------------------------------------------------
     # 5) MOVE & REORDER
     # -----------------------------------------------------------
+    @traced("dao.move_node")
     def move_node(self, node_id: int, new_parent_id: Optional[int], target_index: Optional[int] = None) -> bool:
         """
         Move or reorder a node:
-          - If 'target_index' is specified, place the node at that SortOrder among siblings.
+          - If 'target_index' is specified, place the node at that SortOrder among its new
+            siblings (clamped to 1..end), shifting the siblings at and after it up by one.
           - If no 'target_index', place it at the end (max SortOrder + 1).
-          - Also handle removing the node from its old parent's "list" if parent changed,
-            and shifting sibling SortOrders if within same parent.
+          - The gap it leaves among its old siblings is closed, also when reordering within
+            the same parent, so sibling SortOrders stay 1..n.
+
+        Safe under concurrent moves: the transaction locks the children of both parents
+        (SELECT ... FOR UPDATE on the (ParentID, SortOrder) index) in ParentID order before
+        changing anything, so two moves never take the same locks in opposite orders.
+        Deadlocks and lock-wait timeouts that still occur (e.g. inside write hooks) are retried
+        with jittered exponential backoff, up to move_retries times (dao.move.* in GET /metrics).
 
         Returns True if exactly one row was updated, False otherwise.
         """
+        for attempt in range(self.move_retries + 1):
+            try:
+                moved = self._move_node_once(node_id, new_parent_id, target_index)
+                if moved is not None:
+                    return moved
+                reason = "parent_changed"
+            except mysql.connector.Error as e:
+                if e.errno not in RETRYABLE_ERRNOS:
+                    raise
+                if attempt == self.move_retries:
+                    metrics.incr("dao.move.gave_up")
+                    raise
+                reason = "deadlock" if e.errno == ER_LOCK_DEADLOCK else "lock_wait_timeout"
+            metrics.incr("dao.move.retries")
+            metrics.incr(f"dao.move.retries.{reason}")
+            with tracer.span("dao.move_node.backoff", reason=reason):
+                time.sleep(self.move_backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5))
+        raise RuntimeError(f"Node {node_id} kept changing parent during the move ({self.move_retries} retries)")
+
+    @traced("dao.move_node.attempt")
+    def _move_node_once(self, node_id: int, new_parent_id: Optional[int],
+                        target_index: Optional[int]) -> Optional[bool]:
+        """
+        One move transaction. Returns None if the node changed parent between the first
+        read and taking the locks (the caller retries).
+        """
         conn = self._get_connection()
         try:
             conn.start_transaction()
             cursor = conn.cursor(dictionary=True)
 
-            # 1) Read the current node info
+            # 1) Read the current node info (unlocked: it only tells us which sibling lists to lock)
             cursor.execute("SELECT ParentID, SortOrder FROM SystemNode WHERE ID = %s", (node_id,))
             old_row = cursor.fetchone()
             if not old_row:
@@ -304,45 +621,58 @@ class SystemNodeDAO:
                 return False
 
             old_parent = old_row["ParentID"]
-            old_sort_order = old_row["SortOrder"]
 
-            # If the parent isn't changing but we do have a target_index => reorder within the same parent
-            # If the parent is changing we do two steps: remove from old parent's list & insert into new parent's list.
-
-            # 2) If we are *changing* parents, close gap in the old parent's SortOrder
-            if old_parent != new_parent_id:
-                # Shift siblings after old_sort_order down by 1
-                shift_old_parent_sql = """
-                    UPDATE SystemNode
-                    SET SortOrder = SortOrder - 1
+            # 2) Lock both sibling lists, NULL parent first then ascending IDs (the index order).
+            #    Locking reads also return the latest committed SortOrders.
+            siblings = {}
+            for parent_id in sorted({old_parent, new_parent_id}, key=lambda p: (p is not None, p or 0)):
+                cursor.execute("""
+                    SELECT ID, SortOrder
+                    FROM SystemNode
                     WHERE ParentID <=> %s
-                      AND SortOrder > %s
-                """
-                cursor.execute(shift_old_parent_sql, (old_parent, old_sort_order))
+                    ORDER BY SortOrder
+                    FOR UPDATE
+                """, (parent_id,))
+                siblings[parent_id] = {row["ID"]: row["SortOrder"] for row in cursor.fetchall()}
+
+            if node_id not in siblings[old_parent]:
+                # A concurrent move took the node elsewhere before we locked; start over.
+                conn.rollback()
+                cursor.close()
+                return None
+            old_sort_order = siblings[old_parent][node_id]
+
+            # 3) Close the gap in the old parent's list
+            shift_old_parent_sql = """
+                UPDATE SystemNode
+                SET SortOrder = SortOrder - 1
+                WHERE ParentID <=> %s
+                  AND SortOrder > %s
+            """
+            cursor.execute(shift_old_parent_sql, (old_parent, old_sort_order))
 
-            # 3) Determine the actual target_index (SortOrder) in the new parent's list
-            if target_index is not None:
-                # Shift siblings >= target_index up by 1
+            # 4) Determine the actual SortOrder in the new parent's list (computed from the locked rows)
+            new_siblings = [
+                sort_order - 1 if old_parent == new_parent_id and sort_order > old_sort_order else sort_order
+                for sibling_id, sort_order in siblings[new_parent_id].items()
+                if sibling_id != node_id
+            ]
+            next_pos = max(new_siblings, default=0) + 1
+            if target_index is not None and target_index < next_pos:
+                new_sort_order = max(target_index, 1)
+                # Shift siblings >= new_sort_order up by 1
                 shift_new_parent_sql = """
                     UPDATE SystemNode
                     SET SortOrder = SortOrder + 1
                     WHERE ParentID <=> %s
                       AND SortOrder >= %s
+                      AND ID <> %s
                 """
-                cursor.execute(shift_new_parent_sql, (new_parent_id, target_index))
-                new_sort_order = target_index
+                cursor.execute(shift_new_parent_sql, (new_parent_id, new_sort_order, node_id))
             else:
-                # Place at the end if no target_index
-                sql_max = """
-                    SELECT COALESCE(MAX(SortOrder), 0) + 1 AS next_pos
-                    FROM SystemNode
-                    WHERE ParentID <=> %s
-                """
-                cursor.execute(sql_max, (new_parent_id,))
-                row = cursor.fetchone()
-                new_sort_order = row["next_pos"] if row else 1
+                new_sort_order = next_pos
 
-            # 4) Update the node to the new parent + new_sort_order
+            # 5) Update the node to the new parent + new_sort_order
             update_sql = """
                 UPDATE SystemNode
                 SET ParentID = %s, SortOrder = %s
@@ -350,8 +680,12 @@ class SystemNodeDAO:
             """
             cursor.execute(update_sql, (new_parent_id, new_sort_order, node_id))
             updated_count = cursor.rowcount
+            if updated_count == 1:
+                for hook in self.write_hooks:
+                    hook.on_move(conn, node_id, old_parent, new_parent_id)
 
             conn.commit()
+            self._note_write()
             cursor.close()
             return updated_count == 1
 
@@ -360,3 +694,59 @@ class SystemNodeDAO:
             raise
         finally:
             conn.close()
+
+    # -----------------------------------------------------------
+    # 6) BATCH WRITE (write-behind persistence)
+    # -----------------------------------------------------------
+    @traced("dao.apply_batch")
+    def apply_batch(self, upserts: List[SystemNode], deleted_ids: List[int]) -> None:
+        """
+        Persist final row states in a single transaction.
+        Upserts keep the caller's IDs and SortOrders (INSERT ... ON DUPLICATE KEY UPDATE),
+        then deleted_ids are removed in order (children before parents).
+        Write hooks do not run here; recompute derived tables after bulk batches.
+        """
+        conn = self._get_connection()
+        try:
+            conn.start_transaction()
+            cursor = conn.cursor()
+            if upserts:
+                sql_upsert = """
+                    INSERT INTO SystemNode (
+                        ID, ParentID, Name, Description, Notes,
+                        Tags, Metadata, Status, Importance, SortOrder
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        ParentID = VALUES(ParentID),
+                        Name = VALUES(Name),
+                        Description = VALUES(Description),
+                        Notes = VALUES(Notes),
+                        Tags = VALUES(Tags),
+                        Metadata = VALUES(Metadata),
+                        Status = VALUES(Status),
+                        Importance = VALUES(Importance),
+                        SortOrder = VALUES(SortOrder)
+                """
+                cursor.executemany(sql_upsert, [(
+                    node.ID,
+                    node.ParentID,
+                    node.Name,
+                    node.Description,
+                    node.Notes,
+                    json.dumps(node.Tags) if node.Tags else None,
+                    json.dumps(node.Metadata) if node.Metadata else None,
+                    node.Status,
+                    node.Importance,
+                    node.SortOrder
+                ) for node in upserts])
+            for node_id in deleted_ids:
+                cursor.execute("DELETE FROM SystemNode WHERE ID = %s", (node_id,))
+            conn.commit()
+            self._note_write()
+            cursor.close()
+        except:  # noqa
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
@@ -0,0 +1,39 @@
+from typing import Optional
+from mysql.connector import MySQLConnection
+from src.dao.system_node import SystemNode
+
+
+class WriteHook:
+    """
+    Extension point for SystemNodeDAO writes.
+
+    Each method runs on the write's own connection, after the row change and before
+    the commit, so anything a hook writes commits or rolls back together with it.
+    Hooks only fire when the write actually changed a row. Override what you need.
+    """
+
+    def on_create(self, conn: MySQLConnection, node: SystemNode) -> None:
+        """
+        node has its new ID and SortOrder filled in.
+        """
+
+    def on_update(self, conn: MySQLConnection, old: SystemNode, new: SystemNode) -> None:
+        """
+        old.ParentID and old.Status are the values the row had before the update.
+        """
+
+    def on_delete(self, conn: MySQLConnection, old: SystemNode) -> None:
+        """
+        old.ParentID and old.Status are the values of the deleted row.
+        """
+
+    def on_move(self, conn: MySQLConnection, node_id: int, old_parent_id: Optional[int],
+                new_parent_id: Optional[int]) -> None:
+        """
+        Called once the node and its siblings have their new SortOrders.
+        """
+
+    def on_reorder(self, conn: MySQLConnection, parent_id: Optional[int]) -> None:
+        """
+        The children of parent_id were renumbered (SortOrder only) by maintenance.
+        """
@@ -0,0 +1,48 @@
+import threading
+from typing import Dict
+
+
+class Metrics:
+    """
+    Process-wide counters and value observations, exposed by GET /metrics.
+
+    Counters only go up (e.g. "dao.coalesce.saved"). Observations keep count/sum/max
+    for a measured value (e.g. a duration in ms) so averages can be derived.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._observations: Dict[str, dict] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            obs = self._observations.get(name)
+            if obs is None:
+                obs = self._observations[name] = {"count": 0, "sum": 0.0, "max": value}
+            obs["count"] += 1
+            obs["sum"] += value
+            obs["max"] = max(obs["max"], value)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "observations": {name: dict(obs) for name, obs in self._observations.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,298 @@
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional, List, Dict, Any, Callable
+
+
+class Span:
+    """
+    One timed operation in a trace. Attributes may still be added after end() (e.g. the
+    row count once a query's rows are fetched); the trace is exported when its root ends.
+    """
+
+    def __init__(self, trace: "_Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self._start_ns = time.perf_counter_ns()
+        self.duration_ms: Optional[float] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self) -> None:
+        self.duration_ms = (time.perf_counter_ns() - self._start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 3),
+            "attributes": self.attributes,
+        }
+
+
+class _Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+
+
+# -----------------------------------------------------------
+# EXPORTERS
+# -----------------------------------------------------------
+class InMemoryExporter:
+    def __init__(self, max_traces: int = 1000):
+        """
+        Keeps the last max_traces finished traces (GET /traces reads them).
+        """
+        self._traces: deque = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[dict]) -> None:
+        with self._lock:
+            self._traces.append(spans)
+
+    def traces(self, trace_id: Optional[str] = None) -> List[List[dict]]:
+        with self._lock:
+            traces = list(self._traces)
+        if trace_id is not None:
+            traces = [spans for spans in traces if spans and spans[0]["trace_id"] == trace_id]
+        return traces
+
+
+class FileExporter:
+    def __init__(self, path: str):
+        """
+        Appends one JSON line per span to path.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[dict]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+# -----------------------------------------------------------
+# TRACER
+# -----------------------------------------------------------
+_current_span: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _SpanScope:
+    def __init__(self, span: Optional[Span], on_exit: Optional[Callable[[Span], None]] = None):
+        self.span = span
+        self._on_exit = on_exit
+        self._token = None
+
+    def __enter__(self):
+        if self.span is None:
+            return _NOOP_SPAN
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is None:
+            return False
+        self.span.end()
+        if exc is not None:
+            self.span.set(error=f"{exc_type.__name__}: {exc}")
+        _current_span.reset(self._token)
+        if self._on_exit is not None:
+            self._on_exit(self.span)
+        return False
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = 0.0, exporter=None, max_spans_per_trace: int = 500):
+        """
+        Records spans for a sample of traces (requests). Unsampled traces cost one
+        random() call at the root and a context-variable lookup per span site.
+
+        A trace starts with start_trace(); span() inside it records a child of the current
+        span. span() outside a sampled trace does nothing, so library code can call it
+        unconditionally. Finished traces go to the exporter (InMemoryExporter by default).
+        """
+        self.sample_rate = sample_rate
+        self.exporter = exporter if exporter is not None else InMemoryExporter()
+        self.max_spans_per_trace = max_spans_per_trace
+
+    def configure(self, sample_rate: Optional[float] = None, exporter=None) -> None:
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if exporter is not None:
+            self.exporter = exporter
+
+    @staticmethod
+    def new_trace_id() -> str:
+        return os.urandom(16).hex()
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    def active(self) -> bool:
+        return _current_span.get() is not None
+
+    def start_trace(self, name: str, trace_id: Optional[str] = None, force: bool = False,
+                    **attributes: Any) -> _SpanScope:
+        """
+        Open a root span (with a sample_rate chance, or always with force). Returns a
+        context manager yielding the span, or a no-op stand-in when not sampled.
+        """
+        if not force and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return _SpanScope(None)
+        trace = _Trace(trace_id or self.new_trace_id())
+        root = Span(trace, name, None, attributes)
+        trace.spans.append(root)
+        return _SpanScope(root, self._finish)
+
+    def span(self, name: str, **attributes: Any) -> _SpanScope:
+        parent = _current_span.get()
+        if parent is None or len(parent.trace.spans) >= self.max_spans_per_trace:
+            return _SpanScope(None)
+        span = Span(parent.trace, name, parent.span_id, attributes)
+        parent.trace.spans.append(span)
+        return _SpanScope(span)
+
+    def _finish(self, root: Span) -> None:
+        self.exporter.export([span.to_dict() for span in root.trace.spans])
+
+
+tracer = Tracer()
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator: run the function inside tracer.span(name).
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# -----------------------------------------------------------
+# DB-API INSTRUMENTATION
+# -----------------------------------------------------------
+def sql_shape(sql: str, limit: int = 200) -> str:
+    """
+    The statement with whitespace collapsed, truncated to limit characters. Parameters
+    are never included.
+    """
+    shape = " ".join(sql.split())
+    return shape if len(shape) <= limit else shape[:limit] + "..."
+
+
+class TracedCursor:
+    def __init__(self, cursor):
+        """
+        Wraps a DB-API cursor: execute/executemany get a "db.execute" span with the SQL
+        shape and rowcount; fetched row counts are added to that span.
+        """
+        self._cursor = cursor
+        self._span: Optional[Span] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _run(self, method: str, sql: str, params) -> Any:
+        with tracer.span("db.execute", sql=sql_shape(sql)) as span:
+            result = getattr(self._cursor, method)(sql, params)
+            if method == "executemany":
+                span.set(batch=len(params))
+            rowcount = getattr(self._cursor, "rowcount", -1)
+            if isinstance(rowcount, int) and rowcount >= 0:
+                span.set(rowcount=rowcount)
+        self._span = span if isinstance(span, Span) else None
+        return result
+
+    def execute(self, sql: str, params=()) -> Any:
+        return self._run("execute", sql, params)
+
+    def executemany(self, sql: str, params) -> Any:
+        return self._run("executemany", sql, params)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if self._span is not None:
+            self._span.set(rows=self._span.attributes.get("rows", 0) + (row is not None))
+        return row
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._span is not None:
+            self._span.set(rows=self._span.attributes.get("rows", 0) + len(rows))
+        return rows
+
+
+class TracedConnection:
+    def __init__(self, conn):
+        """
+        Wraps a DB-API connection so its cursors are TracedCursors and commit/rollback
+        get spans. Everything else goes to the wrapped connection.
+        """
+        self.wrapped = conn
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
+
+    def cursor(self, *args, **kwargs) -> TracedCursor:
+        return TracedCursor(self.wrapped.cursor(*args, **kwargs))
+
+    def prepared_cursor(self, *args, **kwargs) -> TracedCursor:
+        return TracedCursor(self.wrapped.prepared_cursor(*args, **kwargs))
+
+    def commit(self) -> None:
+        with tracer.span("db.commit"):
+            self.wrapped.commit()
+
+    def rollback(self) -> None:
+        with tracer.span("db.rollback"):
+            self.wrapped.rollback()
+
+
+def unwrap_connection(conn):
+    return conn.wrapped if isinstance(conn, TracedConnection) else conn
+
+
+def tracer_from_env() -> None:
+    """
+    Configure the global tracer from TRACE_SAMPLE_RATE (0..1, default 0 = off) and
+    TRACE_FILE (append spans as JSON lines there instead of keeping them in memory).
+    """
+    trace_file = os.getenv("TRACE_FILE")
+    tracer.configure(
+        sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0")),
+        exporter=FileExporter(trace_file) if trace_file else None
+    )
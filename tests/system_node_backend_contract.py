@@ -0,0 +1,215 @@
+import random
+import threading
+
+from src.dao.system_node import SystemNode
+from src.dao.system_node_backend import SystemNodeBackend
+
+
+class SystemNodeBackendContract:
+    """
+    Behavioural tests every SystemNodeBackend must pass.
+
+    Mix this into a unittest.TestCase that sets self.dao to a backend
+    over an empty SystemNode table in setUp().
+    """
+
+    dao: SystemNodeBackend
+
+    def _create(self, name: str, parent_id=None, status=None, importance=0) -> int:
+        return self.dao.create(SystemNode(ParentID=parent_id, Name=name, Status=status, Importance=importance))
+
+    def _child_names(self, parent_id) -> list:
+        return [n.Name for n in self.dao.read_by_parent(parent_id)]
+
+    # ------------------------------------------------------------------
+    # CREATE / READ
+    # ------------------------------------------------------------------
+    def test_create_appends_to_siblings(self) -> None:
+        root = self._create("Root")
+        a = self._create("A", root)
+        b = self._create("B", root)
+
+        self.assertEqual(self.dao.read(a).SortOrder, 1)
+        self.assertEqual(self.dao.read(b).SortOrder, 2)
+        self.assertEqual(self.dao.read(root).SortOrder, 1)
+
+    def test_read_round_trips_all_fields(self) -> None:
+        node_id = self.dao.create(SystemNode(
+            Name="Full",
+            Description="desc",
+            Notes="notes",
+            Tags={"k": "v"},
+            Metadata={"n": 1},
+            Status="Active",
+            Importance=3
+        ))
+
+        node = self.dao.read(node_id)
+        self.assertEqual(node.ID, node_id)
+        self.assertIsNone(node.ParentID)
+        self.assertEqual(node.Name, "Full")
+        self.assertEqual(node.Description, "desc")
+        self.assertEqual(node.Notes, "notes")
+        self.assertEqual(node.Tags, {"k": "v"})
+        self.assertEqual(node.Metadata, {"n": 1})
+        self.assertEqual(node.Status, "Active")
+        self.assertEqual(node.Importance, 3)
+
+    def test_read_missing_returns_none(self) -> None:
+        self.assertIsNone(self.dao.read(987654321))
+
+    def test_read_by_parent_handles_null_parent(self) -> None:
+        root = self._create("Root")
+        self._create("Child", root)
+        self._create("Root2")
+
+        self.assertEqual(self._child_names(None), ["Root", "Root2"])
+        self.assertEqual(self._child_names(root), ["Child"])
+
+    def test_read_all_orders_by_parent_then_sort_order(self) -> None:
+        root = self._create("Root")
+        self._create("C1", root)
+        self._create("C2", root)
+
+        nodes = self.dao.read_all()
+        self.assertEqual([n.Name for n in nodes], ["Root", "C1", "C2"])
+
+    # ------------------------------------------------------------------
+    # UPDATE / DELETE
+    # ------------------------------------------------------------------
+    def test_update_succeeds_when_old_matches(self) -> None:
+        node_id = self._create("Before", status="Active", importance=1)
+        old = self.dao.read(node_id)
+        new = SystemNode(ID=node_id, Name="After", Status="Done", Importance=2, SortOrder=old.SortOrder)
+
+        self.assertTrue(self.dao.update(old, new))
+        stored = self.dao.read(node_id)
+        self.assertEqual(stored.Name, "After")
+        self.assertEqual(stored.Status, "Done")
+
+    def test_update_fails_on_concurrency_mismatch(self) -> None:
+        node_id = self._create("Node", status="Active")
+        stale = SystemNode(ID=node_id, Status="Done")
+        new = SystemNode(ID=node_id, Name="Changed", Status="Done")
+
+        self.assertFalse(self.dao.update(stale, new))
+        self.assertEqual(self.dao.read(node_id).Name, "Node")
+
+    def test_delete_respects_concurrency_check(self) -> None:
+        node_id = self._create("Node", status="Active", importance=1)
+
+        self.assertFalse(self.dao.delete(SystemNode(ID=node_id, Status="Active", Importance=2)))
+        self.assertTrue(self.dao.delete(self.dao.read(node_id)))
+        self.assertIsNone(self.dao.read(node_id))
+
+    def test_delete_parent_with_children_fails(self) -> None:
+        root = self._create("Root")
+        self._create("Child", root)
+
+        with self.assertRaises(Exception):
+            self.dao.delete(self.dao.read(root))
+        self.assertIsNotNone(self.dao.read(root))
+
+    # ------------------------------------------------------------------
+    # PATHS
+    # ------------------------------------------------------------------
+    def test_resolve_path_follows_names_from_the_top(self) -> None:
+        work = self._create("Work")
+        projects = self._create("Projects", work)
+        q4 = self._create("Q4", projects)
+        self._create("Q4", work)  # same name elsewhere in the tree
+
+        self.assertEqual(self.dao.resolve_path("/Work/Projects/Q4").ID, q4)
+        self.assertEqual(self.dao.resolve_path("Work/Projects/").ID, projects)
+        self.assertIsNone(self.dao.resolve_path("/Work/Missing/Q4"))
+        self.assertIsNone(self.dao.resolve_path("/Projects"))
+        with self.assertRaises(ValueError):
+            self.dao.resolve_path("/")
+
+    def test_resolve_path_takes_first_sibling_by_sort_order(self) -> None:
+        root = self._create("Root")
+        first = self._create("Dup", root)
+        second = self._create("Dup", root)
+        self._create("Leaf", second)
+        self.assertTrue(self.dao.move_node(first, root, 2))
+
+        self.assertEqual(self.dao.resolve_path("/Root/Dup").ID, second)
+        self.assertIsNotNone(self.dao.resolve_path("/Root/Dup/Leaf"))
+
+    def test_resolve_paths_keeps_input_order(self) -> None:
+        work = self._create("Work")
+        projects = self._create("Projects", work)
+        home = self._create("Home")
+
+        nodes = self.dao.resolve_paths(["/Home", "/Work/Projects", "/Nope", "/Work/Projects", "/Work/Nope/Deeper"])
+
+        self.assertEqual([n.ID if n else None for n in nodes], [home, projects, None, projects, None])
+        self.assertEqual(self.dao.resolve_paths([]), [])
+
+    # ------------------------------------------------------------------
+    # MOVE
+    # ------------------------------------------------------------------
+    def test_move_to_other_parent_appends_and_closes_gap(self) -> None:
+        a = self._create("A")
+        b = self._create("B")
+        a1 = self._create("A1", a)
+        self._create("A2", a)
+        self._create("B1", b)
+
+        self.assertTrue(self.dao.move_node(a1, b))
+        self.assertEqual(self._child_names(a), ["A2"])
+        self.assertEqual(self._child_names(b), ["B1", "A1"])
+        self.assertEqual([n.SortOrder for n in self.dao.read_by_parent(a)], [1])
+        self.assertEqual([n.SortOrder for n in self.dao.read_by_parent(b)], [1, 2])
+
+    def test_move_to_target_index(self) -> None:
+        root = self._create("Root")
+        self._create("C1", root)
+        self._create("C2", root)
+        c3 = self._create("C3", root)
+
+        self.assertTrue(self.dao.move_node(c3, root, 1))
+        self.assertEqual(self._child_names(root), ["C3", "C1", "C2"])
+
+    def test_move_missing_node_returns_false(self) -> None:
+        self.assertFalse(self.dao.move_node(987654321, None))
+
+    def test_reorder_within_parent_keeps_sort_orders_contiguous(self) -> None:
+        root = self._create("Root")
+        c1 = self._create("C1", root)
+        self._create("C2", root)
+        c3 = self._create("C3", root)
+
+        self.assertTrue(self.dao.move_node(c1, root, 2))
+        self.assertEqual(self._child_names(root), ["C2", "C1", "C3"])
+        self.assertTrue(self.dao.move_node(c3, root))
+        self.assertTrue(self.dao.move_node(c1, root, 99))
+        self.assertEqual(self._child_names(root), ["C2", "C3", "C1"])
+        self.assertEqual([n.SortOrder for n in self.dao.read_by_parent(root)], [1, 2, 3])
+
+    def test_concurrent_moves_keep_sibling_orders_a_permutation(self) -> None:
+        parents = [self._create("P1"), self._create("P2")]
+        children = [self._create(f"C{i}", parents[i % 2]) for i in range(12)]
+        errors = []
+
+        def mover(seed: int) -> None:
+            rng = random.Random(seed)
+            try:
+                for _ in range(25):
+                    self.dao.move_node(rng.choice(children), rng.choice(parents), rng.choice([None, 1, 2, 5]))
+            except Exception as e:  # surfaced below; a thread exception would otherwise be lost
+                errors.append(e)
+
+        threads = [threading.Thread(target=mover, args=(seed,)) for seed in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        total = 0
+        for parent_id in parents:
+            orders = [n.SortOrder for n in self.dao.read_by_parent(parent_id)]
+            self.assertEqual(orders, list(range(1, len(orders) + 1)))
+            total += len(orders)
+        self.assertEqual(total, len(children))
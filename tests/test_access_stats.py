@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.dao.access_stats import (HOT_KEY, AccessTrackingSystemNodeDAO, CachePrewarmer, DecayingTopK,
+                                  access_tracking_from_env)
+from src.dao.cache import CachedSystemNodeDAO, LocalKVStore
+from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO
+from src.dao.system_node import SystemNode
+from src.metrics import metrics
+from tests.system_node_backend_contract import SystemNodeBackendContract
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDecayingTopK(unittest.TestCase):
+    def test_ranks_skewed_keys_in_bounded_memory(self) -> None:
+        sketch = DecayingTopK(capacity=10, width=256)
+        for key in range(2000):
+            sketch.add(key)
+        for hot in range(5):
+            for _ in range(100 * (hot + 1)):
+                sketch.add(f"hot{hot}")
+
+        top = sketch.top(5)
+
+        self.assertEqual([key for key, _ in top], ["hot4", "hot3", "hot2", "hot1", "hot0"])
+        self.assertGreaterEqual(top[0][1], 500)
+        self.assertLessEqual(len(sketch._top), 20)
+
+    def test_counts_halve_every_half_life(self) -> None:
+        clock = FakeClock()
+        sketch = DecayingTopK(half_life_seconds=10, clock=clock)
+        sketch.add("old", 8)
+        clock.now = 20
+        sketch.add("new", 3)
+
+        self.assertEqual(sketch.top(), [("new", 3.0), ("old", 2.0)])
+
+    def test_rescale_keeps_decayed_counts(self) -> None:
+        clock = FakeClock()
+        sketch = DecayingTopK(half_life_seconds=1, clock=clock)
+        sketch.add("a", 2 ** 40)
+        clock.now = 40
+        sketch.add("b", 1)
+
+        self.assertEqual(sketch._epoch, 40)
+        self.assertEqual(dict(sketch.top()), {"a": 1.0, "b": 1.0})
+
+
+class TestAccessTrackingContract(SystemNodeBackendContract, unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backing = SQLiteSystemNodeDAO(os.path.join(self.tmpdir.name, "system.db"))
+        self.dao = AccessTrackingSystemNodeDAO(self.backing, sample_rate=1.0)
+
+    def tearDown(self) -> None:
+        self.backing.close()
+        self.tmpdir.cleanup()
+
+
+class TestAccessTracking(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backing = SQLiteSystemNodeDAO(os.path.join(self.tmpdir.name, "system.db"))
+        self.root = self.backing.create(SystemNode(Name="Root"))
+        self.child = self.backing.create(SystemNode(ParentID=self.root, Name="Child"))
+        self.leaf = self.backing.create(SystemNode(ParentID=self.child, Name="Leaf"))
+
+    def tearDown(self) -> None:
+        self.backing.close()
+        self.tmpdir.cleanup()
+
+    def test_reads_are_counted_by_node_and_parent(self) -> None:
+        tracker = AccessTrackingSystemNodeDAO(self.backing, sample_rate=1.0)
+        for _ in range(3):
+            tracker.read(self.child)
+        tracker.read(self.root)
+        tracker.read_by_parent(self.root)
+
+        hot = tracker.hot()
+
+        self.assertEqual([item["ID"] for item in hot["nodes"]], [self.child, self.root])
+        self.assertEqual(hot["nodes"][0]["count"], 3.0)
+        self.assertEqual(hot["parents"], [{"ParentID": self.root, "count": 1.0}])
+        self.assertEqual(metrics.counter("dao.access.sampled"), 5)
+
+    def test_prewarm_fills_the_cache_and_survives_a_restart(self) -> None:
+        store = LocalKVStore()
+        tracker = AccessTrackingSystemNodeDAO(self.backing, sample_rate=1.0)
+        tracker.read(self.leaf)
+        tracker.read_by_parent(self.root)
+        spy = MagicMock(wraps=self.backing)
+        cache = CachedSystemNodeDAO(spy, store)
+
+        result = CachePrewarmer(tracker, cache, depth=2).run_once()
+
+        self.assertEqual(result, {"nodes": 1, "parents": 1, "keys": 3})
+        self.assertEqual(spy.read.call_count, 1)
+        self.assertEqual(spy.read_by_parent.call_count, 2)
+        cache.read(self.leaf)
+        cache.read_by_parent(self.child)
+        self.assertEqual(spy.read.call_count, 1)
+        self.assertEqual(spy.read_by_parent.call_count, 2)
+        self.assertEqual(tracker.hot()["nodes"][0]["count"], 1.0)  # prefetches are not accesses
+
+        restarted = AccessTrackingSystemNodeDAO(self.backing)
+        prewarmer = CachePrewarmer(restarted, CachedSystemNodeDAO(self.backing, store))
+        self.assertEqual(prewarmer.load_saved(), 2)
+        self.assertEqual(prewarmer.load_saved(), 0)
+        self.assertEqual(restarted.hot()["nodes"][0]["ID"], self.leaf)
+        self.assertIsNotNone(store.get_many([HOT_KEY])[0])
+
+    @patch.dict(os.environ, {"ACCESS_STATS": "true", "ACCESS_STATS_SAMPLE_RATE": "0.5",
+                             "ACCESS_STATS_HALF_LIFE_SECONDS": "60"})
+    def test_from_env(self) -> None:
+        tracker = access_tracking_from_env(self.backing)
+
+        self.assertEqual(tracker.sample_rate, 0.5)
+        self.assertEqual(tracker.nodes.half_life_seconds, 60)
+        with patch.dict(os.environ, {"ACCESS_STATS": "false"}):
+            self.assertIsNone(access_tracking_from_env(self.backing))
+
+
+if __name__ == "__main__":
+    unittest.main()
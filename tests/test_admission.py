@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.admission import AdmissionController, Bulkhead, admission_from_env
+from src.metrics import metrics
+
+
+class TestBulkhead(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+
+    def test_admits_up_to_the_limit_then_sheds_when_queue_is_full(self) -> None:
+        bulkhead = Bulkhead("read", limit=2, queue_size=0, wait_seconds=1.0)
+
+        self.assertTrue(bulkhead.acquire())
+        self.assertTrue(bulkhead.acquire())
+        self.assertFalse(bulkhead.acquire())
+        self.assertEqual(metrics.counter("http.admission.read.shed_queue_full"), 1)
+
+        bulkhead.release()
+        self.assertTrue(bulkhead.acquire())
+
+    def test_queued_request_times_out(self) -> None:
+        bulkhead = Bulkhead("heavy", limit=1, queue_size=1, wait_seconds=0.05)
+        bulkhead.acquire()
+
+        start = time.monotonic()
+        self.assertFalse(bulkhead.acquire())
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(metrics.counter("http.admission.heavy.shed_timeout"), 1)
+        self.assertEqual(bulkhead.waiting, 0)
+
+    def test_queued_request_gets_the_released_slot(self) -> None:
+        bulkhead = Bulkhead("write", limit=1, queue_size=1, wait_seconds=5.0)
+        bulkhead.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(bulkhead.acquire()))
+        waiter.start()
+        while bulkhead.waiting == 0:
+            time.sleep(0.001)
+
+        self.assertFalse(bulkhead.acquire())  # the one queue place is taken
+        bulkhead.release()
+        waiter.join(timeout=5)
+
+        self.assertEqual(results, [True])
+        self.assertEqual(bulkhead.active, 1)
+        self.assertEqual(metrics.snapshot()["observations"]["http.admission.write.wait_ms"]["count"], 1)
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_classes_are_isolated(self) -> None:
+        controller = AdmissionController({"heavy": (1, 0, 0.0), "read": (1, 0, 0.0)})
+
+        self.assertIsNotNone(controller.acquire("heavy"))
+        self.assertIsNone(controller.acquire("heavy"))
+        self.assertIsNotNone(controller.acquire("read"))
+
+    @patch.dict(os.environ, {"ADMISSION_CONTROL": "true", "ADMISSION_LIMITS": "heavy=1:0:0,read=64:8:0.25",
+                             "ADMISSION_RETRY_AFTER": "3"})
+    def test_limits_from_env(self) -> None:
+        controller = admission_from_env()
+
+        heavy, read, write = (controller.bulkheads[name] for name in ("heavy", "read", "write"))
+        self.assertEqual((heavy.limit, heavy.queue_size, heavy.wait_seconds), (1, 0, 0.0))
+        self.assertEqual((read.limit, read.queue_size, read.wait_seconds), (64, 8, 0.25))
+        self.assertEqual(write.limit, 8)
+        self.assertEqual(controller.retry_after_seconds, 3)
+
+    @patch.dict(os.environ, {"ADMISSION_CONTROL": "false"})
+    def test_off_by_default(self) -> None:
+        self.assertIsNone(admission_from_env())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dao.archive import (
+    archive_subtree, archive_all, unarchive_subtree, read_archived, read_archived_children,
+    SELECT_ARCHIVED_SQL, SELECT_ARCHIVED_CHILDREN_SQL
+)
+from src.dao.system_node_dao import SystemNodeDAO
+from src.dao.write_hooks import WriteHook
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+def make_row(node_id, parent_id, sort_order, eligible=1) -> dict:
+    return {"ID": node_id, "ParentID": parent_id, "Name": f"n{node_id}", "Description": None, "Notes": None,
+            "Tags": None, "Metadata": None, "Status": "Done", "Importance": 0, "SortOrder": sort_order,
+            "Eligible": eligible}
+
+
+class TestArchiveSubtree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.hook = MagicMock(spec=WriteHook)
+        self.dao = SystemNodeDAO({"host": "fake"}, write_hooks=[self.hook])
+
+    def _executed(self, mock_cursor: MagicMock) -> list:
+        return [(normalize_sql(c[0][0]), c[0][1] if len(c[0]) > 1 else None)
+                for c in mock_cursor.execute.call_args_list]
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_moves_subtree_and_closes_the_gap(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": 10}
+        mock_cursor.fetchall.side_effect = [
+            [{"ID": 5, "SortOrder": 2}, {"ID": 6, "SortOrder": 3}],  # locked siblings
+            [make_row(5, 10, 2)],                                    # subtree root
+            [make_row(7, 5, 1)],                                     # its children
+            [],
+        ]
+
+        result = archive_subtree(self.dao, 5, older_than_days=90)
+
+        self.assertEqual(result, {"ID": 5, "ParentID": 10, "rows": 2, "archived": 2, "ids": [5, 7], "renumbered": [6]})
+        executed = self._executed(mock_cursor)
+        self.assertTrue(all(sql.endswith("for update") for sql, _ in executed[1:4]))
+        insert = [(sql, params) for sql, params in executed if sql.startswith("insert into systemnodearchive")]
+        self.assertEqual(insert[0][1], (5, 7))
+        deletes = [params for sql, params in executed if sql.startswith("delete from systemnode ")]
+        self.assertEqual(deletes, [(7,), (5,)])
+        gap = [params for sql, params in executed if "sortorder = sortorder - 1" in sql]
+        self.assertEqual(gap, [(10, 2)])
+        self.assertEqual([c[0][1].ID for c in self.hook.on_delete.call_args_list], [7, 5])
+        self.hook.on_reorder.assert_called_once_with(mock_conn, 10)
+        mock_conn.commit.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_skips_subtree_with_an_ineligible_node(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": None}
+        mock_cursor.fetchall.side_effect = [
+            [{"ID": 5, "SortOrder": 1}],
+            [make_row(5, None, 1)],
+            [make_row(7, 5, 1), make_row(8, 5, 2, eligible=0)],
+        ]
+
+        result = archive_subtree(self.dao, 5, older_than_days=90)
+
+        self.assertEqual(result["skipped"], "not_eligible")
+        self.assertEqual(result["archived"], 0)
+        self.assertFalse(any(sql.startswith(("insert", "delete")) for sql, _ in self._executed(mock_cursor)))
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_skips_subtree_over_max_rows(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": None}
+        mock_cursor.fetchall.side_effect = [
+            [{"ID": 5, "SortOrder": 1}],
+            [make_row(5, None, 1)],
+            [make_row(7, 5, 1), make_row(8, 5, 2)],
+        ]
+
+        self.assertEqual(archive_subtree(self.dao, 5, older_than_days=90, max_rows=2)["skipped"], "too_large")
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_dry_run_reads_without_locking_or_writing(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": None}
+        mock_cursor.fetchall.side_effect = [[make_row(5, None, 1)], []]
+
+        result = archive_subtree(self.dao, 5, older_than_days=90, dry_run=True)
+
+        self.assertEqual((result["rows"], result["archived"]), (1, 0))
+        self.assertFalse(any("for update" in sql for sql, _ in self._executed(mock_cursor)))
+        mock_conn.commit.assert_not_called()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_missing_root_is_skipped(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.fetchone.return_value = None
+        self.assertEqual(archive_subtree(self.dao, 5, older_than_days=90)["skipped"], "not_found")
+
+
+class TestArchiveAll(unittest.TestCase):
+    @patch("src.dao.archive.archive_subtree")
+    @patch("src.dao.archive.find_archivable_roots", return_value=[1, 2, 3])
+    def test_reports_each_subtree(self, mock_find: MagicMock, mock_archive: MagicMock) -> None:
+        mock_archive.side_effect = [
+            {"ID": 1, "ParentID": None, "rows": 4, "archived": 4, "ids": [1, 11, 12, 13]},
+            {"ID": 2, "ParentID": None, "rows": 0, "archived": 0, "ids": [], "skipped": "too_large"},
+            {"ID": 3, "ParentID": None, "rows": 0, "archived": 0, "ids": [], "skipped": "not_eligible"},
+        ]
+        archived = []
+
+        report = archive_all(MagicMock(), older_than_days=30, pause_seconds=0, on_archived=archived.append)
+
+        mock_find.assert_called_once()
+        self.assertEqual((report["subtrees"], report["rows"], report["skipped"]), (1, 4, 1))
+        self.assertEqual(report["too_large"], [2])
+        self.assertEqual(report["roots"], [1])
+        self.assertEqual([r["ID"] for r in archived], [1])
+
+
+class TestUnarchiveSubtree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.hook = MagicMock(spec=WriteHook)
+        self.dao = SystemNodeDAO({"host": "fake"}, write_hooks=[self.hook])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_restores_subtree_after_live_siblings(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.side_effect = [{"ParentID": 10}, {"ID": 10}]
+        mock_cursor.fetchall.side_effect = [
+            [{"ID": 6, "SortOrder": 1}],  # live siblings
+            [make_row(5, 10, 2)],
+            [make_row(7, 5, 1)],
+            [],
+        ]
+
+        result = unarchive_subtree(self.dao, 5)
+
+        self.assertEqual(result, {"ID": 5, "ParentID": 10, "SortOrder": 2, "restored": 2, "ids": [5, 7]})
+        executed = [(normalize_sql(c[0][0]), c[0][1]) for c in mock_cursor.execute.call_args_list]
+        inserts = [params for sql, params in executed if sql.startswith("insert into systemnode ")]
+        self.assertEqual(inserts, [(5, 2, 5), (5, 2, 7)])
+        deletes = [params for sql, params in executed if sql.startswith("delete from systemnodearchive")]
+        self.assertEqual(deletes, [(5, 7)])
+        created = [c[0][1] for c in self.hook.on_create.call_args_list]
+        self.assertEqual([(n.ID, n.SortOrder) for n in created], [(5, 2), (7, 1)])
+        mock_conn.commit.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_refuses_when_parent_is_not_live(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_conn.cursor.return_value.fetchone.side_effect = [{"ParentID": 10}, None]
+
+        with self.assertRaises(ValueError):
+            unarchive_subtree(self.dao, 5)
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_refuses_node_that_is_not_archived(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.fetchone.return_value = None
+        with self.assertRaises(ValueError):
+            unarchive_subtree(self.dao, 5)
+
+
+class TestReadArchived(unittest.TestCase):
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_reads_use_constant_sql(self, mock_connect: MagicMock) -> None:
+        # Prepared statements are re-prepared whenever the SQL is a different str object
+        dao = SystemNodeDAO({"host": "fake"})
+        dao._fetch = MagicMock(side_effect=[None, [], None, []])
+
+        for node_id in (5, 6):
+            self.assertIsNone(read_archived(dao, node_id))
+            self.assertEqual(read_archived_children(dao, node_id), [])
+
+        statements = [c[0][1] for c in dao._fetch.call_args_list]
+        self.assertEqual([id(sql) for sql in statements],
+                         [id(SELECT_ARCHIVED_SQL), id(SELECT_ARCHIVED_CHILDREN_SQL)] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
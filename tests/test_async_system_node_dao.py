@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+
+try:
+    import aiomysql
+except ImportError:  # the async DAO is optional; its tests need the driver installed
+    aiomysql = None
+
+from src.dao.system_node import SystemNode
+
+
+class FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rowcount = 1
+        self.lastrowid = None
+        self._result = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=()):
+        self.pool.executed.append((" ".join(sql.split()), params))
+        self.pool.active += 1
+        self.pool.max_active = max(self.pool.max_active, self.pool.active)
+        await asyncio.sleep(0.01)
+        self.pool.active -= 1
+        result = self.pool.results.pop(0) if self.pool.results else []
+        if isinstance(result, Exception):
+            raise result
+        self._result = result
+
+    async def fetchone(self):
+        return self._result[0] if self._result else None
+
+    async def fetchall(self):
+        return self._result
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def cursor(self, *args):
+        return FakeCursor(self.pool)
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        self.pool.commits += 1
+
+    async def rollback(self):
+        self.pool.rollbacks += 1
+
+
+class FakePool:
+    def __init__(self, results=None):
+        self.results = list(results or [])
+        self.executed = []
+        self.active = self.max_active = 0
+        self.commits = self.rollbacks = 0
+
+    def acquire(self):
+        return FakeConnection(self)
+
+
+def db_row(node_id, parent_id=None):
+    return {"ID": node_id, "ParentID": parent_id, "Name": f"n{node_id}", "Description": None, "Notes": None,
+            "Tags": None, "Metadata": None, "Status": None, "Importance": 0, "SortOrder": 1}
+
+
+@unittest.skipUnless(aiomysql, "aiomysql is not installed")
+class TestAsyncSystemNodeDAO(unittest.TestCase):
+    def setUp(self) -> None:
+        from src.dao.async_system_node_dao import AsyncSystemNodeDAO
+
+        self.dao = AsyncSystemNodeDAO({"host": "fake"}, move_backoff_seconds=0)
+
+    def test_read_by_parents_runs_queries_concurrently(self) -> None:
+        self.dao._pool = FakePool([[db_row(2, 1)], [db_row(3, 5)], [db_row(4)]])
+
+        children = asyncio.run(self.dao.read_by_parents([1, 5, None, 1]))
+
+        self.assertEqual(list(children), [1, 5, None])
+        self.assertEqual(self.dao._pool.max_active, 3)
+        self.assertTrue(all("where parentid <=> %s" in sql.lower() for sql, _ in self.dao._pool.executed))
+
+    def test_read_decodes_row(self) -> None:
+        self.dao._pool = FakePool([[dict(db_row(7), Tags='{"a": 1}')]])
+
+        node = asyncio.run(self.dao.read(7))
+
+        self.assertEqual(node, SystemNode(ID=7, Name="n7", Tags={"a": 1}, Metadata={}, SortOrder=1))
+
+    def test_move_retries_deadlock(self) -> None:
+        self.dao._pool = FakePool([
+            [{"ParentID": None, "SortOrder": 1}], aiomysql.OperationalError(1213, "Deadlock found"),
+            [{"ParentID": None, "SortOrder": 1}], [{"ID": 4, "SortOrder": 1}], [], [], [],
+        ])
+
+        self.assertTrue(asyncio.run(self.dao.move_node(4, 9)))
+
+        self.assertEqual(self.dao._pool.rollbacks, 1)
+        self.assertEqual(self.dao._pool.commits, 1)
+        self.assertEqual(self.dao._pool.executed[-1][1], (9, 1, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
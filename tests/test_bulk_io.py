@@ -0,0 +1,144 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dao.bulk_io import iter_export_rows, iter_ndjson_gzip, export_to_file, import_ndjson
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+def db_row(node_id, parent_id=None, name="n"):
+    return {
+        "ID": node_id, "ParentID": parent_id, "Name": name, "Description": None, "Notes": None,
+        "Tags": '{"t": 1}', "Metadata": None, "Status": "Active", "Importance": 0, "SortOrder": 1
+    }
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({"host": "fake"})
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_rows_stream_in_batches(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchmany.side_effect = [[db_row(1), db_row(2, 1)], [db_row(3, 1)], []]
+
+        rows = list(iter_export_rows(self.dao, fetch_size=2))
+
+        self.assertEqual([r["ID"] for r in rows], [1, 2, 3])
+        self.assertEqual(rows[0]["Tags"], {"t": 1})
+        self.assertEqual(rows[0]["Metadata"], {})
+        mock_connect.return_value.cursor.assert_called_with(dictionary=True, buffered=False)
+        self.assertIn("order by id", normalize_sql(mock_cursor.execute.call_args[0][0]))
+        mock_connect.return_value.close.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_abandoned_export_does_not_go_back_to_the_pool(self, mock_connect: MagicMock) -> None:
+        # The unbuffered result is still unread; the next borrower would fail on it
+        dao = SystemNodeDAO({"host": "fake"}, pool_size=1)
+        mock_connect.return_value.cursor.return_value.fetchmany.side_effect = [[db_row(1), db_row(2, 1)], []]
+
+        rows = iter_export_rows(dao, fetch_size=2)
+        next(rows)
+        rows.close()
+
+        mock_connect.return_value.close.assert_called_once()
+        self.assertEqual(dao._read_pool._idle.qsize(), 0)
+        dao._read_pool.get().close()
+        self.assertEqual(mock_connect.call_count, 2)
+
+    def test_gzip_stream_round_trips(self) -> None:
+        rows = [{"ID": i, "Name": f"n{i}"} for i in range(2500)]
+
+        data = b"".join(iter_ndjson_gzip(iter(rows), flush_rows=1000))
+
+        lines = gzip.decompress(data).decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], rows)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_export_to_file_counts_rows(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchmany.side_effect = [[db_row(1), db_row(2, 1)], []]
+        path = os.path.join(self.tmpdir.name, "out.ndjson.gz")
+
+        self.assertEqual(export_to_file(self.dao, path), 2)
+        with gzip.open(path, "rt") as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+
+
+class TestImport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({"host": "fake"})
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "in.ndjson.gz")
+        with gzip.open(self.path, "wt") as f:
+            for node_id, parent_id in [(1, None), (2, 1), (3, 1), (4, 2), (5, None)]:
+                f.write(json.dumps({"ID": node_id, "ParentID": parent_id, "Name": f"n{node_id}",
+                                    "Tags": {"k": node_id}, "SortOrder": 1}) + "\n")
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    @staticmethod
+    def _inserted_rows(mock_cursor: MagicMock) -> list:
+        rows = []
+        for call in mock_cursor.executemany.call_args_list:
+            rows.extend(call[0][1])
+        return sorted(rows)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_preserves_ids_in_chunks(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (0,)
+
+        result = import_ndjson(self.dao, self.path, chunk_size=2, workers=2)
+
+        self.assertEqual(result["imported"], 5)
+        self.assertEqual(result["failed_chunks"], [])
+        self.assertEqual(mock_cursor.executemany.call_count, 3)
+        rows = self._inserted_rows(mock_cursor)
+        self.assertEqual([(r[0], r[1]) for r in rows], [(1, None), (2, 1), (3, 1), (4, 2), (5, None)])
+        self.assertEqual(rows[0][5], '{"k": 1}')
+        executed = [normalize_sql(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        self.assertEqual(executed.count("set session foreign_key_checks = 0"), 3)
+        self.assertEqual(executed.count("set session foreign_key_checks = 1"), 3)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_remap_shifts_ids_past_existing_rows(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (100,)
+
+        result = import_ndjson(self.dao, self.path, remap_ids=True, chunk_size=10, workers=1)
+
+        self.assertEqual(result["id_offset"], 100)
+        rows = self._inserted_rows(mock_cursor)
+        self.assertEqual([(r[0], r[1]) for r in rows], [(101, None), (102, 101), (103, 101), (104, 102), (105, None)])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_failed_chunk_is_reported(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (0,)
+        mock_cursor.executemany.side_effect = [None, RuntimeError("duplicate key"), None]
+
+        result = import_ndjson(self.dao, self.path, chunk_size=2, workers=1)
+
+        self.assertEqual(result["imported"], 3)
+        self.assertEqual(len(result["failed_chunks"]), 1)
+        self.assertEqual(result["failed_chunks"][0]["first_line"], 3)
+        self.assertEqual(result["failed_chunks"][0]["last_line"], 4)
+        executed = [normalize_sql(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        self.assertEqual(executed.count("set session foreign_key_checks = 1"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.dao.cache import CachedSystemNodeDAO, LocalKVStore, kv_store_from_url, _node_key, _version_key
+from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+from src.metrics import metrics
+from tests.system_node_backend_contract import SystemNodeBackendContract
+
+
+class TestCachedSystemNodeDAOContract(SystemNodeBackendContract, unittest.TestCase):
+    """
+    Runs the backend contract through the cache, on top of a real SQLite file.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backing = SQLiteSystemNodeDAO(os.path.join(self.tmpdir.name, "system.db"))
+        self.dao = CachedSystemNodeDAO(self.backing, LocalKVStore(), near_cache_size=100)
+
+    def tearDown(self) -> None:
+        self.backing.close()
+        self.tmpdir.cleanup()
+
+
+class TestCachedSystemNodeDAO(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backing = SQLiteSystemNodeDAO(os.path.join(self.tmpdir.name, "system.db"))
+        self.store = LocalKVStore()
+
+    def tearDown(self) -> None:
+        self.backing.close()
+        self.tmpdir.cleanup()
+
+    def _worker(self, near_cache_size: int = 0) -> CachedSystemNodeDAO:
+        spy = MagicMock(wraps=self.backing)
+        return CachedSystemNodeDAO(spy, self.store, near_cache_size=near_cache_size)
+
+    def test_repeated_reads_hit_the_cache(self) -> None:
+        worker = self._worker()
+        node_id = worker.create(SystemNode(Name="A"))
+        for _ in range(3):
+            self.assertEqual(worker.read(node_id).Name, "A")
+            self.assertEqual([n.Name for n in worker.read_by_parent(None)], ["A"])
+
+        self.assertEqual(worker.dao.read.call_count, 1)
+        self.assertEqual(worker.dao.read_by_parent.call_count, 1)
+        self.assertEqual(metrics.counter("cache.hit"), 4)
+        self.assertEqual(metrics.counter("cache.miss"), 2)
+
+    def test_missing_node_is_cached_as_none(self) -> None:
+        worker = self._worker()
+        self.assertIsNone(worker.read(999))
+        self.assertIsNone(worker.read(999))
+        self.assertEqual(worker.dao.read.call_count, 1)
+
+    def test_write_in_one_worker_is_seen_by_another(self) -> None:
+        writer, reader = self._worker(near_cache_size=10), self._worker(near_cache_size=10)
+        node_id = writer.create(SystemNode(Name="A", Importance=1))
+        old = reader.read(node_id)
+        self.assertEqual(reader.read_by_parent(None)[0].Name, "A")
+
+        new = SystemNode(**{**old.__dict__, "Name": "B"})
+        self.assertTrue(writer.update(old, new))
+
+        self.assertEqual(reader.read(node_id).Name, "B")
+        self.assertEqual(reader.read_by_parent(None)[0].Name, "B")
+
+    def test_move_invalidates_both_sibling_lists_and_renumbered_nodes(self) -> None:
+        worker = self._worker()
+        left = worker.create(SystemNode(Name="Left"))
+        right = worker.create(SystemNode(Name="Right"))
+        a = worker.create(SystemNode(Name="A", ParentID=left))
+        b = worker.create(SystemNode(Name="B", ParentID=left))
+        worker.read_by_parent(left)
+        worker.read_by_parent(right)
+        self.assertEqual(worker.read(b).SortOrder, 2)
+
+        self.assertTrue(worker.move_node(a, right))
+
+        self.assertEqual([n.Name for n in worker.read_by_parent(left)], ["B"])
+        self.assertEqual([n.Name for n in worker.read_by_parent(right)], ["A"])
+        self.assertEqual(worker.read(b).SortOrder, 1)
+        self.assertEqual(worker.read(a).ParentID, right)
+
+    def test_entry_stored_by_a_read_that_raced_a_write_is_stale(self) -> None:
+        worker = self._worker()
+        node_id = worker.create(SystemNode(Name="A"))
+
+        # The read loads the old row, then a write commits and invalidates before the read stores it.
+        def slow_read(_node_id):
+            row = self.backing.read(_node_id)
+            worker.invalidate([node_id])
+            return row
+
+        worker.dao.read.side_effect = slow_read
+        self.assertEqual(worker.read(node_id).Name, "A")
+        worker.dao.read.side_effect = None
+
+        worker.read(node_id)
+        self.assertEqual(metrics.counter("cache.stale"), 1)
+        self.assertEqual(worker.dao.read.call_count, 2)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_misses_load_from_the_primary_not_a_replica(self, mock_connect: MagicMock) -> None:
+        # A lagging replica could return the row from before the write that bumped the version
+        hosts = []
+
+        def connect(**config):
+            hosts.append(config["host"])
+            conn = MagicMock()
+            conn.cursor.return_value.fetchone.return_value = None
+            conn.cursor.return_value.fetchall.return_value = []
+            return conn
+
+        mock_connect.side_effect = connect
+        dao = SystemNodeDAO({"host": "primary"}, replica_configs=[{"host": "replica"}])
+        worker = CachedSystemNodeDAO(dao, self.store)
+
+        worker.read(1)
+        worker.read_by_parent(None)
+        dao.read(1)
+
+        self.assertEqual(hosts, ["primary", "primary", "replica"])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_move_reads_the_siblings_to_invalidate_from_the_primary(self, mock_connect: MagicMock) -> None:
+        hosts = []
+
+        def connect(**config):
+            hosts.append(config["host"])
+            conn = MagicMock()
+            conn.cursor.return_value.fetchone.return_value = {
+                "ID": 5, "ParentID": 1, "Name": "N", "Description": None, "Notes": None, "Tags": None,
+                "Metadata": None, "Status": None, "Importance": 0, "SortOrder": 1
+            }
+            conn.cursor.return_value.fetchall.return_value = []
+            return conn
+
+        mock_connect.side_effect = connect
+        dao = SystemNodeDAO({"host": "primary"}, replica_configs=[{"host": "replica"}])
+        worker = CachedSystemNodeDAO(dao, self.store)
+
+        with patch.object(dao, "move_node", return_value=True):
+            self.assertTrue(worker.move_node(5, 2))
+
+        self.assertEqual(set(hosts), {"primary"})
+
+    def test_near_cache_answers_without_the_store(self) -> None:
+        worker = self._worker(near_cache_size=10)
+        node_id = worker.create(SystemNode(Name="A"))
+        worker.read(node_id)
+        self.store.get_many = MagicMock(side_effect=AssertionError("store was queried"))
+        self.assertEqual(worker.read(node_id).Name, "A")
+
+    def test_near_cache_is_bounded(self) -> None:
+        worker = self._worker(near_cache_size=2)
+        for node_id in (1, 2, 3):
+            worker.read(node_id)
+        self.assertEqual(list(worker._near), [_node_key(2), _node_key(3)])
+
+    def test_near_entry_expires_when_the_invalidation_is_lost(self) -> None:
+        worker = CachedSystemNodeDAO(self.backing, self.store, near_cache_size=10, near_ttl_seconds=5)
+        node_id = self.backing.create(SystemNode(Name="A"))
+        worker.read(node_id)
+        # Another worker's update whose announcement never reached this one
+        self.backing.update(self.backing.read(node_id), SystemNode(ID=node_id, Name="B"))
+        self.store.incr_many([_version_key(_node_key(node_id))], 60)
+
+        self.assertEqual(worker.read(node_id).Name, "A")
+        with patch("src.dao.cache.time.monotonic", return_value=time.monotonic() + 6):
+            self.assertEqual(worker.read(node_id).Name, "B")
+
+    def test_malformed_invalidation_message_is_ignored(self) -> None:
+        worker = self._worker(near_cache_size=10)
+        worker.read(1)
+        self.store.publish("systemnode:invalidate", b"not json")
+        self.assertIn(_node_key(1), worker._near)
+
+    def test_other_attributes_pass_through(self) -> None:
+        self.assertIs(CachedSystemNodeDAO(self.backing, self.store).db_path, self.backing.db_path)
+
+
+class TestLocalKVStore(unittest.TestCase):
+    def test_entries_expire(self) -> None:
+        store = LocalKVStore()
+        store.set_many({"a": b"1"}, ttl_seconds=-1)
+        store.set_many({"b": b"2"}, ttl_seconds=60)
+        self.assertEqual(store.get_many(["a", "b"]), [None, b"2"])
+
+    def test_incr_starts_from_zero(self) -> None:
+        store = LocalKVStore()
+        store.incr_many(["v", "v"], ttl_seconds=60)
+        self.assertEqual(store.get_many(["v"]), [b"2"])
+
+    def test_store_from_url(self) -> None:
+        self.assertIsInstance(kv_store_from_url("local"), LocalKVStore)
+        with self.assertRaises(ValueError):
+            kv_store_from_url("memcached://x")
+
+
+if __name__ == "__main__":
+    unittest.main()
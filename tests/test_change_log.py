@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dao.change_log import ChangeLog
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+class TestChangeLog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({"host": "fake"})
+        self.change_log = ChangeLog(self.dao)
+
+    def test_registers_as_write_hook(self) -> None:
+        self.assertIn(self.change_log, self.dao.write_hooks)
+
+    def test_update_that_reparents_marks_both_listings(self) -> None:
+        conn = MagicMock()
+
+        self.change_log.on_update(conn, SystemNode(ID=4, ParentID=1), SystemNode(ID=4, ParentID=2))
+
+        rows = conn.cursor.return_value.executemany.call_args[0][1]
+        self.assertEqual(rows, [(4, 1), (4, 2)])
+
+    def test_move_marks_every_sibling_of_both_parents(self) -> None:
+        conn = MagicMock()
+
+        self.change_log.on_move(conn, 4, 1, 2)
+
+        calls = conn.cursor.return_value.execute.call_args_list
+        self.assertEqual([c[0][1] for c in calls], [(1,), (2,), (4, 1)])
+        self.assertIn("insert into systemnodechange (nodeid, parentid) select", normalize_sql(calls[0][0][0]))
+
+    def test_safe_version_stops_before_first_gap(self) -> None:
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (6,)
+        cursor.fetchall.return_value = [(1,), (2,), (3,), (5,), (6,)]  # 4 not committed yet
+
+        self.assertEqual(ChangeLog.safe_version(cursor), 3)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_changes_since_returns_rows_and_deleted_ids(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = (12,)
+        mock_cursor.fetchall.side_effect = [
+            [(v,) for v in range(1, 13)],
+            [{"NodeID": 3}, {"NodeID": 5}],
+            [{"ID": 3, "ParentID": None, "Name": "n", "Description": None, "Notes": None,
+              "Tags": None, "Metadata": '{"m": 1}', "Status": None, "Importance": 0, "SortOrder": 1}],
+        ]
+
+        version, nodes, deleted_ids = self.change_log.changes_since(10)
+
+        self.assertEqual(version, 12)
+        self.assertEqual([(n.ID, n.Metadata) for n in nodes], [(3, {"m": 1})])
+        self.assertEqual(deleted_ids, [5])
+        mock_conn.start_transaction.assert_called_once_with(consistent_snapshot=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
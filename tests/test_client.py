@@ -0,0 +1,215 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from werkzeug.serving import make_server
+
+from src.admission import AdmissionController
+from src.client import AsyncSystemNodeClient, ClientError, HTTPConnectionPool, SystemNodeClient, local_hashes
+from src.dao.system_node import SystemNode
+from tests.test_subtree_hashes import MemoryHashes
+
+
+class FakeVersions:
+    """
+    Stands in for NodeVersions (MySQL-only): every scope's ETag is settled and changes on bump().
+    """
+
+    def __init__(self):
+        self.version = 1
+
+    def etag(self, scope: str) -> tuple:
+        return f"{scope}-{self.version}", True
+
+    def bump(self) -> None:
+        self.version += 1
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class TestHTTPConnectionPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.pool = HTTPConnectionPool(f"http://127.0.0.1:{self.server.server_port}/api", size=2)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_kept_alive_connections(self) -> None:
+        for i in range(5):
+            self.assertEqual(self.pool.request("GET", f"/{i}")[::2], (200, f"/api/{i}".encode()))
+
+        self.assertEqual(self.pool.stats(), {"size": 2, "idle": 1, "opened": 1})
+
+    def test_resends_on_a_connection_the_server_closed(self) -> None:
+        self.pool.request("GET", "/a")
+        self.pool._idle.queue[0].sock.shutdown(2)  # as if the server had timed it out
+
+        self.assertEqual(self.pool.request("GET", "/b")[::2], (200, b"/api/b"))
+        self.assertEqual(self.pool.stats()["opened"], 2)
+
+
+class TestSystemNodeClient(unittest.TestCase):
+    """
+    The client against the Flask app on a SQLite file, served on a local port.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, {"DB_BACKEND": "sqlite", "SQLITE_PATH": os.path.join(cls.tmpdir.name, "api.db")}):
+            import app
+
+            cls.app_module = app
+            cls.server = make_server("127.0.0.1", 0, app.create_app(), threaded=True)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.tmpdir.cleanup()
+
+    def setUp(self) -> None:
+        self.client = SystemNodeClient(self.base_url, pool_size=4)
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_crud_returns_typed_nodes(self) -> None:
+        root = self.client.create(SystemNode(Name="Root", Tags={"a": 1}))
+        child = self.client.create(SystemNode(ParentID=root, Name="Child"))
+
+        node = self.client.get(child)
+        self.assertIsInstance(node, SystemNode)
+        self.assertEqual((node.ParentID, node.Name, node.Tags), (root, "Child", {}))
+        self.assertEqual([n.ID for n in self.client.children(root)], [child])
+        self.assertEqual(self.client.by_path("/Root/Child").ID, child)
+        self.assertTrue(self.client.update(node, SystemNode(ID=child, ParentID=root, Name="Renamed", Status="Done")))
+        self.assertFalse(self.client.update(node, SystemNode(ID=child, ParentID=root, Name="Stale")))
+        self.assertTrue(self.client.delete(self.client.get(child)))
+        self.assertIsNone(self.client.get(child))
+
+    def test_batches_keep_order(self) -> None:
+        parent = self.client.create(SystemNode(Name="Batch parent"))
+        ids = self.client.create_many([SystemNode(ParentID=parent, Name=f"N{i}") for i in range(5)])
+
+        self.assertEqual([n.Name for n in self.client.get_many(ids + [10 ** 9])[:5]], [f"N{i}" for i in range(5)])
+        self.assertIsNone(self.client.get_many([10 ** 9])[0])
+        self.assertEqual(self.client.reorder(parent, [ids[4], ids[2]]), [True, True])
+        self.assertEqual([n.ID for n in self.client.children(parent)], [ids[4], ids[2], ids[0], ids[1], ids[3]])
+        self.assertEqual(self.client.stats()["batches"], 4)
+
+        with self.client.batch() as batch:
+            created = batch.create(SystemNode(ParentID=parent, Name="Queued"))
+            missing = batch.get(10 ** 9)
+        self.assertEqual(self.client.get(created.value).Name, "Queued")
+        self.assertIsNone(missing.value)
+
+    def test_falls_back_without_batch_endpoints(self) -> None:
+        def not_found():
+            return "", 404
+
+        with patch.dict(self.app_module.app.view_functions, {"batch_create_nodes": not_found}):
+            ids = self.client.create_many([SystemNode(Name="F1"), SystemNode(Name="F2")])
+            ids += self.client.create_many([SystemNode(Name="F3")])
+
+        self.assertEqual([n.Name for n in self.client.get_many(ids)], ["F1", "F2", "F3"])
+        self.assertEqual(self.client.stats()["batches"], 1)
+
+    def test_cache_revalidates_with_etags(self) -> None:
+        node_id = self.client.create(SystemNode(Name="Cached"))
+        versions = FakeVersions()
+        client = SystemNodeClient(self.base_url, cache_size=10)
+        with patch.object(self.app_module, "node_versions", versions):
+            self.assertEqual(client.get(node_id).Name, "Cached")
+            self.assertEqual(client.get(node_id).Name, "Cached")
+            self.assertEqual(client.stats()["not_modified"], 1)
+
+            self.client.update(self.client.get(node_id), SystemNode(ID=node_id, Name="Changed"))
+            versions.bump()
+            self.assertEqual(client.get(node_id).Name, "Changed")
+            self.assertEqual(client.stats()["not_modified"], 1)
+        client.close()
+
+    def test_diverged_descends_only_into_changed_subtrees(self) -> None:
+        root = self.client.create(SystemNode(Name="Synced"))
+        a, b = self.client.create_many([SystemNode(ParentID=root, Name="A"), SystemNode(ParentID=root, Name="B")])
+        a1 = self.client.create(SystemNode(ParentID=a, Name="A1"))
+        local = local_hashes([n for n in self.client.all_nodes() if n.ID in (root, a, b, a1)])
+        hashes = MemoryHashes(self.app_module.dao.read_all)
+        with patch.object(self.app_module, "subtree_hashes", hashes):
+            self.assertEqual(self.client.diverged(local, root), [])
+
+            node = self.client.get(a1)
+            self.client.update(node, SystemNode(ID=a1, ParentID=a, Name="A1 edited", Status="Done"))
+            for node_id in (a1, a, root):
+                hashes.invalidate(node_id)
+            changed = self.client.diverged(local, root, depth=1)
+
+            self.assertIsNone(self.client.subtree_hashes(10 ** 9))
+        self.assertEqual([(c["ID"], c["Children"]) for c in changed], [(root, [a, b]), (a, [a1]), (a1, [])])
+
+    def test_streamed_listing_keeps_its_admission_slot_until_sent(self) -> None:
+        self.client.create(SystemNode(Name="Listed"))
+        admission = AdmissionController({"heavy": (1, 0, 0), "read": (8, 0, 0), "write": (8, 0, 0)})
+        heavy = admission.bulkheads["heavy"]
+        with patch.object(self.app_module, "admission", admission):
+            response = self.app_module.app.test_client().get("/nodes", buffered=False)
+            self.assertEqual(heavy.active, 1)
+            self.assertIn(b"Listed", b"".join(response.response))
+            response.close()
+        self.assertEqual(heavy.active, 0)
+
+    def test_counts_add_up_across_threads(self) -> None:
+        node_id = self.client.create(SystemNode(Name="Shared"))
+        before = self.client.stats()["requests"]
+
+        threads = [threading.Thread(target=lambda: [self.client.get(node_id) for _ in range(25)]) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.client.stats()["requests"] - before, 100)
+
+    def test_errors_raise_client_error(self) -> None:
+        with self.assertRaises(ClientError) as raised:
+            self.client.create(SystemNode(Name="x", ParentID=10 ** 9))
+        self.assertEqual(raised.exception.status, 500)
+
+    def test_async_fan_out(self) -> None:
+        parents = [self.client.create(SystemNode(Name=f"P{i}")) for i in range(3)]
+        for parent in parents:
+            self.client.create(SystemNode(ParentID=parent, Name="C"))
+
+        async def fan_out():
+            async with AsyncSystemNodeClient(self.base_url, pool_size=3) as client:
+                return await client.children_of_many(parents)
+
+        lists = asyncio.run(fan_out())
+        self.assertEqual([[n.ParentID for n in children] for children in lists], [[p] for p in parents])
+
+
+if __name__ == "__main__":
+    unittest.main()
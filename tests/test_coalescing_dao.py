@@ -0,0 +1,123 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from src.dao.coalescing_dao import CoalescingSystemNodeDAO, SingleFlight
+from src.dao.system_node import SystemNode
+from src.metrics import metrics
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self) -> None:
+        flight = SingleFlight()
+        release = threading.Event()
+        entered = threading.Event()
+        calls = []
+        results = []
+
+        def query():
+            calls.append(1)
+            entered.set()
+            release.wait(5)
+            return "rows"
+
+        def caller():
+            results.append(flight.do("key", query))
+
+        threads = [threading.Thread(target=caller) for _ in range(10)]
+        threads[0].start()
+        entered.wait(5)
+        for t in threads[1:]:
+            t.start()
+        # Give every follower time to join the in-flight call before it finishes.
+        threading.Event().wait(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r for r, _ in results], ["rows"] * 10)
+        self.assertEqual(sum(1 for _, shared in results if not shared), 1)
+
+    def test_errors_propagate_to_all_waiters(self) -> None:
+        flight = SingleFlight()
+        with self.assertRaises(RuntimeError):
+            flight.do("key", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+        # The key is released after a failure.
+        self.assertEqual(flight.do("key", lambda: 1), (1, False))
+
+
+class TestCoalescingSystemNodeDAO(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.inner = MagicMock()
+        self.dao = CoalescingSystemNodeDAO(self.inner)
+
+    def test_concurrent_read_all_runs_one_query(self) -> None:
+        release = threading.Event()
+        entered = threading.Event()
+
+        def slow_read_all():
+            entered.set()
+            release.wait(5)
+            return [SystemNode(ID=1)]
+
+        self.inner.read_all.side_effect = slow_read_all
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.dao.read_all())) for _ in range(5)]
+        threads[0].start()
+        entered.wait(5)
+        for t in threads[1:]:
+            t.start()
+        threading.Event().wait(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.inner.read_all.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(metrics.counter("dao.coalesce.executed"), 1)
+        self.assertEqual(metrics.counter("dao.coalesce.saved"), 4)
+
+    def test_pinned_caller_does_not_join_an_unpinned_read(self) -> None:
+        release = threading.Event()
+        entered = threading.Event()
+        caller = threading.local()
+
+        def slow_read_all():
+            if not getattr(caller, "pinned", False):
+                entered.set()
+                release.wait(5)
+            return []
+
+        self.inner._pinned_to_primary.side_effect = lambda: getattr(caller, "pinned", False)
+        self.inner.read_all.side_effect = slow_read_all
+        unpinned = threading.Thread(target=self.dao.read_all)
+        unpinned.start()
+        entered.wait(5)
+        caller.pinned = True
+        self.dao.read_all()
+        release.set()
+        unpinned.join()
+
+        self.assertEqual(self.inner.read_all.call_count, 2)
+        self.assertEqual(metrics.counter("dao.coalesce.saved"), 0)
+
+    def test_different_parents_are_not_coalesced(self) -> None:
+        self.dao.read_by_parent(1)
+        self.dao.read_by_parent(2)
+        self.assertEqual(self.inner.read_by_parent.call_count, 2)
+
+    def test_write_starts_a_new_generation(self) -> None:
+        key_before = self.dao._generation
+        self.dao.create(SystemNode(Name="n"))
+        self.inner.create.assert_called_once()
+        self.assertEqual(self.dao._generation, key_before + 1)
+
+    def test_unknown_attributes_delegate(self) -> None:
+        self.inner.check_replicas.return_value = []
+        self.assertEqual(self.dao.check_replicas(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
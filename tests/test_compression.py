@@ -0,0 +1,70 @@
+import gzip
+import json
+import unittest
+
+from src.compression import ResponseCompression, installed_encodings, iter_json_array, negotiate
+from src.metrics import metrics
+
+
+class TestNegotiate(unittest.TestCase):
+    def test_server_preference_breaks_ties(self) -> None:
+        self.assertEqual(negotiate("gzip, br, zstd", ["zstd", "br", "gzip"]), "zstd")
+
+    def test_highest_q_value_wins(self) -> None:
+        self.assertEqual(negotiate("zstd;q=0.5, gzip", ["zstd", "br", "gzip"]), "gzip")
+
+    def test_refused_and_unoffered_encodings_are_skipped(self) -> None:
+        self.assertEqual(negotiate("br;q=0, deflate", ["br", "gzip"]), None)
+        self.assertEqual(negotiate("*", ["br", "gzip"]), "br")
+        self.assertIsNone(negotiate(None, ["gzip"]))
+
+
+class TestIterJsonArray(unittest.TestCase):
+    def test_chunks_join_to_one_array(self) -> None:
+        for count in (0, 1, 3, 7):
+            chunks = list(iter_json_array(({"i": i} for i in range(count)), json.dumps, batch=3))
+            self.assertEqual(json.loads(b"".join(chunks)), [{"i": i} for i in range(count)])
+        self.assertEqual(len(list(iter_json_array(range(7), json.dumps, batch=3))), 5)
+
+
+class TestResponseCompression(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.compression = ResponseCompression(["gzip"], min_bytes=100, route_levels={"get_nodes": 20})
+
+    def test_large_body_is_compressed_as_it_streams(self) -> None:
+        chunks = [b"x" * 60, b"y" * 60, b"z" * 60]
+        encoding, body = self.compression.encode(iter(chunks), "gzip", "get_nodes")
+
+        self.assertEqual(encoding, "gzip")
+        compressed = b"".join(body)
+        self.assertEqual(gzip.decompress(compressed), b"".join(chunks))
+        self.assertEqual(metrics.counter("http.compression.gzip.bytes_in"), 180)
+        self.assertEqual(metrics.counter("http.compression.gzip.bytes_out"), len(compressed))
+        self.assertEqual(metrics.counter("http.bytes_on_wire.get_nodes"), len(compressed))
+        self.assertEqual(metrics.snapshot()["observations"]["http.compression.gzip.cpu_ms"]["count"], 1)
+
+    def test_small_body_is_sent_as_is(self) -> None:
+        encoding, body = self.compression.encode([b"[", b"]"], "gzip", "get_node")
+
+        self.assertIsNone(encoding)
+        self.assertEqual(b"".join(body), b"[]")
+        self.assertEqual(metrics.counter("http.compression.skipped"), 1)
+        self.assertEqual(metrics.counter("http.bytes_on_wire.get_node"), 2)
+
+    def test_route_level_is_clamped_per_encoding(self) -> None:
+        self.assertEqual(self.compression.level("gzip", "get_nodes"), 9)
+        self.assertEqual(self.compression.level("gzip", "other"), 6)
+        self.assertEqual(self.compression.level("zstd", "get_nodes"), 20)
+
+    @unittest.skipUnless({"br", "zstd"} & set(installed_encodings()), "brotli / zstandard not installed")
+    def test_optional_encoders_round_trip(self) -> None:
+        for encoding in {"br", "zstd"} & set(installed_encodings()):
+            compression = ResponseCompression([encoding], min_bytes=1)
+            chosen, body = compression.encode([b"a" * 500], encoding, None)
+            self.assertEqual(chosen, encoding)
+            self.assertLess(len(b"".join(body)), 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from mysql.connector.errors import PoolError, OperationalError
+
+from src.dao.connection_pool import ConnectionPool
+from src.dao.system_node_dao import SystemNodeDAO, SELECT_NODE_BY_ID_SQL, SELECT_CHILDREN_SQL
+from src.metrics import metrics
+
+
+def _new_connection(*args, **kwargs) -> MagicMock:
+    conn = MagicMock()
+    conn.in_transaction = False
+    return conn
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_returned_connection_is_reused(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({"host": "db"}, size=2)
+        first = pool.get()
+        raw = first._entry.conn
+        first.close()
+        second = pool.get()
+
+        self.assertIs(second._entry.conn, raw)
+        mock_connect.assert_called_once_with(host="db", autocommit=False)
+        raw.close.assert_not_called()
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_warm_opens_idle_connections_up_to_size(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({}, size=3)
+
+        self.assertEqual(pool.warm(5), 3)
+        self.assertEqual(mock_connect.call_count, 3)
+        self.assertEqual(pool.warm(2), 3)
+        self.assertEqual(mock_connect.call_count, 3)
+
+        pool.get().close()
+        self.assertEqual(mock_connect.call_count, 3)
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_open_transaction_is_rolled_back_on_return(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({}, size=1)
+        conn = pool.get()
+        raw = conn._entry.conn
+        raw.in_transaction = True
+        conn.close()
+        raw.rollback.assert_called_once()
+
+        raw.in_transaction = False
+        pool.get().close()
+        raw.rollback.assert_called_once()
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_connection_failing_rollback_is_discarded(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({}, size=1)
+        conn = pool.get()
+        raw = conn._entry.conn
+        raw.in_transaction = True
+        raw.rollback.side_effect = OperationalError("gone")
+        conn.close()
+
+        raw.close.assert_called_once()
+        self.assertIsNot(pool.get()._entry.conn, raw)
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_get_waits_then_fails_when_exhausted(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({}, size=1, wait_seconds=0.01)
+        held = pool.get()
+        with self.assertRaises(PoolError):
+            pool.get()
+        held.close()
+        pool.get()
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_dropped_idle_connection_is_replaced(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({}, size=1, ping_after_idle_seconds=0)
+        conn = pool.get()
+        raw = conn._entry.conn
+        raw.is_connected.return_value = False
+        conn.close()
+
+        self.assertIsNot(pool.get()._entry.conn, raw)
+        self.assertEqual(mock_connect.call_count, 2)
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_prepared_cursor_outlives_the_borrow(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({}, size=1)
+        conn = pool.get()
+        cursor = conn.prepared_cursor("SELECT 1", dictionary=True)
+        conn.close()
+        conn = pool.get()
+
+        self.assertIs(conn.prepared_cursor("SELECT 1", dictionary=True), cursor)
+        conn._entry.conn.cursor.assert_called_once_with(prepared=True, dictionary=True)
+        self.assertEqual(metrics.counter("dao.pool.statements_prepared"), 1)
+
+    @patch("src.dao.connection_pool.mysql.connector.connect", side_effect=_new_connection)
+    def test_connections_returned_after_close_are_closed(self, mock_connect: MagicMock) -> None:
+        pool = ConnectionPool({}, size=2)
+        idle, borrowed = pool.get(), pool.get()
+        idle_raw, borrowed_raw = idle._entry.conn, borrowed._entry.conn
+        idle.close()
+        pool.close()
+        borrowed.close()
+
+        idle_raw.close.assert_called_once()
+        borrowed_raw.close.assert_called_once()
+
+
+class TestPreparedStatementReads(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.dao = SystemNodeDAO({"host": "db"}, pool_size=4, prepared_statements=True)
+
+    @patch("src.dao.connection_pool.mysql.connector.connect")
+    def test_read_prepares_once_per_connection(self, mock_connect: MagicMock) -> None:
+        raw = mock_connect.return_value
+        raw.in_transaction = False
+        raw.cursor.return_value.fetchall.return_value = [{
+            "ID": 5, "ParentID": None, "Name": "A", "Description": None, "Notes": None, "Tags": None,
+            "Metadata": b'{"k": 1}', "Status": None, "Importance": 0, "SortOrder": 1
+        }]
+
+        nodes = [self.dao.read(5) for _ in range(3)]
+
+        mock_connect.assert_called_once_with(host="db", autocommit=True)
+        raw.cursor.assert_called_once_with(prepared=True, dictionary=True)
+        self.assertEqual(raw.cursor.return_value.execute.call_count, 3)
+        for call in raw.cursor.return_value.execute.call_args_list:
+            self.assertIs(call[0][0], SELECT_NODE_BY_ID_SQL)
+            self.assertEqual(call[0][1], (5,))
+        raw.cursor.return_value.close.assert_not_called()
+        self.assertEqual(nodes[-1].Metadata, {"k": 1})
+
+    @patch("src.dao.connection_pool.mysql.connector.connect")
+    def test_read_by_parent_uses_its_own_statement(self, mock_connect: MagicMock) -> None:
+        raw = mock_connect.return_value
+        raw.in_transaction = False
+        raw.cursor.return_value.fetchall.return_value = []
+
+        self.assertEqual(self.dao.read_by_parent(None), [])
+        self.assertIsNone(self.dao.read(1))
+
+        executed = [call[0][0] for call in raw.cursor.return_value.execute.call_args_list]
+        self.assertIs(executed[0], SELECT_CHILDREN_SQL)
+        self.assertIs(executed[1], SELECT_NODE_BY_ID_SQL)
+        self.assertEqual(raw.cursor.call_count, 2)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_unpooled_dao_keeps_plain_cursors(self, mock_connect: MagicMock) -> None:
+        dao = SystemNodeDAO({"host": "db"}, prepared_statements=True)
+        mock_connect.return_value.cursor.return_value.fetchone.return_value = None
+
+        self.assertIsNone(dao.read(1))
+        mock_connect.return_value.cursor.assert_called_once_with(dictionary=True)
+        mock_connect.return_value.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import itertools
+import threading
+import unittest
+from unittest.mock import patch, MagicMock, PropertyMock
+
+import mysql.connector
+
+from src.dao.group_commit import GroupCommitSystemNodeDAO
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+from src.metrics import metrics
+
+
+def run_concurrently(calls: list) -> list:
+    """
+    Runs each call on its own thread; returns their results (or exceptions) in call order.
+    """
+    results = [None] * len(calls)
+
+    def run(i):
+        try:
+            results[i] = calls[i]()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(calls))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+@patch("src.dao.system_node_dao.mysql.connector.connect")
+class TestGroupCommit(unittest.TestCase):
+    """
+    Grouping over a mocked MySQL connection: max_batch closes each group, the window never does.
+    """
+
+    def setUp(self) -> None:
+        metrics.reset()
+        self.executed = []
+        self.fail = {}  # SQL prefix -> exception raised once
+
+    def _dao(self, mock_connect: MagicMock, max_batch: int, window_seconds: float = 5.0) -> GroupCommitSystemNodeDAO:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (1,)
+        type(mock_cursor).lastrowid = PropertyMock(side_effect=itertools.count(100))
+        type(mock_cursor).rowcount = PropertyMock(return_value=1)
+
+        def execute(sql, params=None):
+            statement = " ".join(sql.split())
+            self.executed.append(statement)
+            for prefix, error in list(self.fail.items()):
+                if statement.startswith(prefix):
+                    del self.fail[prefix]
+                    raise error
+
+        mock_cursor.execute.side_effect = execute
+        return GroupCommitSystemNodeDAO(SystemNodeDAO({"host": "fake"}), window_seconds=window_seconds,
+                                        max_batch=max_batch)
+
+    def test_concurrent_creates_share_one_commit(self, mock_connect: MagicMock) -> None:
+        dao = self._dao(mock_connect, max_batch=3)
+
+        ids = run_concurrently([lambda i=i: dao.create(SystemNode(Name=f"N{i}")) for i in range(3)])
+
+        self.assertEqual(sorted(ids), [100, 101, 102])
+        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(mock_connect.return_value.commit.call_count, 1)
+        self.assertEqual(sum(s.startswith("SAVEPOINT") for s in self.executed), 3)
+        self.assertEqual(metrics.counter("dao.group_commit.writes"), 3)
+
+    def test_each_update_reports_its_own_conflict(self, mock_connect: MagicMock) -> None:
+        dao = self._dao(mock_connect, max_batch=2)
+        type(mock_connect.return_value.cursor.return_value).rowcount = PropertyMock(side_effect=[1, 0])
+        old = SystemNode(ID=7, Name="A")
+
+        results = run_concurrently([lambda: dao.update(old, SystemNode(ID=7, Name="B", Status="Done"))] * 2)
+
+        self.assertEqual(sorted(results), [False, True])
+        self.assertEqual(mock_connect.return_value.commit.call_count, 1)
+
+    def test_failing_write_is_rolled_back_alone(self, mock_connect: MagicMock) -> None:
+        dao = self._dao(mock_connect, max_batch=3)
+        self.fail["INSERT"] = mysql.connector.IntegrityError(msg="Cannot add a child row", errno=1452)
+
+        results = run_concurrently([lambda i=i: dao.create(SystemNode(Name=f"N{i}")) for i in range(3)])
+
+        self.assertEqual(sum(isinstance(r, mysql.connector.IntegrityError) for r in results), 1)
+        self.assertEqual(len([r for r in results if isinstance(r, int)]), 2)
+        self.assertEqual(sum(s.startswith("ROLLBACK TO SAVEPOINT") for s in self.executed), 1)
+        self.assertEqual(mock_connect.return_value.commit.call_count, 1)
+
+    def test_deadlock_reruns_writes_one_by_one(self, mock_connect: MagicMock) -> None:
+        dao = self._dao(mock_connect, max_batch=2)
+        self.fail["INSERT"] = mysql.connector.DatabaseError(msg="Deadlock found", errno=1213)
+
+        ids = run_concurrently([lambda i=i: dao.create(SystemNode(Name=f"N{i}")) for i in range(2)])
+
+        self.assertTrue(all(isinstance(i, int) for i in ids))
+        self.assertEqual(mock_connect.return_value.rollback.call_count, 1)
+        self.assertEqual(mock_connect.return_value.commit.call_count, 2)
+        self.assertEqual(metrics.counter("dao.group_commit.fallbacks"), 1)
+
+    def test_lone_write_commits_after_the_window(self, mock_connect: MagicMock) -> None:
+        dao = self._dao(mock_connect, max_batch=10, window_seconds=0.01)
+
+        self.assertEqual(dao.create(SystemNode(Name="Alone")), 100)
+
+        self.assertFalse(any(s.startswith("SAVEPOINT") for s in self.executed))
+        self.assertEqual(mock_connect.return_value.commit.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
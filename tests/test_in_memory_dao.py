@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.dao.in_memory_dao import InMemorySystemNodeDAO
+from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO
+from src.dao.system_node import SystemNode
+from tests.system_node_backend_contract import SystemNodeBackendContract
+
+
+class TestInMemorySystemNodeDAO(SystemNodeBackendContract, unittest.TestCase):
+    """
+    Runs the backend contract against the in-memory engine, persisting to a SQLite file.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SQLiteSystemNodeDAO(os.path.join(self.tmpdir.name, "system.db"))
+        self.dao = InMemorySystemNodeDAO(self.store, flush_interval=0)
+        self.dao.load()
+        self.dao.start()
+
+    def tearDown(self) -> None:
+        self.dao.close()
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def _store_state(self) -> list:
+        return [(n.ID, n.ParentID, n.Name, n.SortOrder) for n in self.store.read_all()]
+
+    def _engine_state(self) -> list:
+        return [(n.ID, n.ParentID, n.Name, n.SortOrder) for n in self.dao.read_all()]
+
+    def test_writes_are_persisted_in_order(self) -> None:
+        a = self._create("A")
+        b = self._create("B")
+        a1 = self._create("A1", a)
+        self._create("A2", a)
+        self.dao.move_node(a1, b, 1)
+        self.dao.delete(self.dao.read(a1))
+
+        self.assertTrue(self.dao.wait_durable(timeout=5))
+        self.assertEqual(self._store_state(), self._engine_state())
+
+    def test_reload_rebuilds_same_tree(self) -> None:
+        root = self._create("Root")
+        for i in range(5):
+            self._create(f"C{i}", root)
+        self.assertTrue(self.dao.wait_durable(timeout=5))
+
+        reloaded = InMemorySystemNodeDAO(self.store)
+        reloaded.load()
+        self.assertEqual(
+            [(n.ID, n.Name, n.SortOrder) for n in reloaded.read_by_parent(root)],
+            [(n.ID, n.Name, n.SortOrder) for n in self.dao.read_by_parent(root)]
+        )
+        self.assertEqual(reloaded._next_id, self.dao._next_id)
+
+    def test_returned_nodes_are_copies(self) -> None:
+        node_id = self.dao.create(SystemNode(Name="Original", Tags={"a": 1}))
+        node = self.dao.read(node_id)
+        node.Name = "Mutated"
+        node.Tags["a"] = 2
+
+        self.assertEqual(self.dao.read(node_id).Name, "Original")
+        self.assertEqual(self.dao.read(node_id).Tags, {"a": 1})
+
+    def test_move_under_descendant_is_rejected(self) -> None:
+        root = self._create("Root")
+        child = self._create("Child", root)
+
+        with self.assertRaises(ValueError):
+            self.dao.move_node(root, child)
+
+    def test_stats_report_load_and_memory(self) -> None:
+        self._create("Root")
+        self.assertTrue(self.dao.wait_durable(timeout=5))
+        self.dao.load()
+
+        stats = self.dao.stats()
+        self.assertEqual(stats["nodes"], 1)
+        self.assertGreater(stats["bytes_per_node"], 0)
+        self.assertGreaterEqual(stats["cold_load_ms"], 0)
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+    def test_batch_puts_new_parents_before_children(self) -> None:
+        store = MagicMock()
+        store.read_all.return_value = [SystemNode(ID=1, Name="Existing", SortOrder=1)]
+        dao = InMemorySystemNodeDAO(store, flush_interval=0)
+        dao.load()
+
+        # Node 1 is queued first, then re-parented under a node created after it.
+        dao.move_node(1, None)
+        new_parent = dao.create(SystemNode(Name="NewParent"))
+        dao.move_node(1, new_parent)
+        dao.start()
+        self.assertTrue(dao.wait_durable(timeout=5))
+        dao.close()
+
+        upserts, deleted_ids = store.apply_batch.call_args[0]
+        self.assertEqual([n.ID for n in upserts], [new_parent, 1])
+        self.assertEqual(deleted_ids, [])
+
+    def test_deletes_go_out_children_first(self) -> None:
+        # Regression: the parent's earlier update kept its queue slot, so it was deleted before its child
+        tmpdir = tempfile.TemporaryDirectory()
+        store = SQLiteSystemNodeDAO(os.path.join(tmpdir.name, "system.db"))
+        parent = store.create(SystemNode(Name="P"))
+        child = store.create(SystemNode(ParentID=parent, Name="C"))
+        dao = InMemorySystemNodeDAO(store, flush_interval=0)
+        dao.load()
+
+        dao.update(dao.read(parent), SystemNode(ID=parent, Name="P2"))
+        dao.delete(dao.read(child))
+        dao.delete(dao.read(parent))
+        dao.start()
+        self.assertTrue(dao.wait_durable(timeout=5))
+        dao.close()
+
+        self.assertEqual(store.read_all(), [])
+        store.close()
+        tmpdir.cleanup()
+
+    def test_row_that_keeps_failing_is_set_aside(self) -> None:
+        store = MagicMock()
+        store.read_all.return_value = []
+
+        def apply_batch(upserts, deleted_ids):
+            if any(n.Name == "Bad" for n in upserts):
+                raise sqlite3.IntegrityError("CHECK constraint failed")
+
+        store.apply_batch.side_effect = apply_batch
+        dao = InMemorySystemNodeDAO(store, flush_interval=0, max_batch_attempts=1)
+        dao.load()
+        bad = dao.create(SystemNode(Name="Bad"))
+        bad_sequence = dao._sequence
+        dao.create(SystemNode(Name="Good"))
+        dao.start()
+
+        self.assertFalse(dao.wait_durable(bad_sequence, timeout=10))
+        self.assertTrue(dao.wait_durable(timeout=5))
+        later = dao.create(SystemNode(Name="Later"))
+        self.assertTrue(dao.wait_durable(timeout=5))
+        dao.close()
+
+        self.assertEqual([entry["ID"] for entry in dao.dead_letters], [bad])
+        self.assertEqual(dao.stats()["dead_letters"], 1)
+        self.assertEqual(store.apply_batch.call_args[0][0][0].ID, later)
+
+    def test_failed_batch_is_retried(self) -> None:
+        store = MagicMock()
+        store.read_all.return_value = []
+        store.apply_batch.side_effect = [RuntimeError("db down"), None]
+        dao = InMemorySystemNodeDAO(store, flush_interval=0)
+        dao.load()
+        dao.start()
+
+        dao.create(SystemNode(Name="Node"))
+        self.assertTrue(dao.wait_durable(timeout=5))
+        dao.close()
+
+        self.assertEqual(store.apply_batch.call_count, 2)
+        self.assertIsNone(dao.stats()["last_error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
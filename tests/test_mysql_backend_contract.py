@@ -0,0 +1,51 @@
+import os
+import unittest
+
+from src.dao.group_commit import GroupCommitSystemNodeDAO
+from src.dao.schema import migrate
+from src.dao.system_node_dao import SystemNodeDAO
+from tests.system_node_backend_contract import SystemNodeBackendContract
+
+# Points at a disposable MySQL database; every test empties its SystemNode table.
+MYSQL_TEST_DATABASE = os.getenv("MYSQL_TEST_DATABASE")
+
+
+@unittest.skipUnless(MYSQL_TEST_DATABASE, "set MYSQL_TEST_DATABASE to run the contract against MySQL")
+class TestMySQLBackendContract(SystemNodeBackendContract, unittest.TestCase):
+    """
+    Runs the same backend contract as the SQLite tests against a live MySQL database.
+    """
+
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({
+            "host": os.getenv("DB_HOST", "127.0.0.1"),
+            "user": os.getenv("DB_USER", "root"),
+            "password": os.getenv("DB_PASSWORD", ""),
+            "database": MYSQL_TEST_DATABASE
+        })
+        migrate(self.dao)
+        conn = self.dao._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            cursor.execute("DELETE FROM SystemNode")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+
+@unittest.skipUnless(MYSQL_TEST_DATABASE, "set MYSQL_TEST_DATABASE to run the contract against MySQL")
+class TestMySQLGroupCommitContract(TestMySQLBackendContract):
+    """
+    The same contract with creates and updates going through group commit.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.dao = GroupCommitSystemNodeDAO(self.dao, window_seconds=0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
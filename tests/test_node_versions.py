@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dao.node_versions import NodeVersions, ALL_SCOPE, ALL_SHARDS, node_scope, parent_scope
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+class TestNodeVersionHooks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({"host": "fake"})
+        self.versions = NodeVersions(self.dao)
+        self.conn = MagicMock()
+        self.cursor = self.conn.cursor.return_value
+
+    def _bumped_scopes(self) -> list:
+        return [c[0][1] for c in self.cursor.execute.call_args_list
+                if normalize_sql(c[0][0]).startswith("insert into systemnodeversion (scope, version) values")]
+
+    def test_registers_itself_as_a_write_hook(self) -> None:
+        self.assertIn(self.versions, self.dao.write_hooks)
+
+    def test_create_bumps_node_parent_and_one_tree_shard_in_sorted_order(self) -> None:
+        self.versions.on_create(self.conn, SystemNode(ID=5, ParentID=2, Name="n"))
+
+        (scopes,) = self._bumped_scopes()
+        self.assertEqual(list(scopes), sorted(scopes))
+        self.assertIn(node_scope(5), scopes)
+        self.assertIn(parent_scope(2), scopes)
+        self.assertEqual(len([s for s in scopes if s.startswith("all:")]), 1)
+        sql = normalize_sql(self.cursor.execute.call_args[0][0])
+        self.assertTrue(sql.endswith("on duplicate key update version = version + 1, "
+                                     "changedat = current_timestamp(3)"))
+
+    def test_update_that_reparents_bumps_both_lists(self) -> None:
+        old = SystemNode(ID=5, ParentID=2, Name="n")
+        new = SystemNode(ID=5, ParentID=None, Name="n")
+        self.versions.on_update(self.conn, old, new)
+
+        (scopes,) = self._bumped_scopes()
+        self.assertTrue({node_scope(5), parent_scope(2), "parent:null"} <= set(scopes))
+
+    def test_move_bumps_every_sibling_of_both_parents(self) -> None:
+        self.versions.on_move(self.conn, 5, 2, 3)
+
+        sibling_bumps = [c[0][1] for c in self.cursor.execute.call_args_list
+                         if "select concat('node:', id)" in normalize_sql(c[0][0])]
+        self.assertEqual(sibling_bumps, [(2,), (3,)])
+        (scopes,) = self._bumped_scopes()
+        self.assertTrue({node_scope(5), parent_scope(2), parent_scope(3)} <= set(scopes))
+
+    def test_reorder_bumps_siblings_and_the_list(self) -> None:
+        self.versions.on_reorder(self.conn, None)
+
+        sibling_bumps = [c[0][1] for c in self.cursor.execute.call_args_list
+                         if "select concat('node:', id)" in normalize_sql(c[0][0])]
+        self.assertEqual(sibling_bumps, [(None,)])
+        (scopes,) = self._bumped_scopes()
+        self.assertIn("parent:null", scopes)
+
+
+class TestNodeVersionEtag(unittest.TestCase):
+    def setUp(self) -> None:
+        self.versions = NodeVersions(SystemNodeDAO({"host": "fake"}), settle_seconds=2.5)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_tag_combines_epoch_and_version(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            {"Scope": "epoch", "Version": 2, "Recent": 0},
+            {"Scope": "parent:7", "Version": 41, "Recent": 0},
+        ]
+
+        self.assertEqual(self.versions.etag(parent_scope(7)), ("2.41", True))
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertIn("from systemnodeversion where scope in (%s, %s)", normalize_sql(sql))
+        self.assertEqual(params, (2_500_000, "parent:7", "epoch"))
+        mock_connect.return_value.close.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_recent_change_is_not_settled(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.fetchall.return_value = [
+            {"Scope": "node:3", "Version": 4, "Recent": 1},
+        ]
+        self.assertEqual(self.versions.etag(node_scope(3)), ("0.4", False))
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_unwritten_scope_is_version_zero(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.fetchall.return_value = []
+        self.assertEqual(self.versions.etag(node_scope(3)), ("0.0", True))
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_whole_tree_sums_its_shards(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            {"Scope": "all:0", "Version": 3, "Recent": 0},
+            {"Scope": "all:9", "Version": 5, "Recent": 0},
+        ]
+
+        self.assertEqual(self.versions.etag(ALL_SCOPE), ("0.8", True))
+        params = mock_cursor.execute.call_args[0][1]
+        self.assertEqual(len(params), 1 + ALL_SHARDS + 1)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_each_scope_shape_reuses_one_sql_object(self, mock_connect: MagicMock) -> None:
+        # Prepared statements are re-prepared whenever the SQL is a different str object
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+        statements = []
+        for scope in (node_scope(1), parent_scope(2), ALL_SCOPE, node_scope(3), ALL_SCOPE):
+            self.versions.etag(scope)
+            statements.append(mock_cursor.execute.call_args[0][0])
+
+        self.assertIs(statements[0], statements[1])
+        self.assertIs(statements[0], statements[3])
+        self.assertIs(statements[2], statements[4])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_bump_epoch_commits(self, mock_connect: MagicMock) -> None:
+        self.versions.bump_epoch()
+
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ("epoch",))
+        mock_connect.return_value.commit.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
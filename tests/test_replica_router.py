@@ -0,0 +1,149 @@
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import mysql.connector
+
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+
+PRIMARY = {"host": "primary", "user": "u", "password": "p", "database": "db"}
+REPLICA_A = {**PRIMARY, "host": "replica-a"}
+REPLICA_B = {**PRIMARY, "host": "replica-b"}
+
+
+def fake_connect_factory(down_hosts=()):
+    """
+    Returns a connect() stand-in that records which host each connection went to.
+    """
+    hosts = []
+
+    def connect(**config):
+        if config["host"] in down_hosts:
+            raise mysql.connector.errors.InterfaceError("connection refused")
+        hosts.append(config["host"])
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = None
+        cursor.fetchall.return_value = []
+        cursor.rowcount = 1
+        return conn
+
+    return connect, hosts
+
+
+class TestReplicaRouting(unittest.TestCase):
+    def tearDown(self) -> None:
+        SystemNodeDAO.set_session(None)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_reads_round_robin_across_replicas(self, mock_connect: MagicMock) -> None:
+        mock_connect.side_effect, hosts = fake_connect_factory()
+        dao = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A, REPLICA_B])
+
+        dao.read(1)
+        dao.read_by_parent(None)
+        dao.read_all()
+        dao.read(2)
+
+        self.assertEqual(hosts, ["replica-a", "replica-b", "replica-a", "replica-b"])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_writes_always_use_primary(self, mock_connect: MagicMock) -> None:
+        mock_connect.side_effect, hosts = fake_connect_factory()
+        dao = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A])
+
+        dao.create(SystemNode(Name="n"))
+        dao.update(SystemNode(ID=1), SystemNode(ID=1, Name="m"))
+        dao.delete(SystemNode(ID=1))
+        dao.move_node(1, None)
+
+        self.assertEqual(hosts, ["primary"] * 4)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_unreachable_replica_is_skipped(self, mock_connect: MagicMock) -> None:
+        mock_connect.side_effect, hosts = fake_connect_factory(down_hosts={"replica-a"})
+        dao = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A, REPLICA_B])
+
+        dao.read(1)
+        dao.read(2)
+        dao.read(3)
+
+        self.assertEqual(hosts, ["replica-b", "replica-b", "replica-b"])
+        self.assertFalse(dao.replicas.replicas[0].healthy)
+        # The failed replica is not retried until its cooldown expires.
+        self.assertEqual(mock_connect.call_count, 4)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_falls_back_to_primary_when_no_replica_is_healthy(self, mock_connect: MagicMock) -> None:
+        mock_connect.side_effect, hosts = fake_connect_factory(down_hosts={"replica-a", "replica-b"})
+        dao = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A, REPLICA_B])
+
+        dao.read(1)
+
+        self.assertEqual(hosts, ["primary"])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_read_your_writes_pins_session_to_primary(self, mock_connect: MagicMock) -> None:
+        mock_connect.side_effect, hosts = fake_connect_factory()
+        dao = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A], read_your_writes_seconds=60)
+
+        SystemNodeDAO.set_session("writer")
+        dao.create(SystemNode(Name="n"))
+        dao.read(1)
+        SystemNodeDAO.set_session("someone-else")
+        dao.read(1)
+
+        self.assertEqual(hosts, ["primary", "primary", "replica-a"])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_last_write_time_carried_by_the_client_pins_in_another_process(self, mock_connect: MagicMock) -> None:
+        mock_connect.side_effect, hosts = fake_connect_factory()
+        writer = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A], read_your_writes_seconds=60)
+        SystemNodeDAO.set_session(None)
+        writer.create(SystemNode(Name="n"))
+        last_write_at = SystemNodeDAO.last_write_time()
+        self.assertIsNotNone(last_write_at)
+
+        # Another worker: none of the writer's in-process state, only what the client sends back
+        reader = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A], read_your_writes_seconds=60)
+        SystemNodeDAO.set_session(None, last_write_at)
+        reader.read(1)
+        SystemNodeDAO.set_session(None, time.time() - 120)
+        reader.read(1)
+        SystemNodeDAO.set_session(None)
+        reader.read(1)
+
+        self.assertEqual(hosts, ["primary", "primary", "replica-a", "replica-a"])
+        self.assertIsNone(SystemNodeDAO.last_write_time())
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_last_write_time_in_the_future_is_ignored(self, mock_connect: MagicMock) -> None:
+        mock_connect.side_effect, hosts = fake_connect_factory()
+        dao = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A], read_your_writes_seconds=60)
+
+        SystemNodeDAO.set_session(None, time.time() + 3600)
+        dao.read(1)
+        SystemNodeDAO.set_session(None, float("nan"))
+        dao.read(1)
+        SystemNodeDAO.set_session(None, time.time() + 1)
+        dao.read(1)
+        SystemNodeDAO.set_session(None)
+
+        self.assertEqual(hosts, ["replica-a", "replica-a", "primary"])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_check_marks_lagging_replica_down(self, mock_connect: MagicMock) -> None:
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = {"Seconds_Behind_Source": 120}
+        mock_connect.return_value = conn
+        dao = SystemNodeDAO(PRIMARY, replica_configs=[REPLICA_A], max_replica_lag_seconds=5)
+
+        status = dao.check_replicas()
+
+        self.assertFalse(status[0]["healthy"])
+        self.assertIn("lag", status[0]["last_error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
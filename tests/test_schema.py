@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dao.schema import (
+    MIGRATIONS, LATEST_VERSION, migrate, missing_indexes, redundant_indexes, explain_problems
+)
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+class TestMigrate(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({"host": "fake"})
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_applies_only_pending_migrations(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (1,)
+        mock_cursor.fetchall.return_value = []
+
+        result = migrate(self.dao)
+
+        self.assertEqual(result["from_version"], 1)
+        self.assertEqual(result["to_version"], LATEST_VERSION)
+        self.assertEqual([m["version"] for m in result["applied"]], list(range(2, LATEST_VERSION + 1)))
+        recorded = [c[0][1][0] for c in mock_cursor.execute.call_args_list if "into schemaversion" in
+                    normalize_sql(c[0][0])]
+        self.assertEqual(recorded, list(range(2, LATEST_VERSION + 1)))
+        executed = " ".join(normalize_sql(c[0][0]) for c in mock_cursor.execute.call_args_list)
+        self.assertNotIn("create table if not exists systemnode (", executed)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_legacy_table_gets_the_parent_sort_index(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (0,)
+        mock_cursor.fetchall.return_value = [("PRIMARY", "ID"), ("ParentID", "ParentID")]
+
+        migrate(self.dao, target=1)
+
+        executed = [normalize_sql(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        self.assertIn("create index idx_systemnode_parent_sort on systemnode (parentid, sortorder)", executed)
+
+    def test_versions_are_increasing(self) -> None:
+        versions = [version for version, _, _ in MIGRATIONS]
+        self.assertEqual(versions, sorted(set(versions)))
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_updated_at_column_is_added_when_missing(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.side_effect = [(3,), (0,)]
+        mock_cursor.fetchall.return_value = []
+
+        migrate(self.dao, target=4)
+
+        executed = [normalize_sql(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        self.assertIn("alter table systemnode add column updatedat timestamp not null default current_timestamp "
+                      "on update current_timestamp", executed)
+        self.assertIn("create index idx_systemnode_status_updated on systemnode (status, updatedat)", executed)
+        self.assertTrue(any(sql.startswith("create table if not exists systemnodearchive") for sql in executed))
+
+
+class TestIndexAdvisor(unittest.TestCase):
+    def test_missing_composite_index(self) -> None:
+        existing = {"SystemNode": {"PRIMARY": ("ID",), "ParentID": ("ParentID",)}}
+
+        missing = missing_indexes(existing)
+
+        self.assertEqual([m["index"] for m in missing], ["idx_systemnode_parent_sort", "idx_systemnode_parent_name"])
+
+    def test_prefix_index_is_redundant(self) -> None:
+        existing = {"SystemNode": {"PRIMARY": ("ID",), "ParentID": ("ParentID",),
+                                   "idx_systemnode_parent_sort": ("ParentID", "SortOrder"),
+                                   "idx_systemnode_parent_name": ("ParentID", "Name")}}
+
+        redundant = redundant_indexes(existing)
+
+        self.assertEqual(redundant, [{"table": "SystemNode", "index": "ParentID", "columns": ["ParentID"],
+                                      "covered_by": "idx_systemnode_parent_sort"}])
+        self.assertEqual(missing_indexes(existing), [])
+
+    def test_explain_flags_scans_and_filesort(self) -> None:
+        rows = [{"table": "SystemNode", "type": "ALL", "key": None, "Extra": "Using where; Using filesort"}]
+
+        self.assertEqual(explain_problems(rows, "idx_systemnode_parent_sort"), [
+            "full table scan of SystemNode (expected idx_systemnode_parent_sort)", "sorts with filesort"
+        ])
+
+    def test_explain_accepts_index_ref_and_optimized_away(self) -> None:
+        rows = [
+            {"table": "SystemNode", "type": "ref", "key": "idx_systemnode_parent_sort", "Extra": "Using where"},
+            {"table": None, "type": None, "key": None, "Extra": "Select tables optimized away"},
+        ]
+
+        self.assertEqual(explain_problems(rows, "idx_systemnode_parent_sort"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.config import shard_configs_from_env
+from src.dao.sharding import ID_SHARD_BITS, XID_PREFIX, ShardDirectory, ShardedSystemNodeDAO
+from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+class MemoryDirectory(ShardDirectory):
+    """
+    ShardDirectory with its table replaced by the in-memory copy.
+    """
+
+    def __init__(self):
+        super().__init__({})
+        self._roots = {}
+
+    def refresh(self) -> dict:
+        return self._roots
+
+    def _write(self, sql: str, params: tuple) -> None:
+        pass
+
+
+class TestShardedRouting(unittest.TestCase):
+    """
+    Routing and merging over two SQLite shards (cross-shard moves need MySQL XA, see below).
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.shards = {name: SQLiteSystemNodeDAO(os.path.join(self.tmpdir.name, f"{name}.db")) for name in ("s0", "s1")}
+        self.shards["s1"]._get_connection().execute(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('SystemNode', ?)", (1 << ID_SHARD_BITS,))
+        self.directory = MemoryDirectory()
+        self.dao = ShardedSystemNodeDAO(self.shards, self.directory)
+
+    def tearDown(self) -> None:
+        self.dao.close()
+        for shard in self.shards.values():
+            shard.close()
+        self.tmpdir.cleanup()
+
+    def test_roots_are_spread_and_subtrees_stay_with_their_root(self) -> None:
+        a = self.dao.create(SystemNode(Name="A"))
+        b = self.dao.create(SystemNode(Name="B"))
+        child = self.dao.create(SystemNode(ParentID=b, Name="B1"))
+
+        self.assertEqual(self.directory.roots(), {a: "s0", b: "s1"})
+        self.assertEqual(child >> ID_SHARD_BITS, 1)
+        self.assertIsNotNone(self.shards["s1"].read(child))
+        self.assertEqual([n.ID for n in self.dao.read_by_parent(None)], [a, b])
+        self.assertEqual([n.ID for n in self.dao.read_by_parent(b)], [child])
+        self.assertEqual([n.ID for n in self.dao.read_all()], [a, b, child])
+
+    def test_lookup_falls_back_to_every_shard(self) -> None:
+        root = self.dao.create(SystemNode(Name="Root"))
+        # A row on s1 with an s0-range ID, as a cross-shard move leaves it
+        self.shards["s1"].apply_batch([SystemNode(ID=500, Name="Moved", SortOrder=1)], [])
+
+        self.assertEqual(self.dao.read(500).Name, "Moved")
+        self.assertEqual(self.dao._candidates(500)[0], "s1")
+        self.assertIsNone(self.dao.read(root + 10 ** 6))
+
+    def test_update_cannot_reparent_across_shards(self) -> None:
+        a = self.dao.create(SystemNode(Name="A"))
+        b = self.dao.create(SystemNode(Name="B"))
+        node = self.dao.read(a)
+
+        with self.assertRaises(ValueError):
+            self.dao.update(node, SystemNode(ID=a, ParentID=b, Name="A"))
+
+    def test_directory_follows_roots_through_moves_and_deletes(self) -> None:
+        a = self.dao.create(SystemNode(Name="A"))
+        self.dao.create(SystemNode(Name="B"))
+        c = self.dao.create(SystemNode(Name="C"))  # s0 again
+
+        self.assertTrue(self.dao.move_node(c, a))
+        self.assertNotIn(c, self.directory.roots())
+        self.assertEqual([n.ID for n in self.dao.read_by_parent(a)], [c])
+
+        self.assertTrue(self.dao.move_node(c, None))
+        self.assertEqual(self.directory.roots()[c], "s0")
+        self.assertTrue(self.dao.delete(self.dao.read(c)))
+        self.assertNotIn(c, self.directory.roots())
+
+    def test_resolve_paths_across_shards(self) -> None:
+        work = self.dao.create(SystemNode(Name="Work"))
+        home = self.dao.create(SystemNode(Name="Home"))
+        q4 = self.dao.create(SystemNode(ParentID=home, Name="Q4"))
+
+        nodes = self.dao.resolve_paths(["/Home/Q4", "/Work", "/Nope", "/Work/Q4"])
+
+        self.assertEqual([n.ID if n else None for n in nodes], [q4, work, None, None])
+        self.assertEqual(self.dao.resolve_path("/Home").ID, home)
+
+
+class TestShardConfig(unittest.TestCase):
+    @patch.dict(os.environ, {"DB_SHARDS": "s0=db_a, s1=host2:3307/db_b"})
+    def test_shards_from_env(self) -> None:
+        configs = shard_configs_from_env({"host": "h", "user": "u", "password": "p", "database": "dir"})
+
+        self.assertEqual(list(configs), ["s0", "s1"])
+        self.assertEqual(configs["s0"], {"host": "h", "user": "u", "password": "p", "database": "db_a"})
+        self.assertEqual((configs["s1"]["host"], configs["s1"]["port"], configs["s1"]["database"]),
+                         ("host2", 3307, "db_b"))
+
+
+class TestRecover(unittest.TestCase):
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_prepared_moves_follow_the_decision_log(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [(1, 40, 0, f"{XID_PREFIX}a".encode()), (1, 40, 0, f"{XID_PREFIX}b"),
+                                             (1, 5, 0, "other")]
+        directory = MagicMock(spec=ShardDirectory)
+        directory.resolve.side_effect = lambda xid: "commit" if xid.endswith("a") else "abort"
+        dao = ShardedSystemNodeDAO({"s0": SystemNodeDAO({"host": "fake"})}, directory)
+
+        result = dao.recover()
+
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertEqual(executed, ["XA RECOVER", f"XA COMMIT '{XID_PREFIX}a'", f"XA ROLLBACK '{XID_PREFIX}b'"])
+        self.assertEqual(result, {"committed": [f"s0:{XID_PREFIX}a"], "rolled_back": [f"s0:{XID_PREFIX}b"]})
+        dao.close()
+
+
+class TestCrossShardMoveLimits(unittest.TestCase):
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_ids_above_the_target_range_are_refused(self, mock_connect: MagicMock) -> None:
+        root, child = (1 << ID_SHARD_BITS) + 5, (1 << ID_SHARD_BITS) + 6
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": None}
+        mock_cursor.fetchall.side_effect = [[{"ID": root, "SortOrder": 1}], [{"ID": root}], [{"ID": child}], []]
+        shards = {name: SystemNodeDAO({"host": name}) for name in ("s0", "s1")}
+        dao = ShardedSystemNodeDAO(shards, MagicMock(spec=ShardDirectory))
+
+        with self.assertRaisesRegex(ValueError, "above shard 's0''s range"):
+            dao.move_across(root, "s1", "s0", None, None)
+
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertFalse([sql for sql in executed if "INSERT INTO SystemNode" in sql])
+        self.assertTrue([sql for sql in executed if sql.startswith("XA ROLLBACK")])
+        self.assertEqual((dao._id_limit("s0"), dao._id_limit("s1")), (1 << ID_SHARD_BITS, None))
+        dao.close()
+
+
+@unittest.skipUnless(os.getenv("MYSQL_TEST_SHARD_DATABASES") and os.getenv("MYSQL_TEST_DATABASE"),
+                     "set MYSQL_TEST_SHARD_DATABASES=db_a,db_b (and MYSQL_TEST_DATABASE for the directory)")
+class TestMySQLCrossShardMove(unittest.TestCase):
+    """
+    Cross-shard moves over real local MySQL databases; each is wiped first.
+    """
+
+    def setUp(self) -> None:
+        base = {"host": os.getenv("DB_HOST", "127.0.0.1"), "user": os.getenv("DB_USER", "root"),
+                "password": os.getenv("DB_PASSWORD", "")}
+        names = os.getenv("MYSQL_TEST_SHARD_DATABASES").split(",")
+        shards = {f"s{i}": SystemNodeDAO({**base, "database": name.strip()}) for i, name in enumerate(names)}
+        directory = ShardDirectory({**base, "database": os.getenv("MYSQL_TEST_DATABASE")})
+        self.dao = ShardedSystemNodeDAO(shards, directory)
+        self.dao.init_shards()
+        for table in ("ShardDirectory", "ShardMove"):
+            directory._write(f"DELETE FROM {table}", ())
+        for shard in shards.values():
+            conn = shard._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+            cursor.execute("DELETE FROM SystemNode")
+            cursor.execute("SET FOREIGN_KEY_CHECKS=1")
+            conn.commit()
+            conn.close()
+        directory.refresh()
+
+    def tearDown(self) -> None:
+        self.dao.close()
+
+    def test_subtree_moves_to_a_parent_on_another_shard(self) -> None:
+        a = self.dao.create(SystemNode(Name="A"))
+        b = self.dao.create(SystemNode(Name="B"))
+        x = self.dao.create(SystemNode(ParentID=a, Name="X"))
+        y = self.dao.create(SystemNode(ParentID=a, Name="Y"))
+        x1 = self.dao.create(SystemNode(ParentID=x, Name="X1"))
+        b1 = self.dao.create(SystemNode(ParentID=b, Name="B1"))
+
+        self.assertTrue(self.dao.move_node(x, b, target_index=1))
+
+        self.assertEqual([(n.ID, n.SortOrder) for n in self.dao.read_by_parent(b)], [(x, 1), (b1, 2)])
+        self.assertEqual([(n.ID, n.SortOrder) for n in self.dao.read_by_parent(a)], [(y, 1)])
+        self.assertEqual(self.dao.read(x1).ParentID, x)
+        self.assertIsNone(self.dao.shards["s0"].read(x1))
+        self.assertEqual(self.dao.recover(), {"committed": [], "rolled_back": []})
+
+    def test_root_rebalances_to_another_shard(self) -> None:
+        a = self.dao.create(SystemNode(Name="A"))
+        child = self.dao.create(SystemNode(ParentID=a, Name="A1"))
+
+        self.assertTrue(self.dao.move_root(a, "s1"))
+
+        self.assertEqual(self.dao.directory.refresh()[a], "s1")
+        self.assertEqual(self.dao.shards["s1"].read(child).ParentID, a)
+        self.assertEqual([n.ID for n in self.dao.read_by_parent(None)], [a])
+
+    def test_root_cannot_move_below_its_id_range(self) -> None:
+        self.dao.create(SystemNode(Name="A"))
+        b = self.dao.create(SystemNode(Name="B"))
+
+        with self.assertRaises(ValueError):
+            self.dao.move_root(b, "s0")
+
+        self.assertEqual(self.dao.directory.refresh()[b], "s1")
+        self.assertIsNone(self.dao.shards["s0"].read(b))
+        self.assertEqual(self.dao.recover(), {"committed": [], "rolled_back": []})
+
+    def test_failed_move_leaves_both_shards_unchanged(self) -> None:
+        a = self.dao.create(SystemNode(Name="A"))
+        b = self.dao.create(SystemNode(Name="B"))
+        x = self.dao.create(SystemNode(ParentID=a, Name="X"))
+        self.dao.max_move_rows = 0
+
+        with self.assertRaises(ValueError):
+            self.dao.move_node(x, b)
+
+        self.assertEqual(self.dao.read(x).ParentID, a)
+        self.assertEqual(self.dao.read_by_parent(b), [])
+        self.assertEqual(self.dao.recover(), {"committed": [], "rolled_back": []})
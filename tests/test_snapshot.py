@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dao.in_memory_dao import InMemorySystemNodeDAO
+from src.dao.snapshot import Snapshot, write_snapshot, create_snapshot
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+def sample_nodes():
+    return [
+        SystemNode(ID=7, ParentID=None, Name="root", Tags={"a": 1}, Status="Active", Importance=3, SortOrder=1),
+        SystemNode(ID=2, ParentID=7, Name="child", Description="déjà vu", Status="Active", SortOrder=2),
+        SystemNode(ID=9, ParentID=7, Name="child", Metadata={"k": [1, 2]}, Notes="", SortOrder=1),
+    ]
+
+
+class TestSnapshotFile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tree.snap")
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_round_trip_in_id_order(self) -> None:
+        self.assertEqual(write_snapshot(sample_nodes(), self.path, change_version=42), 3)
+
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.change_version, 42)
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(list(snapshot.iter_nodes()), sorted(sample_nodes(), key=lambda n: n.ID))
+
+    def test_find_by_id(self) -> None:
+        write_snapshot(sample_nodes(), self.path)
+
+        with Snapshot(self.path) as snapshot:
+            node = snapshot.find(9)
+            self.assertEqual(node.Metadata, {"k": [1, 2]})
+            self.assertEqual(node.Notes, "")
+            self.assertIsNone(node.Description)
+            self.assertIsNone(snapshot.find(8))
+            self.assertIsNone(snapshot.find(100))
+
+    def test_repeated_strings_are_stored_once(self) -> None:
+        nodes = [SystemNode(ID=i, Name="same", Status="Active", SortOrder=i) for i in range(1, 101)]
+        write_snapshot(nodes, self.path)
+
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot._offsets), 3)  # "same", "Active", plus the end offset
+
+    def test_rejects_truncated_file(self) -> None:
+        write_snapshot(sample_nodes(), self.path)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_create_snapshot_reads_rows_and_version_in_one_transaction(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchall.return_value = [{
+            "ID": 1, "ParentID": None, "Name": "n", "Description": None, "Notes": None,
+            "Tags": '{"t": 1}', "Metadata": None, "Status": None, "Importance": 0, "SortOrder": 1
+        }]
+        change_log = MagicMock()
+        change_log.safe_version.return_value = 15
+
+        result = create_snapshot(SystemNodeDAO({"host": "fake"}), change_log, self.path)
+
+        self.assertEqual(result["nodes"], 1)
+        self.assertEqual(result["change_version"], 15)
+        mock_conn.start_transaction.assert_called_once_with(consistent_snapshot=True, readonly=True)
+        mock_connect.assert_called_once()
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.find(1).Tags, {"t": 1})
+
+
+class TestLoadFromSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tree.snap")
+        write_snapshot(sample_nodes(), self.path, change_version=5)
+        self.store = MagicMock()
+        self.engine = InMemorySystemNodeDAO(self.store)
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_loads_without_querying_the_store(self) -> None:
+        self.engine.load_from_snapshot(self.path)
+
+        self.store.read_all.assert_not_called()
+        self.assertEqual([n.ID for n in self.engine.read_by_parent(7)], [9, 2])
+        self.assertEqual(self.engine.stats()["snapshot_change_version"], 5)
+
+    def test_catches_up_from_the_change_log(self) -> None:
+        change_log = MagicMock()
+        change_log.changes_since.return_value = (
+            8, [SystemNode(ID=2, ParentID=7, Name="renamed", SortOrder=2),
+                SystemNode(ID=11, ParentID=7, Name="new", SortOrder=3)], [9]
+        )
+
+        self.engine.load_from_snapshot(self.path, change_log)
+
+        change_log.changes_since.assert_called_once_with(5)
+        self.assertEqual([n.Name for n in self.engine.read_by_parent(7)], ["renamed", "new"])
+        self.assertIsNone(self.engine.read(9))
+        self.assertEqual(self.engine.change_version, 8)
+        self.assertEqual(self.engine.create(SystemNode(Name="next")), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+import mysql.connector
+
+from src.dao.sort_compaction import compact_parent, compact_all
+from src.dao.system_node_dao import SystemNodeDAO
+from src.dao.write_hooks import WriteHook
+from src.metrics import metrics
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+class TestCompactParent(unittest.TestCase):
+    def setUp(self) -> None:
+        self.hook = MagicMock(spec=WriteHook)
+        self.dao = SystemNodeDAO({"host": "fake"}, write_hooks=[self.hook])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_renumbers_gaps_and_duplicates_under_row_locks(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        # Already sorted by (SortOrder, ID): a gap after 1 and a duplicate 4.
+        mock_cursor.fetchall.return_value = [(10, 1), (11, 3), (12, 4), (13, 4)]
+
+        result = compact_parent(self.dao, 7)
+
+        self.assertEqual(result["renumbered"], 2)
+        mock_cursor.executemany.assert_called_once()
+        self.assertEqual(mock_cursor.executemany.call_args[0][1], [(2, 11), (3, 12)])
+        executed = [normalize_sql(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        select_sql = next(sql for sql in executed if sql.startswith("select"))
+        self.assertTrue(select_sql.endswith("order by sortorder, id for update"))
+        self.assertEqual(executed[-1], "set session innodb_lock_wait_timeout = default")
+        self.hook.on_reorder.assert_called_once_with(mock_conn, 7)
+        mock_conn.commit.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_dry_run_reads_without_locking_or_writing(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchall.return_value = [(10, 2), (11, 5)]
+
+        result = compact_parent(self.dao, None, dry_run=True)
+
+        self.assertEqual(result["changes"], [{"ID": 10, "from": 2, "to": 1}, {"ID": 11, "from": 5, "to": 2}])
+        self.assertNotIn("for update", normalize_sql(mock_cursor.execute.call_args[0][0]))
+        mock_cursor.executemany.assert_not_called()
+        mock_conn.start_transaction.assert_not_called()
+        mock_conn.commit.assert_not_called()
+        self.hook.on_reorder.assert_not_called()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_healthy_parent_is_left_alone(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [(10, 1), (11, 2)]
+
+        self.assertEqual(compact_parent(self.dao, 7)["renumbered"], 0)
+        mock_cursor.executemany.assert_not_called()
+        self.hook.on_reorder.assert_not_called()
+
+
+class TestCompactAll(unittest.TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+        self.dao = SystemNodeDAO({"host": "fake"})
+
+    @patch("src.dao.sort_compaction.compact_parent")
+    @patch("src.dao.sort_compaction.find_drifted_parents")
+    def test_skips_parents_locked_by_live_writes(self, mock_find: MagicMock, mock_compact: MagicMock) -> None:
+        mock_find.return_value = [{"ParentID": None}, {"ParentID": 4}, {"ParentID": 9}]
+        mock_compact.side_effect = [
+            {"ParentID": None, "children": 3, "renumbered": 2, "changes": []},
+            mysql.connector.Error(msg="Lock wait timeout exceeded", errno=1205),
+            {"ParentID": 9, "children": 5, "renumbered": 1, "changes": []},
+        ]
+
+        report = compact_all(self.dao, pause_seconds=0)
+
+        self.assertEqual(report["parents_checked"], 3)
+        self.assertEqual(report["parents_fixed"], 2)
+        self.assertEqual(report["rows_renumbered"], 3)
+        self.assertEqual(report["busy"], [4])
+        self.assertEqual(metrics.counter("maintenance.sort_compaction.rows_renumbered"), 3)
+
+    @patch("src.dao.sort_compaction.compact_parent")
+    @patch("src.dao.sort_compaction.find_drifted_parents")
+    def test_other_errors_propagate(self, mock_find: MagicMock, mock_compact: MagicMock) -> None:
+        mock_find.return_value = [{"ParentID": 4}]
+        mock_compact.side_effect = mysql.connector.Error(msg="gone away", errno=2006)
+
+        with self.assertRaises(mysql.connector.Error):
+            compact_all(self.dao, pause_seconds=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from src.dao.sqlite_system_node_dao import SQLiteSystemNodeDAO
+from src.dao.system_node import SystemNode
+from tests.system_node_backend_contract import SystemNodeBackendContract
+
+
+class TestSQLiteSystemNodeDAO(SystemNodeBackendContract, unittest.TestCase):
+    """
+    Runs the backend contract against a real SQLite file in a temp directory.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dao = SQLiteSystemNodeDAO(os.path.join(self.tmpdir.name, "system.db"))
+
+    def tearDown(self) -> None:
+        self.dao.close()
+        self.tmpdir.cleanup()
+
+    def test_uses_wal_journal(self) -> None:
+        (mode,) = self.dao._get_connection().execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_parent_lookup_uses_index(self) -> None:
+        plan = self.dao._get_connection().execute(
+            "EXPLAIN QUERY PLAN SELECT ID FROM SystemNode WHERE ParentID IS ? ORDER BY SortOrder", (None,)
+        ).fetchall()
+        detail = " ".join(row["detail"] for row in plan)
+        self.assertIn("idx_systemnode_parent_sort", detail)
+
+
+class TestSQLiteInMemory(unittest.TestCase):
+    def test_memory_database_is_shared_across_threads(self) -> None:
+        dao = SQLiteSystemNodeDAO(":memory:")
+        node_id = dao.create(SystemNode(Name="Shared"))
+        seen = []
+
+        thread = threading.Thread(target=lambda: seen.append(dao.read(node_id)))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(seen[0].Name, "Shared")
+
+
+if __name__ == "__main__":
+    unittest.main()
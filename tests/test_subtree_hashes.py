@@ -0,0 +1,171 @@
+import unittest
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+from unittest.mock import MagicMock
+
+from src.client import local_hashes
+from src.dao.subtree_hashes import SubtreeHashes
+from src.dao.system_node import SystemNode, merkle_hash
+from src.dao.system_node_dao import SystemNodeDAO
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+class MemoryHashes(SubtreeHashes):
+    """
+    SubtreeHashes over nodes() (a callable, so it follows a live backend) and an in-memory
+    SystemNodeHash table: {ID: [Version, Hash or None]}.
+    """
+
+    def __init__(self, nodes: Callable[[], List[SystemNode]]):
+        super().__init__(MagicMock())
+        self.nodes = nodes
+        self.table: Dict[int, list] = {}
+        self.computed: List[int] = []
+
+    def _fetch_children(self, conn, parent_ids: List[Optional[int]]) -> Dict[Optional[int], List[int]]:
+        children = {parent_id: [] for parent_id in parent_ids}
+        for node in sorted(self.nodes(), key=lambda n: (n.SortOrder, n.ID)):
+            if node.ParentID in children:
+                children[node.ParentID].append(node.ID)
+        return children
+
+    def _fetch_stored(self, conn, node_ids: List[int]) -> dict:
+        return {node_id: tuple(self.table[node_id]) for node_id in node_ids if node_id in self.table}
+
+    def _fetch_nodes(self, conn, node_ids: List[int]) -> Dict[int, SystemNode]:
+        return {node.ID: node for node in self.nodes() if node.ID in node_ids}
+
+    def _store(self, conn, computed: Dict[int, bytes], versions: Dict[int, int]) -> None:
+        self.computed.extend(sorted(computed))
+        for node_id, digest in computed.items():
+            row = self.table.setdefault(node_id, [0, None])
+            if row[0] == versions.get(node_id, 0) and row[1] is None:
+                row[1] = digest
+
+    def invalidate(self, node_id: int) -> None:
+        row = self.table.setdefault(node_id, [0, None])
+        row[0] += 1
+        row[1] = None
+
+
+class TestMerkleHash(unittest.TestCase):
+    def test_covers_content_and_child_order(self) -> None:
+        node = SystemNode(ID=1, Name="A", Tags={"b": 1, "a": 2})
+        reordered_tags = replace(node, Tags={"a": 2, "b": 1})
+
+        self.assertEqual(merkle_hash(node, [b"x", b"y"]), merkle_hash(reordered_tags, [b"x", b"y"]))
+        self.assertEqual(merkle_hash(node, []), merkle_hash(replace(node, SortOrder=9, ParentID=4), []))
+        self.assertNotEqual(merkle_hash(node, [b"x", b"y"]), merkle_hash(node, [b"y", b"x"]))
+        self.assertNotEqual(merkle_hash(node, []), merkle_hash(replace(node, Status="Done"), []))
+        self.assertEqual(merkle_hash(SystemNode(ID=1, Tags=None), []), merkle_hash(SystemNode(ID=1), []))
+
+
+class TestInvalidationHooks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({"host": "fake"})
+        self.hashes = SubtreeHashes(self.dao)
+        self.conn = MagicMock()
+        self.cursor = self.conn.cursor.return_value
+
+    def _invalidated(self) -> list:
+        for call in self.cursor.execute.call_args_list:
+            if normalize_sql(call[0][0]).startswith("insert into systemnodehash"):
+                self.assertIn("on duplicate key update version = version + 1, hash = null", normalize_sql(call[0][0]))
+                return list(call[0][1])
+        return []
+
+    def test_registers_itself_as_write_hook(self) -> None:
+        self.assertIn(self.hashes, self.dao.write_hooks)
+
+    def test_create_clears_the_node_and_its_ancestors_in_id_order(self) -> None:
+        self.cursor.fetchall.return_value = [(5,), (1,)]
+
+        self.hashes.on_create(self.conn, SystemNode(ID=9, ParentID=5))
+
+        self.assertEqual(self._invalidated(), [1, 5, 9])
+
+    def test_update_across_parents_clears_both_chains(self) -> None:
+        self.cursor.fetchall.side_effect = [[(5,), (1,)], [(7,), (1,)]]
+
+        self.hashes.on_update(self.conn, SystemNode(ID=9, ParentID=5), SystemNode(ID=9, ParentID=7))
+
+        self.assertEqual(self._invalidated(), [1, 5, 7, 9])
+
+    def test_delete_drops_the_row_and_clears_ancestors(self) -> None:
+        self.cursor.fetchall.return_value = [(5,)]
+
+        self.hashes.on_delete(self.conn, SystemNode(ID=9, ParentID=5))
+
+        self.assertEqual(normalize_sql(self.cursor.execute.call_args_list[1][0][0]),
+                         "delete from systemnodehash where nodeid = %s")
+        self.assertEqual(self._invalidated(), [5])
+
+    def test_reorder_of_top_level_touches_nothing(self) -> None:
+        self.hashes.on_reorder(self.conn, None)
+
+        self.cursor.execute.assert_not_called()
+
+    def test_node_rows_are_read_without_prepared_statements(self) -> None:
+        self.dao._fetch = MagicMock(side_effect=AssertionError("dynamic SQL would be re-prepared per call"))
+        self.cursor.fetchall.return_value = [{"ID": 3, "ParentID": None, "Name": "A", "Description": None,
+                                              "Notes": None, "Tags": None, "Metadata": None, "Status": None,
+                                              "Importance": 0, "SortOrder": 1}]
+
+        nodes = self.hashes._fetch_nodes(self.conn, [3])
+
+        self.assertEqual(nodes[3].Name, "A")
+        self.conn.cursor.assert_called_with(dictionary=True)
+
+
+class TestHashTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.nodes = [
+            SystemNode(ID=1, Name="A", SortOrder=1),
+            SystemNode(ID=2, Name="B", SortOrder=2),
+            SystemNode(ID=3, ParentID=1, Name="A1", SortOrder=2),
+            SystemNode(ID=4, ParentID=1, Name="A2", SortOrder=1),
+            SystemNode(ID=5, ParentID=4, Name="A2a", SortOrder=1),
+        ]
+        self.hashes = MemoryHashes(lambda: self.nodes)
+
+    def test_matches_hashes_computed_over_a_local_copy(self) -> None:
+        local = local_hashes(self.nodes)
+
+        tree = self.hashes.tree(None, depth=2)
+
+        self.assertEqual(tree["Hash"], local[None])
+        self.assertEqual([(c["ID"], c["Hash"]) for c in tree["Children"]], [(1, local[1]), (2, local[2])])
+        self.assertEqual([c["ID"] for c in tree["Children"][0]["Children"]], [4, 3])
+        self.assertNotIn("Children", tree["Children"][0]["Children"][0])
+
+    def test_stored_hashes_are_reused_until_cleared(self) -> None:
+        self.hashes.tree(1, depth=1)
+        self.assertEqual(sorted(self.hashes.computed), [1, 3, 4, 5])
+
+        self.hashes.computed.clear()
+        self.nodes[4] = replace(self.nodes[4], Name="changed")
+        for node_id in (5, 4, 1):
+            self.hashes.invalidate(node_id)
+        tree = self.hashes.tree(1, depth=1)
+
+        self.assertEqual(sorted(self.hashes.computed), [1, 4, 5])
+        self.assertEqual(tree["Hash"], local_hashes(self.nodes)[1])
+
+    def test_hash_is_not_stored_over_a_newer_invalidation(self) -> None:
+        self.hashes.invalidate(3)
+        self.hashes._store(None, {3: b"old"}, {3: 0})
+
+        self.assertIsNone(self.hashes.table[3][1])
+
+    def test_missing_node_and_depth_limit(self) -> None:
+        self.assertIsNone(self.hashes.tree(99, depth=1))
+        self.assertEqual(set(self.hashes.tree(2, depth=0)), {"ID", "Hash"})
+        with self.assertRaises(ValueError):
+            self.hashes.tree(1, depth=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
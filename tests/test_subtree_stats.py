@@ -0,0 +1,178 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dao.subtree_stats import SubtreeStats
+from src.dao.system_node import SystemNode
+from src.dao.system_node_dao import SystemNodeDAO
+from src.dao.write_hooks import WriteHook
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+class TestWriteHooks(unittest.TestCase):
+    """
+    Hooks run on the write's connection after the row change and before the commit.
+    """
+
+    def setUp(self) -> None:
+        self.hook = MagicMock(spec=WriteHook)
+        self.dao = SystemNodeDAO({"host": "fake"}, write_hooks=[self.hook])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_create_hook_sees_new_id_before_commit(self, mock_connect: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = (4,)
+        mock_cursor.lastrowid = 77
+        order = []
+        self.hook.on_create.side_effect = lambda conn, node: order.append(("hook", node.ID, node.SortOrder))
+        mock_conn.commit.side_effect = lambda: order.append(("commit",))
+
+        self.dao.create(SystemNode(Name="n", ParentID=3))
+
+        self.assertEqual(order, [("hook", 77, 4), ("commit",)])
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_hooks_skip_writes_that_changed_nothing(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.rowcount = 0
+
+        self.dao.update(SystemNode(ID=1), SystemNode(ID=1, Status="Done"))
+        self.dao.delete(SystemNode(ID=1))
+
+        self.hook.on_update.assert_not_called()
+        self.hook.on_delete.assert_not_called()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_move_hook_gets_old_and_new_parent(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": 8, "SortOrder": 2}
+        mock_cursor.fetchall.side_effect = [[{"ID": 5, "SortOrder": 2}], []]
+        mock_cursor.rowcount = 1
+
+        self.dao.move_node(5, 9)
+
+        self.hook.on_move.assert_called_once_with(mock_connect.return_value, 5, 8, 9)
+
+
+class TestSubtreeStats(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dao = SystemNodeDAO({"host": "fake"})
+        self.stats = SubtreeStats(self.dao)
+        self.conn = MagicMock()
+        self.cursor = self.conn.cursor.return_value
+
+    def _rollup_rows(self) -> list:
+        rows = []
+        for call in self.cursor.executemany.call_args_list:
+            self.assertIn("on duplicate key update descendants = descendants +", normalize_sql(call[0][0]))
+            rows.extend(call[0][1])
+        return rows
+
+    def test_registers_itself_as_write_hook(self) -> None:
+        self.assertIn(self.stats, self.dao.write_hooks)
+
+    def test_create_increments_every_ancestor(self) -> None:
+        self.cursor.fetchall.return_value = [(5,), (1,)]
+
+        self.stats.on_create(self.conn, SystemNode(ID=9, ParentID=5, Status="Active"))
+
+        self.assertIn("with recursive chain", normalize_sql(self.cursor.execute.call_args[0][0]))
+        self.assertEqual(self._rollup_rows(), [(5, "Active", 1), (1, "Active", 1)])
+
+    def test_create_of_top_level_node_touches_nothing(self) -> None:
+        self.stats.on_create(self.conn, SystemNode(ID=9, ParentID=None, Status="Active"))
+        self.cursor.executemany.assert_not_called()
+
+    def test_status_change_moves_one_count(self) -> None:
+        self.cursor.fetchall.return_value = [(5,)]
+
+        self.stats.on_update(
+            self.conn,
+            SystemNode(ID=9, ParentID=5, Status="Active"),
+            SystemNode(ID=9, ParentID=5, Status="Done")
+        )
+
+        self.assertEqual(sorted(self._rollup_rows()), [(5, "Active", -1), (5, "Done", 1)])
+
+    def test_null_status_uses_empty_key(self) -> None:
+        self.cursor.fetchall.return_value = [(5,)]
+
+        self.stats.on_update(
+            self.conn,
+            SystemNode(ID=9, ParentID=5, Status=None),
+            SystemNode(ID=9, ParentID=5, Status="Done")
+        )
+
+        self.assertEqual(sorted(self._rollup_rows()), [(5, "", -1), (5, "Done", 1)])
+
+    def test_move_carries_whole_subtree(self) -> None:
+        self.cursor.fetchone.return_value = ("Active",)
+        self.cursor.fetchall.side_effect = [
+            [("Done", 2)],      # the moved node's own rollups
+            [(2,)],             # old parent chain
+            [(3,), (1,)],       # new parent chain
+        ]
+
+        self.stats.on_move(self.conn, 9, 2, 3)
+
+        self.assertEqual(sorted(self._rollup_rows()), [
+            (1, "Active", 1), (1, "Done", 2),
+            (2, "Active", -1), (2, "Done", -2),
+            (3, "Active", 1), (3, "Done", 2),
+        ])
+
+    def test_delete_subtracts_and_drops_own_rows(self) -> None:
+        self.cursor.fetchall.side_effect = [[], [(2,), (1,)]]
+
+        self.stats.on_delete(self.conn, SystemNode(ID=9, ParentID=2, Status="Done"))
+
+        self.assertEqual(self._rollup_rows(), [(2, "Done", -1), (1, "Done", -1)])
+        sql, params = self.cursor.execute.call_args[0]
+        self.assertIn("delete from systemnodestatusrollup where nodeid = %s", normalize_sql(sql))
+        self.assertEqual(params, (9,))
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_recompute_rebuilds_from_tree(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            (1, None, None),
+            (2, 1, "Done"),
+            (3, 2, "Done"),
+            (4, 2, "Active"),
+        ]
+
+        summary = self.stats.recompute()
+
+        inserted = mock_cursor.executemany.call_args[0][1]
+        self.assertEqual(sorted(inserted), [
+            (1, "Active", 1), (1, "Done", 2),
+            (2, "Active", 1), (2, "Done", 1),
+        ])
+        self.assertEqual(summary, {"nodes": 4, "rollup_rows": 4})
+        mock_connect.return_value.commit.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_read_sums_status_counts(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.fetchall.return_value = [
+            {"ID": 1, "Status": "Done", "Descendants": 2},
+            {"ID": 1, "Status": "Active", "Descendants": 1},
+        ]
+
+        self.assertEqual(self.stats.read(1), {
+            "ID": 1, "DescendantCount": 3, "StatusCounts": {"Done": 2, "Active": 1}
+        })
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_read_of_leaf_and_missing_node(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.fetchall.return_value = [
+            {"ID": 1, "Status": None, "Descendants": None},
+        ]
+
+        self.assertEqual(self.stats.read(1), {"ID": 1, "DescendantCount": 0, "StatusCounts": {}})
+        self.assertIsNone(self.stats.read(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
 import unittest
 from unittest.mock import patch, MagicMock
 
+import mysql.connector
+
 # Adjust these imports to match your actual paths
 from src.dao.system_node_dao import SystemNodeDAO
 from src.dao.system_node import SystemNode
+from src.metrics import metrics
 
 
 def normalize_sql(sql: str) -> str:
@@ -335,13 +338,14 @@ class TestSystemNodeDAO(unittest.TestCase):
         mock_connect.return_value = mock_conn
         mock_conn.cursor.return_value = mock_cursor
 
-        # Step 1: read old parent's ParentID, SortOrder => (None, 2)
-        # Step 2: SHIFT old parent's siblings if parent changed
-        # Step 3: read new parent's max sort => 5
-        # Step 4: update node => rowcount=1
-        mock_cursor.fetchone.side_effect = [
-            {"ParentID": None, "SortOrder": 2},   # read old row
-            {"next_pos": 5}                       # new parent's next order
+        # Step 1: read old row => (None, 2)
+        # Step 2: lock the old (NULL) and new (999) sibling lists, in that order
+        # Step 3: close the gap in the old parent
+        # Step 4: update node => rowcount=1, at the end of the new parent's list
+        mock_cursor.fetchone.return_value = {"ParentID": None, "SortOrder": 2}
+        mock_cursor.fetchall.side_effect = [
+            [{"ID": 300, "SortOrder": 1}, {"ID": 400, "SortOrder": 2}, {"ID": 500, "SortOrder": 3}],
+            [{"ID": 10, "SortOrder": 3}, {"ID": 11, "SortOrder": 4}],
         ]
         mock_cursor.rowcount = 1
 
@@ -349,27 +353,27 @@ class TestSystemNodeDAO(unittest.TestCase):
         self.assertTrue(success)
 
         calls = mock_cursor.execute.call_args_list
-        self.assertEqual(len(calls), 4, "Should have 4 queries total.")
+        self.assertEqual(len(calls), 5, "Should have 5 queries total.")
 
         sql1, param1 = calls[0][0]
         norm1 = normalize_sql(sql1)
         self.assertIn("select parentid, sortorder from systemnode", norm1)
         self.assertEqual(param1, (400,))
 
-        sql2, param2 = calls[1][0]
-        norm2 = normalize_sql(sql2)
-        self.assertIn("set sortorder = sortorder - 1", norm2)
-        self.assertEqual(param2, (None, 2))
-
-        sql3, param3 = calls[2][0]
-        norm3 = normalize_sql(sql3)
-        self.assertIn("select coalesce(max(sortorder), 0) + 1 as next_pos", norm3)
-        self.assertEqual(param3, (999,))
+        for call, parent_id in zip(calls[1:3], [None, 999]):
+            sql, param = call[0]
+            self.assertIn("where parentid <=> %s order by sortorder for update", normalize_sql(sql))
+            self.assertEqual(param, (parent_id,))
 
         sql4, param4 = calls[3][0]
         norm4 = normalize_sql(sql4)
-        self.assertIn("update systemnode set parentid = %s, sortorder = %s", norm4)
-        self.assertEqual(param4, (999, 5, 400))
+        self.assertIn("set sortorder = sortorder - 1", norm4)
+        self.assertEqual(param4, (None, 2))
+
+        sql5, param5 = calls[4][0]
+        norm5 = normalize_sql(sql5)
+        self.assertIn("update systemnode set parentid = %s, sortorder = %s", norm5)
+        self.assertEqual(param5, (999, 5, 400))
 
         mock_conn.commit.assert_called_once()
 
@@ -379,7 +383,7 @@ class TestSystemNodeDAO(unittest.TestCase):
     @patch("src.dao.system_node_dao.mysql.connector.connect")
     def test_move_node_reorder_same_parent(self, mock_connect: MagicMock) -> None:
         """
-        Reordering within the same parent => no gap close, just shift >= target_index.
+        Reordering within the same parent => close the old gap, then shift >= target_index.
         """
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -388,13 +392,16 @@ class TestSystemNodeDAO(unittest.TestCase):
 
         # old parent=10, old_sort_order=3, new_parent=10, target_index=1
         mock_cursor.fetchone.return_value = {"ParentID": 10, "SortOrder": 3}
+        mock_cursor.fetchall.return_value = [
+            {"ID": 498, "SortOrder": 1}, {"ID": 499, "SortOrder": 2}, {"ID": 500, "SortOrder": 3}
+        ]
         mock_cursor.rowcount = 1
 
         success = self.dao.move_node(500, 10, 1)
         self.assertTrue(success)
 
         calls = mock_cursor.execute.call_args_list
-        self.assertEqual(len(calls), 3, "3 queries: read old row, shift siblings, update node")
+        self.assertEqual(len(calls), 5, "5 queries: read old row, lock siblings, close gap, shift siblings, update")
 
         sql1, param1 = calls[0][0]
         norm1 = normalize_sql(sql1)
@@ -402,18 +409,166 @@ class TestSystemNodeDAO(unittest.TestCase):
         self.assertEqual(param1, (500,))
 
         sql2, param2 = calls[1][0]
-        norm2 = normalize_sql(sql2)
-        self.assertIn("set sortorder = sortorder + 1", norm2)
-        self.assertIn("where parentid <=> %s and sortorder >= %s", norm2)
-        self.assertEqual(param2, (10, 1))
+        self.assertIn("for update", normalize_sql(sql2))
+        self.assertEqual(param2, (10,))
 
         sql3, param3 = calls[2][0]
-        norm3 = normalize_sql(sql3)
-        self.assertIn("update systemnode set parentid = %s, sortorder = %s", norm3)
-        self.assertEqual(param3, (10, 1, 500))
+        self.assertIn("set sortorder = sortorder - 1", normalize_sql(sql3))
+        self.assertEqual(param3, (10, 3))
+
+        sql4, param4 = calls[3][0]
+        norm4 = normalize_sql(sql4)
+        self.assertIn("set sortorder = sortorder + 1", norm4)
+        self.assertIn("where parentid <=> %s and sortorder >= %s and id <> %s", norm4)
+        self.assertEqual(param4, (10, 1, 500))
+
+        sql5, param5 = calls[4][0]
+        norm5 = normalize_sql(sql5)
+        self.assertIn("update systemnode set parentid = %s, sortorder = %s", norm5)
+        self.assertEqual(param5, (10, 1, 500))
+
+        mock_conn.commit.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_move_node_clamps_target_index_to_end(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": 10, "SortOrder": 1}
+        mock_cursor.fetchall.return_value = [{"ID": 500, "SortOrder": 1}, {"ID": 501, "SortOrder": 2}]
+        mock_cursor.rowcount = 1
+
+        self.assertTrue(self.dao.move_node(500, 10, 9))
+
+        calls = mock_cursor.execute.call_args_list
+        self.assertNotIn("sortorder + 1", " ".join(normalize_sql(c[0][0]) for c in calls))
+        self.assertEqual(calls[-1][0][1], (10, 2, 500))
+
+    @patch("src.dao.system_node_dao.time.sleep")
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_move_node_retries_deadlocks(self, mock_connect: MagicMock, mock_sleep: MagicMock) -> None:
+        metrics.reset()
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": None, "SortOrder": 1}
+        deadlock = mysql.connector.Error(msg="Deadlock found", errno=1213)
+        mock_cursor.fetchall.side_effect = [
+            deadlock,
+            [{"ID": 400, "SortOrder": 1}], [],
+        ]
+        mock_cursor.rowcount = 1
+
+        self.assertTrue(self.dao.move_node(400, 7))
+
+        self.assertEqual(mock_conn.rollback.call_count, 1)
+        mock_conn.commit.assert_called_once()
+        mock_sleep.assert_called_once()
+        self.assertEqual(metrics.counter("dao.move.retries"), 1)
+        self.assertEqual(metrics.counter("dao.move.retries.deadlock"), 1)
+
+    @patch("src.dao.system_node_dao.time.sleep")
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_move_node_gives_up_after_max_retries(self, mock_connect: MagicMock, mock_sleep: MagicMock) -> None:
+        metrics.reset()
+        dao = SystemNodeDAO(self.db_config, move_retries=2)
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = {"ParentID": None, "SortOrder": 1}
+        mock_cursor.fetchall.side_effect = mysql.connector.Error(msg="Lock wait timeout", errno=1205)
+
+        with self.assertRaises(mysql.connector.Error):
+            dao.move_node(400, 7)
 
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(metrics.counter("dao.move.retries.lock_wait_timeout"), 2)
+        self.assertEqual(metrics.counter("dao.move.gave_up"), 1)
+
+    @patch("src.dao.system_node_dao.time.sleep")
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_move_node_restarts_if_node_changed_parent(self, mock_connect: MagicMock, mock_sleep: MagicMock) -> None:
+        mock_conn = mock_connect.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        # The first read says parent 3, but by the time parent 3 is locked the node has left it.
+        mock_cursor.fetchone.side_effect = [{"ParentID": 3, "SortOrder": 1}, {"ParentID": 5, "SortOrder": 1}]
+        mock_cursor.fetchall.side_effect = [[], [], [{"ID": 400, "SortOrder": 1}], []]
+        mock_cursor.rowcount = 1
+
+        self.assertTrue(self.dao.move_node(400, 7))
+
+        self.assertEqual(mock_conn.rollback.call_count, 1)
+        self.assertEqual(mock_cursor.execute.call_args_list[-1][0][1], (7, 1, 400))
+
+    # ------------------------------------------------------------------
+    # APPLY BATCH
+    # ------------------------------------------------------------------
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_apply_batch_upserts_then_deletes(self, mock_connect: MagicMock) -> None:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        upserts = [
+            SystemNode(ID=1, ParentID=None, Name="Parent", SortOrder=1),
+            SystemNode(ID=2, ParentID=1, Name="Child", Tags={"a": 1}, SortOrder=1)
+        ]
+        self.dao.apply_batch(upserts, [7, 6])
+
+        sql_upsert, rows = mock_cursor.executemany.call_args[0]
+        norm = normalize_sql(sql_upsert)
+        self.assertIn("insert into systemnode", norm)
+        self.assertIn("on duplicate key update", norm)
+        self.assertEqual([row[0] for row in rows], [1, 2])
+        self.assertEqual(rows[1][5], '{"a": 1}')
+
+        delete_calls = mock_cursor.execute.call_args_list
+        self.assertEqual([c[0][1] for c in delete_calls], [(7,), (6,)])
+        mock_conn.start_transaction.assert_called_once()
         mock_conn.commit.assert_called_once()
 
+    # ------------------------------------------------------------------
+    # PATHS
+    # ------------------------------------------------------------------
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_resolve_path_is_one_query(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = {
+            "ID": 9, "ParentID": 4, "Name": "Q4", "Description": None, "Notes": None,
+            "Tags": None, "Metadata": None, "Status": None, "Importance": 0, "SortOrder": 1
+        }
+
+        node = self.dao.resolve_path("/Work/Projects/Q4")
+
+        self.assertEqual(node.ID, 9)
+        mock_cursor.execute.assert_called_once()
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertEqual(params, ("Work", "Projects", "Q4"))
+        norm = normalize_sql(sql)
+        self.assertEqual(norm.count("select id from systemnode where parentid"), 3)
+        self.assertIn("where parentid is null and name = %s order by sortorder, id limit 1", norm)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_resolve_paths_queries_once_per_level(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.side_effect = [
+            [(0, 1), (0, 7)],        # level 1: "Work" (two siblings named Work: first by SortOrder wins)
+            [(0, 2), (1, 3)],        # level 2: "Work/A", "Work/B"
+            [
+                {"ID": 2, "ParentID": 1, "Name": "A", "Description": None, "Notes": None, "Tags": None,
+                 "Metadata": None, "Status": None, "Importance": 0, "SortOrder": 1},
+                {"ID": 3, "ParentID": 1, "Name": "B", "Description": None, "Notes": None, "Tags": None,
+                 "Metadata": None, "Status": None, "Importance": 0, "SortOrder": 2},
+            ],
+        ]
+
+        nodes = self.dao.resolve_paths(["/Work/A", "/Work/B", "/Work/A"])
+
+        self.assertEqual([n.ID for n in nodes], [2, 3, 2])
+        calls = mock_cursor.execute.call_args_list
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[0][0][1], (0, None, "Work"))
+        self.assertEqual(calls[1][0][1], (0, 1, "A", 1, 1, "B"))
+        self.assertIn("join systemnode n on n.parentid <=> r.parentid and n.name = r.name",
+                      normalize_sql(calls[1][0][0]))
+        self.assertEqual(calls[2][0][1], (2, 3))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.dao.system_node_dao import SystemNodeDAO
+from src.tracing import Tracer, InMemoryExporter, FileExporter, TracedConnection, sql_shape, tracer, traced
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split()).lower()
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = InMemoryExporter()
+        self.tracer = Tracer(sample_rate=1.0, exporter=self.exporter)
+
+    def test_child_spans_link_to_their_parent(self) -> None:
+        with self.tracer.start_trace("request", trace_id="t1") as root:
+            with self.tracer.span("outer", a=1) as outer:
+                with self.tracer.span("inner"):
+                    pass
+
+        (spans,) = self.exporter.traces("t1")
+        self.assertEqual([s["name"] for s in spans], ["request", "outer", "inner"])
+        self.assertIsNone(spans[0]["parent_id"])
+        self.assertEqual(spans[1]["parent_id"], root.span_id)
+        self.assertEqual(spans[2]["parent_id"], outer.span_id)
+        self.assertEqual(spans[1]["attributes"], {"a": 1})
+        self.assertTrue(all(s["duration_ms"] is not None for s in spans))
+
+    def test_unsampled_trace_records_nothing(self) -> None:
+        self.tracer.sample_rate = 0.0
+        with self.tracer.start_trace("request") as root:
+            root.set(status=200)
+            with self.tracer.span("child"):
+                self.assertFalse(self.tracer.active())
+        self.assertEqual(self.exporter.traces(), [])
+
+    def test_force_samples_when_rate_is_zero(self) -> None:
+        self.tracer.sample_rate = 0.0
+        with self.tracer.start_trace("request", force=True):
+            pass
+        self.assertEqual(len(self.exporter.traces()), 1)
+
+    def test_span_outside_a_trace_is_a_no_op(self) -> None:
+        with self.tracer.span("orphan") as span:
+            span.set(x=1)
+        self.assertEqual(self.exporter.traces(), [])
+
+    def test_error_is_recorded_and_reraised(self) -> None:
+        with self.assertRaises(ValueError):
+            with self.tracer.start_trace("request"):
+                with self.tracer.span("failing"):
+                    raise ValueError("boom")
+        spans = self.exporter.traces()[0]
+        self.assertEqual(spans[1]["attributes"]["error"], "ValueError: boom")
+        self.assertFalse(self.tracer.active())
+
+    def test_spans_per_trace_are_capped(self) -> None:
+        self.tracer.max_spans_per_trace = 3
+        with self.tracer.start_trace("request"):
+            for _ in range(10):
+                with self.tracer.span("child"):
+                    pass
+        self.assertEqual(len(self.exporter.traces()[0]), 3)
+
+    def test_in_memory_exporter_keeps_the_latest_traces(self) -> None:
+        exporter = InMemoryExporter(max_traces=2)
+        for trace_id in ("a", "b", "c"):
+            exporter.export([{"trace_id": trace_id}])
+        self.assertEqual([t[0]["trace_id"] for t in exporter.traces()], ["b", "c"])
+
+    def test_file_exporter_writes_json_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "spans.jsonl")
+            self.tracer.exporter = FileExporter(path)
+            with self.tracer.start_trace("request"):
+                with self.tracer.span("child"):
+                    pass
+            with open(path) as f:
+                names = [json.loads(line)["name"] for line in f]
+        self.assertEqual(names, ["request", "child"])
+
+    def test_sql_shape_collapses_whitespace_and_truncates(self) -> None:
+        self.assertEqual(sql_shape("SELECT *\n   FROM  T\n WHERE ID = %s"), "SELECT * FROM T WHERE ID = %s")
+        self.assertEqual(sql_shape("x" * 300, limit=10), "x" * 10 + "...")
+
+
+class TestTracedConnection(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = InMemoryExporter()
+        tracer.configure(sample_rate=1.0, exporter=self.exporter)
+
+    def tearDown(self) -> None:
+        tracer.configure(sample_rate=0.0, exporter=InMemoryExporter())
+
+    def test_execute_commit_and_fetched_rows_get_spans(self) -> None:
+        raw = MagicMock()
+        raw.cursor.return_value.rowcount = 2
+        raw.cursor.return_value.fetchall.return_value = [(1,), (2,)]
+
+        with tracer.start_trace("request"):
+            conn = TracedConnection(raw)
+            cursor = conn.cursor()
+            cursor.execute("UPDATE  SystemNode\n SET SortOrder = %s", (1,))
+            cursor.fetchall()
+            conn.commit()
+
+        spans = self.exporter.traces()[0]
+        execute = spans[1]
+        self.assertEqual(execute["name"], "db.execute")
+        self.assertEqual(execute["attributes"], {"sql": "UPDATE SystemNode SET SortOrder = %s", "rowcount": 2,
+                                                 "rows": 2})
+        self.assertEqual(spans[2]["name"], "db.commit")
+        raw.cursor.return_value.execute.assert_called_once_with("UPDATE  SystemNode\n SET SortOrder = %s", (1,))
+        raw.commit.assert_called_once()
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_dao_read_is_traced_down_to_the_query(self, mock_connect: MagicMock) -> None:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.rowcount = -1
+        mock_cursor.fetchone.return_value = None
+        dao = SystemNodeDAO({"host": "db"})
+
+        with tracer.start_trace("GET /nodes/<int:node_id>", trace_id="t"):
+            self.assertIsNone(dao.read(7))
+
+        spans = self.exporter.traces("t")[0]
+        by_name = {s["name"]: s for s in spans}
+        self.assertEqual([s["name"] for s in spans], ["GET /nodes/<int:node_id>", "dao.read", "db.connect",
+                                                      "db.execute"])
+        self.assertEqual(by_name["db.connect"]["parent_id"], by_name["dao.read"]["span_id"])
+        self.assertEqual(by_name["db.execute"]["parent_id"], by_name["dao.read"]["span_id"])
+        self.assertEqual(by_name["db.connect"]["attributes"], {"role": "read"})
+        self.assertIn("where id = %s", normalize_sql(by_name["db.execute"]["attributes"]["sql"]))
+        self.assertEqual(by_name["db.execute"]["attributes"]["rows"], 0)
+
+    @patch("src.dao.system_node_dao.mysql.connector.connect")
+    def test_dao_runs_untraced_outside_a_trace(self, mock_connect: MagicMock) -> None:
+        mock_connect.return_value.cursor.return_value.fetchone.return_value = None
+        SystemNodeDAO({"host": "db"}).read(7)
+        self.assertEqual(self.exporter.traces(), [])
+
+    def test_traced_decorator_keeps_the_function_name(self) -> None:
+        @traced("work")
+        def work():
+            return 1
+        self.assertEqual(work.__name__, "work")
+        self.assertEqual(work(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()